@@ -11,12 +11,14 @@ import logging
 import time
 from typing import Optional
 from core.sanderling.service import SanderlingService
+from core.sanderling.tracing import traced
 from eve.mouse import click, random_delay
 from eve.keyboard import press_key, key_down, key_up
 
 logger = logging.getLogger(__name__)
 
 
+@traced('process_cache')
 def process_cache(
     sanderling: SanderlingService,
     approach_timeout: float = 120.0,
@@ -104,6 +106,7 @@ def process_cache(
     return True
 
 
+@traced('find_cache')
 def find_cache(sanderling: SanderlingService, timeout: float = 5.0) -> Optional[object]:
     """
     Найти Triglavian Cache (Bioadaptive/Biocombinative) в overview.
@@ -124,18 +127,16 @@ def find_cache(sanderling: SanderlingService, timeout: float = 5.0) -> Optional[
             continue
         
         # Ищем контейнер по имени и типу (проверяем разные варианты)
-        for entry in state.overview:
-            name_str = (entry.name or "").lower()
-            type_str = (entry.type or "").lower()
-            
-            # Проверяем разные варианты названия в name и type
-            if any(keyword in name_str or keyword in type_str for keyword in [
-                'bioadaptive cache',
-                'biocombinative cache',
-                'triglavian cache'
-            ]):
-                logger.debug(f"Найден контейнер: '{entry.name}' (type: '{entry.type}')")
-                return entry
+        found = state.overview_index.matching(
+            'bioadaptive cache',
+            'biocombinative cache',
+            'triglavian cache',
+            include_type=True
+        )
+        if found:
+            entry = found[0]
+            logger.debug(f"Найден контейнер: '{entry.name}' (type: '{entry.type}')")
+            return entry
         
         time.sleep(0.5)
     
@@ -150,6 +151,7 @@ def find_cache(sanderling: SanderlingService, timeout: float = 5.0) -> Optional[
     return None
 
 
+@traced('approach_cache')
 def approach_cache(sanderling: SanderlingService, cache_entry: object) -> bool:
     """
     Выбрать контейнер и аппрочить его.
@@ -190,6 +192,7 @@ def approach_cache(sanderling: SanderlingService, cache_entry: object) -> bool:
     return True
 
 
+@traced('ensure_mwd_active')
 def ensure_mwd_active(sanderling: SanderlingService) -> None:
     """
     Проверить что МВД включен, если нет - включить.
@@ -223,6 +226,7 @@ def ensure_mwd_active(sanderling: SanderlingService) -> None:
     press_key('2')
 
 
+@traced('launch_drones_safe')
 def launch_drones_safe() -> None:
     """
     Выпустить дронов (Shift+F).
@@ -248,6 +252,7 @@ def launch_drones_safe() -> None:
     random_delay(0.5, 0.8)  # Даем время на выпуск
 
 
+@traced('wait_and_attack')
 def wait_and_attack(
     sanderling: SanderlingService,
     attack_distance_km: float,
@@ -273,27 +278,23 @@ def wait_and_attack(
             continue
         
         # Найти контейнер в overview
-        cache = None
-        for e in state.overview:
-            name_str = (e.name or "").lower()
-            type_str = (e.type or "").lower()
-            if any(keyword in name_str or keyword in type_str for keyword in [
-                'bioadaptive cache',
-                'biocombinative cache'
-            ]):
-                cache = e
-                break
+        found = state.overview_index.matching(
+            'bioadaptive cache',
+            'biocombinative cache',
+            include_type=True
+        )
+        cache = found[0] if found else None
         
         if not cache:
             logger.warning("Контейнер исчез из overview")
             time.sleep(0.5)
             continue
         
-        # Парсим дистанцию
-        distance_km = parse_distance_km(cache.distance)
-        if distance_km is None:
+        # Дистанция уже разобрана парсером
+        if cache.distance_m is None:
             time.sleep(0.5)
             continue
+        distance_km = cache.distance_m / 1000
         
         logger.debug(f"Дистанция до контейнера: {distance_km:.1f} км")
         
@@ -331,39 +332,7 @@ def wait_and_attack(
     return False
 
 
-def parse_distance_km(distance_str: Optional[str]) -> Optional[float]:
-    """
-    Парсить дистанцию из строки в километры.
-    
-    Args:
-        distance_str: "1 189 м" или "188 км"
-        
-    Returns:
-        Дистанция в км или None
-    """
-    if not distance_str:
-        return None
-    
-    try:
-        # Убираем все кроме цифр и точек
-        num_str = ''.join(c for c in distance_str if c.isdigit() or c == '.')
-        if not num_str:
-            return None
-        
-        value = float(num_str)
-        
-        # Конвертируем в км
-        if 'км' in distance_str or 'km' in distance_str.lower():
-            return value
-        elif 'м' in distance_str or 'm' in distance_str.lower():
-            return value / 1000.0
-        else:
-            # По умолчанию метры
-            return value / 1000.0
-    except (ValueError, AttributeError):
-        return None
-
-
+@traced('wait_cache_death')
 def wait_cache_death(sanderling: SanderlingService, timeout: float) -> bool:
     """
     Ждать смерти контейнера (исчезновение из лока или появление врека).
@@ -375,44 +344,38 @@ def wait_cache_death(sanderling: SanderlingService, timeout: float) -> bool:
     Returns:
         True если контейнер умер
     """
-    start = time.time()
-    
-    while time.time() - start < timeout:
-        state = sanderling.get_state()
-        if not state:
-            time.sleep(0.5)
-            continue
-        
+    def cache_dead(state) -> Optional[str]:
         # Проверяем есть ли контейнер в локе
         cache_locked = False
-        if state.targets:
-            for target in state.targets:
-                name_str = (target.name or "").lower()
-                type_str = (target.type or "").lower()
-                if any(keyword in name_str or keyword in type_str for keyword in [
-                    'bioadaptive cache',
-                    'biocombinative cache'
-                ]):
-                    cache_locked = True
-                    break
+        for target in state.targets:
+            name_str = (target.name or "").lower()
+            type_str = (target.type or "").lower()
+            if any(keyword in name_str or keyword in type_str for keyword in [
+                'bioadaptive cache',
+                'biocombinative cache'
+            ]):
+                cache_locked = True
+                break
         
         # Если контейнера нет в локе - он умер
         if not cache_locked:
-            logger.info("Контейнер исчез из лока - уничтожен!")
-            return True
+            return "Контейнер исчез из лока - уничтожен!"
         
         # Проверяем появился ли врек в overview
-        if state.overview:
-            for entry in state.overview:
-                if entry.name and 'wreck' in entry.name.lower():
-                    logger.info("Врек появился в overview - контейнер уничтожен!")
-                    return True
+        if state.overview_index.has('wreck'):
+            return "Врек появился в overview - контейнер уничтожен!"
         
-        time.sleep(0.5)
+        return None
+    
+    reason = sanderling.wait_until(cache_dead, timeout)
+    if reason:
+        logger.info(reason)
+        return True
     
     return False
 
 
+@traced('loot_wreck')
 def loot_wreck(sanderling: SanderlingService) -> bool:
     """
     Залутать остов (wreck) контейнера.
@@ -444,14 +407,10 @@ def loot_wreck(sanderling: SanderlingService) -> bool:
             continue
         
         # Ищем "Остов" или "Wreck" в overview
-        for entry in state.overview:
-            name_str = (entry.name or "").lower()
-            type_str = (entry.type or "").lower()
-            
-            if 'остов' in name_str or 'wreck' in name_str or 'wreck' in type_str:
-                wreck = entry
-                logger.info(f"Найден остов: {entry.name}")
-                break
+        found = state.overview_index.matching('остов', 'wreck', include_type=True)
+        if found:
+            wreck = found[0]
+            logger.info(f"Найден остов: {wreck.name}")
         
         if wreck:
             break
@@ -4,12 +4,14 @@
 import logging
 from typing import Optional
 from core.sanderling.service import SanderlingService
+from core.sanderling.tracing import traced
 from eve.inventory import InventoryManager
 from config import FILAMENT_NAMES
 
 logger = logging.getLogger(__name__)
 
 
+@traced('enter_abyss')
 def enter_abyss(sanderling: SanderlingService, filament_name: str = None) -> bool:
     """
     Войти в Abyss используя филамент.
@@ -12,6 +12,7 @@ import logging
 import time
 from typing import Optional
 from core.sanderling.service import SanderlingService
+from core.sanderling import tracing
 from eve.bookmarks import right_click_bookmark
 from eve.mouse import random_delay
 from bots.abyss_farmer.enter import enter_abyss
@@ -86,8 +87,17 @@ class AbyssFarmer:
             logger.info(f"Время работы: {total_time/60:.1f} мин")
             if self.cycles_completed > 0:
                 logger.info(f"Среднее время цикла: {total_time/self.cycles_completed/60:.1f} мин")
+            
+            # Задержка реакции (чтение памяти -> клик/клавиша) по рутинам, мс
+            latency_file = tracing.dump()
+            if latency_file:
+                logger.info("Задержка реакции, мс:")
+                for line in tracing.format_report().splitlines():
+                    logger.info(f"  {line}")
+                logger.info(f"Отчёт: {latency_file}")
             logger.info(f"{'='*60}\n")
     
+    @tracing.traced('run_cycle')
     def _run_cycle(self) -> bool:
         """
         Выполнить один полный цикл.
@@ -124,6 +134,7 @@ class AbyssFarmer:
         
         return True
     
+    @tracing.traced('warp_to_current_spot')
     def _warp_to_current_spot(self) -> bool:
         """
         Варпнуть на текущий спот.
@@ -222,6 +233,7 @@ class AbyssFarmer:
         logger.debug(f"Кнопка варпа не найдена. Доступные пункты: {[item.text for item in menu_items]}")
         return None
     
+    @tracing.traced('enter_abyss_with_filament')
     def _enter_abyss_with_filament(self) -> bool:
         """
         Использовать филамент и войти в абисс.
@@ -252,6 +264,7 @@ class AbyssFarmer:
             logger.exception(f"Ошибка при входе в абисс: {e}")
             return False
     
+    @tracing.traced('wait_for_abyss_entry')
     def _wait_for_abyss_entry(self, timeout: float = 30.0) -> bool:
         """
         Ждать появления Cache (подтверждение входа в абисс).
@@ -262,36 +275,19 @@ class AbyssFarmer:
         Returns:
             True если Cache появился
         """
-        start = time.time()
-        
-        while time.time() - start < timeout:
-            state = self.sanderling.get_state()
-            
-            if not state or not state.overview:
-                time.sleep(1.0)
-                continue
-            
-            # Ищем Cache в overview
-            for entry in state.overview:
-                if not entry.name:
-                    continue
-                
-                name_lower = entry.name.lower()
-                
-                if any(keyword in name_lower for keyword in [
-                    'bioadaptive cache',
-                    'biocombinative cache',
-                    'triglavian cache',
-                    'cache'
-                ]):
-                    logger.info(f"Cache обнаружен: {entry.name}")
-                    return True
-            
-            time.sleep(1.0)
+        # Ищем Cache в overview (по имени; дистанция может быть не разобрана)
+        entry = self.sanderling.wait_until(
+            lambda state: next((e for e in state.overview_index.matching('cache') if e.name), None),
+            timeout
+        )
+        if entry:
+            logger.info(f"Cache обнаружен: {entry.name}")
+            return True
         
         logger.error(f"Cache не появился за {timeout} секунд")
         return False
     
+    @tracing.traced('clear_abyss')
     def _clear_abyss(self) -> int:
         """
         Зачистить все комнаты абисса.
@@ -4,6 +4,7 @@
 import logging
 import time
 from core.sanderling.service import SanderlingService
+from core.sanderling.tracing import traced
 from bots.abyss_farmer.cache import process_cache
 from eve.mouse import random_delay
 from eve.combat import recall_drones
@@ -12,6 +13,7 @@ from eve.overview_combat import clear_enemies
 logger = logging.getLogger(__name__)
 
 
+@traced('room')
 def room(sanderling: SanderlingService, timeout: float = 300.0) -> bool:
     """
     Пройти комнату в абиссе (с боевой логикой).
@@ -82,6 +84,7 @@ def room(sanderling: SanderlingService, timeout: float = 300.0) -> bool:
     return True
 
 
+@traced('wait_for_cache')
 def _wait_for_cache(sanderling: SanderlingService, timeout: float) -> object:
     """
     Ждать появления Triglavian Cache (Bioadaptive/Biocombinative) в overview.
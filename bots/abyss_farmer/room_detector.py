@@ -6,10 +6,12 @@ import time
 import random
 from typing import Optional
 from core.sanderling.service import SanderlingService
+from core.sanderling.tracing import traced
 
 logger = logging.getLogger(__name__)
 
 
+@traced('detect_room_type')
 def detect_room_type(sanderling: SanderlingService, timeout: float = 30.0) -> str:
     """
     Определить тип комнаты по наличию особых NPC.
@@ -99,6 +101,7 @@ def detect_room_type(sanderling: SanderlingService, timeout: float = 30.0) -> st
     return "default"
 
 
+@traced('wait_for_cache_not_wreck')
 def _wait_for_cache_not_wreck(sanderling: SanderlingService, timeout: float) -> Optional:
     """
     Ждать появления контейнера (не остова!) в overview.
@@ -28,13 +28,18 @@ import re
 from typing import Optional
 from core.sanderling.service import SanderlingService
 from core.sanderling.models import OverviewEntry
+from core.sanderling.tracing import traced
 from eve.mouse import click, random_delay
 from eve.keyboard import press_key, key_down, key_up
 from eve.modules import ensure_mid_slots_active
 
 logger = logging.getLogger(__name__)
 
+# Сколько остов должен отсутствовать в overview, чтобы считать прыжок состоявшимся (мс)
+WRECK_GONE_MS = 1000
 
+
+@traced('default_room')
 def default_room(sanderling: SanderlingService, timeout: float = 300.0) -> bool:
     """
     Пройти стандартную комнату в абиссе.
@@ -153,6 +158,7 @@ def default_room(sanderling: SanderlingService, timeout: float = 300.0) -> bool:
 # ВСПОМОГАТЕЛЬНЫЕ ФУНКЦИИ
 # ============================================================================
 
+@traced('switch_to_tab')
 def _switch_to_tab(sanderling: SanderlingService, tab_name: str) -> bool:
     """
     Переключиться на вкладку overview.
@@ -213,6 +219,7 @@ def _switch_to_tab(sanderling: SanderlingService, tab_name: str) -> bool:
     return True
 
 
+@traced('wait_for_cache')
 def _wait_for_cache(sanderling: SanderlingService, timeout: float) -> Optional[OverviewEntry]:
     """
     Ждать появления контейнера в overview.
@@ -255,6 +262,7 @@ def _wait_for_cache(sanderling: SanderlingService, timeout: float) -> Optional[O
     return None
 
 
+@traced('approach_target')
 def _approach_target(sanderling: SanderlingService, target: OverviewEntry) -> bool:
     """
     Кликнуть на цель и выбрать approach.
@@ -296,6 +304,7 @@ def _approach_target(sanderling: SanderlingService, target: OverviewEntry) -> bo
     return True
 
 
+@traced('orbit_target')
 def _orbit_target(sanderling: SanderlingService, target: OverviewEntry) -> bool:
     """
     Кликнуть на цель и выбрать orbit.
@@ -337,6 +346,7 @@ def _orbit_target(sanderling: SanderlingService, target: OverviewEntry) -> bool:
     return True
 
 
+@traced('launch_drones_manual')
 def _launch_drones_manual():
     """
     Выпустить дронов (Shift+F).
@@ -360,6 +370,7 @@ def _launch_drones_manual():
     random_delay(0.5, 0.8)
 
 
+@traced('wait_for_enemies')
 def _wait_for_enemies(sanderling: SanderlingService, timeout: float) -> bool:
     """
     Ждать появления целей в overview.
@@ -371,18 +382,15 @@ def _wait_for_enemies(sanderling: SanderlingService, timeout: float) -> bool:
     Returns:
         True если цели появились
     """
-    start = time.time()
-    
-    while time.time() - start < timeout:
-        state = sanderling.get_state()
-        if state and state.overview and len(state.overview) > 0:
-            logger.debug(f"Появились цели: {len(state.overview)}")
-            return True
-        time.sleep(0.5)
+    overview = sanderling.wait_until(lambda state: state.overview, timeout)
+    if overview:
+        logger.debug(f"Появились цели: {len(overview)}")
+        return True
     
     return False
 
 
+@traced('kill_first_enemy_in_range')
 def _kill_first_enemy_in_range(
     sanderling: SanderlingService,
     max_distance_km: float,
@@ -410,21 +418,10 @@ def _kill_first_enemy_in_range(
             time.sleep(0.5)
             continue
         
-        # Ищем первую цель в радиусе
-        for entry in state.overview:
-            if not entry.distance:
-                continue
-            
-            distance_km = _parse_distance_km(entry.distance)
-            if distance_km is None:
-                continue
-            
-            if distance_km <= max_distance_km:
-                target_entry = entry
-                logger.info(f"Цель в радиусе: {entry.name} на {distance_km:.1f} км")
-                break
-        
+        # Ближайшая цель в радиусе
+        target_entry = state.overview_index.nearest(max_distance_m=max_distance_km * 1000)
         if target_entry:
+            logger.info(f"Цель в радиусе: {target_entry.name} на {target_entry.distance_m / 1000:.1f} км")
             break
         
         time.sleep(0.5)
@@ -472,6 +469,7 @@ def _kill_first_enemy_in_range(
     return False
 
 
+@traced('kill_and_loot_cache')
 def _kill_and_loot_cache(sanderling: SanderlingService) -> bool:
     """
     Переключиться на Main, убить контейнер, залутать врек.
@@ -619,6 +617,7 @@ def _kill_and_loot_cache(sanderling: SanderlingService) -> bool:
     return True  # Продолжаем выполнение
 
 
+@traced('orbit_gate')
 def _orbit_gate(sanderling: SanderlingService) -> bool:
     """
     Найти Gate/Conduit и выйти на орбиту.
@@ -642,6 +641,7 @@ def _orbit_gate(sanderling: SanderlingService) -> bool:
     return _orbit_target(sanderling, gate_entry)
 
 
+@traced('clear_all_enemies')
 def _clear_all_enemies(sanderling: SanderlingService) -> int:
     """
     Убить все цели в PvP Foe (лок + F + 1).
@@ -753,39 +753,7 @@ def _clear_all_enemies(sanderling: SanderlingService) -> int:
 
 
 
-def _parse_distance_km(distance_str: Optional[str]) -> Optional[float]:
-    """
-    Парсить дистанцию из строки в километры.
-    
-    Args:
-        distance_str: "1 189 м" или "188 км"
-        
-    Returns:
-        Дистанция в км или None
-    """
-    if not distance_str:
-        return None
-    
-    try:
-        # Убираем все кроме цифр и точек
-        num_str = ''.join(c for c in distance_str if c.isdigit() or c == '.')
-        if not num_str:
-            return None
-        
-        value = float(num_str)
-        
-        # Конвертируем в км
-        if 'км' in distance_str or 'km' in distance_str.lower():
-            return value
-        elif 'м' in distance_str or 'm' in distance_str.lower():
-            return value / 1000.0
-        else:
-            # По умолчанию метры
-            return value / 1000.0
-    except (ValueError, AttributeError):
-        return None
-
-
+@traced('wait_for_guns_inactive')
 def _wait_for_guns_inactive(sanderling: SanderlingService, timeout: float) -> bool:
     """
     Ждать пока ракеты (модуль верхнего слота) станут inactive.
@@ -825,6 +793,7 @@ def _wait_for_guns_inactive(sanderling: SanderlingService, timeout: float) -> bo
     return False
 
 
+@traced('wait_cache_death')
 def _wait_cache_death(sanderling: SanderlingService, timeout: float) -> bool:
     """
     Ждать смерти контейнера (исчезновение из targets).
@@ -836,39 +805,24 @@ def _wait_cache_death(sanderling: SanderlingService, timeout: float) -> bool:
     Returns:
         True если контейнер умер
     """
-    start = time.time()
-    
-    while time.time() - start < timeout:
-        state = sanderling.get_state()
-        if not state:
-            time.sleep(0.5)
-            continue
-        
-        # Проверяем есть ли контейнер в targets
-        cache_locked = False
-        if state.targets:
-            for target in state.targets:
-                name_str = (target.name or "").lower()
-                type_str = (target.type or "").lower()
-                if any(keyword in name_str or keyword in type_str for keyword in [
-                    'bioadaptive cache',
-                    'biocombinative cache',
-                    'cache'
-                ]):
-                    cache_locked = True
-                    break
-        
+    def cache_gone(state) -> bool:
         # Если контейнера нет в targets - он умер
-        if not cache_locked:
-            logger.info("Контейнер исчез из targets - уничтожен!")
-            return True
-        
-        time.sleep(0.5)
+        for target in state.targets:
+            name_str = (target.name or "").lower()
+            type_str = (target.type or "").lower()
+            if 'cache' in name_str or 'cache' in type_str:
+                return False
+        return True
+    
+    if sanderling.wait_until(cache_gone, timeout):
+        logger.info("Контейнер исчез из targets - уничтожен!")
+        return True
     
     logger.warning(f"Таймаут {timeout}с ожидания смерти контейнера")
     return False
 
 
+@traced('wait_for_wreck')
 def _wait_for_wreck(sanderling: SanderlingService, timeout: float) -> Optional[OverviewEntry]:
     """
     Ждать появления врека в overview.
@@ -880,32 +834,19 @@ def _wait_for_wreck(sanderling: SanderlingService, timeout: float) -> Optional[O
     Returns:
         OverviewEntry врека или None
     """
-    start = time.time()
-    
-    while time.time() - start < timeout:
-        state = sanderling.get_state()
-        if not state or not state.overview:
-            time.sleep(0.5)
-            continue
-        
-        # Ищем врек
-        for entry in state.overview:
-            if not entry.name:
-                continue
-            
-            name_lower = entry.name.lower()
-            type_lower = (entry.type or "").lower()
-            
-            if 'остов' in name_lower or 'wreck' in name_lower or 'wreck' in type_lower:
-                logger.debug(f"Найден врек: '{entry.name}'")
-                return entry
-        
-        time.sleep(0.5)
+    entry = sanderling.wait_until(
+        lambda state: next((e for e in state.overview if _is_wreck(e)), None),
+        timeout
+    )
+    if entry:
+        logger.debug(f"Найден врек: '{entry.name}'")
+        return entry
     
     logger.error("Врек не найден!")
     return None
 
 
+@traced('wait_for_gate')
 def _wait_for_gate(sanderling: SanderlingService, timeout: float) -> Optional[OverviewEntry]:
     """
     Ждать появления Gate или Conduit в overview.
@@ -917,35 +858,23 @@ def _wait_for_gate(sanderling: SanderlingService, timeout: float) -> Optional[Ov
     Returns:
         OverviewEntry гейта/кондуита или None
     """
-    start = time.time()
-    
-    while time.time() - start < timeout:
-        state = sanderling.get_state()
-        if not state or not state.overview:
-            time.sleep(0.5)
-            continue
-        
-        # Ищем Gate или Conduit (частичное вхождение)
-        for entry in state.overview:
-            if not entry.name:
-                continue
-            
-            name_lower = entry.name.lower()
-            type_lower = (entry.type or "").lower()
-            
-            # Проверяем оба варианта
-            if 'gate' in name_lower or 'gate' in type_lower or \
-               'conduit' in name_lower or 'conduit' in type_lower:
-                logger.debug(f"Найден Gate/Conduit: '{entry.name}' (type: '{entry.type}')")
-                return entry
-        
-        time.sleep(0.5)
+    # Ищем Gate или Conduit (частичное вхождение в name или type; дистанция не нужна)
+    entry = sanderling.wait_until(
+        lambda state: next(
+            (e for e in state.overview_index.matching('gate', 'conduit', include_type=True) if e.name),
+            None
+        ),
+        timeout
+    )
+    if entry:
+        logger.debug(f"Найден Gate/Conduit: '{entry.name}' (type: '{entry.type}')")
+        return entry
     
     logger.error("Gate/Conduit не найден!")
     return None
 
 
-
+@traced('recall_drones')
 def _recall_drones(sanderling: SanderlingService) -> bool:
     """
     Вернуть дронов в корабль (Shift+R) и дождаться их возврата.
@@ -1015,6 +944,7 @@ def _recall_drones(sanderling: SanderlingService) -> bool:
     return False
 
 
+@traced('jump_through_gate')
 def _jump_through_gate(sanderling: SanderlingService) -> bool:
     """
     Найти ворота и прыгнуть через них (Jump).
@@ -1076,6 +1006,7 @@ def _jump_through_gate(sanderling: SanderlingService) -> bool:
     return True
 
 
+@traced('wait_for_wreck_disappear')
 def _wait_for_wreck_disappear(sanderling: SanderlingService, timeout: float) -> bool:
     """
     Ждать пока остов исчезнет из overview.
@@ -1087,39 +1018,24 @@ def _wait_for_wreck_disappear(sanderling: SanderlingService, timeout: float) ->
     Returns:
         True если остов исчез
     """
-    start = time.time()
-    
-    while time.time() - start < timeout:
-        state = sanderling.get_state()
-        if not state or not state.overview:
-            time.sleep(0.5)
-            continue
-        
-        # Ищем остов в overview
-        wreck_found = False
-        for entry in state.overview:
-            if not entry.name:
-                continue
-            
-            name_lower = entry.name.lower()
-            type_lower = (entry.type or "").lower()
-            
-            if 'остов' in name_lower or 'wreck' in name_lower or 'wreck' in type_lower:
-                wreck_found = True
-                break
-        
-        # Если остова нет - прыгнули
-        if not wreck_found:
-            logger.info("Остов исчез - прыжок подтвержден")
-            return True
-        
-        time.sleep(0.5)
+    def no_wreck(state) -> bool:
+        # Пустой overview (загрузка после прыжка) не считается исчезновением
+        return bool(state.overview) and not any(_is_wreck(e) for e in state.overview)
+    
+    # Остов должен пропасть насовсем, а не мигнуть в overview
+    if sanderling.wait_until(
+        lambda state: no_wreck(state) and sanderling.history.stable_for(no_wreck, WRECK_GONE_MS),
+        timeout
+    ):
+        logger.info("Остов исчез - прыжок подтвержден")
+        return True
     
     logger.warning(f"Остов не исчез за {timeout} секунд")
     return False
 
 
 
+@traced('ensure_all_enemies_cleared')
 def _ensure_all_enemies_cleared(sanderling: SanderlingService) -> bool:
     """
     Убедиться что все враги зачищены во вкладке PvP Foe.
@@ -1148,17 +1064,7 @@ def _ensure_all_enemies_cleared(sanderling: SanderlingService) -> bool:
             return True
         
         # Фильтруем только реальных врагов (исключаем cache, gate, conduit, wreck, остов)
-        actual_enemies = []
-        for entry in state.overview:
-            if not entry.name:
-                continue
-            
-            name_lower = entry.name.lower()
-            # Исключаем не-врагов
-            if any(keyword in name_lower for keyword in ['cache', 'gate', 'conduit', 'wreck', 'остов']):
-                continue
-            
-            actual_enemies.append(entry)
+        actual_enemies = state.overview_index.excluding('cache', 'gate', 'conduit', 'wreck', 'остов')
         
         if len(actual_enemies) == 0:
             logger.info("Нет реальных врагов в overview - зачистка завершена")
@@ -1167,18 +1073,10 @@ def _ensure_all_enemies_cleared(sanderling: SanderlingService) -> bool:
         enemies_count = len(actual_enemies)
         logger.info(f"Обнаружено врагов в overview: {enemies_count}")
         
-        # Проверяем дистанцию до ближайшего врага
+        # Проверяем дистанцию до ближайшего врага (враги отсортированы по дистанции)
         min_distance_km = None
-        for entry in actual_enemies:
-            if not entry.distance:
-                continue
-            
-            distance_km = _parse_distance_km(entry.distance)
-            if distance_km is None:
-                continue
-            
-            if min_distance_km is None or distance_km < min_distance_km:
-                min_distance_km = distance_km
+        if actual_enemies[0].distance_m is not None:
+            min_distance_km = actual_enemies[0].distance_m / 1000
         
         if min_distance_km is None:
             logger.warning("Не удалось определить дистанцию до врагов")
@@ -1205,30 +1103,12 @@ def _ensure_all_enemies_cleared(sanderling: SanderlingService) -> bool:
                     time.sleep(1.0)
                     continue
                 
-                # Проверяем есть ли вообще враги
-                enemies_found = False
+                # Проверяем есть ли вообще враги (индекс отсортирован по дистанции)
+                enemies = state.overview_index.excluding('cache', 'gate', 'conduit', 'wreck', 'остов')
+                enemies_found = bool(enemies)
                 closest_distance = None
-                
-                for entry in state.overview:
-                    if not entry.name:
-                        continue
-                    
-                    # Это враг?
-                    name_lower = entry.name.lower()
-                    if any(keyword in name_lower for keyword in ['cache', 'gate', 'conduit', 'wreck', 'остов']):
-                        continue
-                    
-                    enemies_found = True
-                    
-                    if not entry.distance:
-                        continue
-                    
-                    distance_km = _parse_distance_km(entry.distance)
-                    if distance_km is None:
-                        continue
-                    
-                    if closest_distance is None or distance_km < closest_distance:
-                        closest_distance = distance_km
+                if enemies and enemies[0].distance_m is not None:
+                    closest_distance = enemies[0].distance_m / 1000
                 
                 # Если врагов нет - выходим
                 if not enemies_found:
@@ -1280,6 +1160,7 @@ def _is_wreck(entry: OverviewEntry) -> bool:
     return 'остов' in name_lower or 'wreck' in name_lower or 'wreck' in type_lower
 
 
+@traced('loot_wreck_direct')
 def _loot_wreck_direct(sanderling: SanderlingService, wreck_entry: OverviewEntry) -> bool:
     """
     Залутать остов напрямую (когда контейнер уже уничтожен).
@@ -1400,6 +1281,7 @@ def _loot_wreck_direct(sanderling: SanderlingService, wreck_entry: OverviewEntry
 
 
 
+@traced('unlock_wreck_if_locked')
 def _unlock_wreck_if_locked(sanderling: SanderlingService) -> bool:
     """
     Проверить залоченные цели и разлочить остов если он залочен.
@@ -15,6 +15,7 @@ import time
 import random
 from typing import Optional
 from core.sanderling.service import SanderlingService
+from core.sanderling.tracing import traced
 from core.sanderling.models import OverviewEntry, Target
 from eve.mouse import click, random_delay
 from eve.keyboard import press_key, key_down, key_up
@@ -23,6 +24,7 @@ from eve.modules import ensure_mid_slots_active
 logger = logging.getLogger(__name__)
 
 
+@traced('overmind_room')
 def overmind_room(sanderling: SanderlingService, timeout: float = 300.0) -> bool:
     """
     Пройти комнату с Overmind/Tyrannos.
@@ -236,7 +238,6 @@ from bots.abyss_farmer.room_new import (
     _ensure_all_enemies_cleared,
     _recall_drones,
     _jump_through_gate,
-    _parse_distance_km,
     _wait_for_guns_inactive,
     _is_wreck
 )
@@ -267,6 +268,7 @@ def _find_overmind_or_tyrannos(sanderling: SanderlingService) -> Optional[Overvi
     return None
 
 
+@traced('launch_drones')
 def _launch_drones():
     """
     Выпустить дронов (Shift+F).
@@ -284,6 +286,7 @@ def _launch_drones():
     logger.info("Команда выпуска дронов отправлена")
 
 
+@traced('wait_target_in_range')
 def _wait_target_in_range(
     sanderling: SanderlingService,
     target_name: str,
@@ -311,21 +314,11 @@ def _wait_target_in_range(
             time.sleep(0.5)
             continue
         
-        for entry in state.overview:
-            if not entry.name or not entry.distance:
-                continue
-            
-            name_lower = entry.name.lower()
-            if target_name_lower not in name_lower:
-                continue
-            
-            distance_km = _parse_distance_km(entry.distance)
-            if distance_km is None:
-                continue
-            
-            if distance_km <= max_distance_km:
-                logger.info(f"Цель в радиусе: {entry.name} на {distance_km:.1f} км")
-                return True
+        # Ближайшая цель с ключевым словом в имени (индекс отсортирован по дистанции)
+        entry = state.overview_index.nearest(target_name_lower, max_distance_m=max_distance_km * 1000)
+        if entry:
+            logger.info(f"Цель в радиусе: {entry.name} на {entry.distance_m / 1000:.1f} км")
+            return True
         
         time.sleep(0.5)
     
@@ -333,6 +326,7 @@ def _wait_target_in_range(
     return False
 
 
+@traced('lock_target')
 def _lock_target(sanderling: SanderlingService, target: OverviewEntry) -> bool:
     """
     Залочить цель (Ctrl+Click).
@@ -362,6 +356,7 @@ def _lock_target(sanderling: SanderlingService, target: OverviewEntry) -> bool:
     return True
 
 
+@traced('select_and_attack_cache_in_overview')
 def _select_and_attack_cache_in_overview(sanderling: SanderlingService, cache_entry: OverviewEntry) -> bool:
     """
     Кликнуть по контейнеру в overview и атаковать ракетами (1).
@@ -392,6 +387,7 @@ def _select_and_attack_cache_in_overview(sanderling: SanderlingService, cache_en
     return True
 
 
+@traced('orbit_enemy_500m')
 def _orbit_enemy_500m(sanderling: SanderlingService, enemy: OverviewEntry) -> bool:
     """
     Выйти на орбиту 500м вокруг врага.
@@ -435,6 +431,7 @@ def _orbit_enemy_500m(sanderling: SanderlingService, enemy: OverviewEntry) -> bo
     return True
 
 
+@traced('kill_enemy_with_periodic_f')
 def _kill_enemy_with_periodic_f(sanderling: SanderlingService, enemy_name: str) -> bool:
     """
     Ждать смерти врага с периодическим нажатием F (каждые 15 секунд).
@@ -491,6 +488,7 @@ def _kill_enemy_with_periodic_f(sanderling: SanderlingService, enemy_name: str)
     return False
 
 
+@traced('loot_wreck')
 def _loot_wreck(sanderling: SanderlingService) -> bool:
     """
     Залутать врек контейнера (таймаут 25 секунд).
@@ -573,6 +571,7 @@ def _loot_wreck(sanderling: SanderlingService) -> bool:
     return True
 
 
+@traced('wait_for_wreck')
 def _wait_for_wreck(sanderling: SanderlingService, timeout: float) -> Optional[OverviewEntry]:
     """
     Ждать появления врека в overview.
@@ -584,23 +583,13 @@ def _wait_for_wreck(sanderling: SanderlingService, timeout: float) -> Optional[O
     Returns:
         OverviewEntry врека или None
     """
-    start = time.time()
-    
-    while time.time() - start < timeout:
-        state = sanderling.get_state()
-        if not state or not state.overview:
-            time.sleep(0.5)
-            continue
-        
-        for entry in state.overview:
-            if not entry.name:
-                continue
-            
-            if _is_wreck(entry):
-                logger.debug(f"Найден врек: '{entry.name}'")
-                return entry
-        
-        time.sleep(0.5)
+    entry = sanderling.wait_until(
+        lambda state: next((e for e in state.overview if _is_wreck(e)), None),
+        timeout
+    )
+    if entry:
+        logger.debug(f"Найден врек: '{entry.name}'")
+        return entry
     
     logger.error("Врек не найден!")
     return None
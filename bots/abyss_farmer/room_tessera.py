@@ -16,6 +16,7 @@ import time
 import random
 from typing import Optional, Dict
 from core.sanderling.service import SanderlingService
+from core.sanderling.tracing import traced
 from core.sanderling.models import OverviewEntry
 from eve.mouse import click, right_click, move_mouse, random_delay
 from eve.keyboard import press_key, key_down, key_up
@@ -24,6 +25,7 @@ from eve.modules import ensure_mid_slots_active
 logger = logging.getLogger(__name__)
 
 
+@traced('tessera_room')
 def tessera_room(sanderling: SanderlingService, timeout: float = 300.0) -> bool:
     """
     Пройти комнату со Strikegrip Tessera.
@@ -210,7 +212,6 @@ from bots.abyss_farmer.room_new import (
     _clear_all_enemies,
     _recall_drones,
     _jump_through_gate,
-    _parse_distance_km,
     _wait_for_gate
 )
 
@@ -240,6 +241,7 @@ def _find_tessera(sanderling: SanderlingService) -> Optional[OverviewEntry]:
     return None
 
 
+@traced('orbit_15km')
 def _orbit_15km(sanderling: SanderlingService, target: OverviewEntry) -> bool:
     """
     ПКМ по цели → наведение на "выйти на орбиту" → клик "15 км".
@@ -352,6 +354,7 @@ def _orbit_15km(sanderling: SanderlingService, target: OverviewEntry) -> bool:
     return True
 
 
+@traced('launch_drones')
 def _launch_drones():
     """
     Выпустить дронов (Shift+F).
@@ -373,6 +376,7 @@ def _launch_drones():
     logger.info("Команда выпуска дронов отправлена")
 
 
+@traced('wait_target_in_range')
 def _wait_target_in_range(
     sanderling: SanderlingService,
     target_keyword: str,
@@ -400,22 +404,11 @@ def _wait_target_in_range(
             time.sleep(0.5)
             continue
         
-        # Ищем цель
-        for entry in state.overview:
-            if not entry.name or not entry.distance:
-                continue
-            
-            name_lower = entry.name.lower()
-            if target_keyword_lower not in name_lower:
-                continue
-            
-            distance_km = _parse_distance_km(entry.distance)
-            if distance_km is None:
-                continue
-            
-            if distance_km <= max_distance_km:
-                logger.info(f"Цель в радиусе: {entry.name} на {distance_km:.1f} км")
-                return True
+        # Ближайшая цель с ключевым словом в имени (индекс отсортирован по дистанции)
+        entry = state.overview_index.nearest(target_keyword_lower, max_distance_m=max_distance_km * 1000)
+        if entry:
+            logger.info(f"Цель в радиусе: {entry.name} на {entry.distance_m / 1000:.1f} км")
+            return True
         
         time.sleep(0.5)
     
@@ -423,6 +416,7 @@ def _wait_target_in_range(
     return False
 
 
+@traced('lock_target')
 def _lock_target(sanderling: SanderlingService, target: OverviewEntry) -> bool:
     """
     Залочить цель (Ctrl+Click).
@@ -452,6 +446,7 @@ def _lock_target(sanderling: SanderlingService, target: OverviewEntry) -> bool:
     return True
 
 
+@traced('kill_with_drone_monitoring')
 def _kill_with_drone_monitoring(sanderling: SanderlingService, target_name: str) -> bool:
     """
     Убить цель с отслеживанием здоровья дронов.
@@ -612,6 +607,7 @@ def _check_health_drop(initial: Dict, current: Dict) -> bool:
     return False
 
 
+@traced('wait_drones_launched')
 def _wait_drones_launched(sanderling: SanderlingService, timeout: float) -> bool:
     """
     Ждать пока дроны выпустятся (in_space_count > 0).
@@ -637,6 +633,7 @@ def _wait_drones_launched(sanderling: SanderlingService, timeout: float) -> bool
     return False
 
 
+@traced('loot_wreck')
 def _loot_wreck(sanderling: SanderlingService) -> bool:
     """
     Залутать врек контейнера (как в default_room).
@@ -719,6 +716,7 @@ def _loot_wreck(sanderling: SanderlingService) -> bool:
     return True  # Продолжаем выполнение
 
 
+@traced('wait_for_wreck')
 def _wait_for_wreck(sanderling: SanderlingService, timeout: float) -> Optional[OverviewEntry]:
     """
     Ждать появления врека в overview.
@@ -730,26 +728,13 @@ def _wait_for_wreck(sanderling: SanderlingService, timeout: float) -> Optional[O
     Returns:
         OverviewEntry врека или None
     """
-    start = time.time()
-    
-    while time.time() - start < timeout:
-        state = sanderling.get_state()
-        if not state or not state.overview:
-            time.sleep(0.5)
-            continue
-        
-        for entry in state.overview:
-            if not entry.name:
-                continue
-            
-            name_lower = entry.name.lower()
-            type_lower = (entry.type or "").lower()
-            
-            if 'остов' in name_lower or 'wreck' in name_lower or 'wreck' in type_lower:
-                logger.debug(f"Найден врек: '{entry.name}'")
-                return entry
-        
-        time.sleep(0.5)
+    entry = sanderling.wait_until(
+        lambda state: next((e for e in state.overview if _is_wreck(e)), None),
+        timeout
+    )
+    if entry:
+        logger.debug(f"Найден врек: '{entry.name}'")
+        return entry
     
     logger.error("Врек не найден!")
     return None
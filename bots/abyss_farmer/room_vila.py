@@ -11,6 +11,7 @@ import logging
 import time
 from typing import List, Optional
 from core.sanderling.service import SanderlingService
+from core.sanderling.tracing import traced
 from core.sanderling.models import OverviewEntry
 from eve.mouse import click, random_delay
 from eve.keyboard import press_key, key_down, key_up
@@ -19,6 +20,7 @@ from eve.modules import ensure_mid_slots_active
 logger = logging.getLogger(__name__)
 
 
+@traced('vila_room')
 def vila_room(sanderling: SanderlingService, timeout: float = 300.0) -> bool:
     """
     Пройти комнату с Vila.
@@ -139,11 +141,11 @@ from bots.abyss_farmer.room_new import (
     _approach_target,
     _recall_drones,
     _jump_through_gate,
-    _is_wreck,
-    _parse_distance_km
+    _is_wreck
 )
 
 
+@traced('launch_drones')
 def _launch_drones():
     """
     Выпустить дронов (Shift+F).
@@ -161,6 +163,7 @@ def _launch_drones():
     logger.info("Команда выпуска дронов отправлена")
 
 
+@traced('kill_all_vila_except_swarmers')
 def _kill_all_vila_except_swarmers(sanderling: SanderlingService) -> int:
     """
     Убить всех Vila, исключая Swarmer.
@@ -224,6 +227,7 @@ def _get_vila_enemies(sanderling: SanderlingService) -> List[OverviewEntry]:
     return vila_enemies
 
 
+@traced('kill_vila_wave')
 def _kill_vila_wave(sanderling: SanderlingService, enemies: List[OverviewEntry]) -> int:
     """
     Убить волну Vila врагов.
@@ -274,6 +278,7 @@ def _kill_vila_wave(sanderling: SanderlingService, enemies: List[OverviewEntry])
     return len(targets)
 
 
+@traced('wait_targets_dead')
 def _wait_targets_dead(sanderling: SanderlingService, timeout: float) -> bool:
     """
     Ждать пока все залоченные цели не умрут.
@@ -309,6 +314,7 @@ def _wait_targets_dead(sanderling: SanderlingService, timeout: float) -> bool:
     return False
 
 
+@traced('kill_cache')
 def _kill_cache(sanderling: SanderlingService, cache_entry: OverviewEntry) -> bool:
     """
     Убить контейнер.
@@ -349,6 +355,7 @@ def _kill_cache(sanderling: SanderlingService, cache_entry: OverviewEntry) -> bo
     return True
 
 
+@traced('wait_target_in_range')
 def _wait_target_in_range(
     sanderling: SanderlingService,
     target_keyword: str,
@@ -376,21 +383,11 @@ def _wait_target_in_range(
             time.sleep(0.5)
             continue
         
-        for entry in state.overview:
-            if not entry.name or not entry.distance:
-                continue
-            
-            name_lower = entry.name.lower()
-            if target_keyword_lower not in name_lower:
-                continue
-            
-            distance_km = _parse_distance_km(entry.distance)
-            if distance_km is None:
-                continue
-            
-            if distance_km <= max_distance_km:
-                logger.info(f"Цель в радиусе: {entry.name} на {distance_km:.1f} км")
-                return True
+        # Ближайшая цель с ключевым словом в имени (индекс отсортирован по дистанции)
+        entry = state.overview_index.nearest(target_keyword_lower, max_distance_m=max_distance_km * 1000)
+        if entry:
+            logger.info(f"Цель в радиусе: {entry.name} на {entry.distance_m / 1000:.1f} км")
+            return True
         
         time.sleep(0.5)
     
@@ -398,6 +395,7 @@ def _wait_target_in_range(
     return False
 
 
+@traced('lock_target')
 def _lock_target(sanderling: SanderlingService, target: OverviewEntry) -> bool:
     """
     Залочить цель (Ctrl+Click).
@@ -426,6 +424,7 @@ def _lock_target(sanderling: SanderlingService, target: OverviewEntry) -> bool:
     return True
 
 
+@traced('wait_cache_death')
 def _wait_cache_death(sanderling: SanderlingService, timeout: float) -> bool:
     """
     Ждать смерти контейнера.
@@ -441,6 +440,7 @@ def _wait_cache_death(sanderling: SanderlingService, timeout: float) -> bool:
     return wait_cache_death_impl(sanderling, timeout)
 
 
+@traced('loot_wreck')
 def _loot_wreck(sanderling: SanderlingService) -> bool:
     """
     Залутать врек контейнера (таймаут 25 секунд).
@@ -523,6 +523,7 @@ def _loot_wreck(sanderling: SanderlingService) -> bool:
     return True
 
 
+@traced('wait_for_wreck')
 def _wait_for_wreck(sanderling: SanderlingService, timeout: float) -> Optional[OverviewEntry]:
     """
     Ждать появления врека в overview.
@@ -534,23 +535,13 @@ def _wait_for_wreck(sanderling: SanderlingService, timeout: float) -> Optional[O
     Returns:
         OverviewEntry врека или None
     """
-    start = time.time()
-    
-    while time.time() - start < timeout:
-        state = sanderling.get_state()
-        if not state or not state.overview:
-            time.sleep(0.5)
-            continue
-        
-        for entry in state.overview:
-            if not entry.name:
-                continue
-            
-            if _is_wreck(entry):
-                logger.debug(f"Найден врек: '{entry.name}'")
-                return entry
-        
-        time.sleep(0.5)
+    entry = sanderling.wait_until(
+        lambda state: next((e for e in state.overview if _is_wreck(e)), None),
+        timeout
+    )
+    if entry:
+        logger.debug(f"Найден врек: '{entry.name}'")
+        return entry
     
     logger.error("Врек не найден!")
     return None
@@ -1,6 +1,8 @@
 """Sanderling memory reading module."""
 
 from .service import SanderlingService
+from .async_service import AsyncSanderlingService
+from .supervisor import SanderlingSupervisor
 from .parser import UITreeParser
 from .config import SanderlingConfig
 from .cache import RootAddressCache
@@ -9,11 +11,14 @@ from .models import (
     OverviewEntry,
     Module,
     ShipState,
-    GameState
+    GameState,
+    StateSnapshot
 )
 
 __all__ = [
     'SanderlingService',
+    'AsyncSanderlingService',
+    'SanderlingSupervisor',
     'UITreeParser',
     'SanderlingConfig',
     'RootAddressCache',
@@ -22,4 +27,5 @@ __all__ = [
     'Module',
     'ShipState',
     'GameState',
+    'StateSnapshot',
 ]
@@ -0,0 +1,188 @@
+"""Asyncio-фасад над SanderlingService.
+
+Поток чтения остаётся прежним; фасад подписывается на публикацию снимков
+и переносит их в event loop через loop.call_soon_threadsafe. Так бот,
+уведомления и Telegram-бот могут жить в одном event loop вместо отдельных
+потоков со sleep:
+
+    async with AsyncSanderlingService(service) as sanderling:
+        async for state in sanderling.states():
+            ...
+        wreck = await sanderling.wait_until(find_wreck, timeout=10.0)
+"""
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Callable, Optional
+
+from .models import GameState, StateSnapshot
+from .service import SanderlingService
+
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncSanderlingService:
+    """Асинхронный доступ к снимкам SanderlingService."""
+
+    def __init__(self, service: SanderlingService):
+        """
+        Args:
+            service: SanderlingService; ожидание на остановленном сервисе
+                сразу возвращает None (как wait_for_new_state)
+        """
+        self.service = service
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._snapshot: StateSnapshot = service.get_snapshot()
+        self._changed: Optional[asyncio.Event] = None
+        self._closed = False
+
+    async def __aenter__(self) -> "AsyncSanderlingService":
+        self.attach()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def attach(self) -> None:
+        """Подписаться на снимки сервиса (вызывать из работающего event loop)."""
+        if self._loop is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._changed = asyncio.Event()
+        self._snapshot = self.service.get_snapshot()
+        self.service.add_listener(self._on_publish)
+        # После подписки: остановка между проверкой и add_listener не потеряется
+        self._closed = not self.service.is_running
+
+    def close(self) -> None:
+        """Отписаться от сервиса; ожидающие корутины получат None."""
+        if self._loop is None:
+            return
+        self.service.remove_listener(self._on_publish)
+        self._closed = True
+        self._wake()
+        self._loop = None
+
+    def get_state(self) -> Optional[GameState]:
+        """Текущее состояние (без ожидания)."""
+        return self.service.get_state()
+
+    def get_snapshot(self) -> StateSnapshot:
+        """Текущий снимок (без ожидания)."""
+        return self.service.get_snapshot()
+
+    async def next_snapshot(self, after_seq: Optional[int] = None,
+                            timeout: Optional[float] = None) -> Optional[StateSnapshot]:
+        """
+        Дождаться снимок новее after_seq.
+
+        Args:
+            after_seq: Номер последнего обработанного снимка (None - текущий)
+            timeout: Таймаут (сек), None - без таймаута
+
+        Returns:
+            StateSnapshot или None по таймауту / после close() / остановки сервиса
+        """
+        self._ensure_attached()
+        if after_seq is None:
+            after_seq = self._snapshot.seq
+
+        try:
+            return await asyncio.wait_for(self._next_after(after_seq), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def states(self, after_seq: Optional[int] = None) -> AsyncIterator[GameState]:
+        """
+        Асинхронный поток состояний.
+
+        Отдаёт каждое новое состояние; если потребитель медленнее чтения,
+        промежуточные снимки пропускаются (отдаётся последний).
+        Заканчивается после close() или остановки сервиса.
+
+        Args:
+            after_seq: Начать после этого снимка (None - со следующего)
+        """
+        self._ensure_attached()
+        seq = self._snapshot.seq if after_seq is None else after_seq
+
+        while True:
+            snapshot = await self._next_after(seq)
+            if snapshot is None:
+                return
+            seq = snapshot.seq
+            yield snapshot.state
+
+    async def wait_until(self, predicate: Callable[[GameState], Any],
+                         timeout: Optional[float] = None) -> Any:
+        """
+        Ждать состояние, для которого predicate вернёт истинное значение.
+
+        Таймаут через asyncio.wait_for; отмена корутины безопасна - подписка
+        общая, ожидающий ничего не оставляет за собой.
+
+        Args:
+            predicate: Функция от GameState
+            timeout: Таймаут (сек), None - без таймаута
+
+        Returns:
+            Результат predicate или None по таймауту / при остановке
+        """
+        self._ensure_attached()
+        try:
+            return await asyncio.wait_for(self._until(predicate), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def _until(self, predicate: Callable[[GameState], Any]) -> Any:
+        snapshot = self._snapshot
+        while True:
+            if snapshot.state is not None:
+                result = predicate(snapshot.state)
+                if result:
+                    return result
+            snapshot = await self._next_after(snapshot.seq)
+            if snapshot is None:
+                return None
+
+    async def _next_after(self, after_seq: int) -> Optional[StateSnapshot]:
+        """Снимок новее after_seq или None если фасад закрыт / сервис остановлен."""
+        with self.service.waiting():
+            while self._snapshot.seq <= after_seq:
+                if self._closed or not self.service.is_running:
+                    # Сервис не запущен или остановился - новых снимков не будет
+                    self._closed = True
+                    return None
+                # Event пересоздаётся на каждую публикацию - пропустить её нельзя
+                await self._changed.wait()
+            return self._snapshot
+
+    def _ensure_attached(self) -> None:
+        if self._loop is None:
+            self.attach()
+
+    def _on_publish(self, snapshot: Optional[StateSnapshot]) -> None:
+        """Вызывается из потока чтения."""
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        try:
+            loop.call_soon_threadsafe(self._deliver, snapshot)
+        except RuntimeError:
+            # Event loop уже закрыт
+            pass
+
+    def _deliver(self, snapshot: Optional[StateSnapshot]) -> None:
+        """Выполняется в event loop."""
+        if snapshot is None:
+            self._closed = True
+        elif snapshot.seq > self._snapshot.seq:
+            # Публикация - сервис снова работает (перезапуск после stop())
+            self._closed = False
+            self._snapshot = snapshot
+        self._wake()
+
+    def _wake(self) -> None:
+        changed, self._changed = self._changed, asyncio.Event()
+        if changed is not None:
+            changed.set()
@@ -1,12 +1,24 @@
 """Root address caching for fast Sanderling startup."""
 import json
 import os
+import threading
 import time
 from dataclasses import dataclass, asdict
-from typing import Optional
+from typing import Dict, Optional
 from pathlib import Path
 
 
+# Lock на файл кэша: общий для всех экземпляров в процессе
+_FILE_LOCKS: Dict[str, threading.Lock] = {}
+_FILE_LOCKS_GUARD = threading.Lock()
+
+
+def _file_lock(path: str) -> threading.Lock:
+    key = os.path.abspath(path)
+    with _FILE_LOCKS_GUARD:
+        return _FILE_LOCKS.setdefault(key, threading.Lock())
+
+
 @dataclass
 class CacheEntry:
     """Запись в кэше root address."""
@@ -17,7 +29,14 @@ class CacheEntry:
 
 
 class RootAddressCache:
-    """Кэш для хранения root address UI tree."""
+    """
+    Кэш для хранения root address UI tree.
+
+    Один экземпляр можно делить между сервисами разных клиентов
+    (SanderlingSupervisor): операции под lock файла (общим и для разных
+    экземпляров), запись перечитывает файл и меняет только свой ключ,
+    файл заменяется атомарно.
+    """
     
     def __init__(self, cache_file: str = "output/data/sanderling_cache.json"):
         """
@@ -27,6 +46,7 @@ class RootAddressCache:
             cache_file: Путь к файлу кэша
         """
         self.cache_file = cache_file
+        self._lock = _file_lock(cache_file)
         self.data = self._load()
         
     def get(self, process_id: int) -> Optional[str]:
@@ -40,10 +60,11 @@ class RootAddressCache:
             Root address или None если не найден
         """
         key = str(process_id)
-        if key not in self.data:
+        with self._lock:
+            entry = self.data.get(key)
+        if entry is None:
             return None
             
-        entry = self.data[key]
         if not self._is_valid(entry):
             self.invalidate(process_id)
             return None
@@ -65,8 +86,11 @@ class RootAddressCache:
             timestamp=time.time(),
             game_version=game_version
         )
-        self.data[str(process_id)] = asdict(entry)
-        self._save()
+        with self._lock:
+            # Перечитать файл: записи других клиентов/процессов не затираются
+            self.data = self._load()
+            self.data[str(process_id)] = asdict(entry)
+            self._save()
         
     def invalidate(self, process_id: int) -> None:
         """
@@ -76,9 +100,11 @@ class RootAddressCache:
             process_id: ID процесса EVE
         """
         key = str(process_id)
-        if key in self.data:
-            del self.data[key]
-            self._save()
+        with self._lock:
+            self.data = self._load()
+            if key in self.data:
+                del self.data[key]
+                self._save()
         
     def _load(self) -> dict:
         """Загрузить кэш из файла."""
@@ -96,9 +122,12 @@ class RootAddressCache:
         # Создать директорию если не существует
         Path(self.cache_file).parent.mkdir(parents=True, exist_ok=True)
         
+        # Запись во временный файл и замена: читатель не увидит недописанный JSON
+        temp_file = f"{self.cache_file}.{os.getpid()}.{threading.get_ident()}.tmp"
         try:
-            with open(self.cache_file, 'w', encoding='utf-8') as f:
+            with open(temp_file, 'w', encoding='utf-8') as f:
                 json.dump(self.data, f, indent=2, ensure_ascii=False)
+            os.replace(temp_file, self.cache_file)
         except IOError as e:
             print(f"Warning: Failed to save cache: {e}")
         
@@ -0,0 +1,573 @@
+"""Компактное колоночное представление UI tree.
+
+Вместо ~1700 dict-узлов (каждый со своим dictEntriesOfInterest и списком
+children) дерево хранится в параллельных массивах:
+
+- type_ids, parents, first_child, next_sibling - структура дерева
+- abs_x, abs_y, widths, heights - абсолютная геометрия (см. geometry.py)
+- name_ids, text_ids - _name и _setText как индексы в таблице строк
+- entries - разреженная таблица остальных dict entries of interest
+
+Узлы пронумерованы в порядке обхода pre-order (как рекурсивный обход dict).
+Dict-форма (формат C# exe) строится по запросу через to_dict().
+"""
+from array import array
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .geometry import attach_rect, unwrap_int, DISPLAY_WIDTH, DISPLAY_HEIGHT
+
+
+# Нет значения (для widths/heights и индексов строк)
+MISSING = -0x80000000
+# Границы геометрии в колонках array('i') (MISSING занят)
+INT32_MIN = -0x7FFFFFFF
+INT32_MAX = 0x7FFFFFFF
+# Нет узла (для parents/first_child/next_sibling)
+NO_NODE = -1
+
+# Entries, которые хранятся в отдельных колонках
+NAME_KEY = '_name'
+TEXT_KEY = '_setText'
+
+
+class CompactUITree:
+    """UI tree в виде параллельных массивов."""
+
+    __slots__ = (
+        'strings', '_string_ids',
+        'type_ids', 'addresses', 'parents', 'first_child', 'next_sibling',
+        'abs_x', 'abs_y', 'widths', 'heights',
+        'name_ids', 'text_ids', 'entries',
+        '_last_child', '_type_index', '_nodes', '_source', '_node_ids',
+    )
+
+    def __init__(self):
+        """Создать пустое дерево."""
+        # Таблица интернированных строк (типы, ключи, тексты)
+        self.strings: List[str] = []
+        self._string_ids: Dict[str, int] = {}
+
+        self.type_ids = array('i')
+        self.addresses = array('Q')
+        self.parents = array('i')
+        self.first_child = array('i')
+        self.next_sibling = array('i')
+        self.abs_x = array('i')
+        self.abs_y = array('i')
+        self.widths = array('i')
+        self.heights = array('i')
+        self.name_ids = array('i')
+        self.text_ids = array('i')
+        # node index → (key_id, value, key_id, value, ...) для остальных entries
+        self.entries: Dict[int, Tuple[Any, ...]] = {}
+
+        self._last_child = array('i')
+        self._type_index: Optional[Dict[int, List[int]]] = None
+        # Кэш dict-узлов (исходные узлы при from_dict или материализованные)
+        self._nodes: Optional[List[Optional[dict]]] = None
+        # Исходные dict-узлы, если дерево - индекс поверх них
+        self._source: Optional[List[dict]] = None
+        # id(dict-узла) → индекс, для перехода из dict-формы обратно в дерево
+        self._node_ids: Optional[Dict[int, int]] = None
+
+    def __len__(self) -> int:
+        return len(self.type_ids)
+
+    # ------------------------------------------------------------
+    # Построение
+    # ------------------------------------------------------------
+
+    def intern(self, value: str) -> int:
+        """
+        Получить индекс строки в таблице (добавить если нет).
+
+        Args:
+            value: Строка
+
+        Returns:
+            Индекс в self.strings
+        """
+        string_id = self._string_ids.get(value)
+        if string_id is None:
+            string_id = len(self.strings)
+            self.strings.append(value)
+            self._string_ids[value] = string_id
+        return string_id
+
+    def add_node(self, parent: int, address: int, type_name: str,
+                 dict_entries: Optional[dict]) -> int:
+        """
+        Добавить узел. Узлы должны добавляться в порядке pre-order.
+
+        Args:
+            parent: Индекс родителя (NO_NODE для корня)
+            address: pythonObjectAddress
+            type_name: pythonObjectTypeName
+            dict_entries: dictEntriesOfInterest узла
+
+        Returns:
+            Индекс нового узла
+        """
+        dict_entries = dict_entries or {}
+        index = self._add_structure(
+            parent, address, type_name,
+            unwrap_int(dict_entries.get('_displayX')) or 0,
+            unwrap_int(dict_entries.get('_displayY')) or 0,
+            unwrap_int(dict_entries.get('_displayWidth')),
+            unwrap_int(dict_entries.get('_displayHeight')),
+        )
+
+        name_id = text_id = MISSING
+        other = []
+        for key, value in dict_entries.items():
+            if key == NAME_KEY and isinstance(value, str):
+                name_id = self.intern(value)
+            elif key == TEXT_KEY and isinstance(value, str):
+                text_id = self.intern(value)
+            else:
+                other.append(self.intern(key))
+                other.append(self._pack(value))
+        self.name_ids.append(name_id)
+        self.text_ids.append(text_id)
+        if other:
+            self.entries[index] = tuple(other)
+
+        return index
+
+    def _add_structure(self, parent: int, address: int, type_name: str,
+                       rel_x: int, rel_y: int,
+                       width: Optional[int], height: Optional[int]) -> int:
+        """Добавить структуру и геометрию узла (без entries)."""
+        index = len(self.type_ids)
+
+        self.type_ids.append(self.intern(type_name or ''))
+        self.addresses.append(address)
+        self.parents.append(parent)
+        self.first_child.append(NO_NODE)
+        self.next_sibling.append(NO_NODE)
+        self._last_child.append(NO_NODE)
+
+        if parent == NO_NODE:
+            parent_x = parent_y = 0
+        else:
+            parent_x = self.abs_x[parent]
+            parent_y = self.abs_y[parent]
+            last = self._last_child[parent]
+            if last == NO_NODE:
+                self.first_child[parent] = index
+            else:
+                self.next_sibling[last] = index
+            self._last_child[parent] = index
+
+        # Мусорные значения (int_low32 указателя и т.п.) не должны ронять
+        # построение: геометрия прижимается к диапазону int32
+        self.abs_x.append(_clamp(parent_x + rel_x))
+        self.abs_y.append(_clamp(parent_y + rel_y))
+        self.widths.append(MISSING if width is None else _clamp(width))
+        self.heights.append(MISSING if height is None else _clamp(height))
+
+        self._type_index = None
+        return index
+
+    @classmethod
+    def from_dict(cls, ui_tree: dict, keep_source: bool = True) -> "CompactUITree":
+        """
+        Построить компактное дерево из dict-формы.
+
+        С keep_source=True строится только индекс (структура, типы,
+        геометрия) поверх исходных dict-узлов: entries читаются из них,
+        node() возвращает их же, а сами узлы получают абсолютную геометрию
+        (как geometry.annotate_tree). Это дешёвый режим для парсера.
+
+        С keep_source=False entries упаковываются в колонки и таблицы,
+        и исходное dict-дерево можно отпустить (режим хранения).
+
+        Args:
+            ui_tree: Корневой узел UI tree (формат C# exe)
+            keep_source: Индекс поверх исходных dict-узлов
+
+        Returns:
+            CompactUITree
+        """
+        tree = cls()
+        if not isinstance(ui_tree, dict):
+            return tree
+
+        source = [] if keep_source else None
+        stack = [(ui_tree, NO_NODE)]
+        while stack:
+            node, parent = stack.pop()
+            address = _parse_address(node.get('pythonObjectAddress'))
+            type_name = node.get('pythonObjectTypeName')
+
+            if source is None:
+                index = tree.add_node(parent, address, type_name,
+                                      node.get('dictEntriesOfInterest'))
+            else:
+                parent_x = tree.abs_x[parent] if parent != NO_NODE else 0
+                parent_y = tree.abs_y[parent] if parent != NO_NODE else 0
+                abs_x, abs_y = attach_rect(node, parent_x, parent_y)
+                index = tree._add_structure(
+                    parent, address, type_name,
+                    abs_x - parent_x, abs_y - parent_y,
+                    node[DISPLAY_WIDTH], node[DISPLAY_HEIGHT],
+                )
+                source.append(node)
+
+            children = node.get('children')
+            if isinstance(children, list):
+                for child in reversed(children):
+                    if isinstance(child, dict):
+                        stack.append((child, index))
+
+        if source is not None:
+            tree._source = source
+            tree._nodes = source
+        return tree
+
+    # ------------------------------------------------------------
+    # Доступ к узлам
+    # ------------------------------------------------------------
+
+    def type_name(self, index: int) -> str:
+        """Имя типа узла."""
+        return self.strings[self.type_ids[index]]
+
+    def address(self, index: int) -> int:
+        """pythonObjectAddress узла."""
+        return self.addresses[index]
+
+    def parent(self, index: int) -> int:
+        """Индекс родителя или NO_NODE."""
+        return self.parents[index]
+
+    def children(self, index: int) -> Iterator[int]:
+        """Индексы детей узла по порядку."""
+        child = self.first_child[index]
+        while child != NO_NODE:
+            yield child
+            child = self.next_sibling[child]
+
+    def ancestors(self, index: int) -> Iterator[int]:
+        """Индексы предков узла (от родителя к корню)."""
+        parent = self.parents[index]
+        while parent != NO_NODE:
+            yield parent
+            parent = self.parents[parent]
+
+    def subtree_end(self, index: int) -> int:
+        """
+        Граница поддерева в pre-order нумерации.
+
+        Поддерево узла - это индексы [index, subtree_end(index)).
+        """
+        node = index
+        while node != NO_NODE:
+            sibling = self.next_sibling[node]
+            if sibling != NO_NODE:
+                return sibling
+            node = self.parents[node]
+        return len(self.type_ids)
+
+    def rect(self, index: int, default_width: int = 0,
+             default_height: int = 0) -> Tuple[int, int, int, int]:
+        """
+        Абсолютный прямоугольник узла.
+
+        Args:
+            index: Индекс узла
+            default_width: Ширина, если у узла нет _displayWidth
+            default_height: Высота, если у узла нет _displayHeight
+
+        Returns:
+            Кортеж (x, y, width, height)
+        """
+        width = self.widths[index]
+        height = self.heights[index]
+        return (
+            self.abs_x[index],
+            self.abs_y[index],
+            default_width if width == MISSING else width,
+            default_height if height == MISSING else height,
+        )
+
+    def center(self, index: int, default_width: int = 0,
+               default_height: int = 0) -> Tuple[int, int]:
+        """Абсолютный центр узла."""
+        x, y, width, height = self.rect(index, default_width, default_height)
+        return (x + width // 2, y + height // 2)
+
+    def name(self, index: int) -> Optional[str]:
+        """_name узла."""
+        if self._source is not None:
+            return _str_or_none(self._source_entries(index).get(NAME_KEY))
+        name_id = self.name_ids[index]
+        return None if name_id == MISSING else self.strings[name_id]
+
+    def text(self, index: int) -> Optional[str]:
+        """_setText узла."""
+        if self._source is not None:
+            return _str_or_none(self._source_entries(index).get(TEXT_KEY))
+        text_id = self.text_ids[index]
+        return None if text_id == MISSING else self.strings[text_id]
+
+    def entry(self, index: int, key: str, default: Any = None) -> Any:
+        """
+        Значение из dictEntriesOfInterest узла.
+
+        Args:
+            index: Индекс узла
+            key: Ключ entry
+            default: Значение по умолчанию
+
+        Returns:
+            Значение entry или default
+        """
+        if self._source is not None:
+            return self._source_entries(index).get(key, default)
+
+        if key == NAME_KEY:
+            value = self.name(index)
+            if value is not None:
+                return value
+        elif key == TEXT_KEY:
+            value = self.text(index)
+            if value is not None:
+                return value
+
+        key_id = self._string_ids.get(key)
+        if key_id is None:
+            return default
+        packed = self.entries.get(index, ())
+        for i in range(0, len(packed), 2):
+            if packed[i] == key_id:
+                return self._unpack(packed[i + 1])
+        return default
+
+    def dict_entries(self, index: int) -> dict:
+        """Собрать dictEntriesOfInterest узла."""
+        if self._source is not None:
+            return self._source_entries(index)
+
+        result = {}
+        name = self.name(index)
+        if name is not None:
+            result[NAME_KEY] = name
+        text = self.text(index)
+        if text is not None:
+            result[TEXT_KEY] = text
+        strings = self.strings
+        packed = self.entries.get(index, ())
+        for i in range(0, len(packed), 2):
+            result[strings[packed[i]]] = self._unpack(packed[i + 1])
+        return result
+
+    def _source_entries(self, index: int) -> dict:
+        """dictEntriesOfInterest исходного dict-узла."""
+        entries = self._source[index].get('dictEntriesOfInterest')
+        return entries if isinstance(entries, dict) else {}
+
+    def _pack(self, value: Any) -> Any:
+        """
+        Упаковать значение entry для хранения.
+
+        Строки интернируются, вложенные dict (int_low32, ссылки на children,
+        entriesOfInterest) превращаются в плоские кортежи без dict-объектов.
+        """
+        if isinstance(value, str):
+            return self.strings[self.intern(value)]
+        if isinstance(value, dict):
+            if set(value) == _BIG_INT_KEYS and isinstance(value['int'], str):
+                try:
+                    return _BigInt((int(value['int']), value['int_low32']))
+                except ValueError:
+                    pass
+            packed = []
+            for key, item in value.items():
+                packed.append(self.intern(key))
+                packed.append(self._pack(item))
+            return _PackedDict(packed)
+        return value
+
+    def _unpack(self, value: Any) -> Any:
+        """Обратное преобразование для _pack."""
+        if isinstance(value, _BigInt):
+            return {'int': str(value[0]), 'int_low32': value[1]}
+        if isinstance(value, _PackedDict):
+            strings = self.strings
+            return {
+                strings[value[i]]: self._unpack(value[i + 1])
+                for i in range(0, len(value), 2)
+            }
+        return value
+
+    def nodes_of_type(self, type_name: str) -> List[int]:
+        """
+        Индексы всех узлов данного типа (в порядке pre-order).
+
+        Индекс по типам строится лениво один раз на дерево.
+
+        Args:
+            type_name: Имя типа
+
+        Returns:
+            Список индексов узлов
+        """
+        type_id = self._string_ids.get(type_name)
+        if type_id is None:
+            return []
+
+        if self._type_index is None:
+            type_index: Dict[int, List[int]] = {}
+            for index, node_type in enumerate(self.type_ids):
+                nodes = type_index.get(node_type)
+                if nodes is None:
+                    type_index[node_type] = [index]
+                else:
+                    nodes.append(index)
+            self._type_index = type_index
+
+        return self._type_index.get(type_id, [])
+
+    # ------------------------------------------------------------
+    # Dict-форма
+    # ------------------------------------------------------------
+
+    def node(self, index: int) -> dict:
+        """
+        Dict-форма узла (с поддеревом).
+
+        Если дерево построено из dict - возвращается исходный узел,
+        иначе поддерево материализуется один раз и кэшируется.
+
+        Args:
+            index: Индекс узла
+
+        Returns:
+            dict в формате C# exe (с абсолютной геометрией)
+        """
+        if self._nodes is None:
+            self._nodes = [None] * len(self.type_ids)
+        node = self._nodes[index]
+        if node is None:
+            node = self.to_dict(index)
+        return node
+
+    def index_of(self, node: dict) -> Optional[int]:
+        """
+        Индекс узла по его dict-форме (полученной из node()/to_dict()).
+
+        Args:
+            node: dict-узел этого дерева
+
+        Returns:
+            Индекс узла или None если узел не из этого дерева
+        """
+        if self._nodes is None:
+            return None
+        node_ids = self._node_ids
+        if node_ids is None:
+            # Дальше to_dict() дописывает сюда материализованные узлы сам
+            node_ids = {id(cached): index for index, cached in enumerate(self._nodes)
+                        if cached is not None}
+            self._node_ids = node_ids
+        index = node_ids.get(id(node))
+        if index is None or self._nodes[index] is not node:
+            return None
+        return index
+
+    def to_dict(self, index: int = 0) -> Optional[dict]:
+        """
+        Построить dict-форму поддерева (формат C# exe + absoluteX/Y).
+
+        Args:
+            index: Индекс корня поддерева
+
+        Returns:
+            dict или None для пустого дерева
+        """
+        if index >= len(self.type_ids):
+            return None
+        if self._source is not None:
+            return self._source[index]
+
+        if self._nodes is None:
+            self._nodes = [None] * len(self.type_ids)
+        cache = self._nodes
+        # Уже выданный узел (node()/to_dict()) - тот же объект: поддерево у
+        # кэшированного узла всегда полное, а index_of() должен его узнавать
+        if cache[index] is not None:
+            return cache[index]
+
+        node_ids = self._node_ids
+        root = self._make_dict(index)
+        cache[index] = root
+        if node_ids is not None:
+            node_ids[id(root)] = index
+        stack = [(index, root)]
+        while stack:
+            parent_index, parent_node = stack.pop()
+            child = self.first_child[parent_index]
+            if child == NO_NODE:
+                continue
+            children = []
+            while child != NO_NODE:
+                child_node = cache[child]
+                if child_node is None:
+                    child_node = self._make_dict(child)
+                    cache[child] = child_node
+                    if node_ids is not None:
+                        node_ids[id(child_node)] = child
+                    stack.append((child, child_node))
+                children.append(child_node)
+                child = self.next_sibling[child]
+            parent_node['children'] = children
+
+        return root
+
+    def _make_dict(self, index: int) -> dict:
+        """Dict-узел без детей."""
+        width = self.widths[index]
+        height = self.heights[index]
+        return {
+            'pythonObjectAddress': str(self.addresses[index]),
+            'pythonObjectTypeName': self.type_name(index),
+            'dictEntriesOfInterest': self.dict_entries(index),
+            'otherDictEntriesKeys': None,
+            'children': None,
+            'absoluteX': self.abs_x[index],
+            'absoluteY': self.abs_y[index],
+            'displayWidth': None if width == MISSING else width,
+            'displayHeight': None if height == MISSING else height,
+        }
+
+
+_BIG_INT_KEYS = {'int', 'int_low32'}
+
+
+class _BigInt(tuple):
+    """Большой int в формате C# exe: (int, int_low32)."""
+    __slots__ = ()
+
+
+class _PackedDict(tuple):
+    """Вложенный dict как плоский кортеж (key_id, value, key_id, value, ...)."""
+    __slots__ = ()
+
+
+def _str_or_none(value: Any) -> Optional[str]:
+    """Строка или None (для name()/text() в режиме индекса)."""
+    return value if isinstance(value, str) else None
+
+
+def _clamp(value: int) -> int:
+    """Значение геометрии в диапазоне колонки array('i')."""
+    return INT32_MIN if value < INT32_MIN else INT32_MAX if value > INT32_MAX else value
+
+
+def _parse_address(value: Any) -> int:
+    """Адрес узла из pythonObjectAddress (строка с десятичным числом)."""
+    try:
+        return int(value)
+    except (ValueError, TypeError):
+        return 0
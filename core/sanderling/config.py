@@ -1,9 +1,9 @@
 """Sanderling configuration management."""
 import json
 import os
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, field
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 
 
 @dataclass
@@ -14,12 +14,52 @@ class SanderlingConfig:
     fallback_to_cv: bool = True
     cache_enabled: bool = True
     read_interval_ms: int = 1000  # 1 секунда
+    # Адаптивный интервал: чаще при изменениях/ожидании, реже в доке и простое
+    adaptive_read_interval: bool = True
+    read_interval_min_ms: int = 150
+    read_interval_max_ms: int = 2000
+    history_size: int = 100  # Снимков в истории (SanderlingService.history)
+    # Метрики тиков: окно гистограмм и периодический сброс в output/metrics/ (0 - выкл)
+    metrics_window: int = 512
+    metrics_dump_interval_s: float = 0.0
+    metrics_dump_format: str = "json"  # "json" или "prometheus"
+    # Профилирование потока чтения: окно по API, SIGUSR2 или на медленном тике (0 - выкл)
+    profile_duration_s: float = 10.0
+    profile_interval_ms: float = 5.0
+    profile_slow_tick_ms: int = 0
+    profile_cooldown_s: float = 300.0
+    profile_signal: bool = False  # SIGUSR2 -> окно профилирования (Linux), включать явно
+    # Несколько клиентов (SanderlingSupervisor): воркеров чтения (0 - по числу ядер)
+    # и период поиска новых/закрытых клиентов
+    supervisor_workers: int = 0
+    supervisor_discover_interval_s: float = 10.0
     max_retries: int = 3
     timeout_ms: int = 5000
     binary_path: str = "external/sanderling-bin/read-memory-64-bit.exe"
+    # Приём UI tree из stdout ридера по мере вывода (без временного JSON-файла).
+    # reader_stream_args - аргументы, с которыми ридер пишет JSON в stdout; если
+    # ридер всё равно записал файл, он читается как обычно
+    reader_stream_output: bool = False
+    reader_stream_args: List[str] = field(default_factory=list)
+    # Долгоживущий ридер: запускается один раз, дерево читается запросами по pipe
+    # (core/sanderling/reader_host.py). reader_host_command - команда запуска,
+    # "{pid}" подставляется; пусто - LinuxMemoryReader в дочернем процессе на Linux,
+    # binary_path serve --pid=N на Windows
+    reader_host: bool = False
+    reader_host_command: List[str] = field(default_factory=list)
     debug_mode: bool = False
+    # Debug-снимки UI tree (output/debug/*.snap): сжатие "zlib", "zstd" или "none"
+    # и очередь фоновой записи (переполнение - снимок пропускается)
+    debug_snapshot_compression: str = "zlib"
+    debug_snapshot_queue_size: int = 4
+    # Запись всей сессии в output/sessions/ (ключевой кадр раз в N тиков + дельты)
+    session_recording: bool = False
+    session_keyframe_interval: int = 100
+    compact_ui_tree: bool = True  # Хранить UI tree в колоночной форме (CompactUITree)
     # Linux-специфичные настройки
-    linux_use_process_vm_readv: bool = False  # Метод чтения памяти (fallback)
+    # Метод чтения памяти: process_vm_readv вместо pread(/proc/pid/mem); выбирается по
+    # scripts/benchmark_linux_primitives.py (без доступа к mem он включается сам)
+    linux_use_process_vm_readv: bool = False
     linux_scan_chunk_size: int = 4_194_304  # Размер чанка для сканирования (4 MB)
     
     @classmethod
@@ -98,12 +138,103 @@ class SanderlingConfig:
             self.debug_mode = False
             valid = False
             
+        if not isinstance(self.adaptive_read_interval, bool):
+            print("Warning: 'adaptive_read_interval' must be bool")
+            self.adaptive_read_interval = True
+            valid = False
+            
+        if not isinstance(self.session_recording, bool):
+            print("Warning: 'session_recording' must be bool")
+            self.session_recording = False
+            valid = False
+            
+        if not isinstance(self.compact_ui_tree, bool):
+            print("Warning: 'compact_ui_tree' must be bool")
+            self.compact_ui_tree = True
+            valid = False
+            
+        if not isinstance(self.profile_signal, bool):
+            print("Warning: 'profile_signal' must be bool")
+            self.profile_signal = False
+            valid = False
+            
         # Валидация диапазонов
         if not isinstance(self.read_interval_ms, int) or self.read_interval_ms < 50 or self.read_interval_ms > 5000:
             print("Warning: 'read_interval_ms' must be int between 50 and 5000")
             self.read_interval_ms = 200
             valid = False
             
+        if not isinstance(self.read_interval_min_ms, int) or self.read_interval_min_ms < 50 or self.read_interval_min_ms > self.read_interval_ms:
+            print("Warning: 'read_interval_min_ms' must be int between 50 and read_interval_ms")
+            self.read_interval_min_ms = min(150, self.read_interval_ms)
+            valid = False
+            
+        if not isinstance(self.read_interval_max_ms, int) or self.read_interval_max_ms < self.read_interval_ms or self.read_interval_max_ms > 10000:
+            print("Warning: 'read_interval_max_ms' must be int between read_interval_ms and 10000")
+            self.read_interval_max_ms = max(2000, self.read_interval_ms)
+            valid = False
+            
+        if not isinstance(self.history_size, int) or self.history_size < 2 or self.history_size > 10000:
+            print("Warning: 'history_size' must be int between 2 and 10000")
+            self.history_size = 100
+            valid = False
+            
+        if not isinstance(self.metrics_window, int) or self.metrics_window < 10 or self.metrics_window > 100000:
+            print("Warning: 'metrics_window' must be int between 10 and 100000")
+            self.metrics_window = 512
+            valid = False
+            
+        if not isinstance(self.metrics_dump_interval_s, (int, float)) or self.metrics_dump_interval_s < 0:
+            print("Warning: 'metrics_dump_interval_s' must be non-negative number")
+            self.metrics_dump_interval_s = 0.0
+            valid = False
+            
+        if self.metrics_dump_format not in ("json", "prometheus"):
+            print("Warning: 'metrics_dump_format' must be 'json' or 'prometheus'")
+            self.metrics_dump_format = "json"
+            valid = False
+            
+        if not isinstance(self.profile_duration_s, (int, float)) or self.profile_duration_s <= 0:
+            print("Warning: 'profile_duration_s' must be positive number")
+            self.profile_duration_s = 10.0
+            valid = False
+            
+        if not isinstance(self.profile_interval_ms, (int, float)) or self.profile_interval_ms < 1:
+            print("Warning: 'profile_interval_ms' must be number >= 1")
+            self.profile_interval_ms = 5.0
+            valid = False
+            
+        if not isinstance(self.profile_slow_tick_ms, int) or self.profile_slow_tick_ms < 0:
+            print("Warning: 'profile_slow_tick_ms' must be non-negative int")
+            self.profile_slow_tick_ms = 0
+            valid = False
+            
+        if not isinstance(self.supervisor_workers, int) or self.supervisor_workers < 0:
+            print("Warning: 'supervisor_workers' must be non-negative int")
+            self.supervisor_workers = 0
+            valid = False
+            
+        if (not isinstance(self.supervisor_discover_interval_s, (int, float))
+                or self.supervisor_discover_interval_s <= 0):
+            print("Warning: 'supervisor_discover_interval_s' must be positive number")
+            self.supervisor_discover_interval_s = 10.0
+            valid = False
+            
+        if self.debug_snapshot_compression not in ("zlib", "zstd", "none"):
+            print("Warning: 'debug_snapshot_compression' must be 'zlib', 'zstd' or 'none'")
+            self.debug_snapshot_compression = "zlib"
+            valid = False
+            
+        if not isinstance(self.debug_snapshot_queue_size, int) or self.debug_snapshot_queue_size < 1:
+            print("Warning: 'debug_snapshot_queue_size' must be positive int")
+            self.debug_snapshot_queue_size = 4
+            valid = False
+            
+        if not isinstance(self.session_keyframe_interval, int) or self.session_keyframe_interval < 1:
+            print("Warning: 'session_keyframe_interval' must be positive int")
+            self.session_keyframe_interval = 100
+            valid = False
+            
         if not isinstance(self.max_retries, int) or self.max_retries < 1 or self.max_retries > 10:
             print("Warning: 'max_retries' must be int between 1 and 10")
             self.max_retries = 3
@@ -119,4 +250,26 @@ class SanderlingConfig:
             self.binary_path = "external/sanderling-bin/read-memory-64-bit.exe"
             valid = False
             
+        if not isinstance(self.reader_stream_output, bool):
+            print("Warning: 'reader_stream_output' must be bool")
+            self.reader_stream_output = False
+            valid = False
+            
+        if (not isinstance(self.reader_stream_args, list)
+                or not all(isinstance(arg, str) for arg in self.reader_stream_args)):
+            print("Warning: 'reader_stream_args' must be list of strings")
+            self.reader_stream_args = []
+            valid = False
+            
+        if not isinstance(self.reader_host, bool):
+            print("Warning: 'reader_host' must be bool")
+            self.reader_host = False
+            valid = False
+            
+        if (not isinstance(self.reader_host_command, list)
+                or not all(isinstance(arg, str) for arg in self.reader_host_command)):
+            print("Warning: 'reader_host_command' must be list of strings")
+            self.reader_host_command = []
+            valid = False
+            
         return valid
@@ -0,0 +1,131 @@
+"""Корпус записанных UI tree для офлайн-инструментов.
+
+Дампы JSON (C# exe, dev tools), бинарные снимки .snap (snapshot_file) и
+записи сессий .sess (session_recorder) приводятся к одному виду: список
+(кадр, время, CompactUITree). Из записи сессии берётся не больше одного
+кадра за session_every секунд - соседние тики почти одинаковы.
+
+    for path, root in corpus_files(["output/dumps", "output/sessions/*.sess"]):
+        for frame, timestamp, tree in load_trees(path, session_every=60):
+            key = tree_key(path, frame, root)   # не зависит от текущего каталога
+"""
+import glob
+import json
+import os
+from typing import Iterable, List, Optional, Tuple
+
+from .compact_tree import CompactUITree
+from .session_recorder import SESSION_MAGIC, SessionReader
+from .snapshot_file import SNAPSHOT_MAGIC, read_snapshot
+
+
+# Расширения файлов корпуса при обходе каталога
+CORPUS_SUFFIXES = ('.json', '.snap', '.sess')
+
+
+def expand_paths(patterns: Iterable[str]) -> List[str]:
+    """
+    Файлы корпуса по путям, glob-маскам и каталогам.
+
+    Args:
+        patterns: Файлы, маски (output/ui_tree_dump_*.json) или каталоги
+            (обходятся рекурсивно, берутся CORPUS_SUFFIXES)
+
+    Returns:
+        Пути без повторов, в порядке аргументов (внутри маски/каталога - по имени)
+    """
+    return [path for path, _ in corpus_files(patterns)]
+
+
+def corpus_files(patterns: Iterable[str]) -> List[Tuple[str, str]]:
+    """
+    Как expand_paths, но с корнем аргумента для каждого файла.
+
+    Корень - сам каталог, каталог маски до первого шаблона (output для
+    output/*.json) или каталог файла. Ключи деревьев (tree_key) считаются
+    от него и не зависят от текущего каталога.
+
+    Returns:
+        [(путь, корень)] без повторов путей
+    """
+    files = {}
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            root = pattern
+            matched = sorted(
+                os.path.join(walk_root, name)
+                for walk_root, _, names in os.walk(pattern)
+                for name in names
+                if name.endswith(CORPUS_SUFFIXES)
+            )
+        elif glob.has_magic(pattern):
+            root = _static_prefix(pattern)
+            matched = sorted(glob.glob(pattern, recursive=True))
+        else:
+            root = os.path.dirname(pattern)
+            matched = [pattern]
+        for path in matched:
+            if os.path.isfile(path):
+                files.setdefault(path, root)
+    return list(files.items())
+
+
+def _static_prefix(pattern: str) -> str:
+    """Каталог маски до первой части с шаблоном."""
+    parts = []
+    for part in pattern.replace(os.sep, '/').split('/')[:-1]:
+        if glob.has_magic(part):
+            break
+        parts.append(part)
+    return '/'.join(parts) or ('/' if pattern.startswith('/') else '')
+
+
+def load_trees(path: str, session_every: float = 0.0) -> List[Tuple[int, float, CompactUITree]]:
+    """
+    Деревья файла корпуса.
+
+    JSON, который не является UI tree (дампы overview и т.п.), даёт пустой
+    список. Время дампа и снимка - mtime файла.
+
+    Args:
+        path: .json, .snap или .sess (формат определяется по содержимому)
+        session_every: Для .sess - не чаще одного кадра за столько секунд
+
+    Returns:
+        [(номер кадра, время, CompactUITree)]; для дампа и снимка кадр 0
+    """
+    with open(path, 'rb') as f:
+        head = f.read(8)
+
+    if head == SESSION_MAGIC:
+        trees = []
+        last = None
+        for frame, (timestamp, tree) in enumerate(SessionReader(path)):
+            if last is None or timestamp - last >= session_every:
+                trees.append((frame, timestamp, tree))
+                last = timestamp
+        return trees
+
+    timestamp = os.path.getmtime(path)
+    if head == SNAPSHOT_MAGIC:
+        return [(0, timestamp, read_snapshot(path))]
+
+    with open(path, 'r', encoding='utf-8') as f:
+        ui_tree = json.load(f)
+    if not isinstance(ui_tree, dict) or 'pythonObjectTypeName' not in ui_tree:
+        return []
+    return [(0, timestamp, CompactUITree.from_dict(ui_tree))]
+
+
+def tree_key(path: str, frame: int = 0, root: Optional[str] = None) -> str:
+    """
+    Имя дерева в отчётах и эталонах: путь относительно корня аргумента
+    корпуса (corpus_files), у кадров сессии - #кадр.
+
+    Args:
+        path: Файл корпуса
+        frame: Номер кадра
+        root: Корень аргумента (None или '' - каталог файла, ключ - имя файла)
+    """
+    key = os.path.relpath(path, root or os.path.dirname(path) or '.').replace(os.sep, '/')
+    return f"{key}#{frame}" if frame else key
@@ -0,0 +1,56 @@
+"""Разбор строк дистанции из overview и панели целей.
+
+Клиент EVE пишет дистанцию с разделителями разрядов и единицами:
+"1 189 м", "188 570 км", "2,500 m", "12 а.е.". Парсится один раз
+в парсере UI tree, дальше везде используется число в метрах.
+"""
+import re
+from typing import Optional
+
+
+METERS_PER_KM = 1000.0
+METERS_PER_AU = 149_597_870_700.0
+
+# Число: цифры с разделителями разрядов (пробелы, в т.ч. неразрывные, запятые) и дробной частью
+_NUMBER_RE = re.compile(r'\d[\d\s,.]*')
+_THOUSANDS_COMMA_RE = re.compile(r'\d{1,3}(,\d{3})+')
+
+
+def parse_distance_m(distance_str: Optional[str]) -> Optional[float]:
+    """
+    Конвертировать строку дистанции в метры.
+
+    Args:
+        distance_str: Строка вида "1 189 м", "188 570 км", "2,500 m", "3,2 AU"
+
+    Returns:
+        Дистанция в метрах или None
+    """
+    if not distance_str or not isinstance(distance_str, str):
+        return None
+
+    match = _NUMBER_RE.search(distance_str)
+    if not match:
+        return None
+
+    number = re.sub(r'\s', '', match.group()).rstrip('.,')
+    if ',' in number:
+        if '.' in number or _THOUSANDS_COMMA_RE.fullmatch(number):
+            # "2,500" / "1,234.5" - запятая разделяет разряды
+            number = number.replace(',', '')
+        else:
+            # "3,2" - десятичная запятая
+            number = number.replace(',', '.')
+
+    try:
+        value = float(number)
+    except ValueError:
+        return None
+
+    unit = distance_str[match.end():].strip().lower()
+    if unit.startswith(('км', 'km')):
+        return value * METERS_PER_KM
+    if unit.startswith(('а.е', 'au')):
+        return value * METERS_PER_AU
+    # "м"/"m" и по умолчанию - метры
+    return value
@@ -0,0 +1,138 @@
+"""Абсолютная геометрия узлов UI tree.
+
+Координаты в UI tree относительные (`_displayX`/`_displayY` от родителя),
+а большие int приходят в формате C# exe: {"int": "...", "int_low32": N}.
+Здесь это нормализуется один раз при построении дерева: каждый узел
+получает готовые абсолютные координаты и размеры экрана.
+
+Поля, добавляемые в узел:
+- absoluteX, absoluteY - абсолютные координаты левого верхнего угла
+- displayWidth, displayHeight - размеры (None если их нет в dict entries)
+"""
+from typing import Any, Optional, Tuple
+
+
+ABSOLUTE_X = 'absoluteX'
+ABSOLUTE_Y = 'absoluteY'
+DISPLAY_WIDTH = 'displayWidth'
+DISPLAY_HEIGHT = 'displayHeight'
+
+
+def unwrap_int(value: Any) -> Optional[int]:
+    """
+    Нормализовать значение из dictEntriesOfInterest в int.
+
+    Args:
+        value: Число или dict вида {"int": "...", "int_low32": N}
+
+    Returns:
+        int или None если значение отсутствует/не число
+    """
+    if isinstance(value, dict):
+        value = value.get('int_low32')
+    if value is None or isinstance(value, bool):
+        return None
+    try:
+        return int(value)
+    except (ValueError, TypeError):
+        return None
+
+
+def attach_rect(node: dict, parent_x: int = 0, parent_y: int = 0) -> Tuple[int, int]:
+    """
+    Записать в узел абсолютный прямоугольник.
+
+    Args:
+        node: Узел UI tree
+        parent_x: Абсолютный X родителя
+        parent_y: Абсолютный Y родителя
+
+    Returns:
+        Абсолютные (x, y) узла - для передачи детям
+    """
+    dict_entries = node.get('dictEntriesOfInterest') or {}
+    x = parent_x + (unwrap_int(dict_entries.get('_displayX')) or 0)
+    y = parent_y + (unwrap_int(dict_entries.get('_displayY')) or 0)
+
+    node[ABSOLUTE_X] = x
+    node[ABSOLUTE_Y] = y
+    node[DISPLAY_WIDTH] = unwrap_int(dict_entries.get('_displayWidth'))
+    node[DISPLAY_HEIGHT] = unwrap_int(dict_entries.get('_displayHeight'))
+    return x, y
+
+
+def annotate_tree(ui_tree: dict) -> int:
+    """
+    Один проход по дереву: проставить абсолютную геометрию всем узлам.
+
+    Используется для деревьев, пришедших из JSON (C# exe, дампы).
+    LinuxMemoryReader проставляет поля сам во время чтения.
+
+    Args:
+        ui_tree: Корневой узел UI tree
+
+    Returns:
+        Количество обработанных узлов
+    """
+    if not isinstance(ui_tree, dict):
+        return 0
+
+    count = 0
+    stack = [(ui_tree, 0, 0)]
+    while stack:
+        node, parent_x, parent_y = stack.pop()
+        x, y = attach_rect(node, parent_x, parent_y)
+        count += 1
+
+        children = node.get('children')
+        if isinstance(children, list):
+            for child in children:
+                if isinstance(child, dict):
+                    stack.append((child, x, y))
+
+    return count
+
+
+def is_annotated(node: dict) -> bool:
+    """Проверить что узел уже содержит абсолютную геометрию."""
+    return isinstance(node, dict) and ABSOLUTE_X in node
+
+
+def node_rect(node: dict, default_width: int = 0,
+              default_height: int = 0) -> Tuple[int, int, int, int]:
+    """
+    Абсолютный прямоугольник узла.
+
+    Args:
+        node: Аннотированный узел UI tree
+        default_width: Ширина, если у узла нет _displayWidth
+        default_height: Высота, если у узла нет _displayHeight
+
+    Returns:
+        Кортеж (x, y, width, height)
+    """
+    width = node.get(DISPLAY_WIDTH)
+    height = node.get(DISPLAY_HEIGHT)
+    return (
+        node.get(ABSOLUTE_X, 0),
+        node.get(ABSOLUTE_Y, 0),
+        default_width if width is None else width,
+        default_height if height is None else height,
+    )
+
+
+def node_center(node: dict, default_width: int = 0,
+                default_height: int = 0) -> Tuple[int, int]:
+    """
+    Абсолютный центр узла (точка для клика).
+
+    Args:
+        node: Аннотированный узел UI tree
+        default_width: Ширина, если у узла нет _displayWidth
+        default_height: Высота, если у узла нет _displayHeight
+
+    Returns:
+        Кортеж (x, y)
+    """
+    x, y, width, height = node_rect(node, default_width, default_height)
+    return (x + width // 2, y + height // 2)
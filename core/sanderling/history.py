@@ -0,0 +1,180 @@
+"""История последних снимков состояния.
+
+Кольцевой буфер фиксированной ёмкости с временными запросами:
+значение N мс назад, скорость изменения (дистанции, щита), "стабильно
+не меньше T мс". В истории хранятся только распарсенные состояния без
+UI tree; соседние состояния делят неизменившиеся записи (структурное
+разделение в парсере), поэтому буфер занимает немного памяти.
+"""
+import dataclasses
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, List, Optional, Union
+
+from .models import GameState, OverviewEntry, StateSnapshot
+
+
+EntryMatch = Union[str, Callable[[OverviewEntry], bool]]
+
+
+class SnapshotHistory:
+    """Кольцевой буфер последних снимков."""
+
+    def __init__(self, capacity: int = 100):
+        """
+        Args:
+            capacity: Максимальное число хранимых снимков
+        """
+        self.capacity = capacity
+        self._snapshots: deque = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._snapshots)
+
+    def append(self, snapshot: StateSnapshot) -> None:
+        """
+        Добавить снимок (самый старый вытесняется при переполнении).
+
+        UI tree в историю не попадает - только распарсенное состояние.
+        """
+        state = snapshot.state
+        if state is not None and (state.tree is not None or state.ui_tree is not None):
+            state = dataclasses.replace(state, tree=None, ui_tree=None)
+        snapshot = dataclasses.replace(snapshot, state=state, tree=None)
+
+        with self._lock:
+            self._snapshots.append(snapshot)
+
+    def clear(self) -> None:
+        """Очистить историю."""
+        with self._lock:
+            self._snapshots.clear()
+
+    def snapshots(self, window_ms: Optional[float] = None) -> List[StateSnapshot]:
+        """
+        Снимки от старого к новому.
+
+        Args:
+            window_ms: Только снимки за последние window_ms (None - все)
+        """
+        with self._lock:
+            snapshots = list(self._snapshots)
+        if window_ms is None:
+            return snapshots
+
+        since = time.time() - window_ms / 1000.0
+        return [s for s in snapshots if s.timestamp >= since]
+
+    def latest(self) -> Optional[StateSnapshot]:
+        """Последний снимок или None."""
+        with self._lock:
+            return self._snapshots[-1] if self._snapshots else None
+
+    def at(self, ms_ago: float) -> Optional[StateSnapshot]:
+        """
+        Снимок, актуальный ms_ago миллисекунд назад.
+
+        Returns:
+            Последний снимок не новее этого момента или None, если история короче
+        """
+        moment = time.time() - ms_ago / 1000.0
+        with self._lock:
+            for snapshot in reversed(self._snapshots):
+                if snapshot.timestamp <= moment:
+                    return snapshot
+        return None
+
+    def value_at(self, ms_ago: float, getter: Callable[[GameState], Any]) -> Any:
+        """
+        Значение getter(state) ms_ago миллисекунд назад.
+
+        Пример: history.value_at(2000, lambda s: s.ship.shield if s.ship else None)
+
+        Returns:
+            Результат getter или None, если снимка нет
+        """
+        snapshot = self.at(ms_ago)
+        if snapshot is None or snapshot.state is None:
+            return None
+        return getter(snapshot.state)
+
+    def rate(self, getter: Callable[[GameState], Optional[float]],
+             window_ms: float = 2000) -> Optional[float]:
+        """
+        Скорость изменения величины (единиц в секунду) за последние window_ms.
+
+        Считается по самому старому и самому новому снимку окна, в которых
+        getter вернул число.
+
+        Args:
+            getter: Функция GameState -> число или None
+            window_ms: Окно (мс)
+
+        Returns:
+            Единиц в секунду или None, если точек меньше двух
+        """
+        points = []
+        for snapshot in self.snapshots(window_ms):
+            if snapshot.state is None:
+                continue
+            value = getter(snapshot.state)
+            if value is not None:
+                points.append((snapshot.timestamp, value))
+
+        if len(points) < 2:
+            return None
+
+        (t0, v0), (t1, v1) = points[0], points[-1]
+        if t1 <= t0:
+            return None
+        return (v1 - v0) / (t1 - t0)
+
+    def distance_rate(self, match: EntryMatch, window_ms: float = 2000) -> Optional[float]:
+        """
+        Скорость изменения дистанции до записи overview (м/с).
+
+        Отрицательное значение - цель приближается.
+
+        Args:
+            match: Подстрока имени/типа (без учёта регистра) или функция OverviewEntry -> bool
+            window_ms: Окно (мс)
+
+        Returns:
+            м/с или None, если запись не найдена хотя бы в двух снимках
+        """
+        if isinstance(match, str):
+            keyword = match.lower()
+
+            def matches(entry: OverviewEntry) -> bool:
+                return (keyword in (entry.name or "").lower()
+                        or keyword in (entry.type or "").lower())
+        else:
+            matches = match
+
+        def distance(state: GameState) -> Optional[float]:
+            for entry in state.overview:
+                if entry.distance_m is not None and matches(entry):
+                    return entry.distance_m
+            return None
+
+        return self.rate(distance, window_ms)
+
+    def stable_for(self, predicate: Callable[[GameState], Any], ms: float) -> bool:
+        """
+        Условие выполняется во всех снимках последних ms миллисекунд.
+
+        История должна покрывать весь интервал: нужен снимок не новее
+        начала интервала, для которого условие тоже выполнено.
+
+        Пример: остов пропал насовсем -
+            history.stable_for(lambda s: not any(_is_wreck(e) for e in s.overview), 1500)
+        """
+        since = time.time() - ms / 1000.0
+        for snapshot in reversed(self.snapshots()):
+            if snapshot.state is None or not predicate(snapshot.state):
+                return False
+            if snapshot.timestamp <= since:
+                return True
+        return False
@@ -0,0 +1,577 @@
+"""Синтетическая куча CPython 2.7 (Win64) для тестов LinuxMemoryReader без EVE.
+
+Из записанного дампа UI tree (output/ui_tree_dump_*.json) строится образ
+памяти с той же раскладкой объектов, что в процессе EVE под Proton:
+
+- PyTypeObject с tp_name и tp_dictoffset (0x120, Win64), ob_type -> 'type',
+  у 'type' ob_type указывает сам на себя (проверка метакласса);
+- экземпляры UI-классов: заголовок PyObject, weaklist, __dict__ по tp_dictoffset;
+- PyDictObject с ma_table (PyDictEntry по 24 байта, открытая адресация);
+- PyChildrenList с '_childrenObjects' -> list;
+- str (ob_sval inline), unicode (UCS-4 буфер), int, float, bool.
+
+Образ сохраняется в файл и читается через FixtureProcessAccess - замену
+LinuxProcessAccess с тем же интерфейсом (read_bytes, read_calls,
+memory_regions). Поиск UIRoot и чтение дерева идут тем же кодом, что
+на живом процессе:
+
+    image = build_heap(json.load(open(dump_path)))
+    reader = LinuxMemoryReader(0, process=FixtureProcessAccess(image))
+    reader.open()
+    root = reader.find_root_address()      # == hex(image.root)
+    tree = reader.read_ui_tree(root)
+    assert normalize_tree(tree) == normalize_tree(dump)
+
+HeapProcess держит образ в памяти дочернего процесса по тому же базовому
+адресу - тогда чтение идёт настоящими pread(/proc/pid/mem) и
+process_vm_readv (замеры стоимости syscall'ов без EVE):
+
+    with HeapProcess(image) as holder:
+        reader = LinuxMemoryReader(holder.pid)
+"""
+import json
+import mmap
+import os
+import struct
+import subprocess
+import sys
+import tempfile
+import zlib
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Union
+
+from .linux_cpython import (
+    DICT_MA_FILL, DICT_MA_MASK, DICT_MA_TABLE, DICT_MA_USED, DICTENTRY_SIZE,
+    FLOAT_OB_FVAL, INT_OB_IVAL, LIST_OB_ITEM, MAX_STRING_LEN, OB_SIZE,
+    STR_OB_SHASH, STR_OB_SSTATE, STR_OB_SVAL, TP_NAME, UNICODE_LENGTH, UNICODE_STR,
+)
+from .linux_process import LinuxProcessAccess, MemoryRegion
+from .linux_reader import ENTRIES_OF_INTEREST_KEYS
+
+
+# Куча EVE под Proton лежит примерно здесь (адреса из дампов ~0x1E8'0000'0000)
+DEFAULT_BASE = 0x1E000000000
+
+# Раскладка Win64 PyTypeObject (см. linux_reader.py)
+TYPE_OBJECT_SIZE = 0x198
+TP_BASICSIZE = 0x20
+TP_FLAGS = 0xA8
+TP_DICTOFFSET = 0x120
+
+# PyDictObject: заголовок, ma_lookup, ma_smalltable[8] (таблица до 8 слотов - внутри)
+DICT_MA_SMALLTABLE = 0x38
+DICT_OBJECT_SIZE = DICT_MA_SMALLTABLE + 8 * DICTENTRY_SIZE
+
+# Экземпляр UI-класса: PyObject_HEAD, weakreflist, __dict__
+INSTANCE_WEAKLIST = 0x10
+INSTANCE_DICT = 0x18
+INSTANCE_SIZE = 0x20
+
+# Py_TPFLAGS_DEFAULT | HEAPTYPE | BASETYPE | HAVE_GC (значение для правдоподобия)
+HEAP_TYPE_FLAGS = 0x000253EB
+
+# Хвост образа: read_cstring читает до 256 байт за концом строки
+TAIL_PADDING = 4096
+
+FILE_MAGIC = b'SNDHEAP1'
+# magic, base, size, root, длина JSON-метаданных
+FILE_HEADER = struct.Struct('<8sQQQI')
+
+
+@dataclass
+class HeapImage:
+    """Образ памяти: байты с базовым адресом и адрес корня UI tree."""
+    base: int
+    data: Union[bytes, bytearray, mmap.mmap]
+    root: int
+    meta: Dict[str, Any] = field(default_factory=dict)
+    data_offset: int = 0  # Смещение образа внутри data (для mmap файла)
+
+    @property
+    def size(self) -> int:
+        return len(self.data) - self.data_offset
+
+    def save(self, path: str) -> None:
+        """Записать образ в файл (заголовок + JSON-метаданные + байты)."""
+        meta = json.dumps(self.meta, ensure_ascii=False).encode('utf-8')
+        with open(path, 'wb') as f:
+            f.write(FILE_HEADER.pack(FILE_MAGIC, self.base, self.size, self.root, len(meta)))
+            f.write(meta)
+            f.write(memoryview(self.data)[self.data_offset:])
+
+    @classmethod
+    def load(cls, path: str) -> "HeapImage":
+        """
+        Открыть образ из файла (memory-mapped, без копирования в память).
+
+        Raises:
+            ValueError: Не файл образа
+        """
+        with open(path, 'rb') as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(data) < FILE_HEADER.size:
+            data.close()
+            raise ValueError(f"{path}: слишком короткий файл образа")
+        magic, base, size, root, meta_len = FILE_HEADER.unpack_from(data, 0)
+        if magic != FILE_MAGIC:
+            data.close()
+            raise ValueError(f"{path}: не образ кучи ({magic!r})")
+
+        offset = FILE_HEADER.size + meta_len
+        meta = json.loads(data[FILE_HEADER.size:offset].decode('utf-8'))
+        return cls(base=base, data=data, root=root, meta=meta, data_offset=offset)
+
+
+class FixtureProcessAccess(LinuxProcessAccess):
+    """LinuxProcessAccess поверх HeapImage вместо /proc/pid/mem."""
+
+    def __init__(self, image: Union[HeapImage, str]):
+        """
+        Args:
+            image: Образ или путь к файлу образа
+        """
+        super().__init__(pid=0)
+        self.image = HeapImage.load(image) if isinstance(image, str) else image
+        self._view: Optional[memoryview] = None
+
+    def open(self) -> bool:
+        self._view = memoryview(self.image.data)[self.image.data_offset:]
+        return True
+
+    def close(self) -> None:
+        if self._view is not None:
+            self._view.release()
+            self._view = None
+
+    def _read(self, addr: int, size: int) -> Optional[bytes]:
+        if self._view is None:
+            return None
+
+        self.read_calls += 1
+        start = addr - self.image.base
+        if start < 0 or start + size > len(self._view):
+            return None
+        return self._view[start:start + size].tobytes()
+
+    def memory_regions(self) -> List[MemoryRegion]:
+        """Один анонимный rw-регион на весь образ."""
+        regions = [MemoryRegion(
+            start=self.image.base,
+            end=self.image.base + self.image.size,
+            permissions='rw-p',
+            offset=0,
+            device='00:00',
+            inode=0,
+            pathname='',
+        )]
+        if self.recorder is not None:
+            self.recorder.record_regions(regions)
+        return regions
+
+
+# Дочерний процесс HeapProcess: отобразить образ по его базовому адресу и ждать EOF на stdin.
+# Без импорта пакета - процесс держит только образ.
+_HOLD_SCRIPT = r"""
+import ctypes, sys
+path, base, offset, size = sys.argv[1], int(sys.argv[2]), int(sys.argv[3]), int(sys.argv[4])
+with open(path, 'rb') as f:
+    f.seek(offset)
+    data = f.read(size)
+libc = ctypes.CDLL(None, use_errno=True)
+libc.mmap.restype = ctypes.c_void_p
+libc.mmap.argtypes = [ctypes.c_void_p, ctypes.c_size_t, ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_long]
+# PROT_READ | PROT_WRITE, MAP_PRIVATE | MAP_ANONYMOUS | MAP_FIXED_NOREPLACE
+addr = libc.mmap(base, (size + 4095) & ~4095, 0x3, 0x02 | 0x20 | 0x100000, -1, 0)
+if addr != base:
+    sys.stderr.write('mmap 0x%x failed (errno %d)\n' % (base, ctypes.get_errno()))
+    sys.exit(1)
+ctypes.memmove(addr, data, size)
+del data
+sys.stdout.write('ready\n')
+sys.stdout.flush()
+sys.stdin.read()
+"""
+
+
+class HeapProcess:
+    """Дочерний процесс, держащий образ кучи по его базовому адресу (только Linux)."""
+
+    def __init__(self, image: Union[HeapImage, str]):
+        """
+        Args:
+            image: Образ или путь к файлу образа
+        """
+        self.image = HeapImage.load(image) if isinstance(image, str) else image
+        self._path = image if isinstance(image, str) else None
+        self._temp: Optional[str] = None
+        self._process: Optional[subprocess.Popen] = None
+
+    @property
+    def pid(self) -> int:
+        return self._process.pid if self._process is not None else 0
+
+    def start(self) -> None:
+        """
+        Запустить процесс и дождаться, пока образ окажется в его памяти.
+
+        Raises:
+            OSError: Процесс не смог отобразить образ по базовому адресу
+        """
+        path = self._path
+        if path is None:
+            fd, self._temp = tempfile.mkstemp(suffix='.heap')
+            os.close(fd)
+            self.image.save(self._temp)
+            path = self._temp
+        header = HeapImage.load(path)
+        offset, size = header.data_offset, header.size
+        header.data.close()
+
+        self._process = subprocess.Popen(
+            [sys.executable, '-c', _HOLD_SCRIPT, path, str(self.image.base), str(offset), str(size)],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        )
+        if self._process.stdout.readline().strip() != b'ready':
+            error = self._process.stderr.read().decode('utf-8', errors='replace').strip()
+            self.stop()
+            raise OSError(f"Процесс с образом кучи не запустился: {error}")
+
+    def stop(self) -> None:
+        """Завершить процесс (закрытие stdin) и удалить временный файл образа."""
+        process, self._process = self._process, None
+        if process is not None:
+            try:
+                process.stdin.close()
+                process.wait(timeout=5.0)
+            except (OSError, subprocess.TimeoutExpired):
+                process.kill()
+                process.wait()
+            process.stdout.close()
+            process.stderr.close()
+        if self._temp is not None:
+            os.unlink(self._temp)
+            self._temp = None
+
+    def __enter__(self) -> "HeapProcess":
+        self.start()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.stop()
+
+
+class HeapBuilder:
+    """Раскладка объектов CPython 2.7 в bytearray с заданным базовым адресом."""
+
+    def __init__(self, base: int = DEFAULT_BASE):
+        self.base = base
+        self.buffer = bytearray()
+        self._types: Dict[str, int] = {}
+        self._strings: Dict[str, int] = {}  # Интернированные str (ключи dict)
+        self._small_ints: Dict[int, int] = {}  # Кэш -5..256, как в CPython
+        self._bools: Dict[bool, int] = {}
+        self._cstrings: Dict[str, int] = {}
+        self.objects = 0
+
+        # 'type' - метакласс: ob_type указывает сам на себя
+        self.type_type = self._alloc(TYPE_OBJECT_SIZE)
+        self._write_type(self.type_type, 'type', self.type_type, TYPE_OBJECT_SIZE, 0)
+        self._types['type'] = self.type_type
+
+    # --- Низкий уровень -------------------------------------------------
+
+    def _alloc(self, size: int) -> int:
+        """Выделить size байт (выравнивание 16, как у pymalloc)."""
+        offset = (len(self.buffer) + 15) & ~15
+        self.buffer.extend(b'\x00' * (offset + size - len(self.buffer)))
+        return self.base + offset
+
+    def _put(self, addr: int, fmt: str, *values: Any) -> None:
+        struct.pack_into(fmt, self.buffer, addr - self.base, *values)
+
+    def _header(self, addr: int, type_name: str, refcnt: int = 1) -> None:
+        self._put(addr, '<qQ', refcnt, self.type_of(type_name))
+
+    def _cstring(self, text: str) -> int:
+        addr = self._cstrings.get(text)
+        if addr is None:
+            raw = text.encode('utf-8') + b'\x00'
+            addr = self._cstrings[text] = self._alloc(len(raw))
+            self.buffer[addr - self.base:addr - self.base + len(raw)] = raw
+        return addr
+
+    def _write_type(self, addr: int, name: str, meta: int, basicsize: int, dictoffset: int) -> None:
+        self._put(addr, '<qQ', 1000, meta)
+        self._put(addr + TP_NAME, '<Q', self._cstring(name))
+        self._put(addr + TP_BASICSIZE, '<q', basicsize)
+        self._put(addr + TP_FLAGS, '<I', HEAP_TYPE_FLAGS if dictoffset else 0)
+        self._put(addr + TP_DICTOFFSET, '<q', dictoffset)
+
+    # --- Объекты --------------------------------------------------------
+
+    def type_of(self, name: str, has_dict: bool = False) -> int:
+        """PyTypeObject по имени (создаётся при первом обращении)."""
+        addr = self._types.get(name)
+        if addr is None:
+            addr = self._types[name] = self._alloc(TYPE_OBJECT_SIZE)
+            if has_dict:
+                self._write_type(addr, name, self.type_type, INSTANCE_SIZE, INSTANCE_DICT)
+            else:
+                self._write_type(addr, name, self.type_type, 0x18, 0)
+        return addr
+
+    def new_str(self, text: str, intern: bool = False) -> int:
+        """PyStringObject (байты UTF-8 inline в ob_sval)."""
+        if intern and text in self._strings:
+            return self._strings[text]
+        raw = text.encode('utf-8')
+        addr = self._alloc(STR_OB_SVAL + len(raw) + 1)
+        self._header(addr, 'str')
+        self._put(addr + OB_SIZE, '<q', len(raw))
+        self._put(addr + STR_OB_SHASH, '<q', -1)
+        self._put(addr + STR_OB_SSTATE, '<i', 1 if intern else 0)
+        offset = addr - self.base + STR_OB_SVAL
+        self.buffer[offset:offset + len(raw)] = raw
+        self.objects += 1
+        if intern:
+            self._strings[text] = addr
+        return addr
+
+    def new_unicode(self, text: str) -> int:
+        """PyUnicodeObject с UCS-4 буфером (Py_UNICODE на Linux-сборке ридера)."""
+        raw = text.encode('utf-32-le')
+        buf = self._alloc(len(raw) + 4)
+        self.buffer[buf - self.base:buf - self.base + len(raw)] = raw
+        addr = self._alloc(0x30)
+        self._header(addr, 'unicode')
+        self._put(addr + UNICODE_LENGTH, '<q', len(text))
+        self._put(addr + UNICODE_STR, '<Q', buf)
+        self.objects += 1
+        return addr
+
+    def new_int(self, value: int) -> int:
+        """PyIntObject (маленькие -5..256 общие, как в CPython)."""
+        if -5 <= value <= 256 and value in self._small_ints:
+            return self._small_ints[value]
+        addr = self._alloc(0x18)
+        self._header(addr, 'int')
+        self._put(addr + INT_OB_IVAL, '<q', value)
+        self.objects += 1
+        if -5 <= value <= 256:
+            self._small_ints[value] = addr
+        return addr
+
+    def new_bool(self, value: bool) -> int:
+        addr = self._bools.get(value)
+        if addr is None:
+            addr = self._bools[value] = self._alloc(0x18)
+            self._header(addr, 'bool', refcnt=1000)
+            self._put(addr + INT_OB_IVAL, '<q', 1 if value else 0)
+            self.objects += 1
+        return addr
+
+    def new_float(self, value: float) -> int:
+        addr = self._alloc(0x18)
+        self._header(addr, 'float')
+        self._put(addr + FLOAT_OB_FVAL, '<d', value)
+        self.objects += 1
+        return addr
+
+    def new_list(self, items: List[int]) -> int:
+        """PyListObject: ob_size + ob_item -> массив указателей."""
+        addr = self._alloc(0x28)
+        self._header(addr, 'list')
+        self._put(addr + OB_SIZE, '<q', len(items))
+        if items:
+            array = self._alloc(8 * len(items))
+            self._put(array, f'<{len(items)}Q', *items)
+            self._put(addr + LIST_OB_ITEM, '<Q', array)
+            self._put(addr + LIST_OB_ITEM + 8, '<q', len(items))  # allocated
+        self.objects += 1
+        return addr
+
+    def new_dict(self, items: Dict[str, int]) -> int:
+        """
+        PyDictObject со строковыми ключами.
+
+        Таблица - степень двойки с заполнением не больше 2/3 (как в CPython 2.7),
+        слоты по хэшу ключа с линейным пробированием.
+        """
+        slots = 8
+        while len(items) * 3 >= slots * 2:
+            slots *= 2
+        mask = slots - 1
+
+        addr = self._alloc(DICT_OBJECT_SIZE)
+        table = addr + DICT_MA_SMALLTABLE if slots == 8 else self._alloc(slots * DICTENTRY_SIZE)
+        used = set()
+        for key, value in items.items():
+            key_hash = zlib.crc32(key.encode('utf-8'))
+            slot = key_hash & mask
+            while slot in used:
+                slot = (slot + 1) & mask
+            used.add(slot)
+            self._put(table + slot * DICTENTRY_SIZE, '<qQQ', key_hash, self.new_str(key, intern=True), value)
+
+        self._header(addr, 'dict')
+        self._put(addr + DICT_MA_FILL, '<q', len(items))
+        self._put(addr + DICT_MA_USED, '<q', len(items))
+        self._put(addr + DICT_MA_MASK, '<q', mask)
+        self._put(addr + DICT_MA_TABLE, '<Q', table)
+        self.objects += 1
+        return addr
+
+    def new_instance(self, type_name: str, attrs: Dict[str, int], refcnt: int = 1) -> int:
+        """Экземпляр класса с __dict__ по tp_dictoffset."""
+        dict_addr = self.new_dict(attrs)
+        addr = self._alloc(INSTANCE_SIZE)
+        self._put(addr, '<qQ', refcnt, self.type_of(type_name, has_dict=True))
+        self._put(addr + INSTANCE_DICT, '<Q', dict_addr)
+        self.objects += 1
+        return addr
+
+    # --- UI tree -------------------------------------------------------
+
+    def value(self, value: Any) -> Optional[int]:
+        """
+        Python-объект для значения из dictEntriesOfInterest (формат C# exe).
+
+        Returns:
+            Адрес объекта или None, если LinuxMemoryReader такое значение не выдаёт
+        """
+        if isinstance(value, bool):
+            return self.new_bool(value)
+        if isinstance(value, int):
+            return self.new_int(value)
+        if isinstance(value, float):
+            return self.new_float(value)
+        if isinstance(value, str):
+            if len(value.encode('utf-8')) > MAX_STRING_LEN:
+                return None
+            return self.new_str(value) if value.isascii() else self.new_unicode(value)
+        if isinstance(value, dict):
+            if 'int_low32' in value:
+                # Большой int: ридер отдаёт только младшие 32 бита
+                return self.new_int((1 << 33) + (value['int_low32'] & 0xFFFFFFFF))
+            if 'entriesOfInterest' in value:
+                attrs = self.attrs(value['entriesOfInterest'] or {})
+                # Ридер пропускает пустой __dict__; у настоящих Bunch (_sr) всегда
+                # есть атрибуты вне ENTRIES_OF_INTEREST_KEYS
+                attrs.setdefault('_owner', self.new_int(0))
+                return self.new_instance('Bunch', attrs)
+        return None
+
+    def attrs(self, entries: dict) -> Dict[str, int]:
+        """__dict__ узла: только ключи, которые читает ридер (кроме children)."""
+        attrs = {}
+        for key, value in entries.items():
+            if key not in ENTRIES_OF_INTEREST_KEYS or key == 'children':
+                continue
+            addr = self.value(value)
+            if addr is not None:
+                attrs[key] = addr
+        return attrs
+
+    def node(self, node: dict) -> int:
+        """Экземпляр UI-класса узла и (рекурсивно) его детей."""
+        entries = node.get('dictEntriesOfInterest') or {}
+        attrs = self.attrs(entries)
+
+        children = node.get('children') or []
+        if children or 'children' in entries:
+            child_addrs = [self.node(child) for child in children]
+            attrs['children'] = self.new_instance(
+                'PyChildrenList', {'_childrenObjects': self.new_list(child_addrs)})
+
+        return self.new_instance(node.get('pythonObjectTypeName') or 'object', attrs)
+
+    def image(self, root: int, meta: Optional[dict] = None) -> HeapImage:
+        """Завершить образ (с хвостовым паддингом)."""
+        self.buffer.extend(b'\x00' * TAIL_PADDING)
+        return HeapImage(base=self.base, data=bytes(self.buffer), root=root, meta=dict(meta or {}))
+
+
+def build_heap(ui_tree: dict, base: int = DEFAULT_BASE, decoys: bool = True,
+               source: Optional[str] = None) -> HeapImage:
+    """
+    Построить образ кучи из дампа UI tree.
+
+    Args:
+        ui_tree: Дамп в формате C# exe / LinuxMemoryReader
+        base: Базовый адрес образа
+        decoys: Добавить ложные цели поиска: str 'UIRoot' (строка без tp_name)
+            и пустой экземпляр UIRoot (валидный, но с одним узлом)
+        source: Имя исходного дампа (в метаданные)
+
+    Returns:
+        HeapImage; image.root - адрес корня UI tree
+    """
+    builder = HeapBuilder(base)
+    if decoys:
+        builder.new_str('UIRoot')
+        builder.new_instance('UIRoot', {'_name': builder.new_str('decoy')})
+
+    root = builder.node(ui_tree)
+
+    meta = {
+        'source': source,
+        'root': hex(root),
+        'nodes': count_nodes(ui_tree),
+        'objects': builder.objects,
+        'types': len(builder._types),
+    }
+    return builder.image(root, meta)
+
+
+def count_nodes(ui_tree: Optional[dict]) -> int:
+    """Число узлов в dict-дереве."""
+    count = 0
+    stack = [ui_tree] if ui_tree else []
+    while stack:
+        node = stack.pop()
+        count += 1
+        stack.extend(node.get('children') or [])
+    return count
+
+
+def normalize_value(value: Any) -> Any:
+    """Значение entries в сравнимой форме (без адресов); None - не сравнивается."""
+    if isinstance(value, (bool, int, float)):
+        return value
+    if isinstance(value, str):
+        return value if len(value.encode('utf-8')) <= MAX_STRING_LEN else None
+    if isinstance(value, dict):
+        if 'int_low32' in value:
+            return ('int', value['int_low32'])
+        if 'entriesOfInterest' in value:
+            return normalize_entries(value['entriesOfInterest'] or {})
+    return None
+
+
+def normalize_entries(entries: dict) -> dict:
+    result = {}
+    for key, value in entries.items():
+        if key not in ENTRIES_OF_INTEREST_KEYS or key == 'children':
+            continue
+        value = normalize_value(value)
+        if value is not None:
+            result[key] = value
+    return result
+
+
+def normalize_tree(node: Optional[dict]) -> Optional[tuple]:
+    """
+    Дерево в форме для сравнения: (тип, entries, дети).
+
+    Адреса, абсолютная геометрия и значения, которых ридер не выдаёт
+    (цвета C# exe, вложенные узлы в _setText), отбрасываются - так дамп
+    и результат чтения образа сравнимы напрямую.
+    """
+    if node is None:
+        return None
+    return (
+        node.get('pythonObjectTypeName'),
+        normalize_entries(node.get('dictEntriesOfInterest') or {}),
+        tuple(normalize_tree(child) for child in node.get('children') or ()),
+    )
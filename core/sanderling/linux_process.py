@@ -5,13 +5,14 @@ EVE запущена через Steam Proton (wine64-preloader + exefile.exe).
 """
 
 import os
+import select
 import struct
 import ctypes
 import ctypes.util
 import logging
 import re
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import Iterator, List, Optional
 
 logger = logging.getLogger(__name__)
 
@@ -43,11 +44,21 @@ class MemoryRegion:
 class LinuxProcessAccess:
     """Доступ к памяти Linux-процесса через /proc/pid/mem."""
 
-    def __init__(self, pid: int):
+    def __init__(self, pid: int, use_process_vm_readv: bool = False):
+        """
+        Args:
+            pid: PID процесса
+            use_process_vm_readv: Читать через process_vm_readv, не открывая /proc/pid/mem
+        """
         self.pid = pid
         self._fd: Optional[int] = None
+        self._prefer_process_vm_readv = use_process_vm_readv
         self._use_process_vm_readv = False
         self._libc = None
+        self.read_calls = 0  # Число syscall'ов чтения (pread / process_vm_readv)
+        self.bytes_read = 0  # Байт запрошено через read_bytes
+        # Запись всех чтений (linux_replay.PageRecorder), None - выключено
+        self.recorder = None
 
     def open(self) -> bool:
         """
@@ -56,6 +67,8 @@ class LinuxProcessAccess:
         Returns:
             True если успешно
         """
+        if self._prefer_process_vm_readv:
+            return self._init_process_vm_readv()
         try:
             mem_path = f"/proc/{self.pid}/mem"
             self._fd = os.open(mem_path, os.O_RDONLY)
@@ -117,12 +130,26 @@ class LinuxProcessAccess:
         if addr < 0 or addr > 0x7FFFFFFFFFFF or addr + size > 0x7FFFFFFFFFFF:
             return None
 
+        self.bytes_read += size
+        data = self._read(addr, size)
+        if self.recorder is not None:
+            self.recorder.record(addr, size, data)
+        return data
+
+    def _read(self, addr: int, size: int) -> Optional[bytes]:
+        """
+        Одно чтение из процесса (pread или process_vm_readv).
+
+        Переопределяется подменами доступа к памяти (linux_fixture, linux_replay).
+        """
         if self._use_process_vm_readv:
+            self.read_calls += 1
             return self._read_via_process_vm_readv(addr, size)
 
         if self._fd is None:
             return None
 
+        self.read_calls += 1
         try:
             data = os.pread(self._fd, size, addr)
             if len(data) != size:
@@ -237,6 +264,13 @@ class LinuxProcessAccess:
         except Exception:
             return None
 
+    def memory_regions(self) -> List[MemoryRegion]:
+        """Регионы памяти процесса (/proc/pid/maps)."""
+        regions = get_memory_regions(self.pid)
+        if self.recorder is not None:
+            self.recorder.record_regions(regions)
+        return regions
+
     def __enter__(self):
         self.open()
         return self
@@ -315,40 +349,155 @@ def _parse_maps_line(line: str) -> Optional[MemoryRegion]:
         return None
 
 
-def find_eve_process() -> Optional[int]:
+# Имена процессов (/proc/pid/comm, до 15 символов), у которых стоит смотреть cmdline.
+# Wine/Proton выставляет comm по имени exe ("exefile.exe"); до этого
+# процесс называется wine64-preloader / wine-preloader.
+_EVE_COMM_HINTS = ('exefile', 'wine', 'preloader')
+
+
+def iter_eve_processes() -> Iterator[int]:
     """
-    Найти процесс EVE Online запущенный через Proton.
+    Перебрать процессы EVE Online запущенные через Proton.
 
-    Сканирует /proc/*/cmdline на наличие exefile.exe.
+    Сначала читается короткий /proc/*/comm; cmdline (может быть длинным)
+    читается только у кандидатов, похожих на wine/exefile.
     Через Proton это wine64-preloader + exefile.exe.
 
+    Yields:
+        PID процессов в порядке /proc
+    """
+    try:
+        entries = os.listdir('/proc')
+    except OSError as e:
+        logger.error(f"Ошибка сканирования /proc: {e}")
+        return
+
+    for entry in entries:
+        if not entry.isdigit():
+            continue
+
+        pid = int(entry)
+
+        try:
+            with open(f"/proc/{pid}/comm", 'rb') as f:
+                comm = f.read().decode('utf-8', errors='replace').strip().lower()
+        except OSError:
+            continue
+
+        if not any(hint in comm for hint in _EVE_COMM_HINTS):
+            continue
+
+        try:
+            with open(f"/proc/{pid}/cmdline", 'rb') as f:
+                cmdline = f.read()
+        except OSError:
+            continue
+
+        # cmdline содержит аргументы разделённые null-байтами
+        cmdline_str = cmdline.decode('utf-8', errors='replace').lower()
+
+        # EVE через Proton: wine64-preloader запускает exefile.exe
+        if 'exefile.exe' in cmdline_str:
+            logger.debug(f"EVE PID {pid}, comm: {comm}, cmdline: {cmdline_str[:200]}")
+            yield pid
+
+
+def find_eve_process() -> Optional[int]:
+    """
+    Найти процесс EVE Online запущенный через Proton (первый найденный).
+
     Returns:
         PID процесса или None
     """
+    for pid in iter_eve_processes():
+        logger.info(f"Найден процесс EVE Online: PID {pid}")
+        return pid
+    return None
+
+
+def find_eve_processes() -> List[int]:
+    """
+    Найти все процессы EVE Online (несколько клиентов на машине).
+
+    Returns:
+        Список PID (может быть пустым)
+    """
+    return list(iter_eve_processes())
+
+
+def read_start_time(pid: int) -> Optional[int]:
+    """
+    Время старта процесса (поле 22 /proc/pid/stat, в тиках с загрузки системы).
+
+    Пара (pid, start_time) однозначно определяет процесс: при переиспользовании
+    PID время старта будет другим.
+
+    Returns:
+        starttime или None если процесса нет
+    """
     try:
-        for entry in os.listdir('/proc'):
-            if not entry.isdigit():
-                continue
+        with open(f"/proc/{pid}/stat", 'rb') as f:
+            data = f.read()
+    except OSError:
+        return None
 
-            pid = int(entry)
-            cmdline_path = f"/proc/{pid}/cmdline"
+    # comm (поле 2) в скобках и может содержать пробелы - считаем от последней ')'
+    try:
+        fields = data[data.rindex(b')') + 2:].split()
+        return int(fields[19])
+    except (ValueError, IndexError):
+        return None
 
-            try:
-                with open(cmdline_path, 'rb') as f:
-                    cmdline = f.read()
-            except (OSError, PermissionError):
-                continue
 
-            # cmdline содержит аргументы разделённые null-байтами
-            cmdline_str = cmdline.decode('utf-8', errors='replace').lower()
+class ProcessLiveness:
+    """
+    Дешёвая проверка что процесс жив и это всё ещё тот же процесс.
 
-            # EVE через Proton: wine64-preloader запускает exefile.exe
-            if 'exefile.exe' in cmdline_str:
-                logger.info(f"Найден процесс EVE Online: PID {pid}")
-                logger.debug(f"cmdline: {cmdline_str[:200]}")
-                return pid
+    Основной способ - pidfd (Linux 5.3+, Python 3.9+): дескриптор держится
+    на сам процесс, становится читаемым при его завершении, PID reuse на
+    него не влияет; проверка - один poll() с нулевым таймаутом.
+    Fallback - сравнение закэшированного времени старта из /proc/pid/stat.
+    """
 
-    except OSError as e:
-        logger.error(f"Ошибка сканирования /proc: {e}")
+    def __init__(self, pid: int):
+        self.pid = pid
+        self._pidfd: Optional[int] = None
+        self._poll = None
+        self._start_time = read_start_time(pid)
 
-    return None
+        pidfd_open = getattr(os, 'pidfd_open', None)
+        if pidfd_open is not None:
+            try:
+                self._pidfd = pidfd_open(pid)
+                self._poll = select.poll()
+                self._poll.register(self._pidfd, select.POLLIN)
+            except OSError as e:
+                logger.debug(f"pidfd_open({pid}) недоступен: {e}, используем /proc/{pid}/stat")
+                self._pidfd = None
+                self._poll = None
+
+    def is_alive(self) -> bool:
+        """
+        Returns:
+            True если процесс работает (и PID не переиспользован)
+        """
+        if self._poll is not None:
+            # POLLIN на pidfd - процесс завершился
+            return not self._poll.poll(0)
+
+        if self._start_time is None:
+            return False
+        return read_start_time(self.pid) == self._start_time
+
+    def close(self) -> None:
+        """Закрыть pidfd."""
+        if self._pidfd is not None:
+            try:
+                os.close(self._pidfd)
+            except OSError:
+                pass
+            self._pidfd = None
+            self._poll = None
+
+    def __del__(self):
+        self.close()
@@ -11,8 +11,10 @@ import struct
 import time
 from typing import Any, Dict, List, Optional, Set, Tuple
 
-from .linux_process import LinuxProcessAccess, MemoryRegion, get_memory_regions
+from .linux_process import LinuxProcessAccess, MemoryRegion
 from .linux_cpython import CPythonReader, OB_TYPE, OB_SIZE, TP_NAME
+from .geometry import attach_rect
+from .compact_tree import CompactUITree, NO_NODE
 
 logger = logging.getLogger(__name__)
 
@@ -99,9 +101,21 @@ DEFAULT_SCAN_CHUNK_SIZE = 4 * 1024 * 1024
 class LinuxMemoryReader:
     """Чтение UI tree EVE Online из памяти Linux-процесса."""
 
-    def __init__(self, pid: int, scan_chunk_size: int = DEFAULT_SCAN_CHUNK_SIZE):
+    def __init__(self, pid: int, scan_chunk_size: int = DEFAULT_SCAN_CHUNK_SIZE,
+                 process: Optional[LinuxProcessAccess] = None,
+                 use_process_vm_readv: bool = False):
+        """
+        Args:
+            pid: PID процесса EVE
+            scan_chunk_size: Размер чанка при сканировании памяти
+            process: Готовый доступ к памяти вместо /proc/pid/mem
+                (например FixtureProcessAccess из linux_fixture)
+            use_process_vm_readv: Читать через process_vm_readv вместо /proc/pid/mem
+        """
         self.pid = pid
         self.scan_chunk_size = scan_chunk_size
+        self.use_process_vm_readv = use_process_vm_readv
+        self._process_source = process
         self._process: Optional[LinuxProcessAccess] = None
         self._cpython: Optional[CPythonReader] = None
         self._visited: Set[int] = set()
@@ -117,12 +131,17 @@ class LinuxMemoryReader:
         Returns:
             True если успешно
         """
-        self._process = LinuxProcessAccess(self.pid)
+        self._process = self._process_source or LinuxProcessAccess(self.pid, self.use_process_vm_readv)
         if not self._process.open():
             return False
         self._cpython = CPythonReader(self._process)
         return True
 
+    @property
+    def read_calls(self) -> int:
+        """Число syscall'ов чтения памяти с момента open()."""
+        return self._process.read_calls if self._process else 0
+
     def close(self) -> None:
         """Закрыть доступ к памяти."""
         if self._process:
@@ -152,7 +171,7 @@ class LinuxMemoryReader:
         start_time = time.time()
 
         # Шаг 1: получить readable регионы
-        regions = get_memory_regions(self.pid)
+        regions = self._process.memory_regions()
         readable_regions = [r for r in regions if r.is_readable and r.size > 0]
         total_size = sum(r.size for r in readable_regions)
         logger.info(f"Найдено {len(readable_regions)} readable регионов, "
@@ -501,13 +520,19 @@ class LinuxMemoryReader:
 
         return count
 
-    def _read_node(self, addr: int, depth: int) -> Optional[dict]:
+    def _read_node(self, addr: int, depth: int,
+                   parent_x: int = 0, parent_y: int = 0) -> Optional[dict]:
         """
         Рекурсивно прочитать узел UI tree.
 
+        Абсолютная геометрия (absoluteX/absoluteY/displayWidth/displayHeight)
+        проставляется сразу при построении узла.
+
         Args:
             addr: Адрес PyObject
             depth: Текущая глубина
+            parent_x: Абсолютный X родителя
+            parent_y: Абсолютный Y родителя
 
         Returns:
             dict в формате C# exe или None
@@ -522,52 +547,118 @@ class LinuxMemoryReader:
         if type_name is None:
             return None
 
-        # Прочитать __dict__
-        dict_entries_of_interest = {}
+        # other keys — null при --remove-other-dict-entries (как C# exe)
+        dict_entries_of_interest = self._read_entries_of_interest(addr, depth)
         other_keys = None
 
+        node = {
+            "pythonObjectAddress": str(addr),
+            "pythonObjectTypeName": type_name,
+            "dictEntriesOfInterest": dict_entries_of_interest,
+            "otherDictEntriesKeys": other_keys,
+            "children": None,
+        }
+        abs_x, abs_y = attach_rect(node, parent_x, parent_y)
+
+        # Прочитать children
+        children_addrs = self._get_children_addresses(addr)
+        if children_addrs:
+            children = []
+            for child_addr in children_addrs[:MAX_CHILDREN]:
+                child_node = self._read_node(child_addr, depth + 1, abs_x, abs_y)
+                if child_node:
+                    children.append(child_node)
+
+            if children:
+                node["children"] = children
+
+        return node
+
+    def _read_entries_of_interest(self, addr: int, depth: int) -> dict:
+        """
+        Прочитать dict entries of interest узла из его __dict__.
+
+        Args:
+            addr: Адрес PyObject
+            depth: Текущая глубина
+
+        Returns:
+            dict ключ → значение (в формате C# exe)
+        """
+        dict_entries_of_interest = {}
+
         dict_addr = self._find_instance_dict(addr)
         if dict_addr:
             raw_dict = self._cpython.read_dict(dict_addr)
             if raw_dict:
-                interest_keys = []
-                other_key_list = []
-
                 for key, value_addr in raw_dict.items():
                     if key in ENTRIES_OF_INTEREST_KEYS:
-                        interest_keys.append((key, value_addr))
-                    else:
-                        other_key_list.append(key)
+                        value = self._read_dict_value(key, value_addr, depth)
+                        if value is not None:
+                            dict_entries_of_interest[key] = value
 
-                # Читаем значения entries of interest
-                for key, value_addr in interest_keys:
-                    value = self._read_dict_value(key, value_addr, depth)
-                    if value is not None:
-                        dict_entries_of_interest[key] = value
+        return dict_entries_of_interest
 
-                # other keys — null при --remove-other-dict-entries (как C# exe)
-                other_keys = None
+    def read_ui_tree_compact(self, root_address: str) -> Optional[CompactUITree]:
+        """
+        Прочитать UI tree сразу в компактную колоночную форму.
+
+        Dict-узлы не создаются: узлы пишутся в CompactUITree по мере чтения.
+        Dict-форма доступна через CompactUITree.to_dict().
+
+        Args:
+            root_address: Адрес в формате "0xABCD..." или decimal string
+
+        Returns:
+            CompactUITree или None
+        """
+        if not self._process or not self._cpython:
+            logger.error("Процесс не открыт")
+            return None
+
+        addr = self._parse_address(root_address)
+        if addr is None:
+            logger.error(f"Невалидный адрес: {root_address}")
+            return None
+
+        self._visited.clear()
+        start_time = time.time()
+
+        tree = CompactUITree()
+        self._read_node_compact(tree, addr, depth=0, parent=NO_NODE)
+
+        elapsed_ms = (time.time() - start_time) * 1000
+        logger.info(f"UI tree прочитан (compact): {len(tree)} нод за {elapsed_ms:.0f}ms")
+
+        return tree if len(tree) else None
+
+    def _read_node_compact(self, tree: CompactUITree, addr: int,
+                           depth: int, parent: int) -> None:
+        """
+        Рекурсивно прочитать узел в CompactUITree (pre-order).
+
+        Args:
+            tree: Заполняемое дерево
+            addr: Адрес PyObject
+            depth: Текущая глубина
+            parent: Индекс родителя в tree
+        """
+        if depth > MAX_TREE_DEPTH or addr in self._visited:
+            return
+
+        self._visited.add(addr)
+
+        type_name = self._cpython.read_type_name(addr)
+        if type_name is None:
+            return
+
+        index = tree.add_node(parent, addr, type_name,
+                              self._read_entries_of_interest(addr, depth))
 
-        # Прочитать children
-        children = None
         children_addrs = self._get_children_addresses(addr)
         if children_addrs:
-            children = []
             for child_addr in children_addrs[:MAX_CHILDREN]:
-                child_node = self._read_node(child_addr, depth + 1)
-                if child_node:
-                    children.append(child_node)
-
-            if not children:
-                children = None
-
-        return {
-            "pythonObjectAddress": str(addr),
-            "pythonObjectTypeName": type_name,
-            "dictEntriesOfInterest": dict_entries_of_interest,
-            "otherDictEntriesKeys": other_keys,
-            "children": children,
-        }
+                self._read_node_compact(tree, child_addr, depth + 1, index)
 
     def _read_dict_value(self, key: str, value_addr: int, depth: int) -> Any:
         """
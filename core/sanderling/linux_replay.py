@@ -0,0 +1,315 @@
+"""Запись и воспроизведение чтений памяти LinuxProcessAccess.
+
+Запись: к LinuxProcessAccess подключается PageRecorder (process.recorder),
+который сохраняет каждое чтение - байты раскладываются по страницам 4 KB
+(с маской покрытых байт для частично прочитанных страниц), плюс журнал
+(адрес, размер, успех) в порядке чтений и список регионов /proc/pid/maps.
+Страницы пишутся в файл со сжатием zlib.
+
+Воспроизведение: ReplayProcessAccess отдаёт те же байты из файла. Чтение,
+целиком попадающее в записанные байты, успешно; остальное - None, как
+чтение неотображённой памяти. Так медленный тик с продакшена можно
+повторить офлайн, а варианты алгоритма ридера сравнить на одинаковых
+входных данных по числу чтений и времени.
+
+    process = LinuxProcessAccess(pid)
+    process.recorder = PageRecorder()
+    reader = LinuxMemoryReader(pid, process=process)
+    ...                                       # поиск корня, N чтений дерева
+    process.recorder.save('tick.pages', meta={...})
+
+    reader = LinuxMemoryReader(0, process=ReplayProcessAccess('tick.pages'))
+"""
+import json
+import struct
+import time
+import zlib
+from array import array
+from typing import Any, Dict, List, Optional, Tuple
+
+from .linux_process import LinuxProcessAccess, MemoryRegion
+
+
+PAGE_SIZE = 4096
+PAGE_SHIFT = 12
+
+FILE_MAGIC = b'SNDPAGE1'
+# magic, page_size, страниц, чтений в журнале, длина JSON-метаданных
+FILE_HEADER = struct.Struct('<8sIIII')
+# Адрес страницы, флаги, длина сжатых данных
+PAGE_HEADER = struct.Struct('<QBI')
+PAGE_PARTIAL = 0x01  # За данными следует сжатая маска покрытых байт
+
+FULL_MASK = b'\x01' * PAGE_SIZE
+
+
+class PageStore:
+    """Страницы памяти с маской записанных байт."""
+
+    def __init__(self):
+        self.pages: Dict[int, bytearray] = {}
+        self.masks: Dict[int, bytearray] = {}  # Только для неполных страниц
+        self.regions: List[MemoryRegion] = []
+
+    def __len__(self) -> int:
+        return len(self.pages)
+
+    def put(self, addr: int, data: bytes) -> None:
+        """Записать байты по адресу."""
+        pos = 0
+        while pos < len(data):
+            page = (addr + pos) >> PAGE_SHIFT
+            start = (addr + pos) & (PAGE_SIZE - 1)
+            length = min(PAGE_SIZE - start, len(data) - pos)
+
+            buf = self.pages.get(page)
+            if buf is None:
+                buf = self.pages[page] = bytearray(PAGE_SIZE)
+                self.masks[page] = bytearray(PAGE_SIZE)
+            buf[start:start + length] = data[pos:pos + length]
+
+            mask = self.masks.get(page)
+            if mask is not None:
+                mask[start:start + length] = FULL_MASK[:length]
+                if length == PAGE_SIZE or b'\x00' not in mask:
+                    del self.masks[page]
+
+            pos += length
+
+    def get(self, addr: int, size: int) -> Optional[bytes]:
+        """
+        Прочитать байты.
+
+        Returns:
+            bytes или None, если хотя бы один байт не записан
+        """
+        page = addr >> PAGE_SHIFT
+        start = addr & (PAGE_SIZE - 1)
+
+        # Быстрый путь: чтение внутри одной страницы
+        if start + size <= PAGE_SIZE:
+            buf = self.pages.get(page)
+            if buf is None:
+                return None
+            mask = self.masks.get(page)
+            if mask is not None and b'\x00' in mask[start:start + size]:
+                return None
+            return bytes(buf[start:start + size])
+
+        parts = []
+        pos = 0
+        while pos < size:
+            page = (addr + pos) >> PAGE_SHIFT
+            start = (addr + pos) & (PAGE_SIZE - 1)
+            length = min(PAGE_SIZE - start, size - pos)
+            buf = self.pages.get(page)
+            if buf is None:
+                return None
+            mask = self.masks.get(page)
+            if mask is not None and b'\x00' in mask[start:start + length]:
+                return None
+            parts.append(buf[start:start + length])
+            pos += length
+        return b''.join(parts)
+
+    def stored_bytes(self) -> int:
+        """Записанных байт (без учёта сжатия)."""
+        partial = sum(PAGE_SIZE - mask.count(0) for mask in self.masks.values())
+        return (len(self.pages) - len(self.masks)) * PAGE_SIZE + partial
+
+
+class PageRecorder:
+    """Запись чтений LinuxProcessAccess (подключается как process.recorder)."""
+
+    def __init__(self):
+        self.store = PageStore()
+        # Журнал чтений в порядке выполнения
+        self.log_addr = array('Q')
+        self.log_size = array('I')
+        self.log_ok = bytearray()
+        self.marks: List[Tuple[str, int]] = []  # (имя этапа, индекс в журнале)
+
+    def __len__(self) -> int:
+        return len(self.log_ok)
+
+    def record(self, addr: int, size: int, data: Optional[bytes]) -> None:
+        """Вызывается LinuxProcessAccess.read_bytes на каждое чтение."""
+        self.log_addr.append(addr)
+        self.log_size.append(size)
+        self.log_ok.append(data is not None)
+        if data:
+            self.store.put(addr, data)
+
+    def record_regions(self, regions: List[MemoryRegion]) -> None:
+        """Вызывается LinuxProcessAccess.memory_regions."""
+        self.store.regions = list(regions)
+
+    def mark(self, name: str) -> None:
+        """Отметить начало этапа (поиск корня, чтение дерева) в журнале."""
+        self.marks.append((name, len(self.log_ok)))
+
+    def save(self, path: str, meta: Optional[Dict[str, Any]] = None, level: int = 6) -> None:
+        """
+        Записать страницы, журнал и регионы в файл.
+
+        Args:
+            path: Путь к файлу (.pages)
+            meta: Дополнительные метаданные (pid, корень, тайминги этапов)
+            level: Уровень сжатия zlib
+        """
+        store = self.store
+        meta = dict(meta or {})
+        meta.setdefault('created', time.strftime('%Y-%m-%d %H:%M:%S'))
+        meta['regions'] = [
+            [r.start, r.end, r.permissions, r.offset, r.device, r.inode, r.pathname]
+            for r in store.regions
+        ]
+        meta['marks'] = self.marks
+        meta['stored_bytes'] = store.stored_bytes()
+        meta_raw = json.dumps(meta, ensure_ascii=False).encode('utf-8')
+
+        with open(path, 'wb') as f:
+            f.write(FILE_HEADER.pack(FILE_MAGIC, PAGE_SIZE, len(store.pages), len(self.log_ok), len(meta_raw)))
+            f.write(meta_raw)
+
+            for column in (self.log_addr.tobytes(), self.log_size.tobytes(), bytes(self.log_ok)):
+                packed = zlib.compress(column, level)
+                f.write(struct.pack('<I', len(packed)))
+                f.write(packed)
+
+            for page in sorted(store.pages):
+                mask = store.masks.get(page)
+                packed = zlib.compress(bytes(store.pages[page]), level)
+                f.write(PAGE_HEADER.pack(page << PAGE_SHIFT, PAGE_PARTIAL if mask is not None else 0, len(packed)))
+                f.write(packed)
+                if mask is not None:
+                    packed_mask = zlib.compress(bytes(mask), level)
+                    f.write(struct.pack('<I', len(packed_mask)))
+                    f.write(packed_mask)
+
+
+class Recording:
+    """Загруженная запись: страницы, журнал чтений, метаданные."""
+
+    def __init__(self, store: PageStore, log: Tuple[array, array, bytes], meta: Dict[str, Any]):
+        self.store = store
+        self.log_addr, self.log_size, self.log_ok = log
+        self.meta = meta
+
+    @property
+    def reads(self) -> int:
+        return len(self.log_ok)
+
+    def phases(self) -> List[Tuple[str, int, int]]:
+        """Этапы записи: [(имя, первое чтение, число чтений)]."""
+        marks = [tuple(m) for m in self.meta.get('marks', [])]
+        result = []
+        for i, (name, start) in enumerate(marks):
+            end = marks[i + 1][1] if i + 1 < len(marks) else self.reads
+            result.append((name, start, end - start))
+        return result
+
+    @classmethod
+    def load(cls, path: str) -> "Recording":
+        """
+        Прочитать файл записи.
+
+        Raises:
+            ValueError: Не файл записи или другой размер страницы
+        """
+        with open(path, 'rb') as f:
+            raw = f.read()
+
+        if len(raw) < FILE_HEADER.size:
+            raise ValueError(f"{path}: слишком короткий файл записи")
+        magic, page_size, pages, reads, meta_len = FILE_HEADER.unpack_from(raw, 0)
+        if magic != FILE_MAGIC:
+            raise ValueError(f"{path}: не запись чтений ({magic!r})")
+        if page_size != PAGE_SIZE:
+            raise ValueError(f"{path}: размер страницы {page_size}, ожидается {PAGE_SIZE}")
+
+        pos = FILE_HEADER.size
+        meta = json.loads(raw[pos:pos + meta_len].decode('utf-8'))
+        pos += meta_len
+
+        columns = []
+        for _ in range(3):
+            (length,) = struct.unpack_from('<I', raw, pos)
+            pos += 4
+            columns.append(zlib.decompress(raw[pos:pos + length]))
+            pos += length
+        log_addr = array('Q')
+        log_addr.frombytes(columns[0])
+        log_size = array('I')
+        log_size.frombytes(columns[1])
+
+        store = PageStore()
+        for _ in range(pages):
+            addr, flags, length = PAGE_HEADER.unpack_from(raw, pos)
+            pos += PAGE_HEADER.size
+            page = addr >> PAGE_SHIFT
+            store.pages[page] = bytearray(zlib.decompress(raw[pos:pos + length]))
+            pos += length
+            if flags & PAGE_PARTIAL:
+                (length,) = struct.unpack_from('<I', raw, pos)
+                pos += 4
+                store.masks[page] = bytearray(zlib.decompress(raw[pos:pos + length]))
+                pos += length
+
+        store.regions = [MemoryRegion(*region) for region in meta.get('regions', [])]
+        return cls(store, (log_addr, log_size, columns[2]), meta)
+
+
+class ReplayProcessAccess(LinuxProcessAccess):
+    """LinuxProcessAccess, отдающий чтения из записи PageRecorder."""
+
+    def __init__(self, recording: Any, verify: bool = True):
+        """
+        Args:
+            recording: Recording или путь к файлу записи
+            verify: Сверять последовательность чтений с журналом записи
+        """
+        super().__init__(pid=0)
+        self.recording = Recording.load(recording) if isinstance(recording, str) else recording
+        self.pid = self.recording.meta.get('pid', 0)
+        self.verify = verify
+        self.position = 0  # Индекс следующего чтения в журнале
+        self.diverged_at: Optional[int] = None  # Первое чтение, не совпавшее с журналом
+        self._opened = False
+
+    @property
+    def matches_log(self) -> bool:
+        """Все чтения пока совпадают с записанными (адрес и размер)."""
+        return self.diverged_at is None
+
+    def open(self) -> bool:
+        self._opened = True
+        return True
+
+    def close(self) -> None:
+        self._opened = False
+
+    def rewind(self) -> None:
+        """Начать сверку с журналом заново (новый прогон на том же объекте)."""
+        self.position = 0
+        self.diverged_at = None
+
+    def _read(self, addr: int, size: int) -> Optional[bytes]:
+        if not self._opened:
+            return None
+
+        self.read_calls += 1
+        if self.verify and self.diverged_at is None:
+            log = self.recording
+            i = self.position
+            if i >= log.reads or log.log_addr[i] != addr or log.log_size[i] != size:
+                self.diverged_at = i
+        self.position += 1
+
+        return self.recording.store.get(addr, size)
+
+    def memory_regions(self) -> List[MemoryRegion]:
+        regions = list(self.recording.store.regions)
+        if self.recorder is not None:
+            self.recorder.record_regions(regions)
+        return regions
@@ -0,0 +1,178 @@
+"""Метрики тиков чтения Sanderling.
+
+Каждый тик сервиса раскладывается по стадиям: проверка процесса, чтение
+памяти, число узлов, число syscall'ов, парсинг, публикация. Значения
+копятся в скользящих гистограммах (последние N тиков) и отдаются как
+p50/p95/p99/max через SanderlingService.metrics(). Опционально сервис
+периодически сбрасывает их в output/metrics/ (JSON или Prometheus text).
+"""
+import json
+import math
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+
+# Стадии тика: ключ -> описание (для Prometheus HELP)
+STAGES = {
+    'liveness_ms': 'Проверка что процесс EVE жив',
+    'read_ms': 'Чтение памяти (UI tree)',
+    'parse_ms': 'Парсинг UI tree в GameState',
+    'publish_ms': 'Публикация снимка и уведомление ожидающих',
+    'tick_ms': 'Тик целиком (без паузы)',
+    'nodes': 'Узлов в UI tree',
+    'syscalls': 'Чтений памяти (syscall) за тик',
+}
+
+PERCENTILES = (50, 95, 99)
+
+
+class RollingHistogram:
+    """Последние N значений с перцентилями по запросу."""
+
+    def __init__(self, capacity: int = 512):
+        self._values: deque = deque(maxlen=capacity)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def add(self, value: float) -> None:
+        self._values.append(value)
+
+    def summary(self) -> Dict[str, float]:
+        """
+        Сводка по окну.
+
+        Returns:
+            {'count', 'mean', 'p50', 'p95', 'p99', 'max'} (пустой dict если значений нет)
+        """
+        values = sorted(self._values)
+        if not values:
+            return {}
+
+        result = {'count': len(values), 'mean': sum(values) / len(values)}
+        for p in PERCENTILES:
+            # nearest-rank
+            rank = max(0, math.ceil(p / 100.0 * len(values)) - 1)
+            result[f'p{p}'] = values[rank]
+        result['max'] = values[-1]
+        return result
+
+
+class ServiceMetrics:
+    """Метрики тиков SanderlingService."""
+
+    def __init__(self, window: int = 512):
+        """
+        Args:
+            window: Сколько последних тиков учитывать в гистограммах
+        """
+        self._lock = threading.Lock()
+        self._histograms = {stage: RollingHistogram(window) for stage in STAGES}
+        self._last: Dict[str, float] = {}
+        self.ticks = 0
+        self.errors = 0
+        self.started_at = time.time()
+
+    def record(self, tick: Dict[str, float]) -> None:
+        """
+        Записать успешный тик.
+
+        Args:
+            tick: Значения стадий (ключи из STAGES; отсутствующие пропускаются)
+        """
+        with self._lock:
+            for stage, value in tick.items():
+                histogram = self._histograms.get(stage)
+                if histogram is not None and value is not None:
+                    histogram.add(value)
+            self._last = dict(tick)
+            self.ticks += 1
+
+    def record_error(self) -> None:
+        """Посчитать неудачный тик."""
+        with self._lock:
+            self.errors += 1
+
+    def snapshot(self) -> dict:
+        """
+        Текущие метрики.
+
+        Returns:
+            {'ticks', 'errors', 'uptime_s', 'last': {...}, 'stages': {stage: summary}}
+        """
+        with self._lock:
+            return {
+                'ticks': self.ticks,
+                'errors': self.errors,
+                'uptime_s': time.time() - self.started_at,
+                'last': dict(self._last),
+                'stages': {stage: h.summary() for stage, h in self._histograms.items()},
+            }
+
+    def to_prometheus(self, prefix: str = 'sanderling') -> str:
+        """Метрики в текстовом формате Prometheus (summary на стадию)."""
+        data = self.snapshot()
+        lines = [
+            f'# TYPE {prefix}_ticks_total counter',
+            f'{prefix}_ticks_total {data["ticks"]}',
+            f'# TYPE {prefix}_errors_total counter',
+            f'{prefix}_errors_total {data["errors"]}',
+        ]
+        for stage, summary in data['stages'].items():
+            if not summary:
+                continue
+            name = f'{prefix}_{stage}'
+            lines.append(f'# HELP {name} {STAGES[stage]}')
+            lines.append(f'# TYPE {name} summary')
+            for p in PERCENTILES:
+                lines.append(f'{name}{{quantile="{p / 100.0}"}} {summary[f"p{p}"]:g}')
+            lines.append(f'{name}{{quantile="1.0"}} {summary["max"]:g}')
+            lines.append(f'{name}_count {summary["count"]}')
+            lines.append(f'{name}_sum {summary["mean"] * summary["count"]:g}')
+        return '\n'.join(lines) + '\n'
+
+    def dump(self, path: str, fmt: str = 'json') -> None:
+        """
+        Записать метрики в файл (атомарно через временный файл).
+
+        Args:
+            path: Путь к файлу
+            fmt: 'json' или 'prometheus'
+        """
+        if fmt == 'prometheus':
+            text = self.to_prometheus()
+        else:
+            text = json.dumps(self.snapshot(), indent=2, ensure_ascii=False)
+
+        target = Path(path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_suffix(target.suffix + '.tmp')
+        tmp.write_text(text, encoding='utf-8')
+        tmp.replace(target)
+
+
+def format_table(stages: Dict[str, dict], keys: Optional[Iterable[str]] = None,
+                 title: str = 'stage') -> str:
+    """
+    Таблица p50/p95/p99/max по стадиям (для логов и скриптов).
+
+    Args:
+        stages: metrics()['stages']
+        keys: Какие стадии показать (по умолчанию все непустые)
+        title: Заголовок первой колонки
+    """
+    keys = list(keys) if keys is not None else [k for k, v in stages.items() if v]
+    width = max([12] + [len(key) for key in keys])
+    lines = [f"{title:<{width}} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9} {'count':>7}"]
+    for key in keys:
+        summary = stages.get(key) or {}
+        if not summary:
+            continue
+        lines.append(
+            f"{key:<{width}} {summary['p50']:>9.1f} {summary['p95']:>9.1f} "
+            f"{summary['p99']:>9.1f} {summary['max']:>9.1f} {summary['count']:>7}"
+        )
+    return '\n'.join(lines)
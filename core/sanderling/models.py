@@ -1,9 +1,23 @@
-"""Data models for Sanderling UI tree parsing."""
+"""Data models for Sanderling UI tree parsing.
+
+Записи неизменяемые (frozen, на Python 3.10+ ещё и со __slots__), коллекции
+в них - кортежи. Парсер переиспользует равные записи прошлого тика
+(UITreeParser._share), поэтому неизменившиеся части состояния сохраняют
+идентичность между тиками: `prev.overview is state.overview`.
+"""
+import sys
+from bisect import bisect_right
 from dataclasses import dataclass, field
-from typing import List, Optional, Tuple
+from typing import Dict, Optional, Tuple
 
+from .compact_tree import CompactUITree
 
-@dataclass
+
+# Неизменяемая запись без __dict__ (slots для dataclass есть с Python 3.10)
+_RECORD = {'frozen': True, 'slots': True} if sys.version_info >= (3, 10) else {'frozen': True}
+
+
+@dataclass(**_RECORD)
 class Target:
     """Залоченная цель."""
     name: str
@@ -19,18 +33,19 @@ class Target:
     hull: Optional[float] = None
 
 
-@dataclass
+@dataclass(**_RECORD)
 class OverviewEntry:
     """Запись в Overview."""
     index: int
     name: Optional[str] = None
     type: Optional[str] = None
-    distance: Optional[str] = None
+    distance: Optional[str] = None  # Строка из overview ("1 189 м")
     center: Optional[Tuple[int, int]] = None
     bounds: Optional[Tuple[int, int, int, int]] = None
+    distance_m: Optional[float] = None  # Дистанция в метрах (разобрана один раз парсером)
 
 
-@dataclass
+@dataclass(**_RECORD)
 class Module:
     """Модуль корабля."""
     slot_type: str  # 'high', 'mid', 'low'
@@ -40,7 +55,7 @@ class Module:
     center: Optional[Tuple[int, int]] = None
 
 
-@dataclass
+@dataclass(**_RECORD)
 class SelectedAction:
     """Доступное действие с выбранным объектом."""
     name: str  # 'approach', 'warpTo', 'orbit', etc.
@@ -48,7 +63,7 @@ class SelectedAction:
     texture_path: Optional[str] = None
 
 
-@dataclass
+@dataclass(**_RECORD)
 class OverviewTab:
     """Вкладка обзора."""
     name: str  # Имя вкладки
@@ -56,17 +71,17 @@ class OverviewTab:
     center: Tuple[int, int]  # Координаты для клика
 
 
-@dataclass
+@dataclass(**_RECORD)
 class NeocomButton:
     """Кнопка Neocom (боковая панель)."""
     button_type: str  # 'cargo', 'inventory', 'tactical', 'scanner', 'autopilot', etc.
     center: Tuple[int, int]  # АБСОЛЮТНЫЕ координаты для клика
 
 
-@dataclass
+@dataclass(**_RECORD)
 class ShipState:
     """Состояние корабля."""
-    modules: List[Module] = field(default_factory=list)
+    modules: Tuple[Module, ...] = ()
     
     # Здоровье корабля (0.0-1.0)
     shield: float = 1.0
@@ -78,7 +93,7 @@ class ShipState:
     speed: float = 0.0  # м/с
 
 
-@dataclass
+@dataclass(**_RECORD)
 class InventoryFilter:
     """Фильтр инвентаря."""
     name: str  # Название фильтра (например, "!FILAMENT!")
@@ -87,7 +102,7 @@ class InventoryFilter:
     is_active: bool = False  # Активен ли фильтр
 
 
-@dataclass
+@dataclass(**_RECORD)
 class InventoryItem:
     """Предмет в инвентаре."""
     name: str  # Название предмета
@@ -99,18 +114,18 @@ class InventoryItem:
     item_type: Optional[str] = None  # Тип предмета
 
 
-@dataclass
+@dataclass(**_RECORD)
 class InventoryWindow:
     """Окно инвентаря."""
     is_open: bool = False
     center: Tuple[int, int] = None  # Центр окна
     bounds: Optional[Tuple[int, int, int, int]] = None  # x, y, width, height
-    filters: List[InventoryFilter] = field(default_factory=list)
-    items: List[InventoryItem] = field(default_factory=list)
+    filters: Tuple[InventoryFilter, ...] = ()
+    items: Tuple[InventoryItem, ...] = ()
     loot_all_button: Optional[Tuple[int, int]] = None  # Координаты кнопки "Взять все"
 
 
-@dataclass
+@dataclass(**_RECORD)
 class ContextMenuItem:
     """Пункт контекстного меню."""
     text: str  # Текст пункта меню
@@ -118,14 +133,14 @@ class ContextMenuItem:
     bounds: Optional[Tuple[int, int, int, int]] = None
 
 
-@dataclass
+@dataclass(**_RECORD)
 class ContextMenu:
     """Контекстное меню."""
     is_open: bool = False
-    items: List[ContextMenuItem] = field(default_factory=list)
+    items: Tuple[ContextMenuItem, ...] = ()
 
 
-@dataclass
+@dataclass(**_RECORD)
 class Drone:
     """Дрон в космосе или в отсеке."""
     name: str  # Название дрона (например, "Caldari Navy Hornet")
@@ -141,11 +156,11 @@ class Drone:
     bounds: Optional[Tuple[int, int, int, int]] = None
 
 
-@dataclass
+@dataclass(**_RECORD)
 class DronesState:
     """Состояние дронов."""
-    drones_in_space: List[Drone] = field(default_factory=list)  # Дроны в космосе
-    drones_in_bay: List[Drone] = field(default_factory=list)  # Дроны в отсеке
+    drones_in_space: Tuple[Drone, ...] = ()  # Дроны в космосе
+    drones_in_bay: Tuple[Drone, ...] = ()  # Дроны в отсеке
     
     # Количество дронов
     in_space_count: int = 0  # Сколько дронов в космосе
@@ -155,7 +170,7 @@ class DronesState:
     window_open: bool = False
 
 
-@dataclass
+@dataclass(**_RECORD)
 class Bookmark:
     """Букмарк (локация)."""
     name: str  # Название букмарка (например, "1 SPOT 1", "2 SPOT 2", "3 HOME 3")
@@ -164,20 +179,145 @@ class Bookmark:
     bounds: Optional[Tuple[int, int, int, int]] = None  # x, y, width, height (абсолютные)
 
 
+class OverviewIndex:
+    """
+    Индексы по записям overview одного тика.
+
+    Строится парсером один раз (и переиспользуется, пока overview не
+    изменился). Запросы вида "ближайшая запись в 35 км" и "есть ли врек"
+    не сканируют overview: дистанции отсортированы (bisect), выборки по
+    ключевым словам кэшируются.
+    """
+
+    __slots__ = ('entries', 'by_distance', '_distances', '_by_name', '_by_type', '_keyword_cache')
+
+    def __init__(self, entries: Tuple[OverviewEntry, ...] = ()):
+        """
+        Args:
+            entries: Записи overview в порядке отображения
+        """
+        self.entries = entries
+        # От ближней к дальней; записи без дистанции в конце
+        self.by_distance: Tuple[OverviewEntry, ...] = tuple(sorted(
+            entries,
+            key=lambda e: (e.distance_m is None, e.distance_m or 0.0)
+        ))
+        self._distances = [e.distance_m for e in self.by_distance if e.distance_m is not None]
+
+        self._by_name: Dict[str, Tuple[OverviewEntry, ...]] = {}
+        self._by_type: Dict[str, Tuple[OverviewEntry, ...]] = {}
+        for entry in self.by_distance:
+            if entry.name is not None:
+                self._by_name[entry.name] = self._by_name.get(entry.name, ()) + (entry,)
+            if entry.type is not None:
+                self._by_type[entry.type] = self._by_type.get(entry.type, ()) + (entry,)
+
+        self._keyword_cache: Dict[Tuple, Tuple[OverviewEntry, ...]] = {}
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def within(self, max_distance_m: float) -> Tuple[OverviewEntry, ...]:
+        """Записи не дальше max_distance_m, от ближней к дальней."""
+        return self.by_distance[:bisect_right(self._distances, max_distance_m)]
+
+    def nearest(self, *keywords: str, max_distance_m: Optional[float] = None,
+                include_type: bool = False) -> Optional[OverviewEntry]:
+        """
+        Ближайшая запись (с известной дистанцией).
+
+        Args:
+            keywords: Если заданы - только записи, имя которых содержит одно из них
+            max_distance_m: Не дальше этой дистанции
+            include_type: Искать keywords и в типе записи
+
+        Returns:
+            OverviewEntry или None
+        """
+        entries = self.matching(*keywords, include_type=include_type) if keywords else self.by_distance
+        if not entries or entries[0].distance_m is None:
+            return None
+        if max_distance_m is not None and entries[0].distance_m > max_distance_m:
+            return None
+        return entries[0]
+
+    def matching(self, *keywords: str, include_type: bool = False) -> Tuple[OverviewEntry, ...]:
+        """
+        Записи, имя (или тип при include_type) которых содержит одно из
+        ключевых слов (без учёта регистра). От ближней к дальней.
+        """
+        key = ('+', include_type) + keywords
+        found = self._keyword_cache.get(key)
+        if found is None:
+            lowered = [k.lower() for k in keywords]
+            found = tuple(
+                e for e in self.by_distance
+                if any(k in (e.name or '').lower() or (include_type and k in (e.type or '').lower())
+                       for k in lowered)
+            )
+            self._keyword_cache[key] = found
+        return found
+
+    def excluding(self, *keywords: str) -> Tuple[OverviewEntry, ...]:
+        """
+        Записи с именем, которое не содержит ни одного из ключевых слов
+        (без учёта регистра). От ближней к дальней.
+        """
+        key = ('-',) + keywords
+        found = self._keyword_cache.get(key)
+        if found is None:
+            lowered = [k.lower() for k in keywords]
+            found = tuple(
+                e for e in self.by_distance
+                if e.name and not any(k in e.name.lower() for k in lowered)
+            )
+            self._keyword_cache[key] = found
+        return found
+
+    def has(self, *keywords: str, include_type: bool = False) -> bool:
+        """Есть ли запись с одним из ключевых слов в имени (или типе)."""
+        return bool(self.matching(*keywords, include_type=include_type))
+
+    def with_name(self, name: str) -> Tuple[OverviewEntry, ...]:
+        """Записи с точно таким именем, от ближней к дальней."""
+        return self._by_name.get(name, ())
+
+    def with_type(self, type_name: str) -> Tuple[OverviewEntry, ...]:
+        """Записи с точно таким типом, от ближней к дальней."""
+        return self._by_type.get(type_name, ())
+
+
 @dataclass
 class GameState:
     """Состояние игры из UI tree."""
-    targets: List[Target] = field(default_factory=list)
-    overview: List[OverviewEntry] = field(default_factory=list)
+    targets: Tuple[Target, ...] = ()
+    overview: Tuple[OverviewEntry, ...] = ()
+    overview_index: OverviewIndex = field(default_factory=OverviewIndex, repr=False)  # Дистанция/имя/тип
     ship: Optional[ShipState] = None
-    selected_actions: List[SelectedAction] = field(default_factory=list)
-    overview_tabs: List[OverviewTab] = field(default_factory=list)
-    neocom_buttons: List[NeocomButton] = field(default_factory=list)
+    selected_actions: Tuple[SelectedAction, ...] = ()
+    overview_tabs: Tuple[OverviewTab, ...] = ()
+    neocom_buttons: Tuple[NeocomButton, ...] = ()
     inventory: Optional[InventoryWindow] = None
     context_menu: Optional[ContextMenu] = None
     drones: Optional[DronesState] = None
-    bookmarks: List[Bookmark] = field(default_factory=list)
+    bookmarks: Tuple[Bookmark, ...] = ()
     ui_tree: Optional[dict] = None  # Сырое UI tree для дополнительного парсинга
+    tree: Optional[CompactUITree] = field(default=None, repr=False)  # Индекс UI tree (типы, геометрия)
     timestamp: float = 0.0
     is_valid: bool = True
-    warnings: List[str] = field(default_factory=list)
+    warnings: Tuple[str, ...] = ()
+
+
+@dataclass(**_RECORD)
+class StateSnapshot:
+    """
+    Опубликованный сервисом снимок: состояние и UI tree из одного чтения.
+    
+    Сервис заменяет снимок целиком (присваивание ссылки атомарно), поэтому
+    state и tree всегда согласованы, а читателям не нужен lock.
+    """
+    seq: int = 0  # Номер снимка (0 - чтений ещё не было)
+    state: Optional[GameState] = None
+    tree: object = field(default=None, repr=False)  # CompactUITree или dict
+    timestamp: float = 0.0  # time.time() начала чтения
+    read_time_ms: int = 0
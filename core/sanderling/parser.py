@@ -1,7 +1,15 @@
 """UI Tree parser for extracting game state from Sanderling."""
 import time
-from typing import List, Optional, Tuple, Dict, Any
-from .models import GameState, Target, OverviewEntry, Module, ShipState, SelectedAction, OverviewTab, NeocomButton
+from typing import List, Optional, Tuple, Dict, Any, Union
+from .models import GameState, Target, OverviewEntry, OverviewIndex, Module, ShipState, SelectedAction, OverviewTab, NeocomButton
+from .compact_tree import CompactUITree
+from .selector import compile_selector, select, select_first
+from .distance import parse_distance_m
+from .geometry import node_rect, node_center, unwrap_int
+
+
+# Предмет инвентаря: текст с названием филамента в InvItem или внутри него
+_INVENTORY_ITEM_SELECTOR = 'InvItem[_setText~="filament"], InvItem [_setText~="filament"]'
 
 
 class UITreeParser:
@@ -9,83 +17,112 @@ class UITreeParser:
     
     def __init__(self):
         """Инициализация парсера."""
-        self._cache_hash = None
+        self._cached_tree = None  # Вход прошлого parse() (ключ кэша по идентичности)
         self._cached_state = None
+        self._tree: Optional[CompactUITree] = None  # Дерево текущего parse()
+        # Структурное разделение: записи прошлого тика и текущего (значение → объект)
+        self._shared: Dict[Any, Any] = {}
+        self._shared_next: Dict[Any, Any] = {}
+        self._overview_index: Optional[OverviewIndex] = None
     
-    def parse(self, ui_tree: dict) -> GameState:
+    def parse(self, ui_tree: Union[dict, CompactUITree]) -> GameState:
         """
         Распарсить UI tree в структурированное состояние.
         
         Args:
-            ui_tree: Словарь с UI tree от Sanderling
+            ui_tree: Словарь с UI tree от Sanderling или уже
+                компактное дерево (LinuxMemoryReader.read_ui_tree_compact).
+                Dict остаётся в state.ui_tree, индекс строится поверх него;
+                экономия памяти - только с компактным деревом (compact_ui_tree)
             
         Returns:
             GameState с извлеченными данными
         """
-        if not ui_tree or not isinstance(ui_tree, dict):
+        if isinstance(ui_tree, CompactUITree):
+            is_empty = not len(ui_tree)
+        else:
+            is_empty = not ui_tree or not isinstance(ui_tree, dict)
+        if is_empty:
             return GameState(
                 timestamp=time.time(),
                 is_valid=False,
-                warnings=["Empty or invalid UI tree"]
+                warnings=("Empty or invalid UI tree",)
             )
         
-        # Кэширование парсинга
-        tree_hash = hash(str(ui_tree))
-        if tree_hash == self._cache_hash and self._cached_state:
+        # Кэширование парсинга: каждое чтение даёт новое дерево, поэтому кэш
+        # по идентичности - без str() всего dict и до построения индекса
+        if ui_tree is self._cached_tree and self._cached_state:
             return self._cached_state
         
+        if isinstance(ui_tree, CompactUITree):
+            tree = ui_tree
+            raw_tree = None
+        else:
+            # Один проход: индекс по типам + абсолютная геометрия узлов.
+            # Dict живёт в state.ui_tree, поэтому индекс поверх него (keep_source)
+            # дешевле упаковки entries в копию (keep_source=False)
+            tree = CompactUITree.from_dict(ui_tree, keep_source=True)
+            raw_tree = ui_tree
+        
+        self._tree = tree
+        self._shared_next = {}
         warnings = []
         
         # Парсинг целей
-        targets = self._parse_targets(ui_tree)
+        targets = self._parse_targets(tree)
         if not targets:
             warnings.append("No targets found in UI tree")
         
         # Парсинг Overview
-        overview = self._parse_overview(ui_tree)
+        overview = self._parse_overview(tree)
         if not overview:
             warnings.append("No overview entries found in UI tree")
         
+        # Индекс overview перестраивается только если overview изменился
+        if self._overview_index is None or self._overview_index.entries is not overview:
+            self._overview_index = OverviewIndex(overview)
+        
         # Парсинг модулей и состояния корабля
-        modules = self._parse_modules(ui_tree)
-        shield, armor, hull = self._parse_ship_health(ui_tree)
-        capacitor = self._parse_capacitor(ui_tree)
-        speed = self._parse_speed(ui_tree)
+        modules = self._parse_modules(tree)
+        shield, armor, hull = self._parse_ship_health(tree)
+        capacitor = self._parse_capacitor(tree)
+        speed = self._parse_speed(tree)
         
-        ship_state = ShipState(
+        ship_state = self._share(ShipState(
             modules=modules,
             shield=shield,
             armor=armor,
             hull=hull,
             capacitor=capacitor,
             speed=speed
-        ) if modules or shield < 1.0 or armor < 1.0 or hull < 1.0 else None
+        )) if modules or shield < 1.0 or armor < 1.0 or hull < 1.0 else None
         
         # Парсинг доступных действий
-        selected_actions = self._parse_selected_actions(ui_tree)
+        selected_actions = self._parse_selected_actions(tree)
         
         # Парсинг вкладок overview
-        overview_tabs = self._parse_overview_tabs(ui_tree)
+        overview_tabs = self._parse_overview_tabs(tree)
         
         # Парсинг кнопок Neocom (боковая панель)
-        neocom_buttons = self._parse_neocom_buttons(ui_tree)
+        neocom_buttons = self._parse_neocom_buttons(tree)
         
         # Парсинг инвентаря
-        inventory = self._parse_inventory(ui_tree)
+        inventory = self._parse_inventory(tree)
         
         # Парсинг контекстного меню
-        context_menu = self._parse_context_menu(ui_tree)
+        context_menu = self._parse_context_menu(tree)
         
         # Парсинг дронов
-        drones = self._parse_drones(ui_tree)
+        drones = self._parse_drones(tree)
         
         # Парсинг букмарков (локаций)
-        bookmarks = self._parse_bookmarks(ui_tree)
+        bookmarks = self._parse_bookmarks(tree)
         
         # Создание состояния
         state = GameState(
             targets=targets,
             overview=overview,
+            overview_index=self._overview_index,
             ship=ship_state,
             selected_actions=selected_actions,
             overview_tabs=overview_tabs,
@@ -94,36 +131,41 @@ class UITreeParser:
             context_menu=context_menu,
             drones=drones,
             bookmarks=bookmarks,
-            ui_tree=ui_tree,  # Сохраняем сырое дерево для дополнительного парсинга
+            ui_tree=raw_tree,  # Сохраняем сырое дерево для дополнительного парсинга
+            tree=tree,
             timestamp=time.time(),
             is_valid=len(warnings) == 0,
-            warnings=warnings
+            warnings=tuple(warnings)
         )
         
+        self._tree = None
+        self._shared, self._shared_next = self._shared_next, {}
+        
         # Кэширование результата
-        self._cache_hash = tree_hash
+        self._cached_tree = ui_tree
         self._cached_state = state
         
         return state
     
-    def _parse_targets(self, node: dict) -> List[Target]:
+    def _parse_targets(self, tree: CompactUITree) -> Tuple[Target, ...]:
         """
         Извлечь залоченные цели.
         
         Args:
-            node: Узел UI tree
+            tree: Индексированный UI tree
             
         Returns:
             Список целей
         """
         targets = []
-        target_nodes = self._find_nodes_by_type(node, "TargetInBar")
         
-        for idx, target_node in enumerate(target_nodes):
+        for idx, index in enumerate(select(tree, "TargetInBar")):
             try:
-                # Извлечь координаты
-                center = self._extract_coordinates(target_node)
-                bounds = self._extract_bounds(target_node)
+                target_node = tree.node(index)
+                
+                # АБСОЛЮТНЫЕ центр и границы цели
+                center = tree.center(index)
+                bounds = tree.rect(index)
                 
                 # Валидация
                 if not self._validate_coordinates(center):
@@ -135,7 +177,7 @@ class UITreeParser:
                 distance_str = self._extract_target_distance(target_node)
                 
                 # Конвертировать дистанцию в float (метры)
-                distance = self._parse_distance(distance_str) if distance_str else None
+                distance = parse_distance_m(distance_str)
                 
                 # Проверить активность цели
                 is_active = self._has_child_type(target_node, "ActiveTargetIndicator")
@@ -143,7 +185,7 @@ class UITreeParser:
                 # Извлечь здоровье цели
                 shield, armor, hull = self._parse_target_health(target_node)
                 
-                target = Target(
+                target = self._share(Target(
                     name=name or f"Target_{idx+1}",
                     type=target_type or "unknown",
                     distance=distance,
@@ -153,51 +195,35 @@ class UITreeParser:
                     shield=shield,
                     armor=armor,
                     hull=hull
-                )
+                ))
                 targets.append(target)
                 
             except Exception as e:
                 # Тихо пропускаем ошибки парсинга
                 continue
         
-        return targets
+        return self._share(tuple(targets))
     
-    def _parse_overview(self, node: dict) -> List[OverviewEntry]:
+    def _parse_overview(self, tree: CompactUITree) -> Tuple[OverviewEntry, ...]:
         """
         Извлечь записи Overview.
         
         Args:
-            node: Узел UI tree
+            tree: Индексированный UI tree
             
         Returns:
             Список записей Overview
         """
         entries = []
-        overview_paths = self._find_nodes_with_path(node, "OverviewScrollEntry")
+        entry_nodes = self._select(tree, "OverviewScrollEntry")
         
-        for idx, path in enumerate(overview_paths):
+        for idx, entry_node in enumerate(entry_nodes):
             try:
-                entry_node = path[-1]
-                
-                # Извлечь АБСОЛЮТНЫЕ координаты
-                center = self._extract_absolute_coordinates(path)
-                if not center:
-                    continue
+                # АБСОЛЮТНЫЙ центр записи
+                center = node_center(entry_node, 100, 24)
                 
-                # Добавить половину ширины/высоты для центра
-                dict_entries = entry_node.get('dictEntriesOfInterest', {})
-                width = dict_entries.get('_displayWidth', 100)
-                height = dict_entries.get('_displayHeight', 24)
-                
-                if isinstance(width, dict) and 'int_low32' in width:
-                    width = width['int_low32']
-                if isinstance(height, dict) and 'int_low32' in height:
-                    height = height['int_low32']
-                
-                center = (center[0] + int(width)//2, center[1] + int(height)//2)
-                
-                # Извлечь bounds
-                bounds = self._extract_bounds(entry_node)
+                # АБСОЛЮТНЫЕ границы записи (в одной системе с center)
+                bounds = node_rect(entry_node, 100, 24)
                 
                 # Валидация
                 if not self._validate_coordinates(center):
@@ -206,37 +232,39 @@ class UITreeParser:
                 # Извлечь данные из дочерних OverviewLabel
                 name, distance, entry_type = self._extract_overview_data(entry_node)
                 
-                entry = OverviewEntry(
+                entry = self._share(OverviewEntry(
                     index=idx,
                     name=name,
                     type=entry_type,
                     distance=distance,
                     center=center,
-                    bounds=bounds
-                )
+                    bounds=bounds,
+                    distance_m=parse_distance_m(distance)
+                ))
                 entries.append(entry)
                 
             except Exception as e:
                 # Тихо пропускаем ошибки парсинга
                 continue
         
-        return entries
+        return self._share(tuple(entries))
     
-    def _parse_modules(self, node: dict) -> List[Module]:
+    def _parse_modules(self, tree: CompactUITree) -> Tuple[Module, ...]:
         """
         Извлечь модули корабля.
         
         Args:
-            node: Узел UI tree
+            tree: Индексированный UI tree
             
         Returns:
             Список модулей
         """
         modules = []
-        module_nodes = self._find_nodes_by_type(node, "ShipSlot")
         
-        for idx, module_node in enumerate(module_nodes):
+        for idx, index in enumerate(select(tree, "ShipSlot")):
             try:
+                module_node = tree.node(index)
+                
                 # Извлечь имя слота из _name
                 dict_entries = module_node.get('dictEntriesOfInterest', {})
                 slot_name = dict_entries.get('_name', f'slot_{idx}')
@@ -247,92 +275,101 @@ class UITreeParser:
                 # Проверить активность через ModuleButton
                 is_active = self._is_module_active(module_node)
                 
-                # Извлечь координаты
-                center = self._extract_coordinates(module_node)
+                # АБСОЛЮТНЫЙ центр слота
+                center = tree.center(index, 64, 64)
                 
                 # Валидация
                 if not self._validate_coordinates(center):
                     continue
                 
-                module = Module(
+                module = self._share(Module(
                     slot_type=slot_type,
                     slot_name=slot_name,
                     is_active=is_active,
                     center=center
-                )
+                ))
                 modules.append(module)
                 
             except Exception as e:
                 # Тихо пропускаем ошибки парсинга
                 continue
         
-        return modules
-    
-    def _find_nodes_by_type(self, node: Any, type_name: str) -> List[dict]:
+        return self._share(tuple(modules))
+
+    def _share(self, record: Any) -> Any:
         """
-        Найти все узлы определенного типа.
-        
+        Вернуть уже существующий равный объект вместо нового.
+
+        Записи моделей неизменяемые и hashable: если запись (или кортеж
+        записей) совпадает с записью прошлого тика, возвращается объект
+        прошлого тика. Неизменившиеся части состояния сохраняют
+        идентичность между тиками, новые объекты сразу уходят в мусор.
+
         Args:
-            node: Узел для поиска
-            type_name: Имя типа узла
-            
+            record: Неизменяемая запись или кортеж записей
+
         Returns:
-            Список найденных узлов
+            Равный record объект (прошлого тика, текущего или сам record)
         """
-        results = []
-        
-        if not isinstance(node, dict):
-            return results
-        
-        # Проверить текущий узел
-        if node.get('pythonObjectTypeName') == type_name:
-            results.append(node)
-        
-        # Рекурсивный поиск в children
-        children = node.get('children', [])
-        if isinstance(children, list):
-            for child in children:
-                results.extend(self._find_nodes_by_type(child, type_name))
-        
-        return results
-    
-    def _find_nodes_with_path(self, node: Any, type_name: str, path: Optional[List[dict]] = None) -> List[List[dict]]:
+        shared = self._shared_next.get(record)
+        if shared is None:
+            shared = self._shared.get(record, record)
+            self._shared_next[shared] = shared
+        return shared
+
+    def _select(self, tree: CompactUITree, query: str, scope: Optional[int] = None) -> List[dict]:
+        """
+        Найти узлы по селектору (см. selector.py).
+
+        Args:
+            tree: Индексированный UI tree
+            query: Селектор, например "OverviewScrollEntry" или "#invLootAllBtn"
+            scope: Искать только в поддереве этого узла
+
+        Returns:
+            Список найденных узлов (dict-форма, в порядке обхода)
+        """
+        return compile_selector(query).nodes(tree, scope)
+
+    def _find_nodes_by_type(self, node: Any, type_name: str) -> List[dict]:
         """
-        Найти все узлы определенного типа с путем от корня.
+        Найти все узлы определенного типа.
         
         Args:
             node: Узел для поиска
             type_name: Имя типа узла
-            path: Текущий путь (для рекурсии)
             
         Returns:
-            Список путей к найденным узлам
+            Список найденных узлов
         """
-        if path is None:
-            path = []
+        # Узлы текущего дерева - через индекс по типам, без обхода
+        tree = self._tree
+        index = tree.index_of(node) if tree is not None and isinstance(node, dict) else None
+        if index is not None:
+            return self._select(tree, type_name, scope=index)
         
         results = []
         
         if not isinstance(node, dict):
             return results
         
-        current_path = path + [node]
-        
         # Проверить текущий узел
         if node.get('pythonObjectTypeName') == type_name:
-            results.append(current_path)
+            results.append(node)
         
         # Рекурсивный поиск в children
         children = node.get('children', [])
         if isinstance(children, list):
             for child in children:
-                results.extend(self._find_nodes_with_path(child, type_name, current_path))
+                results.extend(self._find_nodes_by_type(child, type_name))
         
         return results
     
     def _extract_coordinates(self, node: dict) -> Optional[Tuple[int, int]]:
         """
-        Извлечь АБСОЛЮТНЫЕ координаты элемента (с учетом всех родителей).
+        Извлечь координаты элемента ОТНОСИТЕЛЬНО родителя (_displayX/_displayY).
+
+        Для клика нужны абсолютные: tree.center(index) / node_center(node).
         
         Args:
             node: Узел UI tree
@@ -340,56 +377,20 @@ class UITreeParser:
         Returns:
             Кортеж (x, y) или None
         """
-        try:
-            dict_entries = node.get('dictEntriesOfInterest', {})
-            x = dict_entries.get('_displayX')
-            y = dict_entries.get('_displayY')
-            
-            # Обработать int_low32
-            if isinstance(x, dict) and 'int_low32' in x:
-                x = x['int_low32']
-            if isinstance(y, dict) and 'int_low32' in y:
-                y = y['int_low32']
-            
-            if x is not None and y is not None:
-                return (int(x), int(y))
-        except (ValueError, TypeError):
-            pass
-        
-        return None
-    
-    def _extract_absolute_coordinates(self, node_path: List[dict]) -> Optional[Tuple[int, int]]:
-        """
-        Извлечь абсолютные координаты узла с учетом всех родителей.
+        dict_entries = node.get('dictEntriesOfInterest', {})
+        x = unwrap_int(dict_entries.get('_displayX'))
+        y = unwrap_int(dict_entries.get('_displayY'))
         
-        Args:
-            node_path: Путь от корня до узла
-            
-        Returns:
-            Кортеж (x, y) абсолютных координат
-        """
-        x = 0
-        y = 0
+        if x is not None and y is not None:
+            return (x, y)
         
-        for node in node_path:
-            dict_entries = node.get('dictEntriesOfInterest', {})
-            
-            node_x = dict_entries.get('_displayX', 0)
-            node_y = dict_entries.get('_displayY', 0)
-            
-            if isinstance(node_x, dict) and 'int_low32' in node_x:
-                node_x = node_x['int_low32']
-            if isinstance(node_y, dict) and 'int_low32' in node_y:
-                node_y = node_y['int_low32']
-            
-            x += int(node_x) if node_x else 0
-            y += int(node_y) if node_y else 0
-        
-        return (x, y)
+        return None
     
     def _extract_bounds(self, node: dict) -> Optional[Tuple[int, int, int, int]]:
         """
-        Извлечь границы элемента.
+        Извлечь границы элемента ОТНОСИТЕЛЬНО родителя (_displayX/_displayY).
+
+        Абсолютные: tree.rect(index) / node_rect(node).
         
         Args:
             node: Узел UI tree
@@ -397,27 +398,16 @@ class UITreeParser:
         Returns:
             Кортеж (x, y, width, height) или None
         """
-        try:
-            dict_entries = node.get('dictEntriesOfInterest', {})
-            x = dict_entries.get('_displayX')
-            y = dict_entries.get('_displayY')
-            width = dict_entries.get('_displayWidth')
-            height = dict_entries.get('_displayHeight')
-            
-            # Обработать int_low32
-            if isinstance(x, dict) and 'int_low32' in x:
-                x = x['int_low32']
-            if isinstance(y, dict) and 'int_low32' in y:
-                y = y['int_low32']
-            if isinstance(width, dict) and 'int_low32' in width:
-                width = width['int_low32']
-            if isinstance(height, dict) and 'int_low32' in height:
-                height = height['int_low32']
-            
-            if all(v is not None for v in [x, y, width, height]):
-                return (int(x), int(y), int(width), int(height))
-        except (ValueError, TypeError):
-            pass
+        dict_entries = node.get('dictEntriesOfInterest', {})
+        values = [
+            unwrap_int(dict_entries.get('_displayX')),
+            unwrap_int(dict_entries.get('_displayY')),
+            unwrap_int(dict_entries.get('_displayWidth')),
+            unwrap_int(dict_entries.get('_displayHeight')),
+        ]
+        
+        if all(v is not None for v in values):
+            return tuple(values)
         
         return None
     
@@ -645,9 +635,7 @@ class UITreeParser:
                 dict_entries = child.get('dictEntriesOfInterest', {})
                 text = dict_entries.get('_text', '')
                 hint = dict_entries.get('_hint', '')
-                x = dict_entries.get('_displayX', 0)
-                if isinstance(x, dict) and 'int_low32' in x:
-                    x = x['int_low32']
+                x = unwrap_int(dict_entries.get('_displayX')) or 0
                 labels.append({'text': text, 'hint': hint, 'x': x})
         
         # Сортируем по X координате (слева направо)
@@ -681,49 +669,6 @@ class UITreeParser:
         
         return (name, distance, entry_type)
     
-    def _parse_distance(self, distance_str: str) -> Optional[float]:
-        """
-        Конвертировать строку дистанции в метры.
-        
-        Args:
-            distance_str: Строка вида "1 189 м" или "188 570 км"
-            
-        Returns:
-            Дистанция в метрах или None
-        """
-        if not distance_str:
-            return None
-        
-        try:
-            # Сохранить единицы измерения
-            is_km = 'км' in distance_str or 'km' in distance_str.lower()
-            is_m = ' м' in distance_str or ' m' in distance_str.lower()
-            
-            # Убрать все кроме цифр, точек и запятых
-            num_str = ''
-            for char in distance_str:
-                if char.isdigit() or char in '.,':
-                    num_str += char
-            
-            if not num_str:
-                return None
-            
-            # Заменить запятые на точки
-            num_str = num_str.replace(',', '.')
-            
-            # Конвертировать
-            value = float(num_str)
-            
-            if is_km:
-                return value * 1000
-            elif is_m:
-                return value
-            else:
-                # По умолчанию метры
-                return value
-        except (ValueError, AttributeError):
-            return None
-    
     def _validate_coordinates(self, coords: Optional[Tuple[int, int]]) -> bool:
         """
         Валидировать координаты.
@@ -746,17 +691,17 @@ class UITreeParser:
         return True
 
     
-    def _parse_ship_health(self, node: dict) -> Tuple[float, float, float]:
+    def _parse_ship_health(self, tree: CompactUITree) -> Tuple[float, float, float]:
         """
         Извлечь здоровье корабля (щиты, броня, структура).
         
         Args:
-            node: Корневой узел UI tree
+            tree: Индексированный UI tree
             
         Returns:
             Кортеж (shield, armor, hull) в диапазоне 0.0-1.0
         """
-        gauges = self._find_nodes_by_type(node, 'ShipHudSpriteGauge')
+        gauges = self._select(tree, 'ShipHudSpriteGauge')
         
         shield = 1.0
         armor = 1.0
@@ -781,18 +726,18 @@ class UITreeParser:
         
         return (shield, armor, hull)
     
-    def _parse_capacitor(self, node: dict) -> float:
+    def _parse_capacitor(self, tree: CompactUITree) -> float:
         """
         Извлечь уровень энергии корабля.
         
         Args:
-            node: Корневой узел UI tree
+            tree: Индексированный UI tree
             
         Returns:
             Уровень энергии 0.0-1.0
         """
         # Ищем CapacitorContainer
-        containers = self._find_nodes_by_type(node, 'CapacitorContainer')
+        containers = self._select(tree, 'CapacitorContainer')
         if not containers:
             return 1.0
         
@@ -826,18 +771,18 @@ class UITreeParser:
         
         return visible_cells / total_cells
     
-    def _parse_speed(self, node: dict) -> float:
+    def _parse_speed(self, tree: CompactUITree) -> float:
         """
         Извлечь скорость корабля.
         
         Args:
-            node: Корневой узел UI tree
+            tree: Индексированный UI tree
             
         Returns:
             Скорость в м/с
         """
         # Ищем SpeedGauge
-        gauges = self._find_nodes_by_type(node, 'SpeedGauge')
+        gauges = self._select(tree, 'SpeedGauge')
         if not gauges:
             return 0.0
         
@@ -918,12 +863,10 @@ class UITreeParser:
                     continue
                 
                 # Получить ширину полоски
-                width = sprite_dict.get('_displayWidth', 0)
-                if isinstance(width, dict) and 'int_low32' in width:
-                    width = width['int_low32']
+                width = sprite.get('displayWidth')
                 
                 try:
-                    width = int(width)
+                    width = int(width or 0)
                     # Максимальная ширина 94px
                     percent = min(width / 94.0, 1.0)
                     
@@ -938,39 +881,26 @@ class UITreeParser:
         
         return (shield, armor, hull)
     
-    def _parse_selected_actions(self, node: dict) -> List[SelectedAction]:
+    def _parse_selected_actions(self, tree: CompactUITree) -> Tuple[SelectedAction, ...]:
         """
         Извлечь доступные действия с выбранным объектом.
         
         Args:
-            node: Корневой узел UI tree
+            tree: Индексированный UI tree
             
         Returns:
             Список доступных действий с АБСОЛЮТНЫМИ координатами кнопок
         """
         actions = []
-        button_paths = self._find_nodes_with_path(node, 'SelectedItemButton')
+        buttons = self._select(tree, 'SelectedItemButton')
         
-        for path in button_paths:
-            button = path[-1]
+        for button in buttons:
             dict_entries = button.get('dictEntriesOfInterest', {})
             name = dict_entries.get('_name', '')
             texture = dict_entries.get('texturePath', '')
             
-            # Извлечь АБСОЛЮТНЫЕ координаты центра кнопки
-            center = self._extract_absolute_coordinates(path)
-            if not center:
-                continue
-            
-            # Добавить половину ширины/высоты для центра кнопки
-            width = dict_entries.get('_displayWidth', 32)
-            height = dict_entries.get('_displayHeight', 32)
-            if isinstance(width, dict) and 'int_low32' in width:
-                width = width['int_low32']
-            if isinstance(height, dict) and 'int_low32' in height:
-                height = height['int_low32']
-            
-            center = (center[0] + int(width)//2, center[1] + int(height)//2)
+            # АБСОЛЮТНЫЙ центр кнопки
+            center = node_center(button, 32, 32)
             
             # Извлечь имя действия из _name
             # Например: "selectedItemApproach" -> "approach"
@@ -981,47 +911,34 @@ class UITreeParser:
             # Преобразовать в snake_case
             action_name = self._camel_to_snake(action_name)
             
-            action = SelectedAction(
+            action = self._share(SelectedAction(
                 name=action_name,
                 center=center,
                 texture_path=texture if texture else None
-            )
+            ))
             actions.append(action)
         
-        return actions
+        return self._share(tuple(actions))
     
-    def _parse_overview_tabs(self, node: dict) -> List[OverviewTab]:
+    def _parse_overview_tabs(self, tree: CompactUITree) -> Tuple[OverviewTab, ...]:
         """
         Извлечь вкладки overview.
         
         Args:
-            node: Корневой узел UI tree
+            tree: Индексированный UI tree
             
         Returns:
             Список вкладок с АБСОЛЮТНЫМИ координатами для клика
         """
         tabs = []
-        tab_paths = self._find_nodes_with_path(node, 'OverviewTab')
+        tab_nodes = self._select(tree, 'OverviewTab')
         
-        for path in tab_paths:
-            tab_node = path[-1]
+        for tab_node in tab_nodes:
             dict_entries = tab_node.get('dictEntriesOfInterest', {})
             name = dict_entries.get('_name', '')
             
-            # Извлечь АБСОЛЮТНЫЕ координаты центра вкладки
-            center = self._extract_absolute_coordinates(path)
-            if not center:
-                continue
-            
-            # Добавить половину ширины/высоты для центра вкладки
-            width = dict_entries.get('_displayWidth', 40)
-            height = dict_entries.get('_displayHeight', 24)
-            if isinstance(width, dict) and 'int_low32' in width:
-                width = width['int_low32']
-            if isinstance(height, dict) and 'int_low32' in height:
-                height = height['int_low32']
-            
-            center = (center[0] + int(width)//2, center[1] + int(height)//2)
+            # АБСОЛЮТНЫЙ центр вкладки
+            center = node_center(tab_node, 40, 24)
             
             # Извлечь текст вкладки из _name
             # Например: "OverviewTab_<color=yellow>✈ Jump</color>" -> "✈ Jump"
@@ -1031,14 +948,14 @@ class UITreeParser:
             import re
             label = re.sub(r'<[^>]+>', '', label)
             
-            tab = OverviewTab(
+            tab = self._share(OverviewTab(
                 name=name,
                 label=label,
                 center=center
-            )
+            ))
             tabs.append(tab)
         
-        return tabs
+        return self._share(tuple(tabs))
     
     def _camel_to_snake(self, name: str) -> str:
         """
@@ -1057,12 +974,12 @@ class UITreeParser:
         return name.lower()
 
     
-    def _parse_neocom_buttons(self, node: dict) -> List[NeocomButton]:
+    def _parse_neocom_buttons(self, tree: CompactUITree) -> Tuple[NeocomButton, ...]:
         """
         Извлечь кнопки Neocom (боковая панель).
         
         Args:
-            node: Корневой узел UI tree
+            tree: Индексированный UI tree
             
         Returns:
             Список кнопок с АБСОЛЮТНЫМИ координатами для клика
@@ -1083,43 +1000,27 @@ class UITreeParser:
         
         # Найти все кнопки
         for type_name, button_type in button_mapping.items():
-            button_paths = self._find_nodes_with_path(node, type_name)
+            button_nodes = self._select(tree, type_name)
             
-            for path in button_paths:
-                button_node = path[-1]
+            for button_node in button_nodes:
+                # АБСОЛЮТНЫЙ центр кнопки
+                center = node_center(button_node, 36, 36)
                 
-                # Извлечь АБСОЛЮТНЫЕ координаты центра кнопки
-                center = self._extract_absolute_coordinates(path)
-                if not center:
-                    continue
-                
-                # Добавить половину ширины/высоты для центра кнопки
-                dict_entries = button_node.get('dictEntriesOfInterest', {})
-                width = dict_entries.get('_displayWidth', 36)
-                height = dict_entries.get('_displayHeight', 36)
-                
-                if isinstance(width, dict) and 'int_low32' in width:
-                    width = width['int_low32']
-                if isinstance(height, dict) and 'int_low32' in height:
-                    height = height['int_low32']
-                
-                center = (center[0] + int(width)//2, center[1] + int(height)//2)
-                
-                button = NeocomButton(
+                button = self._share(NeocomButton(
                     button_type=button_type,
                     center=center
-                )
+                ))
                 buttons.append(button)
         
-        return buttons
+        return self._share(tuple(buttons))
 
     
-    def _parse_inventory(self, node: dict) -> Optional['InventoryWindow']:
+    def _parse_inventory(self, tree: CompactUITree) -> Optional['InventoryWindow']:
         """
         Извлечь данные инвентаря.
         
         Args:
-            node: Корневой узел UI tree
+            tree: Индексированный UI tree
             
         Returns:
             InventoryWindow или None если инвентарь закрыт
@@ -1127,56 +1028,41 @@ class UITreeParser:
         from .models import InventoryWindow, InventoryFilter, InventoryItem
         
         # Найти InventoryPrimary
-        inventory_paths = self._find_nodes_with_path(node, 'InventoryPrimary')
-        if not inventory_paths:
+        inventory_nodes = self._select(tree, 'InventoryPrimary')
+        if not inventory_nodes:
             return None
         
-        inv_path = inventory_paths[0]
-        inv_node = inv_path[-1]
-        inv_dict = inv_node.get('dictEntriesOfInterest', {})
+        inv_node = inventory_nodes[0]
         
-        # Извлечь АБСОЛЮТНЫЕ координаты окна
-        inv_center = self._extract_absolute_coordinates(inv_path)
-        if not inv_center:
-            return None
-        
-        # Извлечь размеры
-        width = inv_dict.get('_displayWidth', 0)
-        height = inv_dict.get('_displayHeight', 0)
-        if isinstance(width, dict) and 'int_low32' in width:
-            width = width['int_low32']
-        if isinstance(height, dict) and 'int_low32' in height:
-            height = height['int_low32']
-        
-        inv_x = inv_center[0]
-        inv_y = inv_center[1]
-        inv_bounds = (inv_x, inv_y, int(width), int(height))
-        inv_center = (inv_x + int(width)//2, inv_y + int(height)//2)
+        # АБСОЛЮТНЫЕ координаты и размеры окна
+        inv_bounds = node_rect(inv_node)
+        inv_center = node_center(inv_node)
+        inv_x, inv_y = inv_bounds[0], inv_bounds[1]
         
         # Парсим фильтры
-        filters = self._parse_inventory_filters(node, inv_x, inv_y)
+        filters = self._parse_inventory_filters(tree, inv_x, inv_y)
         
         # Парсим предметы
-        items = self._parse_inventory_items(node, inv_x, inv_y)
+        items = self._parse_inventory_items(tree, inv_x, inv_y)
         
         # Парсим кнопку "Взять все"
-        loot_all_button = self._parse_loot_all_button(node, inv_x, inv_y)
+        loot_all_button = self._parse_loot_all_button(tree, inv_x, inv_y)
         
-        return InventoryWindow(
+        return self._share(InventoryWindow(
             is_open=True,
             center=inv_center,
             bounds=inv_bounds,
             filters=filters,
             items=items,
             loot_all_button=loot_all_button
-        )
+        ))
     
-    def _parse_inventory_filters(self, node: dict, inv_x: int, inv_y: int) -> List['InventoryFilter']:
+    def _parse_inventory_filters(self, tree: CompactUITree, inv_x: int, inv_y: int) -> Tuple['InventoryFilter', ...]:
         """
         Извлечь фильтры инвентаря.
         
         Args:
-            node: Корневой узел UI tree
+            tree: Индексированный UI tree
             inv_x: X координата окна инвентаря (для вычисления абсолютных координат)
             inv_y: Y координата окна инвентаря
             
@@ -1186,29 +1072,12 @@ class UITreeParser:
         from .models import InventoryFilter
         
         filters = []
-        filter_paths = self._find_nodes_with_path(node, 'FilterEntry')
+        filter_nodes = self._select(tree, 'FilterEntry')
         
-        for path in filter_paths:
-            filter_node = path[-1]
-            filter_dict = filter_node.get('dictEntriesOfInterest', {})
-            
-            # Извлечь АБСОЛЮТНЫЕ координаты фильтра
-            filter_center = self._extract_absolute_coordinates(path)
-            if not filter_center:
-                continue
-            
-            # Извлечь размеры
-            width = filter_dict.get('_displayWidth', 120)
-            height = filter_dict.get('_displayHeight', 22)
-            if isinstance(width, dict) and 'int_low32' in width:
-                width = width['int_low32']
-            if isinstance(height, dict) and 'int_low32' in height:
-                height = height['int_low32']
-            
-            filter_x = filter_center[0]
-            filter_y = filter_center[1]
-            filter_bounds = (filter_x, filter_y, int(width), int(height))
-            filter_center = (filter_x + int(width)//2, filter_y + int(height)//2)
+        for filter_node in filter_nodes:
+            # АБСОЛЮТНЫЕ координаты и размеры фильтра
+            filter_bounds = node_rect(filter_node, 120, 22)
+            filter_center = node_center(filter_node, 120, 22)
             
             # Извлечь текст фильтра рекурсивно
             filter_text = self._find_filter_text(filter_node)
@@ -1218,115 +1087,41 @@ class UITreeParser:
             # Проверить активность фильтра (есть ли Checkbox с checked=True)
             is_active = self._is_filter_active(filter_node)
             
-            filter_obj = InventoryFilter(
+            filter_obj = self._share(InventoryFilter(
                 name=filter_text,
                 center=filter_center,
                 bounds=filter_bounds,
                 is_active=is_active
-            )
+            ))
             filters.append(filter_obj)
         
-        return filters
+        return self._share(tuple(filters))
     
-    def _parse_loot_all_button(self, node: dict, inv_x: int, inv_y: int) -> Optional[Tuple[int, int]]:
+    def _parse_loot_all_button(self, tree: CompactUITree, inv_x: int, inv_y: int) -> Optional[Tuple[int, int]]:
         """
         Найти кнопку "Взять все" (invLootAllBtn).
         
         Args:
-            node: Корневой узел UI tree
+            tree: Индексированный UI tree
             inv_x: X координата окна инвентаря
             inv_y: Y координата окна инвентаря
             
         Returns:
             Абсолютные координаты кнопки или None
         """
-        # Ищем кнопку по имени "invLootAllBtn" через рекурсивный поиск
-        def find_button(n: dict) -> Optional[dict]:
-            """Рекурсивный поиск кнопки по имени."""
-            if not isinstance(n, dict):
-                return None
-            
-            # Проверяем текущий узел
-            dict_entries = n.get('dictEntriesOfInterest', {})
-            if dict_entries.get('_name') == 'invLootAllBtn':
-                return n
-            
-            # Ищем в children
-            children = n.get('children', [])
-            if isinstance(children, list):
-                for child in children:
-                    result = find_button(child)
-                    if result:
-                        return result
-            
-            return None
-        
-        button_node = find_button(node)
-        if not button_node:
+        button = select_first(tree, '#invLootAllBtn')
+        if button is None:
             return None
         
-        # Нужно найти путь к кнопке для вычисления абсолютных координат
-        # Ищем Button с именем invLootAllBtn
-        button_paths = []
-        
-        def find_paths(n: dict, path: List[dict] = None):
-            if path is None:
-                path = []
-            
-            if not isinstance(n, dict):
-                return
-            
-            current_path = path + [n]
-            
-            # Проверяем текущий узел
-            if n.get('pythonObjectTypeName') == 'Button':
-                dict_entries = n.get('dictEntriesOfInterest', {})
-                if dict_entries.get('_name') == 'invLootAllBtn':
-                    button_paths.append(current_path)
-            
-            # Рекурсия в children
-            children = n.get('children', [])
-            if isinstance(children, list):
-                for child in children:
-                    find_paths(child, current_path)
-        
-        find_paths(node)
-        
-        if not button_paths:
-            return None
-        
-        # Берем первый найденный путь
-        button_path = button_paths[0]
-        button_coords = self._extract_absolute_coordinates(button_path)
-        
-        if not button_coords:
-            return None
-        
-        # Получаем размеры кнопки для вычисления центра
-        button_dict = button_path[-1].get('dictEntriesOfInterest', {})
-        
-        width = button_dict.get('_displayWidth', 80)
-        height = button_dict.get('_displayHeight', 24)
-        
-        if isinstance(width, dict) and 'int_low32' in width:
-            width = width['int_low32']
-        if isinstance(height, dict) and 'int_low32' in height:
-            height = height['int_low32']
-        
-        # Вычисляем центр кнопки
-        button_center = (
-            button_coords[0] + int(width) // 2,
-            button_coords[1] + int(height) // 2
-        )
-        
-        return button_center
+        # АБСОЛЮТНЫЙ центр кнопки
+        return tree.center(button, 80, 24)
     
-    def _parse_inventory_items(self, node: dict, inv_x: int, inv_y: int) -> List['InventoryItem']:
+    def _parse_inventory_items(self, tree: CompactUITree, inv_x: int, inv_y: int) -> Tuple['InventoryItem', ...]:
         """
         Извлечь предметы из инвентаря.
         
         Args:
-            node: Корневой узел UI tree
+            tree: Индексированный UI tree
             inv_x: X координата окна инвентаря
             inv_y: Y координата окна инвентаря
             
@@ -1334,86 +1129,45 @@ class UITreeParser:
             Список предметов с АБСОЛЮТНЫМИ координатами
         """
         from .models import InventoryItem
+        import re
         
         items = []
         
-        # Собираем все узлы для поиска
-        all_nodes = []
-        def collect_nodes_with_path(n, path=None):
-            if path is None:
-                path = []
-            if not isinstance(n, dict):
-                return
-            
-            current_path = path + [n]
-            all_nodes.append((n, current_path))
-            
-            # Рекурсия в children (массив)
-            children = n.get('children', [])
-            if isinstance(children, list):
-                for child in children:
-                    collect_nodes_with_path(child, current_path)
-        
-        collect_nodes_with_path(node)
-        
-        # Ищем предметы по текстуре и тексту
-        for node_data, path in all_nodes:
-            dict_entries = node_data.get('dictEntriesOfInterest', {})
-            if not dict_entries:
+        # Узлы с названием филамента внутри InvItem (или сам InvItem)
+        for index in select(tree, _INVENTORY_ITEM_SELECTOR):
+            text = tree.text(index)
+            if not text:
                 continue
             
-            # Проверяем текстуру (иконка предмета)
-            texture = dict_entries.get('_texturePath', '')
-            
-            # Проверяем текст (название предмета)
-            text = dict_entries.get('_setText', '')
-            hint = dict_entries.get('_hint', '')
-            
             # ВАЖНО: Пропускаем WindowCaption - это заголовок окна, а не предмет
-            # Ищем только узлы внутри InvItem
-            is_in_inv_item = False
-            is_window_caption = False
-            for p in path:
-                if p.get('pythonObjectTypeName') == 'InvItem':
-                    is_in_inv_item = True
-                if p.get('pythonObjectTypeName') == 'WindowCaption':
-                    is_window_caption = True
-            
-            # Если есть текст с названием предмета и это НЕ заголовок окна
-            if text and isinstance(text, str) and ('Filament' in text or 'filament' in text.lower()) and not is_window_caption and is_in_inv_item:
-                # Извлечь АБСОЛЮТНЫЕ координаты
-                item_center = self._extract_absolute_coordinates(path)
-                if not item_center:
-                    continue
-                
-                # Извлечь размеры
-                width = dict_entries.get('_displayWidth', 64)
-                height = dict_entries.get('_displayHeight', 64)
-                if isinstance(width, dict) and 'int_low32' in width:
-                    width = width['int_low32']
-                if isinstance(height, dict) and 'int_low32' in height:
-                    height = height['int_low32']
-                
-                item_x = item_center[0]
-                item_y = item_center[1]
-                item_bounds = (item_x, item_y, int(width), int(height))
-                item_center = (item_x + int(width)//2, item_y + int(height)//2)
-                
-                # Очистить текст от HTML тегов
-                import re
-                clean_text = re.sub(r'<[^>]+>', '', text)
-                clean_hint = re.sub(r'<[^>]+>', '', hint) if hint else None
-                
-                item = InventoryItem(
-                    name=clean_text,
-                    hint=clean_hint,
-                    center=item_center,
-                    bounds=item_bounds,
-                    texture_path=texture if texture else None
-                )
-                items.append(item)
-        
-        return items
+            if tree.type_name(index) == 'WindowCaption' or any(
+                tree.type_name(parent) == 'WindowCaption'
+                for parent in tree.ancestors(index)
+            ):
+                continue
+            
+            # Проверяем текстуру (иконка предмета)
+            texture = tree.entry(index, '_texturePath', '')
+            hint = tree.entry(index, '_hint', '')
+            
+            # АБСОЛЮТНЫЕ координаты и размеры предмета
+            item_bounds = tree.rect(index, 64, 64)
+            item_center = tree.center(index, 64, 64)
+            
+            # Очистить текст от HTML тегов
+            clean_text = re.sub(r'<[^>]+>', '', text)
+            clean_hint = re.sub(r'<[^>]+>', '', hint) if hint else None
+            
+            item = self._share(InventoryItem(
+                name=clean_text,
+                hint=clean_hint,
+                center=item_center,
+                bounds=item_bounds,
+                texture_path=texture if texture else None
+            ))
+            items.append(item)
+        
+        return self._share(tuple(items))
     
     def _find_filter_text(self, node: dict) -> Optional[str]:
         """
@@ -1471,12 +1225,12 @@ class UITreeParser:
         
         return False
     
-    def _parse_context_menu(self, node: dict) -> Optional['ContextMenu']:
+    def _parse_context_menu(self, tree: CompactUITree) -> Optional['ContextMenu']:
         """
         Извлечь контекстное меню.
         
         Args:
-            node: Корневой узел UI tree
+            tree: Индексированный UI tree
             
         Returns:
             ContextMenu или None если меню закрыто
@@ -1484,17 +1238,16 @@ class UITreeParser:
         from .models import ContextMenu, ContextMenuItem
         
         # Найти ContextMenu (не Menu!)
-        menu_paths = self._find_nodes_with_path(node, 'ContextMenu')
-        if not menu_paths:
+        menu_nodes = self._select(tree, 'ContextMenu')
+        if not menu_nodes:
             return None
         
         menu_items = []
         
         # Найти все MenuEntryView (не MenuEntry!)
-        entry_paths = self._find_nodes_with_path(node, 'MenuEntryView')
+        entry_nodes = self._select(tree, 'MenuEntryView')
         
-        for path in entry_paths:
-            entry_node = path[-1]
+        for entry_node in entry_nodes:
             entry_dict = entry_node.get('dictEntriesOfInterest', {})
             
             # Извлечь текст пункта меню из _setText
@@ -1517,46 +1270,32 @@ class UITreeParser:
             import re
             text = re.sub(r'<[^>]+>', '', text)
             
-            # Извлечь АБСОЛЮТНЫЕ координаты
-            center = self._extract_absolute_coordinates(path)
-            if not center:
-                continue
-            
-            # Извлечь размеры
-            width = entry_dict.get('_displayWidth', 100)
-            height = entry_dict.get('_displayHeight', 20)
-            if isinstance(width, dict) and 'int_low32' in width:
-                width = width['int_low32']
-            if isinstance(height, dict) and 'int_low32' in height:
-                height = height['int_low32']
-            
-            entry_x = center[0]
-            entry_y = center[1]
-            entry_bounds = (entry_x, entry_y, int(width), int(height))
-            entry_center = (entry_x + int(width)//2, entry_y + int(height)//2)
+            # АБСОЛЮТНЫЕ координаты и размеры пункта
+            entry_bounds = node_rect(entry_node, 100, 20)
+            entry_center = node_center(entry_node, 100, 20)
             
-            menu_item = ContextMenuItem(
+            menu_item = self._share(ContextMenuItem(
                 text=text,
                 center=entry_center,
                 bounds=entry_bounds
-            )
+            ))
             menu_items.append(menu_item)
         
         if not menu_items:
             return None
         
-        return ContextMenu(
+        return self._share(ContextMenu(
             is_open=True,
-            items=menu_items
-        )
+            items=self._share(tuple(menu_items))
+        ))
 
     
-    def _parse_drones(self, node: dict) -> Optional['DronesState']:
+    def _parse_drones(self, tree: CompactUITree) -> Optional['DronesState']:
         """
         Извлечь состояние дронов.
         
         Args:
-            node: Корневой узел UI tree
+            tree: Индексированный UI tree
             
         Returns:
             DronesState или None если окно дронов закрыто
@@ -1565,7 +1304,7 @@ class UITreeParser:
         import re
         
         # Найти DronesWindow
-        drones_window_nodes = self._find_nodes_by_type(node, 'DronesWindow')
+        drones_window_nodes = self._select(tree, 'DronesWindow')
         if not drones_window_nodes:
             return None
         
@@ -1598,36 +1337,36 @@ class UITreeParser:
         
         # Парсим дроны в космосе
         drones_in_space = []
-        space_entry_paths = self._find_nodes_with_path(drones_window, 'DroneInSpaceEntry')
+        space_entries = self._find_nodes_by_type(drones_window, 'DroneInSpaceEntry')
         
-        for path in space_entry_paths:
-            drone = self._parse_drone_entry(path)
+        for entry_node in space_entries:
+            drone = self._parse_drone_entry(entry_node)
             if drone:
                 drones_in_space.append(drone)
         
         # Парсим дроны в отсеке
         drones_in_bay = []
-        bay_entry_paths = self._find_nodes_with_path(drones_window, 'DroneInBayEntry')
+        bay_entries = self._find_nodes_by_type(drones_window, 'DroneInBayEntry')
         
-        for path in bay_entry_paths:
-            drone = self._parse_drone_entry(path)
+        for entry_node in bay_entries:
+            drone = self._parse_drone_entry(entry_node)
             if drone:
                 drones_in_bay.append(drone)
         
-        return DronesState(
-            drones_in_space=drones_in_space,
-            drones_in_bay=drones_in_bay,
+        return self._share(DronesState(
+            drones_in_space=self._share(tuple(drones_in_space)),
+            drones_in_bay=self._share(tuple(drones_in_bay)),
             in_space_count=in_space_count,
             max_drones=max_drones,
             window_open=True
-        )
+        ))
     
-    def _parse_drone_entry(self, path: List[dict]) -> Optional['Drone']:
+    def _parse_drone_entry(self, entry_node: dict) -> Optional['Drone']:
         """
         Распарсить запись дрона (DroneInSpaceEntry или DroneInBayEntry).
         
         Args:
-            path: Путь к узлу дрона
+            entry_node: Узел дрона
             
         Returns:
             Drone или None
@@ -1635,27 +1374,9 @@ class UITreeParser:
         from .models import Drone
         import re
         
-        entry_node = path[-1]
-        
-        # Извлечь АБСОЛЮТНЫЕ координаты
-        center = self._extract_absolute_coordinates(path)
-        if not center:
-            return None
-        
-        # Извлечь размеры
-        dict_entries = entry_node.get('dictEntriesOfInterest', {})
-        width = dict_entries.get('_displayWidth', 346)
-        height = dict_entries.get('_displayHeight', 24)
-        
-        if isinstance(width, dict) and 'int_low32' in width:
-            width = width['int_low32']
-        if isinstance(height, dict) and 'int_low32' in height:
-            height = height['int_low32']
-        
-        entry_x = center[0]
-        entry_y = center[1]
-        entry_bounds = (entry_x, entry_y, int(width), int(height))
-        entry_center = (entry_x + int(width)//2, entry_y + int(height)//2)
+        # АБСОЛЮТНЫЕ координаты и размеры записи
+        entry_bounds = node_rect(entry_node, 346, 24)
+        entry_center = node_center(entry_node, 346, 24)
         
         # Найти TextBody с именем и состоянием
         text_bodies = self._find_nodes_by_type(entry_node, 'TextBody')
@@ -1718,7 +1439,7 @@ class UITreeParser:
         # Парсим здоровье дрона
         shield, armor, hull = self._parse_drone_health(entry_node)
         
-        return Drone(
+        return self._share(Drone(
             name=name,
             state=state,
             shield=shield,
@@ -1726,7 +1447,7 @@ class UITreeParser:
             hull=hull,
             center=entry_center,
             bounds=entry_bounds
-        )
+        ))
     
     def _parse_drone_health(self, entry_node: dict) -> Tuple[float, float, float]:
         """
@@ -1763,9 +1484,9 @@ class UITreeParser:
                     continue
                 
                 # Получить ширину полоски
-                width = fill_dict.get('_displayWidth', 32)
-                if isinstance(width, dict) and 'int_low32' in width:
-                    width = width['int_low32']
+                width = fill.get('displayWidth')
+                if width is None:
+                    width = 32
                 
                 try:
                     width = int(width)
@@ -1784,12 +1505,12 @@ class UITreeParser:
         return (shield, armor, hull)
 
     
-    def _parse_bookmarks(self, node: dict) -> List['Bookmark']:
+    def _parse_bookmarks(self, tree: CompactUITree) -> Tuple['Bookmark', ...]:
         """
         Извлечь букмарки (локации) из UI tree.
         
         Args:
-            node: Корневой узел UI tree
+            tree: Индексированный UI tree
             
         Returns:
             Список букмарков
@@ -1802,21 +1523,21 @@ class UITreeParser:
         bookmarks = []
         
         # Найти все PlaceEntry узлы
-        place_entry_paths = self._find_nodes_with_path(node, 'PlaceEntry')
+        place_entries = self._select(tree, 'PlaceEntry')
         
-        for path in place_entry_paths:
-            bookmark = self._parse_bookmark_entry(path)
+        for entry_node in place_entries:
+            bookmark = self._parse_bookmark_entry(entry_node)
             if bookmark:
                 bookmarks.append(bookmark)
         
-        return bookmarks
+        return self._share(tuple(bookmarks))
     
-    def _parse_bookmark_entry(self, path: List[dict]) -> Optional['Bookmark']:
+    def _parse_bookmark_entry(self, entry_node: dict) -> Optional['Bookmark']:
         """
         Распарсить запись букмарка (PlaceEntry).
         
         Args:
-            path: Путь к узлу букмарка
+            entry_node: Узел букмарка
             
         Returns:
             Bookmark или None
@@ -1827,7 +1548,6 @@ class UITreeParser:
         
         logger = logging.getLogger(__name__)
         
-        entry_node = path[-1]
         dict_entries = entry_node.get('dictEntriesOfInterest', {})
         
         # Извлечь имя букмарка
@@ -1856,32 +1576,16 @@ class UITreeParser:
         if not name:
             return None
         
-        # Извлечь АБСОЛЮТНЫЕ координаты
-        center = self._extract_absolute_coordinates(path)
-        
-        if not center:
-            return None
-        
-        # Извлечь размеры
-        width = dict_entries.get('_displayWidth', 236)
-        height = dict_entries.get('_displayHeight', 25)
-        
-        if isinstance(width, dict) and 'int_low32' in width:
-            width = width['int_low32']
-        if isinstance(height, dict) and 'int_low32' in height:
-            height = height['int_low32']
-        
-        entry_x = center[0]
-        entry_y = center[1]
-        entry_bounds = (entry_x, entry_y, int(width), int(height))
-        entry_center = (entry_x + int(width)//2, entry_y + int(height)//2)
+        # АБСОЛЮТНЫЕ координаты и размеры записи
+        entry_bounds = node_rect(entry_node, 236, 25)
+        entry_center = node_center(entry_node, 236, 25)
         
         # Извлечь hint (полное название)
         hint = dict_entries.get('_hint', None)
         
-        return Bookmark(
+        return self._share(Bookmark(
             name=name,
             hint=hint,
             center=entry_center,
             bounds=entry_bounds
-        )
+        ))
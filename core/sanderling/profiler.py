@@ -0,0 +1,152 @@
+"""Сэмплирующий профайлер потока чтения Sanderling.
+
+Включается на время (N секунд) без перезапуска под cProfile: отдельный поток
+каждые interval_ms снимает стек целевых потоков через sys._current_frames()
+и считает одинаковые стеки. Результат - collapsed stacks (формат
+flamegraph.pl / speedscope / inferno):
+
+    service.py:_read_loop;parser.py:parse;parser.py:_parse_overview 42
+
+Рядом пишется .json с параметрами окна и тиками, попавшими в него
+(число узлов, время чтения/парсинга), чтобы связать профиль с нагрузкой.
+"""
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from types import CodeType, FrameType
+from typing import Callable, Dict, Iterable, List, Optional
+
+
+logger = logging.getLogger(__name__)
+
+
+class SamplingProfiler:
+    """Окно сэмплирования стеков заданных потоков."""
+
+    def __init__(self, thread_ids: Iterable[int], duration_s: float,
+                 interval_ms: float = 5.0, output_dir: str = "output/logs",
+                 on_finish: Optional[Callable[["SamplingProfiler"], None]] = None):
+        """
+        Args:
+            thread_ids: threading.get_ident() потоков для сэмплирования
+            duration_s: Длительность окна (сек)
+            interval_ms: Период сэмплирования (мс)
+            output_dir: Куда писать результат
+            on_finish: Вызывается из потока профайлера после записи файлов
+        """
+        self.thread_ids = list(thread_ids)
+        self.duration_s = duration_s
+        self.interval_s = interval_ms / 1000.0
+        self.output_dir = output_dir
+        self.on_finish = on_finish
+
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.ticks: List[dict] = []
+        self.output_path: Optional[str] = None
+        self.started_at = 0.0
+
+        self._labels: Dict[CodeType, str] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Запустить окно сэмплирования в фоне."""
+        self.started_at = time.time()
+        self._thread = threading.Thread(target=self._run, name="sanderling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Завершить окно досрочно (файлы всё равно будут записаны)."""
+        self._stop.set()
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        if self._thread:
+            self._thread.join(timeout)
+
+    def tag(self, tick: dict) -> None:
+        """Добавить метрики тика, попавшего в окно (вызывается потоком чтения)."""
+        with self._lock:
+            self.ticks.append(dict(tick, at=time.time()))
+
+    def _run(self) -> None:
+        deadline = time.monotonic() + self.duration_s
+        targets = set(self.thread_ids)
+
+        while not self._stop.is_set() and time.monotonic() < deadline:
+            frames = sys._current_frames()
+            for thread_id in targets:
+                frame = frames.get(thread_id)
+                if frame is not None:
+                    self.stacks[self._collapse(frame)] += 1
+            del frames
+            self.samples += 1
+            self._stop.wait(self.interval_s)
+
+        try:
+            self.output_path = self._write()
+            logger.info(f"Профиль записан: {self.output_path} ({self.samples} сэмплов)")
+        except OSError as e:
+            logger.error(f"Не удалось записать профиль: {e}")
+
+        if self.on_finish:
+            self.on_finish(self)
+
+    def _collapse(self, frame: FrameType) -> str:
+        """Стек от корня к листу в виде 'file:func;file:func'."""
+        labels = []
+        while frame is not None:
+            code = frame.f_code
+            label = self._labels.get(code)
+            if label is None:
+                label = self._labels[code] = f"{os.path.basename(code.co_filename)}:{code.co_name}"
+            labels.append(label)
+            frame = frame.f_back
+        labels.reverse()
+        return ';'.join(labels)
+
+    def _write(self) -> str:
+        """Записать .folded и .json; вернуть путь к .folded."""
+        Path(self.output_dir).mkdir(parents=True, exist_ok=True)
+        stamp = time.strftime('%Y%m%d_%H%M%S', time.localtime(self.started_at))
+        base = Path(self.output_dir) / f"sanderling_profile_{stamp}"
+        suffix = 1
+        while Path(f"{base}.folded").exists():
+            base = Path(self.output_dir) / f"sanderling_profile_{stamp}_{suffix}"
+            suffix += 1
+
+        with open(f"{base}.folded", 'w', encoding='utf-8') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+        with self._lock:
+            ticks = list(self.ticks)
+
+        meta = {
+            'started': self.started_at,
+            'duration_s': time.time() - self.started_at,
+            'interval_ms': self.interval_s * 1000,
+            'samples': self.samples,
+            'threads': self.thread_ids,
+            'ticks': ticks,
+        }
+        for key in ('nodes', 'read_ms', 'parse_ms', 'tick_ms'):
+            values = [t[key] for t in ticks if t.get(key) is not None]
+            if values:
+                meta[f'{key}_mean'] = sum(values) / len(values)
+                meta[f'{key}_max'] = max(values)
+
+        with open(f"{base}.json", 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=2, ensure_ascii=False)
+
+        return f"{base}.folded"
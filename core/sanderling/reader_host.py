@@ -0,0 +1,463 @@
+"""Долгоживущий процесс ридера: запросы и ответы через stdin/stdout.
+
+Запуск ридера на каждый тик (read-memory-64-bit.exe) платит за старт
+процесса и JIT при каждом чтении. В режиме reader_host сервис запускает
+ридер один раз и дальше шлёт ему запросы "прочитать дерево с корня X"
+по pipe; ридер держит открытый процесс EVE и прогретый код между тиками.
+
+Протокол - кадры в обе стороны:
+
+    <II>  длина заголовка, длина тела (little-endian)
+    заголовок  JSON (utf-8)
+    тело       байты (пусто, JSON-дерево или бинарный снимок .snap)
+
+Запросы (заголовок):
+    {"op": "hello"}                                   -> {"ok": true, "reader": ..., "formats": [...]}
+    {"op": "find_root"}                               -> {"ok": true, "root": "0x..."}
+    {"op": "read_tree", "root": "0x...", "format": f} -> {"ok": true, "format": f, "calls": N} + тело
+    {"op": "quit"}                                    -> {"ok": true}, процесс завершается
+Ошибка: {"ok": false, "error": "..."}; процесс продолжает обслуживать запросы.
+
+format - пожелание клиента: 'snapshot' (колонки snapshot_file без сжатия,
+CompactUITree восстанавливается без разбора JSON) или 'json' (формат C#
+exe). Хост отвечает тем, что умеет, клиент разбирает по format ответа.
+
+Тот же протокол обслуживает LinuxMemoryReader в дочернем процессе (чтение
+памяти не держит GIL процесса бота, падение ридера не роняет сервис):
+
+    python -m core.sanderling.reader_host --pid 12345
+    python -m core.sanderling.reader_host --heap output/heaps/dump.heap   # синтетическая куча
+
+    client = ReaderHostClient(cmd, timeout=5.0)
+    client.start()
+    root = client.find_root()
+    tree = client.read_tree(root)            # CompactUITree
+"""
+import argparse
+import json
+import logging
+import struct
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, List, Optional, Sequence, Tuple, Union
+
+from .compact_tree import CompactUITree
+from .snapshot_file import decode_snapshot, encode_snapshot
+
+
+logger = logging.getLogger(__name__)
+
+# Заголовок кадра: длина JSON-заголовка, длина тела
+FRAME_HEADER = struct.Struct('<II')
+
+FORMAT_SNAPSHOT = 'snapshot'
+FORMAT_JSON = 'json'
+
+# Ограничение на заголовок кадра (защита от рассинхронизации потока)
+MAX_HEADER_SIZE = 1024 * 1024
+
+# Рабочий каталог для `python -m core.sanderling.reader_host` (корень проекта)
+HOST_CWD = str(Path(__file__).resolve().parents[2])
+
+
+class ReaderHostError(Exception):
+    """Хост ответил ошибкой или нарушил протокол."""
+
+
+def write_frame(stream: BinaryIO, header: Dict[str, Any], body: bytes = b'') -> None:
+    """Записать кадр протокола и сбросить буфер."""
+    encoded = json.dumps(header, separators=(',', ':')).encode('utf-8')
+    stream.write(FRAME_HEADER.pack(len(encoded), len(body)))
+    stream.write(encoded)
+    if body:
+        stream.write(body)
+    stream.flush()
+
+
+def read_frame(stream: BinaryIO) -> Optional[Tuple[Dict[str, Any], bytes]]:
+    """
+    Прочитать кадр протокола.
+
+    Returns:
+        (заголовок, тело) или None, если поток закрыт до начала кадра
+
+    Raises:
+        ReaderHostError: Поток оборван посреди кадра или кадр некорректен
+    """
+    head = _read_exact(stream, FRAME_HEADER.size)
+    if not head:
+        return None
+    header_size, body_size = FRAME_HEADER.unpack(head)
+    if header_size > MAX_HEADER_SIZE:
+        raise ReaderHostError(f"Некорректный кадр: заголовок {header_size} байт")
+
+    try:
+        header = json.loads(_read_exact(stream, header_size, required=True).decode('utf-8'))
+    except ValueError as e:
+        raise ReaderHostError(f"Некорректный заголовок кадра: {e}") from e
+    body = _read_exact(stream, body_size, required=True) if body_size else b''
+    return header, body
+
+
+def _read_exact(stream: BinaryIO, size: int, required: bool = False) -> bytes:
+    data = stream.read(size)
+    if len(data) == size:
+        return data
+    if not data and not required:
+        return b''
+    # BufferedReader.read(n) возвращает меньше только на EOF; сырой поток - докачиваем
+    chunks = [data]
+    received = len(data)
+    while received < size:
+        chunk = stream.read(size - received)
+        if not chunk:
+            raise ReaderHostError(f"Поток оборван: {received} из {size} байт")
+        chunks.append(chunk)
+        received += len(chunk)
+    return b''.join(chunks)
+
+
+# === Сторона ридера ===
+
+class ReaderHandler:
+    """Обработчик запросов хоста (LinuxMemoryReader, заглушка exe)."""
+
+    name = 'reader'
+    formats: Sequence[str] = (FORMAT_SNAPSHOT,)
+
+    def find_root(self) -> Optional[str]:
+        """Полный поиск UIRoot."""
+        raise NotImplementedError
+
+    def read_tree(self, root: str, fmt: str) -> Tuple[Dict[str, Any], bytes]:
+        """
+        Прочитать дерево с корня.
+
+        Args:
+            root: Адрес UIRoot ('0x...')
+            fmt: Формат, который просит клиент
+
+        Returns:
+            (поля ответа - как минимум 'format', тело); пустое тело - дерево не прочитано
+        """
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Освободить ресурсы при завершении хоста."""
+
+
+def serve(handler: ReaderHandler, stdin: Optional[BinaryIO] = None,
+          stdout: Optional[BinaryIO] = None) -> int:
+    """
+    Обслуживать запросы до quit или закрытия stdin.
+
+    Returns:
+        Код выхода процесса
+    """
+    stdin = stdin or sys.stdin.buffer
+    stdout = stdout or sys.stdout.buffer
+    try:
+        while True:
+            try:
+                frame = read_frame(stdin)
+            except ReaderHostError as e:
+                logger.error(f"Поток запросов нарушен: {e}")
+                return 1
+            if frame is None:
+                return 0
+
+            request, _ = frame
+            op = request.get('op')
+            body = b''
+            try:
+                if op == 'hello':
+                    reply = {'ok': True, 'reader': handler.name, 'formats': list(handler.formats)}
+                elif op == 'find_root':
+                    reply = {'ok': True, 'root': handler.find_root()}
+                elif op == 'read_tree':
+                    started = time.perf_counter()
+                    fields, body = handler.read_tree(request['root'], request.get('format', FORMAT_SNAPSHOT))
+                    reply = {'ok': True, **fields, 'elapsed_ms': (time.perf_counter() - started) * 1000}
+                elif op == 'quit':
+                    write_frame(stdout, {'ok': True})
+                    return 0
+                else:
+                    reply = {'ok': False, 'error': f"Неизвестный запрос: {op!r}"}
+            except Exception as e:
+                logger.exception(f"Ошибка обработки {op!r}")
+                reply, body = {'ok': False, 'error': f"{type(e).__name__}: {e}"}, b''
+            write_frame(stdout, reply, body)
+    finally:
+        handler.close()
+
+
+class LinuxReaderHandler(ReaderHandler):
+    """LinuxMemoryReader в процессе хоста (открыт между запросами)."""
+
+    name = 'linux'
+    formats = (FORMAT_SNAPSHOT, FORMAT_JSON)
+
+    def __init__(self, pid: int, scan_chunk_size: Optional[int] = None, heap: Optional[str] = None,
+                 use_process_vm_readv: bool = False):
+        """
+        Args:
+            pid: PID процесса EVE
+            scan_chunk_size: Размер чанка при поиске корня
+            heap: Файл синтетической кучи (linux_fixture) вместо процесса
+            use_process_vm_readv: Читать через process_vm_readv вместо /proc/pid/mem
+        """
+        from .linux_reader import DEFAULT_SCAN_CHUNK_SIZE, LinuxMemoryReader
+
+        process = None
+        if heap:
+            from .linux_fixture import FixtureProcessAccess
+            process = FixtureProcessAccess(heap)
+        self.reader = LinuxMemoryReader(pid, scan_chunk_size or DEFAULT_SCAN_CHUNK_SIZE, process=process,
+                                        use_process_vm_readv=use_process_vm_readv)
+        if not self.reader.open():
+            raise OSError(f"Не удалось открыть память процесса {pid}")
+
+    def find_root(self) -> Optional[str]:
+        return self.reader.find_root_address()
+
+    def read_tree(self, root: str, fmt: str) -> Tuple[Dict[str, Any], bytes]:
+        calls_before = self.reader.read_calls
+        if fmt == FORMAT_JSON:
+            ui_tree = self.reader.read_ui_tree(root)
+            body = json.dumps(ui_tree, separators=(',', ':')).encode('utf-8') if ui_tree else b''
+        else:
+            fmt = FORMAT_SNAPSHOT
+            ui_tree = self.reader.read_ui_tree_compact(root)
+            # Без сжатия: pipe быстрее zlib
+            body = encode_snapshot(ui_tree, compression='none') if ui_tree is not None else b''
+        return {'format': fmt, 'calls': self.reader.read_calls - calls_before}, body
+
+    def close(self) -> None:
+        self.reader.close()
+
+
+# === Сторона сервиса ===
+
+class ReaderHostClient:
+    """Клиент долгоживущего ридера: запуск, запросы, перезапуск после сбоя."""
+
+    def __init__(self, cmd: Sequence[str], cwd: Optional[str] = None, timeout: float = 5.0,
+                 start_timeout: float = 30.0):
+        """
+        Args:
+            cmd: Команда запуска хоста
+            cwd: Рабочий каталог хоста
+            timeout: Секунд на ответ (по умолчанию для request)
+            start_timeout: Секунд на запуск и hello
+        """
+        self.cmd = list(cmd)
+        self.cwd = cwd
+        self.timeout = timeout
+        self.start_timeout = start_timeout
+        self.info: Dict[str, Any] = {}  # Ответ на hello
+        self.starts = 0  # Сколько раз процесс запускался
+        self.last_reply: Dict[str, Any] = {}  # Заголовок последнего ответа
+        self._process: Optional[subprocess.Popen] = None
+        self._lock = threading.Lock()
+
+    @property
+    def alive(self) -> bool:
+        """Запущен ли процесс хоста."""
+        return self._process is not None and self._process.poll() is None
+
+    def start(self) -> bool:
+        """
+        Запустить хост (если не запущен) и дождаться hello.
+
+        Returns:
+            True если хост отвечает
+        """
+        if self.alive:
+            return True
+        self.close()
+        try:
+            self._process = subprocess.Popen(
+                self.cmd, cwd=self.cwd,
+                stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=None,
+            )
+        except OSError as e:
+            logger.error(f"Не удалось запустить ридер {self.cmd[0]}: {e}")
+            return False
+        self.starts += 1
+
+        try:
+            self.info = self.request({'op': 'hello'}, timeout=self.start_timeout)[0]
+        except (ReaderHostError, subprocess.TimeoutExpired) as e:
+            logger.error(f"Ридер не ответил на hello: {e}")
+            self.close()
+            return False
+        logger.info(f"Reader host started: {self.info.get('reader')} (pid {self._process.pid})")
+        return True
+
+    def request(self, header: Dict[str, Any], timeout: Optional[float] = None) -> Tuple[Dict[str, Any], bytes]:
+        """
+        Отправить запрос и дождаться ответа.
+
+        Args:
+            header: Заголовок запроса ({'op': ...})
+            timeout: Секунд на ответ (None - self.timeout)
+
+        Returns:
+            (заголовок ответа, тело)
+
+        Raises:
+            subprocess.TimeoutExpired: Нет ответа за timeout (процесс убит)
+            ReaderHostError: Хост ответил ошибкой, упал или нарушил протокол
+        """
+        with self._lock:
+            process = self._process
+            if process is None or process.poll() is not None:
+                self._process = None
+                raise ReaderHostError("Ридер не запущен")
+
+            timeout = self.timeout if timeout is None else timeout
+            expired = threading.Event()
+
+            def kill():
+                expired.set()
+                process.kill()
+
+            timer = threading.Timer(timeout, kill) if timeout else None
+            if timer is not None:
+                timer.daemon = True
+                timer.start()
+            try:
+                write_frame(process.stdin, header)
+                frame = read_frame(process.stdout)
+            except (OSError, ReaderHostError) as e:
+                frame = None
+                if not expired.is_set():
+                    self._kill()
+                    raise ReaderHostError(f"Связь с ридером потеряна: {e}") from e
+            finally:
+                if timer is not None:
+                    timer.cancel()
+
+            if expired.is_set():
+                self._kill()
+                raise subprocess.TimeoutExpired(self.cmd, timeout)
+            if frame is None:
+                self._kill()
+                raise ReaderHostError("Ридер завершился")
+
+        reply, body = frame
+        self.last_reply = reply
+        if not reply.get('ok'):
+            raise ReaderHostError(reply.get('error') or "ошибка без описания")
+        return reply, body
+
+    def find_root(self, timeout: float = 180.0) -> Optional[str]:
+        """Полный поиск UIRoot в процессе хоста."""
+        return self.request({'op': 'find_root'}, timeout=timeout)[0].get('root')
+
+    def read_tree(self, root: str, compact: bool = True,
+                  timeout: Optional[float] = None) -> Union[CompactUITree, dict, None]:
+        """
+        Прочитать UI tree.
+
+        Args:
+            root: Адрес UIRoot
+            compact: Вернуть CompactUITree (иначе dict-дерево)
+            timeout: Секунд на ответ
+
+        Returns:
+            Дерево или None, если ридер его не прочитал
+        """
+        fmt = FORMAT_SNAPSHOT if compact and FORMAT_SNAPSHOT in self.info.get('formats', ()) else FORMAT_JSON
+        reply, body = self.request({'op': 'read_tree', 'root': root, 'format': fmt}, timeout=timeout)
+        if not body:
+            return None
+
+        if reply.get('format') == FORMAT_SNAPSHOT:
+            tree = decode_snapshot(body)
+            return tree if compact else tree.to_dict()
+        ui_tree = json.loads(body)
+        return CompactUITree.from_dict(ui_tree, keep_source=False) if compact else ui_tree
+
+    def close(self, timeout: float = 2.0) -> None:
+        """Попросить хост завершиться; не ответил - убить."""
+        process, self._process = self._process, None
+        if process is None:
+            return
+        if process.poll() is None:
+            try:
+                write_frame(process.stdin, {'op': 'quit'})
+                process.stdin.close()
+                process.wait(timeout=timeout)
+            except (OSError, ValueError, subprocess.TimeoutExpired):
+                process.kill()
+                process.wait()
+        _close_pipes(process)
+
+    def _kill(self) -> None:
+        process, self._process = self._process, None
+        if process is None:
+            return
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+        _close_pipes(process)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def _close_pipes(process: subprocess.Popen) -> None:
+    for pipe in (process.stdin, process.stdout):
+        try:
+            pipe.close()
+        except (OSError, ValueError):
+            pass
+
+
+def linux_host_command(pid: int, scan_chunk_size: Optional[int] = None,
+                       use_process_vm_readv: bool = False) -> List[str]:
+    """Команда запуска LinuxMemoryReader в дочернем процессе (запускать с cwd=HOST_CWD)."""
+    cmd = [sys.executable, '-m', 'core.sanderling.reader_host', '--pid', str(pid)]
+    if scan_chunk_size:
+        cmd += ['--scan-chunk-size', str(scan_chunk_size)]
+    if use_process_vm_readv:
+        cmd.append('--process-vm-readv')
+    return cmd
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="LinuxMemoryReader как долгоживущий процесс ридера")
+    parser.add_argument("--pid", type=int, default=0, help="PID процесса EVE")
+    parser.add_argument("--heap", help="Файл синтетической кучи (linux_fixture) вместо процесса")
+    parser.add_argument("--scan-chunk-size", type=int, help="Размер чанка при поиске корня")
+    parser.add_argument("--process-vm-readv", action="store_true",
+                        help="Читать через process_vm_readv вместо /proc/pid/mem")
+    args = parser.parse_args(argv)
+
+    # stdout - канал протокола: любой print уходит в stderr
+    stdout = sys.stdout.buffer
+    sys.stdout = sys.stderr
+    logging.basicConfig(
+        level=logging.WARNING,
+        stream=sys.stderr,
+        format='%(asctime)s - reader_host - %(levelname)s - %(message)s'
+    )
+    try:
+        handler = LinuxReaderHandler(args.pid, args.scan_chunk_size, heap=args.heap,
+                                     use_process_vm_readv=args.process_vm_readv)
+    except OSError as e:
+        logger.error(str(e))
+        return 1
+    return serve(handler, sys.stdin.buffer, stdout)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
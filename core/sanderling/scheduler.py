@@ -0,0 +1,82 @@
+"""Адаптивный интервал чтения памяти.
+
+Вместо фиксированного read_interval_ms интервал подстраивается под обстановку:
+- цели, дистанции overview или модули меняются, либо бот ждёт снимок
+  (wait_until) - читаем чаще, вплоть до нижней границы;
+- в доке или ничего не меняется - постепенно замедляемся до верхней границы.
+
+Изменения определяются по identity кортежей: парсер переиспользует объекты
+для неизменившихся секций, поэтому `is not` дешевле сравнения значений.
+"""
+from typing import Optional
+
+from .models import GameState
+
+
+class ReadScheduler:
+    """Выбор паузы между чтениями памяти."""
+
+    # Множители ускорения/замедления за одно чтение
+    SPEEDUP = 0.5
+    BACKOFF = 1.5
+
+    def __init__(self, base_ms: int, floor_ms: int, ceiling_ms: int, adaptive: bool = True):
+        """
+        Args:
+            base_ms: Базовый интервал (read_interval_ms)
+            floor_ms: Минимальный интервал
+            ceiling_ms: Максимальный интервал
+            adaptive: False - всегда base_ms (старое поведение)
+        """
+        self.base_ms = base_ms
+        self.floor_ms = min(floor_ms, base_ms)
+        self.ceiling_ms = max(ceiling_ms, base_ms)
+        self.adaptive = adaptive
+        self.interval_ms = float(base_ms)
+        self._previous: Optional[GameState] = None
+
+    def next_interval_ms(self, state: Optional[GameState], waiting: bool = False) -> float:
+        """
+        Рассчитать интервал до следующего чтения (от начала текущего).
+
+        Args:
+            state: Только что распарсенное состояние (None - чтение не удалось)
+            waiting: Есть ли потоки в wait_for_new_state / wait_until
+
+        Returns:
+            Интервал в миллисекундах
+        """
+        if not self.adaptive:
+            return self.base_ms
+
+        previous, self._previous = self._previous, state
+
+        if state is None:
+            # Ошибка чтения - не торопимся, но и не уходим в долгий сон
+            self.interval_ms = float(self.base_ms)
+        elif waiting:
+            self.interval_ms = float(self.floor_ms)
+        elif self._is_changing(state, previous):
+            self.interval_ms = max(self.floor_ms, self.interval_ms * self.SPEEDUP)
+        elif self._is_docked(state):
+            self.interval_ms = float(self.ceiling_ms)
+        else:
+            self.interval_ms = min(self.ceiling_ms, self.interval_ms * self.BACKOFF)
+
+        return self.interval_ms
+
+    @staticmethod
+    def _is_changing(state: GameState, previous: Optional[GameState]) -> bool:
+        """Изменились ли цели, overview (в т.ч. дистанции) или модули."""
+        if previous is None:
+            return True
+        if state.targets is not previous.targets or state.overview is not previous.overview:
+            return True
+        modules = state.ship.modules if state.ship else ()
+        previous_modules = previous.ship.modules if previous.ship else ()
+        return modules is not previous_modules
+
+    @staticmethod
+    def _is_docked(state: GameState) -> bool:
+        """В доке нет ShipUI - парсер не находит ни модулей, ни здоровья корабля."""
+        return state.ship is None and not state.overview
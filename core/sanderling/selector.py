@@ -0,0 +1,323 @@
+"""Селекторы узлов UI tree.
+
+Небольшой язык запросов в стиле CSS вместо рукописных рекурсивных обходов:
+
+    OverviewScrollEntry > OverviewLabel[_setText~="km"]
+    ActivateButton > EveLabelMedium[_setText="Activate"]
+    #invLootAllBtn
+    DronesWindow DroneInSpaceEntry, DronesWindow DroneInBayEntry
+
+Синтаксис:
+- Type        - имя типа узла (pythonObjectTypeName), * - любой тип
+- #name       - то же, что [_name="name"]
+- [key]       - entry присутствует в dictEntriesOfInterest
+- [key=v]     - равно; также != (не равно), ^= (начинается), $= (заканчивается),
+                *= (содержит), ~= (содержит без учёта регистра)
+- A B         - B потомок A,  A > B - B прямой ребёнок A
+- A, B        - объединение
+
+Запрос компилируется один раз (compile_selector кэширует) и выполняется над
+CompactUITree: кандидаты берутся из индекса по типам правого селектора,
+остальная цепочка проверяется подъёмом по parents. Результат - индексы узлов
+в порядке pre-order; прямоугольники - tree.rect(index).
+"""
+import re
+from bisect import bisect_left
+from functools import lru_cache
+from typing import Iterable, List, Optional, Tuple, Union
+
+from .compact_tree import CompactUITree, NO_NODE, NAME_KEY
+from .geometry import unwrap_int
+
+
+class SelectorError(ValueError):
+    """Синтаксическая ошибка в селекторе."""
+
+
+_TOKEN_RE = re.compile(r'''
+    (?P<space>\s+)
+  | (?P<child>>)
+  | (?P<comma>,)
+  | (?P<type>\*|[A-Za-z_][\w]*)
+  | (?P<id>\#[\w-]+)
+  | \[\s*(?P<key>[\w]+)\s*
+        (?:(?P<op>=|!=|\^=|\$=|\*=|~=)\s*
+           (?:"(?P<dq>[^"]*)"|'(?P<sq>[^']*)'|(?P<bare>[^\]\s]+))\s*)?
+    \]
+''', re.VERBOSE)
+
+DESCENDANT = ' '
+CHILD = '>'
+
+
+class _Compound:
+    """Простой селектор: тип + фильтры по entries."""
+
+    __slots__ = ('type_name', 'attrs')
+
+    def __init__(self):
+        self.type_name: Optional[str] = None
+        self.attrs: List[Tuple[str, Optional[str], Optional[str]]] = []
+
+    def matches(self, tree: CompactUITree, index: int) -> bool:
+        if self.type_name is not None and tree.type_name(index) != self.type_name:
+            return False
+        for key, op, expected in self.attrs:
+            if not _attr_matches(tree.entry(index, key), op, expected):
+                return False
+        return True
+
+
+class Selector:
+    """Скомпилированный селектор."""
+
+    __slots__ = ('query', '_chains')
+
+    def __init__(self, query: str, chains: List[List[Tuple[str, _Compound]]]):
+        self.query = query
+        # Каждая цепочка: [(комбинатор слева, простой селектор), ...]
+        self._chains = chains
+
+    def __repr__(self) -> str:
+        return f"Selector({self.query!r})"
+
+    def select(self, tree: CompactUITree, scope: Optional[int] = None) -> List[int]:
+        """
+        Найти все подходящие узлы.
+
+        Args:
+            tree: UI tree
+            scope: Искать только в поддереве этого узла (включая его самого)
+
+        Returns:
+            Индексы узлов в порядке pre-order
+        """
+        if not len(tree):
+            return []
+
+        if scope is None:
+            start, end = 0, len(tree)
+        else:
+            start, end = scope, tree.subtree_end(scope)
+
+        if len(self._chains) == 1:
+            return list(self._select_chain(tree, self._chains[0], start, end))
+
+        found = set()
+        for chain in self._chains:
+            found.update(self._select_chain(tree, chain, start, end))
+        return sorted(found)
+
+    def first(self, tree: CompactUITree, scope: Optional[int] = None) -> Optional[int]:
+        """Первый подходящий узел (pre-order) или None."""
+        if not len(tree):
+            return None
+        start = 0 if scope is None else scope
+        end = len(tree) if scope is None else tree.subtree_end(scope)
+
+        best = None
+        for chain in self._chains:
+            for index in self._select_chain(tree, chain, start, end):
+                if best is None or index < best:
+                    best = index
+                break
+        return best
+
+    def matches(self, tree: CompactUITree, index: int) -> bool:
+        """Проверить что узел подходит под селектор."""
+        return any(
+            chain[-1][1].matches(tree, index) and self._match_left(tree, chain, len(chain) - 1, index, 0)
+            for chain in self._chains
+        )
+
+    def parts(self) -> List[List[Tuple[str, Optional[str], List[Tuple[str, Optional[str], Optional[str]]]]]]:
+        """
+        Разобранный запрос для выполнения вне CompactUITree (dev_tools/ui_index.py).
+
+        Returns:
+            Цепочки запроса: [[(комбинатор слева, тип или None, [(key, op, value)]), ...], ...]
+        """
+        return [[(combinator, compound.type_name, list(compound.attrs)) for combinator, compound in chain]
+                for chain in self._chains]
+
+    def nodes(self, tree: CompactUITree, scope: Optional[int] = None) -> List[dict]:
+        """Подходящие узлы в dict-форме (с absoluteX/absoluteY/displayWidth/displayHeight)."""
+        return [tree.node(index) for index in self.select(tree, scope)]
+
+    def rects(self, tree: CompactUITree, scope: Optional[int] = None,
+              default_width: int = 0, default_height: int = 0) -> List[Tuple[int, int, int, int]]:
+        """Абсолютные прямоугольники подходящих узлов."""
+        return [tree.rect(index, default_width, default_height)
+                for index in self.select(tree, scope)]
+
+    def _select_chain(self, tree: CompactUITree, chain: List[Tuple[str, _Compound]],
+                      start: int, end: int) -> Iterable[int]:
+        """Кандидаты по правому селектору + проверка цепочки слева."""
+        last = len(chain) - 1
+        compound = chain[last][1]
+
+        if compound.type_name is not None:
+            candidates = tree.nodes_of_type(compound.type_name)
+            if start > 0 or end < len(tree):
+                lo = bisect_left(candidates, start)
+                hi = bisect_left(candidates, end, lo)
+                candidates = candidates[lo:hi]
+        else:
+            candidates = range(start, end)
+
+        for index in candidates:
+            if compound.matches(tree, index) and self._match_left(tree, chain, last, index, start):
+                yield index
+
+    def _match_left(self, tree: CompactUITree, chain: List[Tuple[str, _Compound]],
+                    position: int, index: int, start: int) -> bool:
+        """Проверить селекторы левее position для узла index (подъём по parents)."""
+        if position == 0:
+            return True
+
+        combinator = chain[position][0]
+        compound = chain[position - 1][1]
+        parent = tree.parents[index]
+
+        if combinator == CHILD:
+            return (parent != NO_NODE and parent >= start
+                    and compound.matches(tree, parent)
+                    and self._match_left(tree, chain, position - 1, parent, start))
+
+        while parent != NO_NODE and parent >= start:
+            if compound.matches(tree, parent) and self._match_left(tree, chain, position - 1, parent, start):
+                return True
+            parent = tree.parents[parent]
+        return False
+
+
+@lru_cache(maxsize=256)
+def compile_selector(query: str) -> Selector:
+    """
+    Скомпилировать селектор (результат кэшируется).
+
+    Args:
+        query: Текст селектора
+
+    Returns:
+        Selector
+
+    Raises:
+        SelectorError: При синтаксической ошибке
+    """
+    chains = []
+    chain: List[Tuple[str, _Compound]] = []
+    compound: Optional[_Compound] = None
+    combinator = DESCENDANT
+    pos = 0
+    text = query.strip()
+
+    def close_chain():
+        if compound is not None:
+            chain.append((combinator, compound))
+        if not chain:
+            raise SelectorError(f"Пустой селектор в {query!r}")
+        chains.append(list(chain))
+
+    while pos < len(text):
+        match = _TOKEN_RE.match(text, pos)
+        if not match:
+            raise SelectorError(f"Не разобрать {text[pos:]!r} в {query!r}")
+        pos = match.end()
+        kind = match.lastgroup if match.lastgroup in ('space', 'child', 'comma', 'type', 'id') else 'attr'
+
+        if kind == 'space':
+            continue
+
+        if kind in ('child', 'comma'):
+            if compound is None:
+                raise SelectorError(f"Ожидался селектор перед {match.group()!r} в {query!r}")
+            chain.append((combinator, compound))
+            compound = None
+            if kind == 'comma':
+                chains.append(list(chain))
+                chain = []
+                combinator = DESCENDANT
+            else:
+                combinator = CHILD
+            continue
+
+        # Пробел между простыми селекторами - комбинатор потомка
+        if compound is not None and text[match.start() - 1].isspace():
+            chain.append((combinator, compound))
+            compound = None
+            combinator = DESCENDANT
+
+        if compound is None:
+            compound = _Compound()
+
+        if kind == 'type':
+            if compound.type_name is not None or compound.attrs:
+                raise SelectorError(f"Тип должен идти первым: {query!r}")
+            if match.group('type') != '*':
+                compound.type_name = match.group('type')
+        elif kind == 'id':
+            compound.attrs.append((NAME_KEY, '=', match.group('id')[1:]))
+        else:
+            op = match.group('op')
+            value = None
+            if op is not None:
+                value = next(v for v in (match.group('dq'), match.group('sq'), match.group('bare'))
+                             if v is not None)
+            compound.attrs.append((match.group('key'), op, value))
+
+    if compound is None and chain:
+        raise SelectorError(f"Селектор не может заканчиваться комбинатором: {query!r}")
+    close_chain()
+    return Selector(query, chains)
+
+
+def select(tree: CompactUITree, query: Union[str, Selector],
+           scope: Optional[int] = None) -> List[int]:
+    """
+    Найти узлы по селектору.
+
+    Args:
+        tree: UI tree
+        query: Текст селектора или скомпилированный Selector
+        scope: Искать только в поддереве этого узла
+
+    Returns:
+        Индексы узлов в порядке pre-order
+    """
+    selector = compile_selector(query) if isinstance(query, str) else query
+    return selector.select(tree, scope)
+
+
+def select_first(tree: CompactUITree, query: Union[str, Selector],
+                 scope: Optional[int] = None) -> Optional[int]:
+    """Первый узел по селектору или None."""
+    selector = compile_selector(query) if isinstance(query, str) else query
+    return selector.first(tree, scope)
+
+
+def _attr_matches(value, op: Optional[str], expected: Optional[str]) -> bool:
+    """Сравнить значение entry с условием из селектора."""
+    if value is None:
+        return op == '!='
+    if op is None:
+        return True
+
+    if isinstance(value, dict):
+        value = unwrap_int(value)
+        if value is None:
+            return op == '!='
+    text = value if isinstance(value, str) else str(value)
+
+    if op == '=':
+        return text == expected
+    if op == '!=':
+        return text != expected
+    if op == '^=':
+        return text.startswith(expected)
+    if op == '$=':
+        return text.endswith(expected)
+    if op == '*=':
+        return expected in text
+    # ~=
+    return expected.lower() in text.lower()
@@ -1,4 +1,5 @@
 """Sanderling background service for EVE Online memory reading."""
+import signal
 import subprocess
 import sys
 import json
@@ -6,13 +7,23 @@ import time
 import psutil
 import threading
 import logging
-from typing import Optional
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, List, Optional, Union
 from pathlib import Path
 
 from .config import SanderlingConfig
 from .cache import RootAddressCache
 from .parser import UITreeParser
-from .models import GameState
+from .scheduler import ReadScheduler
+from .history import SnapshotHistory
+from .metrics import ServiceMetrics
+from . import tracing
+from .profiler import SamplingProfiler
+from .snapshot_file import SnapshotWriter
+from .session_recorder import SessionRecorder
+from .tree_stream import run_reader_streaming
+from .models import GameState, StateSnapshot
+from .compact_tree import CompactUITree
 
 
 logger = logging.getLogger(__name__)
@@ -21,31 +32,70 @@ logger = logging.getLogger(__name__)
 class SanderlingService:
     """Фоновый сервис для чтения памяти EVE Online через Sanderling."""
     
-    def __init__(self, config: Optional[SanderlingConfig] = None):
+    def __init__(self, config: Optional[SanderlingConfig] = None, pid: Optional[int] = None,
+                 wake_event: Optional[threading.Event] = None,
+                 cache: Optional[RootAddressCache] = None):
         """
         Инициализация сервиса.
         
         Args:
             config: Конфигурация Sanderling (если None, загружается из файла)
+            pid: PID конкретного клиента EVE (None - найти первый)
+            wake_event: Общий event пробуждения (SanderlingSupervisor)
+            cache: Общий кэш root address (SanderlingSupervisor); None - свой
         """
         self.config = config or SanderlingConfig.load()
-        self.cache = RootAddressCache() if self.config.cache_enabled else None
+        self.cache = (cache or RootAddressCache()) if self.config.cache_enabled else None
         self.parser = UITreeParser()
         
         self.process_handle = None
         self.eve_process_id = None
+        self._target_pid = pid
+        # Проверка жизни процесса EVE (держится между тиками, см. _is_eve_running)
+        self._liveness = None
         self.is_running = False
-        self.last_state = None
-        self.last_ui_tree = None  # Добавляем хранение последнего UI tree
         self.error_count = 0
         self.error_timestamps = []
         
         self._thread = None
         self._stop_event = threading.Event()
         self._root_address = None
+        # Открытый LinuxMemoryReader держится между тиками (кэш layout типов)
+        self._linux_reader = None
+        # Долгоживущий процесс ридера (reader_host), запускается при первом чтении
+        self._reader_host = None
+        self._error_backoff_s = 0.0  # Пауза перед повтором после ошибки чтения
         self._read_count = 0
         self._last_read_time_ms = 0
-        self._state_lock = threading.Lock()  # Защита от race condition
+        # Текущий снимок - неизменяемый, публикуется заменой ссылки (без lock для читателей)
+        self._snapshot = StateSnapshot()
+        # Последние снимки для временных запросов (тренды, "стабильно N мс")
+        self.history = SnapshotHistory(self.config.history_size)
+        # Тайминги стадий тика (service.metrics())
+        self._metrics = ServiceMetrics(self.config.metrics_window)
+        self._last_read_calls: Optional[int] = None  # syscall'ов в последнем чтении (Linux)
+        self._metrics_dumped_at = time.monotonic()
+        # Профайлер потока чтения (окно по запросу)
+        self._profiler: Optional[SamplingProfiler] = None
+        self._profiled_at: Optional[float] = None
+        # Фоновая запись debug-снимков (создаётся при первом снимке)
+        self._snapshots: Optional[SnapshotWriter] = None
+        # Запись сессии (ключевые кадры + дельты), если session_recording
+        self._session: Optional[SessionRecorder] = None
+        # Lock нужен только ожидающим: они просыпаются по notify_all при публикации
+        self._state_lock = threading.Lock()
+        self._state_changed = threading.Condition(self._state_lock)
+        self._waiters = 0  # Потоков в wait_for_new_state
+        # Прервать паузу чтения (появился ожидающий)
+        self._wake_event = wake_event or threading.Event()
+        # Подписчики на публикацию снимков (вызываются из потока чтения)
+        self._listeners: List[Callable[[Optional[StateSnapshot]], None]] = []
+        self.scheduler = ReadScheduler(
+            base_ms=self.config.read_interval_ms,
+            floor_ms=self.config.read_interval_min_ms,
+            ceiling_ms=self.config.read_interval_max_ms,
+            adaptive=self.config.adaptive_read_interval
+        )
         
     def start(self) -> bool:
         """
@@ -64,6 +114,29 @@ class SanderlingService:
         
         logger.info("Starting Sanderling service...")
         
+        if not self.attach():
+            return False
+        
+        # Запустить фоновый поток чтения
+        self._thread = threading.Thread(target=self._read_loop, daemon=True)
+        self._thread.start()
+        
+        if self.config.profile_signal:
+            self._install_profile_signal()
+        
+        logger.info("Service started")
+        return True
+        
+    def attach(self) -> bool:
+        """
+        Найти процесс EVE и root address без запуска потока чтения.
+        
+        После успешного attach() тики можно выполнять извне через tick()
+        (так работает SanderlingSupervisor); start() вызывает его сам.
+        
+        Returns:
+            True если процесс и root address найдены
+        """
         # Найти процесс EVE
         self.eve_process_id = self._find_eve_process()
         if not self.eve_process_id:
@@ -91,13 +164,8 @@ class SanderlingService:
                 self.cache.set(self.eve_process_id, self._root_address)
                 logger.info("Root address cached")
         
-        # Запустить фоновый поток чтения
         self.is_running = True
         self._stop_event.clear()
-        self._thread = threading.Thread(target=self._read_loop, daemon=True)
-        self._thread.start()
-        
-        logger.info("Service started")
         return True
         
     def stop(self) -> None:
@@ -107,8 +175,17 @@ class SanderlingService:
         
         logger.info("Stopping service...")
         
+        if self._profiler is not None:
+            self._profiler.stop()
+        
         self.is_running = False
         self._stop_event.set()
+        self._wake_event.set()
+        
+        # Разбудить ожидающих - новых снимков не будет
+        with self._state_changed:
+            self._state_changed.notify_all()
+        self._notify_listeners(None)
         
         if self._thread:
             self._thread.join(timeout=5.0)
@@ -120,17 +197,162 @@ class SanderlingService:
             except:
                 pass
         
+        if self._liveness is not None and hasattr(self._liveness, 'close'):
+            self._liveness.close()
+        self._liveness = None
+        self._close_linux_reader()
+        self._close_reader_host()
+        
+        if self._snapshots is not None:
+            self._snapshots.stop()
+        if self._session is not None:
+            self._session.close()
+            logger.info(f"Session recording saved: {self._session.path} ({self._session.frames} frames)")
+            self._session = None
+        
         logger.info("Service stopped")
         
     def get_state(self) -> Optional[GameState]:
         """
-        Получить текущее состояние игры (thread-safe).
+        Получить текущее состояние игры (thread-safe, без блокировок).
         
         Returns:
             GameState или None если данные недоступны
         """
+        snapshot = self._snapshot
+        tracing.observe(snapshot)
+        return snapshot.state
+    
+    def get_snapshot(self) -> StateSnapshot:
+        """
+        Получить текущий снимок: состояние, UI tree, номер и время чтения.
+        
+        Снимок неизменяемый; state и tree в нём из одного чтения.
+        
+        Returns:
+            StateSnapshot (seq == 0 если чтений ещё не было)
+        """
+        snapshot = self._snapshot
+        tracing.observe(snapshot)
+        return snapshot
+    
+    @property
+    def last_state(self) -> Optional[GameState]:
+        """Последнее состояние игры."""
+        return self._snapshot.state
+    
+    @property
+    def state_seq(self) -> int:
+        """Номер последнего опубликованного снимка (0 - снимков ещё не было)."""
+        return self._snapshot.seq
+    
+    def wait_for_new_state(self, after_seq: int,
+                           timeout: Optional[float] = None) -> Optional[StateSnapshot]:
+        """
+        Ждать снимок новее after_seq.
+        
+        Возвращается сразу, если такой снимок уже опубликован.
+        
+        Args:
+            after_seq: Номер последнего обработанного снимка
+            timeout: Таймаут ожидания (сек), None - без таймаута
+            
+        Returns:
+            StateSnapshot или None по таймауту / при остановке сервиса
+        """
+        snapshot = self._snapshot
+        if snapshot.seq > after_seq:
+            return snapshot
+        
+        deadline = None if timeout is None else time.monotonic() + timeout
+        
+        with self._state_changed:
+            self._waiters += 1
+            try:
+                while True:
+                    snapshot = self._snapshot
+                    if snapshot.seq > after_seq:
+                        return snapshot
+                    if not self.is_running:
+                        return None
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        return None
+                    # Цикл чтения может спать с большим интервалом - сократить паузу
+                    self._wake_event.set()
+                    self._state_changed.wait(remaining)
+            finally:
+                self._waiters -= 1
+    
+    @contextmanager
+    def waiting(self) -> Iterator[None]:
+        """
+        Пометить что кто-то ждёт новый снимок.
+        
+        Пока блок активен, цикл чтения работает с минимальным интервалом.
+        wait_for_new_state делает это сам; нужно для внешних ожидающих
+        (AsyncSanderlingService).
+        """
         with self._state_lock:
-            return self.last_state
+            self._waiters += 1
+        self._wake_event.set()
+        try:
+            yield
+        finally:
+            with self._state_lock:
+                self._waiters -= 1
+    
+    def add_listener(self, listener: Callable[[Optional[StateSnapshot]], None]) -> None:
+        """
+        Подписаться на публикацию снимков.
+        
+        listener вызывается из потока чтения с новым StateSnapshot и с None
+        при остановке сервиса. Он должен быть быстрым (например,
+        loop.call_soon_threadsafe) - чтение ждёт его завершения.
+        """
+        self._listeners.append(listener)
+    
+    def remove_listener(self, listener: Callable[[Optional[StateSnapshot]], None]) -> None:
+        """Отписаться от публикации снимков."""
+        try:
+            self._listeners.remove(listener)
+        except ValueError:
+            pass
+    
+    def wait_until(self, predicate: Callable[[GameState], Any],
+                   timeout: Optional[float] = None) -> Any:
+        """
+        Ждать снимок, для которого predicate вернёт истинное значение.
+        
+        Текущее состояние проверяется сразу, дальше predicate вызывается
+        один раз на каждый новый снимок (без sleep-опроса).
+        
+        Args:
+            predicate: Функция от GameState; результат проверяется на истинность
+            timeout: Таймаут ожидания (сек), None - без таймаута
+            
+        Returns:
+            Результат predicate (например, найденная запись overview)
+            или None по таймауту
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        snapshot = self._snapshot
+        
+        while True:
+            if snapshot.state is not None:
+                result = predicate(snapshot.state)
+                if result:
+                    # Реакция бота отсчитывается от чтения этого снимка
+                    tracing.observe(snapshot)
+                    return result
+            
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return None
+            
+            snapshot = self.wait_for_new_state(snapshot.seq, remaining)
+            if snapshot is None:
+                return None
     
     def get_ui_tree(self) -> Optional[dict]:
         """
@@ -139,8 +361,19 @@ class SanderlingService:
         Returns:
             UI tree dict или None если данные недоступны
         """
-        with self._state_lock:
-            return self.last_ui_tree
+        return self.last_ui_tree
+    
+    @property
+    def last_ui_tree(self) -> Optional[dict]:
+        """
+        Последний сырой UI tree в dict-форме.
+        
+        В компактном режиме dict строится по запросу (один раз на дерево).
+        """
+        tree = self._snapshot.tree
+        if isinstance(tree, CompactUITree):
+            return tree.node(0) if len(tree) else None
+        return tree
     
     # Properties для удобного доступа к данным
     @property
@@ -153,11 +386,60 @@ class SanderlingService:
         """Время последнего чтения в миллисекундах."""
         return getattr(self, '_last_read_time_ms', 0)
     
+    def metrics(self) -> dict:
+        """
+        Метрики тиков чтения.
+        
+        Returns:
+            {'ticks', 'errors', 'uptime_s', 'last': {...}, 'stages': {...}}, где
+            stages - для liveness_ms, read_ms, parse_ms, publish_ms, tick_ms,
+            nodes, syscalls: {'count', 'mean', 'p50', 'p95', 'p99', 'max'}
+        """
+        return self._metrics.snapshot()
+    
+    @property
+    def is_profiling(self) -> bool:
+        """Идёт ли сейчас окно профилирования."""
+        return self._profiler is not None and self._profiler.is_running
+    
+    def start_profiling(self, duration_s: Optional[float] = None) -> bool:
+        """
+        Запустить окно сэмплирующего профилирования потока чтения.
+        
+        Чтение и парсинг идут в одном потоке, поэтому сэмплируется он.
+        Результат - output/logs/sanderling_profile_<время>.folded (collapsed
+        stacks для flamegraph) и .json с тиками окна (узлы, время чтения).
+        
+        Args:
+            duration_s: Длительность окна (по умолчанию profile_duration_s)
+            
+        Returns:
+            True если окно запущено (False - сервис не запущен или окно уже идёт)
+        """
+        if self._thread is None or not self._thread.is_alive() or self.is_profiling:
+            return False
+        
+        duration_s = duration_s or self.config.profile_duration_s
+        self._profiled_at = time.monotonic()
+        self._profiler = SamplingProfiler(
+            [self._thread.ident],
+            duration_s=duration_s,
+            interval_ms=self.config.profile_interval_ms
+        )
+        self._profiler.start()
+        logger.info(f"Profiling reader thread for {duration_s:.0f}s")
+        return True
+    
+    @property
+    def read_interval_ms(self) -> float:
+        """Текущий интервал чтения (адаптивный)."""
+        return self.scheduler.interval_ms
+    
     @property
     def targets(self):
         """Список целей (thread-safe)."""
-        with self._state_lock:
-            return self.last_state.targets if self.last_state else []
+        state = self._snapshot.state
+        return state.targets if state else []
     
     @property
     def targets_count(self) -> int:
@@ -167,8 +449,8 @@ class SanderlingService:
     @property
     def overview(self):
         """Список записей overview (thread-safe)."""
-        with self._state_lock:
-            return self.last_state.overview if self.last_state else []
+        state = self._snapshot.state
+        return state.overview if state else []
     
     @property
     def overview_count(self) -> int:
@@ -178,8 +460,8 @@ class SanderlingService:
     @property
     def modules(self):
         """Список модулей (thread-safe)."""
-        with self._state_lock:
-            return self.last_state.ship.modules if self.last_state and self.last_state.ship else []
+        state = self._snapshot.state
+        return state.ship.modules if state and state.ship else []
     
     @property
     def active_modules_count(self) -> int:
@@ -191,11 +473,15 @@ class SanderlingService:
         Найти процесс EVE Online.
 
         На Windows: ищем exefile.exe через psutil.
-        На Linux: ищем через /proc/*/cmdline (EVE через Proton).
+        На Linux: ищем через /proc (comm, затем cmdline; EVE через Proton).
 
         Returns:
             Process ID или None
         """
+        if self._target_pid:
+            # Клиент задан явно (SanderlingSupervisor)
+            return self._target_pid
+        
         max_attempts = 12  # 12 * 5 секунд = 1 минута
         attempt = 0
 
@@ -229,10 +515,14 @@ class SanderlingService:
 
         На Windows: запускает read-memory-64-bit.exe.
         На Linux: использует LinuxMemoryReader напрямую.
+        С reader_host: запрос к долгоживущему ридеру.
 
         Returns:
             Root address или None
         """
+        if self.config.reader_host:
+            return self._find_root_address_host()
+
         # Linux: используем LinuxMemoryReader напрямую (без subprocess)
         if sys.platform == 'linux':
             return self._find_root_address_linux()
@@ -243,8 +533,7 @@ class SanderlingService:
             return None
 
         try:
-            cmd = [
-                self.config.binary_path,
+            cmd = self._reader_command() + [
                 "read-memory-eve-online",
                 f"--pid={self.eve_process_id}",
                 "--remove-other-dict-entries"
@@ -305,7 +594,8 @@ class SanderlingService:
         try:
             reader = LinuxMemoryReader(
                 self.eve_process_id,
-                scan_chunk_size=self.config.linux_scan_chunk_size
+                scan_chunk_size=self.config.linux_scan_chunk_size,
+                use_process_vm_readv=self.config.linux_use_process_vm_readv
             )
             if not reader.open():
                 logger.error("Не удалось открыть доступ к памяти процесса")
@@ -320,21 +610,43 @@ class SanderlingService:
             logger.error(f"Ошибка поиска root address на Linux: {e}")
             return None
         
-    def _read_memory(self) -> Optional[dict]:
+    def _read_memory(self) -> Union[dict, CompactUITree, None]:
         """
         Прочитать память и вернуть UI tree.
 
-        На Windows: subprocess → C# exe → JSON файл.
+        На Windows: subprocess → C# exe → JSON файл (с reader_stream_output -
+        JSON из stdout ридера, дерево строится по мере вывода).
         На Linux: LinuxMemoryReader напрямую → dict.
+        С reader_host: запрос к долгоживущему процессу ридера.
+        С compact_ui_tree дерево возвращается как CompactUITree.
 
         Returns:
-            UI tree dict или None
+            UI tree или None
         """
+        if self.config.reader_host:
+            return self._read_memory_host()
+
         # Linux: читаем память напрямую из Python (без subprocess!)
         if sys.platform == 'linux':
             return self._read_memory_linux()
 
         # Windows: стандартный путь через C# exe
+        return self._read_memory_exe()
+
+    def _reader_command(self) -> List[str]:
+        """
+        Команда запуска ридера из binary_path.
+
+        Скрипт .py (заглушка scripts/fake_memory_reader.py) запускается текущим
+        интерпретатором - так путь через exe проверяется и без Windows.
+        """
+        path = Path(self.config.binary_path).absolute()
+        if path.suffix == '.py':
+            return [sys.executable, str(path)]
+        return [str(path)]
+
+    def _read_memory_exe(self) -> Union[dict, CompactUITree, None]:
+        """Прочитать UI tree запуском ридера (read-memory-64-bit.exe)."""
         if not Path(self.config.binary_path).exists():
             return None
 
@@ -345,8 +657,7 @@ class SanderlingService:
                 temp_dir = Path("temp")
             temp_dir.mkdir(exist_ok=True)
 
-            cmd = [
-                str(Path(self.config.binary_path).absolute()),
+            cmd = self._reader_command() + [
                 "read-memory-eve-online",
                 f"--pid={self.eve_process_id}",
                 "--remove-other-dict-entries"
@@ -355,23 +666,36 @@ class SanderlingService:
             if self._root_address:
                 cmd.extend(["--root-address", self._root_address])
 
-            start_time = time.time()
-
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                cwd=str(temp_dir.absolute()),
-                timeout=self.config.timeout_ms / 1000.0
-            )
+            if self.config.reader_stream_output:
+                streamed = run_reader_streaming(
+                    cmd + list(self.config.reader_stream_args),
+                    cwd=str(temp_dir.absolute()),
+                    timeout=self.config.timeout_ms / 1000.0,
+                    compact=self.config.compact_ui_tree
+                )
+                if streamed.returncode != 0:
+                    logger.error(f"Sanderling read failed with exit code {streamed.returncode}")
+                    return None
+                if streamed.ui_tree is not None:
+                    if self.config.debug_mode:
+                        self._save_debug_snapshot(streamed.ui_tree)
+                    return streamed.ui_tree
+                # JSON в stdout не было - ридер записал файл, дальше обычный путь
+                output = streamed.output
+            else:
+                result = subprocess.run(
+                    cmd,
+                    capture_output=True,
+                    text=True,
+                    cwd=str(temp_dir.absolute()),
+                    timeout=self.config.timeout_ms / 1000.0
+                )
 
-            elapsed_ms = (time.time() - start_time) * 1000
+                if result.returncode != 0:
+                    logger.error(f"Sanderling read failed with exit code {result.returncode}")
+                    return None
 
-            if result.returncode != 0:
-                logger.error(f"Sanderling read failed with exit code {result.returncode}")
-                return None
-
-            output = result.stdout
+                output = result.stdout
 
             import re
             match = re.search(r"to file '([^']+)'", output)
@@ -391,91 +715,365 @@ class SanderlingService:
             with open(json_file, 'r', encoding='utf-8') as f:
                 ui_tree = json.load(f)
 
-            try:
-                json_file.unlink()
-            except Exception:
-                pass
-
             if self.config.debug_mode:
-                self._save_debug_snapshot(ui_tree)
+                # Файл забирает writer: dict-дерево дальше дополняет парсер
+                self._snapshot_writer().submit_file(json_file)
+            else:
+                try:
+                    json_file.unlink()
+                except Exception:
+                    pass
+
+            if self.config.compact_ui_tree:
+                # dict-дерево из JSON больше не нужно - упаковываем в колонки
+                return CompactUITree.from_dict(ui_tree, keep_source=False)
 
             return ui_tree
 
         except subprocess.TimeoutExpired:
             logger.error("Memory read timed out")
             return None
-        except json.JSONDecodeError as e:
+        except ValueError as e:
+            # json.JSONDecodeError или оборванный JSON из stdout ридера
             logger.error(f"Failed to parse UI tree JSON: {e}")
             return None
         except Exception as e:
             logger.error(f"Error reading memory: {e}")
             return None
 
-    def _read_memory_linux(self) -> Optional[dict]:
-        """Прочитать UI tree на Linux через LinuxMemoryReader."""
+    def _read_memory_linux(self) -> Union[dict, CompactUITree, None]:
+        """
+        Прочитать UI tree на Linux через LinuxMemoryReader.
+        
+        Reader открывается один раз и переиспользуется между тиками (его кэш
+        tp_dictoffset по типам остаётся валидным, пока жив процесс); после
+        исключения он закрывается и открывается заново на следующем тике.
+        """
         from .linux_reader import LinuxMemoryReader
+        reader = self._linux_reader
+        calls_before = 0
         try:
-            reader = LinuxMemoryReader(
-                self.eve_process_id,
-                scan_chunk_size=self.config.linux_scan_chunk_size
-            )
-            if not reader.open():
-                logger.error("Не удалось открыть доступ к памяти")
-                return None
+            if reader is None:
+                reader = LinuxMemoryReader(
+                    self.eve_process_id,
+                    scan_chunk_size=self.config.linux_scan_chunk_size,
+                    use_process_vm_readv=self.config.linux_use_process_vm_readv
+                )
+                if not reader.open():
+                    logger.error("Не удалось открыть доступ к памяти")
+                    return None
+                self._linux_reader = reader
+            calls_before = reader.read_calls
 
-            try:
+            if self.config.compact_ui_tree:
+                ui_tree = reader.read_ui_tree_compact(self._root_address)
+            else:
                 ui_tree = reader.read_ui_tree(self._root_address)
 
-                if self.config.debug_mode and ui_tree:
-                    self._save_debug_snapshot(ui_tree)
+            if self.config.debug_mode and ui_tree:
+                self._save_debug_snapshot(ui_tree)
 
-                return ui_tree
-            finally:
-                reader.close()
+            return ui_tree
         except Exception as e:
             logger.error(f"Ошибка чтения памяти на Linux: {e}")
+            self._close_linux_reader()
+            return None
+        finally:
+            if reader is not None and reader is self._linux_reader:
+                self._last_read_calls = reader.read_calls - calls_before
+    
+    def _close_linux_reader(self) -> None:
+        """Закрыть удерживаемый LinuxMemoryReader."""
+        reader, self._linux_reader = self._linux_reader, None
+        if reader is not None:
+            reader.close()
+
+    def _reader_host_command(self) -> List[str]:
+        """
+        Команда запуска долгоживущего ридера.
+
+        reader_host_command из конфига ("{pid}" подставляется); по умолчанию на
+        Linux - LinuxMemoryReader в дочернем процессе, иначе binary_path serve.
+        Команда выполняется в корне проекта.
+        """
+        from .reader_host import linux_host_command
+        pid = str(self.eve_process_id)
+        if self.config.reader_host_command:
+            return [arg.replace('{pid}', pid) for arg in self.config.reader_host_command]
+        if sys.platform == 'linux':
+            return linux_host_command(self.eve_process_id, self.config.linux_scan_chunk_size,
+                                      self.config.linux_use_process_vm_readv)
+        return self._reader_command() + ["serve", f"--pid={pid}"]
+
+    def _reader_host_client(self):
+        """Клиент долгоживущего ридера; процесс запускается (перезапускается) при необходимости."""
+        # Импорт по месту: reader_host запускается и как `python -m`
+        from .reader_host import HOST_CWD, ReaderHostClient
+        client = self._reader_host
+        if client is None:
+            client = ReaderHostClient(
+                self._reader_host_command(),
+                cwd=HOST_CWD,
+                timeout=self.config.timeout_ms / 1000.0
+            )
+            self._reader_host = client
+        if not client.start():
+            return None
+        return client
+
+    def _find_root_address_host(self) -> Optional[str]:
+        """Найти root address запросом к долгоживущему ридеру."""
+        from .reader_host import ReaderHostError
+        client = self._reader_host_client()
+        if client is None:
+            return None
+        try:
+            logger.info("Searching for root address via reader host...")
+            return client.find_root(timeout=180.0)
+        except subprocess.TimeoutExpired:
+            logger.error("Root address search timed out (180s)")
             return None
+        except ReaderHostError as e:
+            logger.error(f"Error finding root address: {e}")
+            return None
+
+    def _read_memory_host(self) -> Union[dict, CompactUITree, None]:
+        """
+        Прочитать UI tree у долгоживущего ридера (reader_host).
+
+        Процесс ридера держится между тиками; после сбоя или таймаута он убит
+        и запускается заново на следующем тике.
+        """
+        from .reader_host import ReaderHostError
+        client = self._reader_host_client()
+        if client is None:
+            return None
+        try:
+            ui_tree = client.read_tree(
+                self._root_address,
+                compact=self.config.compact_ui_tree,
+                timeout=self.config.timeout_ms / 1000.0
+            )
+        except subprocess.TimeoutExpired:
+            logger.error("Memory read timed out")
+            return None
+        except (ReaderHostError, ValueError) as e:
+            # ValueError - некорректное тело ответа (JSON или снимок)
+            logger.error(f"Reader host read failed: {e}")
+            return None
+
+        self._last_read_calls = client.last_reply.get('calls')
+        if self.config.debug_mode and ui_tree:
+            self._save_debug_snapshot(ui_tree)
+        return ui_tree
+
+    def _close_reader_host(self) -> None:
+        """Остановить долгоживущий процесс ридера."""
+        client, self._reader_host = self._reader_host, None
+        if client is not None:
+            client.close()
         
     def _read_loop(self) -> None:
         """Фоновый цикл чтения памяти."""
         logger.debug("Read loop started")
         
         while not self._stop_event.is_set():
-            try:
-                # Проверить что процесс EVE еще жив
-                if not self._is_eve_running():
-                    logger.warning("EVE process terminated")
-                    self.is_running = False
-                    break
+            tick_start = time.monotonic()
+            state = self.tick()
+            if not self.is_running:
+                break
+            
+            # Ждать перед следующим чтением: интервал считается от начала чтения
+            self._wait_next_tick(tick_start, state)
+        
+        logger.debug("Read loop stopped")
+        
+    def tick(self) -> Optional[GameState]:
+        """
+        Один тик: проверка процесса, чтение, парсинг, публикация снимка.
+        
+        Вызывается потоком чтения или воркером SanderlingSupervisor
+        (тики одного сервиса не должны выполняться параллельно).
+        Если процесс EVE завершился, is_running становится False.
+        
+        Returns:
+            Распарсенное состояние или None если чтение не удалось
+        """
+        state = None
+        try:
+            # Проверить что процесс EVE еще жив
+            t_liveness = time.perf_counter()
+            if not self._is_eve_running():
+                logger.warning("EVE process terminated")
+                self.is_running = False
+                self._close_linux_reader()
+                self._close_reader_host()
+                return None
+            
+            # Читать память
+            start_time = time.time()
+            self._last_read_calls = None
+            t_read = time.perf_counter()
+            ui_tree = self._read_memory()
+            t_parse = time.perf_counter()
+            read_time_ms = int((t_parse - t_read) * 1000)
+            
+            if ui_tree:
+                # Парсить UI tree
+                state = self.parser.parse(ui_tree)
+                t_publish = time.perf_counter()
                 
-                # Читать память
-                start_time = time.time()
-                ui_tree = self._read_memory()
-                read_time_ms = int((time.time() - start_time) * 1000)
+                self._publish(state, ui_tree, start_time, read_time_ms)
+                if self.config.session_recording:
+                    self._record_session(state, ui_tree, start_time)
+                t_done = time.perf_counter()
                 
-                if ui_tree:
-                    # Парсить UI tree
-                    state = self.parser.parse(ui_tree)
-                    
-                    # Thread-safe обновление состояния
-                    with self._state_lock:
-                        self.last_state = state
-                        self.last_ui_tree = ui_tree  # Сохраняем сырой UI tree
-                    
-                    self.error_count = 0
-                    self._read_count += 1
-                    self._last_read_time_ms = read_time_ms
-                else:
-                    self._handle_error(Exception("Failed to read memory"))
+                self.error_count = 0
+                self._read_count += 1
+                self._last_read_time_ms = read_time_ms
                 
-            except Exception as e:
-                self._handle_error(e)
+                tick = {
+                    'liveness_ms': (t_read - t_liveness) * 1000,
+                    'read_ms': (t_parse - t_read) * 1000,
+                    'parse_ms': (t_publish - t_parse) * 1000,
+                    'publish_ms': (t_done - t_publish) * 1000,
+                    'tick_ms': (t_done - t_liveness) * 1000,
+                    'nodes': len(state.tree) if state.tree is not None else None,
+                    'syscalls': self._last_read_calls,
+                }
+                self._metrics.record(tick)
+                self._dump_metrics_if_due()
+                self._profile_tick(tick)
+            else:
+                self._metrics.record_error()
+                self._handle_error(Exception("Failed to read memory"))
             
-            # Ждать перед следующим чтением
-            time.sleep(self.config.read_interval_ms / 1000.0)
+        except Exception as e:
+            self._metrics.record_error()
+            self._handle_error(e)
         
-        logger.debug("Read loop stopped")
+        return state
+        
+    def _publish(self, state: GameState, ui_tree: Union[dict, CompactUITree],
+                 read_started: float, read_time_ms: int) -> None:
+        """
+        Опубликовать новый снимок и разбудить ожидающих.
+        
+        Снимок собирается целиком и подменяется одним присваиванием ссылки:
+        читатели без lock видят либо старый, либо новый снимок, но не смесь.
+        """
+        self._snapshot = StateSnapshot(
+            seq=self._snapshot.seq + 1,
+            state=state,
+            tree=ui_tree,
+            timestamp=read_started,
+            read_time_ms=read_time_ms
+        )
+        self.history.append(self._snapshot)
+        with self._state_changed:
+            self._state_changed.notify_all()
+        self._notify_listeners(self._snapshot)
+    
+    def _notify_listeners(self, snapshot: Optional[StateSnapshot]) -> None:
+        """Вызвать подписчиков; ошибка одного не мешает остальным и чтению."""
+        for listener in tuple(self._listeners):
+            try:
+                listener(snapshot)
+            except Exception as e:
+                logger.error(f"Snapshot listener failed: {e}")
+    
+    def _profile_tick(self, tick: dict) -> None:
+        """Пометить тик в окне профилирования; запустить окно на медленном тике."""
+        profiler = self._profiler
+        if profiler is not None and profiler.is_running:
+            profiler.tag(dict(tick, seq=self._snapshot.seq))
+            return
+        
+        threshold = self.config.profile_slow_tick_ms
+        if not threshold or tick['tick_ms'] < threshold:
+            return
+        
+        cooldown = self.config.profile_cooldown_s
+        if self._profiled_at is not None and time.monotonic() - self._profiled_at < cooldown:
+            return
+        
+        logger.warning(f"Slow tick {tick['tick_ms']:.0f}ms (>= {threshold}ms), starting profiler")
+        self.start_profiling()
+    
+    def _install_profile_signal(self) -> None:
+        """SIGUSR2 запускает окно профилирования (POSIX, только из главного потока)."""
+        if not hasattr(signal, 'SIGUSR2') or threading.current_thread() is not threading.main_thread():
+            return
+        try:
+            signal.signal(signal.SIGUSR2, lambda signum, frame: self.start_profiling())
+            logger.debug("SIGUSR2 starts Sanderling profiling")
+        except (ValueError, OSError) as e:
+            logger.debug(f"Cannot install SIGUSR2 handler: {e}")
+    
+    def _dump_metrics_if_due(self) -> None:
+        """Периодически сбрасывать метрики в output/metrics/ (если включено)."""
+        interval = self.config.metrics_dump_interval_s
+        if interval <= 0 or time.monotonic() - self._metrics_dumped_at < interval:
+            return
+        
+        self._metrics_dumped_at = time.monotonic()
+        fmt = self.config.metrics_dump_format
+        suffix = 'prom' if fmt == 'prometheus' else 'json'
+        try:
+            self._metrics.dump(f"output/metrics/sanderling_metrics.{suffix}", fmt)
+        except OSError as e:
+            logger.error(f"Failed to dump metrics: {e}")
+    
+    def _wait_next_tick(self, tick_start: float, state: Optional[GameState]) -> None:
+        """
+        Пауза до следующего чтения.
+        
+        Время чтения и парсинга вычитается из интервала. Если во время
+        паузы появился ожидающий снимок поток, пауза сокращается до
+        нижней границы интервала.
+        
+        Args:
+            tick_start: time.monotonic() начала текущего чтения
+            state: Распарсенное состояние (None если чтение не удалось)
+        """
+        # Пауза перед повтором после ошибки ожидающими не сокращается
+        backoff, self._error_backoff_s = self._error_backoff_s, 0.0
+        if backoff and self._stop_event.wait(backoff):
+            return
+        
+        # Сначала сбросить событие, потом читать состояние: set() от нового
+        # ожидающего или stop() после clear() разбудит wait ниже, а не потеряется
+        self._wake_event.clear()
+        if self._stop_event.is_set():
+            return
+        with self._state_lock:
+            waiting = self._waiters > 0
+        
+        interval_s = self.scheduler.next_interval_ms(state, waiting) / 1000.0
+        remaining = tick_start + interval_s - time.monotonic()
+        if remaining <= 0:
+            return
+        
+        if self._wake_event.wait(remaining) and not self._stop_event.is_set():
+            remaining = tick_start + self.scheduler.floor_ms / 1000.0 - time.monotonic()
+            if remaining > 0:
+                self._stop_event.wait(remaining)
+    
+    def next_tick_at(self, tick_start: float, state: Optional[GameState]) -> float:
+        """
+        Момент следующего чтения (time.monotonic()) для внешнего планировщика.
         
+        То же правило, что в _wait_next_tick, но без ожидания: интервал
+        ReadScheduler от начала тика плюс пауза после ошибки.
+        
+        Args:
+            tick_start: time.monotonic() начала тика
+            state: Результат tick()
+        """
+        backoff, self._error_backoff_s = self._error_backoff_s, 0.0
+        interval_s = self.scheduler.next_interval_ms(state, self._waiters > 0) / 1000.0
+        return tick_start + max(interval_s, backoff)
+    
     def _handle_error(self, error: Exception) -> None:
         """
         Обработать ошибку чтения.
@@ -510,40 +1108,77 @@ class SanderlingService:
             
             self.error_count = 0
         else:
-            # Подождать перед повтором
-            time.sleep(1.0)
+            # Подождать перед повтором (пауза выдерживается перед следующим тиком)
+            self._error_backoff_s = 1.0
         
     def _is_eve_running(self) -> bool:
         """
         Проверить что процесс EVE еще работает.
         
+        Объект проверки создаётся один раз на PID: на Linux это pidfd
+        (или закэшированное время старта из /proc/pid/stat), на Windows -
+        psutil.Process, который сам сверяет время создания. В обоих случаях
+        переиспользованный PID не считается живым процессом EVE.
+        
         Returns:
             True если процесс жив
         """
         if not self.eve_process_id:
             return False
         
+        liveness = self._liveness
+        if liveness is None or liveness.pid != self.eve_process_id:
+            if liveness is not None and hasattr(liveness, 'close'):
+                liveness.close()
+            try:
+                if sys.platform == 'linux':
+                    from .linux_process import ProcessLiveness
+                    liveness = ProcessLiveness(self.eve_process_id)
+                else:
+                    liveness = psutil.Process(self.eve_process_id)
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                return False
+            self._liveness = liveness
+        
+        if sys.platform == 'linux':
+            return liveness.is_alive()
+        
         try:
-            proc = psutil.Process(self.eve_process_id)
-            return proc.is_running()
+            return liveness.is_running()
         except (psutil.NoSuchProcess, psutil.AccessDenied):
             return False
         
-    def _save_debug_snapshot(self, ui_tree: dict) -> None:
+    def _save_debug_snapshot(self, ui_tree: Union[dict, CompactUITree]) -> None:
         """
         Сохранить снимок UI tree в debug режиме.
         
+        Снимок только ставится в очередь SnapshotWriter: кодирование в
+        бинарный формат, сжатие и запись идут в его потоке, не в тике.
+        
         Args:
-            ui_tree: UI tree для сохранения
+            ui_tree: UI tree для сохранения (после этого не меняется)
         """
-        try:
-            timestamp = time.strftime("%H%M%S")
-            filename = f"output/debug/ui_tree_{timestamp}.json"
-            
-            Path(filename).parent.mkdir(parents=True, exist_ok=True)
-            
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(ui_tree, f, indent=2, ensure_ascii=False)
-                
-        except Exception as e:
-            logger.error(f"Failed to save debug snapshot: {e}")
+        self._snapshot_writer().submit(ui_tree)
+    
+    def _record_session(self, state: GameState, ui_tree: Union[dict, CompactUITree],
+                        timestamp: float) -> None:
+        """Поставить дерево тика в запись сессии (кадр считает поток рекордера)."""
+        if self._session is None:
+            stamp = time.strftime("%Y%m%d_%H%M%S")
+            self._session = SessionRecorder(
+                f"output/sessions/session_{self.eve_process_id}_{stamp}.sess",
+                keyframe_interval=self.config.session_keyframe_interval
+            )
+            logger.info(f"Recording session to {self._session.path}")
+        # state.tree - уже построенный парсером CompactUITree
+        self._session.submit(state.tree if state.tree is not None else ui_tree, timestamp)
+    
+    def _snapshot_writer(self) -> SnapshotWriter:
+        """Writer debug-снимков (создаётся при первом обращении)."""
+        if self._snapshots is None:
+            self._snapshots = SnapshotWriter(
+                "output/debug",
+                compression=self.config.debug_snapshot_compression,
+                queue_size=self.config.debug_snapshot_queue_size
+            )
+        return self._snapshots
@@ -0,0 +1,473 @@
+"""Запись UI tree за всю сессию: ключевые кадры + дельты.
+
+Полный снимок на каждом тике (600 мс) - гигабайты в час. SessionRecorder
+пишет в один файл ключевой кадр (бинарный снимок snapshot_file) раз в
+keyframe_interval тиков, а между ними - дельты к предыдущему тику.
+Узлы сопоставляются по pythonObjectAddress; дельта содержит удалённые
+адреса и добавленные/изменённые узлы целиком (родитель, предыдущий
+сосед, тип, dictEntriesOfInterest). Порядок детей задаётся ссылкой на
+предыдущего соседа, так что вставка узла меняет только его соседа.
+
+    recorder = SessionRecorder("output/sessions/session.sess")
+    recorder.submit(state.tree)           # каждый тик (запись в потоке рекордера)
+    recorder.close()
+
+    reader = SessionReader("output/sessions/session.sess")
+    tree = reader.tree_at(timestamp)      # CompactUITree на момент времени
+    for timestamp, tree in reader:        # покадрово
+
+Сравнение тика с прошлым - несколько мс CPU на ~1500 узлов (перевод
+packed entries в строки), ключевой кадр - десятки мс. Поэтому submit()
+только ставит дерево в ограниченную очередь, а кадры считает и пишет
+поток рекордера; при переполнении тик пропускается (следующая дельта
+строится к последнему записанному дереву). Время кадра в потоке
+рекордера - stats()['record_ms'].
+
+Файл: заголовок, затем кадры (заголовок кадра + данные). Индекса в конце
+нет - читатель сканирует заголовки кадров, поэтому файл после падения
+процесса читается до последнего целого кадра.
+"""
+import bisect
+import logging
+import queue
+import struct
+import threading
+import time
+import zlib
+from array import array
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+from .compact_tree import CompactUITree, NO_NODE, _PackedDict
+from .metrics import RollingHistogram
+from .snapshot_file import (
+    _Decoder, _Encoder, _U32, _column_bytes, _decode_strings, _encode_strings, _read_column,
+    decode_snapshot, encode_snapshot,
+)
+
+
+logger = logging.getLogger(__name__)
+
+SESSION_MAGIC = b'SNDSESS1'
+SESSION_VERSION = 1
+# magic, версия, резерв, время начала (unix)
+SESSION_HEADER = struct.Struct('<8sHHd')
+# тип кадра, резерв, время (unix), узлов, длина данных
+FRAME_HEADER = struct.Struct('<BBdII')
+
+FRAME_KEYFRAME = 1  # Данные - бинарный снимок (encode_snapshot)
+FRAME_DELTA = 2     # Данные - дельта к предыдущему кадру (zlib)
+
+# Узел для дельты: (адрес родителя, адрес предыдущего соседа, тип, entries)
+_NodeRecord = Tuple[int, int, str, dict]
+
+
+class SessionRecorder:
+    """Запись UI tree каждого тика: ключевые кадры и дельты."""
+
+    def __init__(self, path: Union[str, Path], keyframe_interval: int = 100,
+                 compression_level: int = 3, queue_size: int = 8):
+        """
+        Args:
+            path: Файл записи (.sess); создаётся заново
+            keyframe_interval: Ключевой кадр раз в столько тиков
+            compression_level: Уровень zlib для кадров
+            queue_size: Тиков в очереди submit(); сверх этого тики пропускаются
+        """
+        self.path = Path(path)
+        self.keyframe_interval = max(1, keyframe_interval)
+        self.level = compression_level
+
+        self.frames = 0
+        self.keyframes = 0
+        self.bytes_written = 0
+        self.dropped = 0
+        # Время record() на кадр (мс): сравнение с прошлым тиком, кодирование, запись
+        self.record_ms = RollingHistogram(512)
+        self._queue: queue.Queue = queue.Queue(maxsize=max(1, queue_size))
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+        # Сигнатуры узлов прошлого тика: адрес -> (родитель, сосед, тип, имя, текст, entries)
+        self._signatures: Optional[Dict[int, tuple]] = None
+        self._since_keyframe = 0
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, 'wb')
+        self._write(SESSION_HEADER.pack(SESSION_MAGIC, SESSION_VERSION, 0, time.time()))
+
+    def submit(self, ui_tree: Union[CompactUITree, dict, None],
+               timestamp: Optional[float] = None) -> bool:
+        """
+        Поставить дерево тика в очередь записи (не блокирует).
+
+        Дерево не копируется: после submit его нельзя менять.
+
+        Returns:
+            False если очередь полна и тик пропущен
+        """
+        if self._file is None or ui_tree is None:
+            return False
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="sanderling-session", daemon=True)
+                self._thread.start()
+        try:
+            self._queue.put_nowait((ui_tree, timestamp if timestamp is not None else time.time()))
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def record(self, ui_tree: Union[CompactUITree, dict, None],
+               timestamp: Optional[float] = None) -> None:
+        """
+        Записать дерево очередного тика (синхронно, в вызывающем потоке).
+
+        Args:
+            ui_tree: CompactUITree (state.tree) или dict-дерево
+            timestamp: Время тика (unix, по умолчанию сейчас)
+        """
+        if self._file is None or ui_tree is None:
+            return
+        started = time.perf_counter()
+        timestamp = timestamp if timestamp is not None else time.time()
+
+        tree = ui_tree if isinstance(ui_tree, CompactUITree) else CompactUITree.from_dict(ui_tree)
+        if len(tree) == 0:
+            return
+        signatures = _signatures(tree)
+
+        keyframe = (
+            self._signatures is None
+            or signatures is None
+            or self._since_keyframe >= self.keyframe_interval
+        )
+        if keyframe:
+            self._write_frame(FRAME_KEYFRAME, timestamp, len(tree),
+                              encode_snapshot(tree, 'zlib', level=self.level, created=timestamp))
+            self._since_keyframe = 1
+            self.keyframes += 1
+        else:
+            self._write_frame(FRAME_DELTA, timestamp, len(tree),
+                              zlib.compress(self._encode_delta(tree, signatures), self.level))
+            self._since_keyframe += 1
+
+        # Адреса повторяются - дельту к этому дереву не построить, следующий тоже ключевой
+        self._signatures = signatures
+        self.frames += 1
+        self.record_ms.add((time.perf_counter() - started) * 1000)
+
+    def stats(self) -> dict:
+        """Счётчики записи и время record() (p50/p95/p99/max, мс)."""
+        return {
+            'frames': self.frames,
+            'keyframes': self.keyframes,
+            'dropped': self.dropped,
+            'bytes': self.bytes_written,
+            'record_ms': self.record_ms.summary(),
+        }
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Дописать очередь и закрыть файл записи."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join(timeout=timeout)
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            try:
+                self.record(*item)
+            except Exception as e:
+                logger.error(f"Failed to record session frame: {e}")
+
+    def _encode_delta(self, tree: CompactUITree, signatures: Dict[int, tuple]) -> bytes:
+        """Дельта: удалённые адреса и добавленные/изменённые узлы."""
+        previous = self._signatures
+        removed = array('Q', [address for address in previous if address not in signatures])
+
+        encoder = _Encoder()
+        upserts = bytearray()
+        count = 0
+        addresses = tree.addresses
+        for index in range(len(tree)):
+            address = addresses[index]
+            signature = signatures[address]
+            if previous.get(address) == signature:
+                continue
+            parent, prev, type_name = signature[0], signature[1], signature[2]
+            upserts += struct.pack('<QQQI', address, parent, prev, encoder.intern(type_name))
+            encoder.value(upserts, tree.dict_entries(index))
+            count += 1
+
+        return b''.join((
+            _U32.pack(len(encoder.strings)), _encode_strings(encoder.strings),
+            _U32.pack(len(removed)), _column_bytes(removed),
+            _U32.pack(count), bytes(upserts),
+        ))
+
+    def _write_frame(self, kind: int, timestamp: float, nodes: int, data: bytes) -> None:
+        self._write(FRAME_HEADER.pack(kind, 0, timestamp, nodes, len(data)) + data)
+
+    def _write(self, data: bytes) -> None:
+        self._file.write(data)
+        # Кадр сразу на диск: после падения процесса запись читается до него
+        self._file.flush()
+        self.bytes_written += len(data)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class SessionReader:
+    """Чтение записи SessionRecorder с перемоткой по времени."""
+
+    def __init__(self, path: Union[str, Path]):
+        """
+        Args:
+            path: Файл записи (.sess)
+
+        Raises:
+            ValueError: Не запись сессии
+        """
+        self.path = Path(path)
+        with open(self.path, 'rb') as f:
+            self._data = f.read()
+
+        if len(self._data) < SESSION_HEADER.size:
+            raise ValueError(f"{path}: слишком короткий файл сессии")
+        magic, version, _, self.started_at = SESSION_HEADER.unpack_from(self._data, 0)
+        if magic != SESSION_MAGIC:
+            raise ValueError(f"{path}: не запись сессии ({magic!r})")
+        if version != SESSION_VERSION:
+            raise ValueError(f"{path}: неизвестная версия записи {version}")
+
+        # Кадры: (время, тип, узлов, смещение данных, длина)
+        self.frames: List[Tuple[float, int, int, int, int]] = []
+        pos = SESSION_HEADER.size
+        while pos + FRAME_HEADER.size <= len(self._data):
+            kind, _, timestamp, nodes, length = FRAME_HEADER.unpack_from(self._data, pos)
+            start = pos + FRAME_HEADER.size
+            if start + length > len(self._data):
+                logger.warning(f"{path}: последний кадр обрезан (запись прервана)")
+                break
+            self.frames.append((timestamp, kind, nodes, start, length))
+            pos = start + length
+        self._timestamps = [frame[0] for frame in self.frames]
+
+        # Состояние последней реконструкции (для покадрового чтения)
+        self._nodes: Optional[Dict[int, _NodeRecord]] = None
+        self._root: int = 0
+        self._position = -1
+
+    def __len__(self) -> int:
+        return len(self.frames)
+
+    @property
+    def start(self) -> Optional[float]:
+        """Время первого кадра."""
+        return self._timestamps[0] if self._timestamps else None
+
+    @property
+    def end(self) -> Optional[float]:
+        """Время последнего кадра."""
+        return self._timestamps[-1] if self._timestamps else None
+
+    def frame_at(self, timestamp: float) -> int:
+        """
+        Индекс кадра, действующего на момент timestamp (последний не позже).
+
+        Returns:
+            Индекс кадра или -1 если запись началась позже
+        """
+        return bisect.bisect_right(self._timestamps, timestamp) - 1
+
+    def tree_at(self, timestamp: float) -> Optional[CompactUITree]:
+        """
+        Восстановить дерево на момент времени.
+
+        Args:
+            timestamp: Время (unix)
+
+        Returns:
+            CompactUITree или None если запись началась позже
+        """
+        index = self.frame_at(timestamp)
+        return self.tree(index) if index >= 0 else None
+
+    def tree(self, index: int) -> CompactUITree:
+        """
+        Восстановить дерево кадра: ближайший ключевой кадр + дельты до index.
+
+        Последовательные вызовы (вперёд) продолжают с прошлого кадра.
+        """
+        if not 0 <= index < len(self.frames):
+            raise IndexError(f"кадр {index} вне записи ({len(self.frames)} кадров)")
+
+        keyframe = index
+        while self.frames[keyframe][1] != FRAME_KEYFRAME:
+            keyframe -= 1
+            if keyframe < 0:
+                raise ValueError(f"{self.path}: нет ключевого кадра перед кадром {index}")
+
+        if self._nodes is not None and keyframe <= self._position <= index:
+            start = self._position + 1
+        else:
+            self._load_keyframe(keyframe)
+            start = keyframe + 1
+        for position in range(start, index + 1):
+            self._apply_delta(position)
+        self._position = index
+
+        return _build_tree(self._nodes, self._root)
+
+    def __iter__(self) -> Iterator[Tuple[float, CompactUITree]]:
+        """Все кадры по порядку: (время, дерево)."""
+        for index, frame in enumerate(self.frames):
+            yield frame[0], self.tree(index)
+
+    def _payload(self, index: int) -> memoryview:
+        _, _, _, start, length = self.frames[index]
+        return memoryview(self._data)[start:start + length]
+
+    def _load_keyframe(self, index: int) -> None:
+        tree = decode_snapshot(bytes(self._payload(index)))
+        prev_sibling = _prev_siblings(tree)
+        addresses = tree.addresses
+        parents = tree.parents
+        nodes = {}
+        for i in range(len(tree)):
+            parent = parents[i]
+            nodes[addresses[i]] = (
+                addresses[parent] if parent != NO_NODE else 0,
+                prev_sibling[i],
+                tree.type_name(i),
+                tree.dict_entries(i),
+            )
+        self._nodes = nodes
+        self._root = addresses[0]
+        self._position = index
+
+    def _apply_delta(self, index: int) -> None:
+        view = memoryview(zlib.decompress(self._payload(index)))
+        pos = 0
+        (count,) = _U32.unpack_from(view, pos)
+        strings, pos = _decode_strings(view, pos + 4, count)
+
+        (count,) = _U32.unpack_from(view, pos)
+        removed = _read_column(view, pos + 4, 'Q', count)
+        pos += 4 + 8 * count
+        nodes = self._nodes
+        for address in removed:
+            nodes.pop(address, None)
+
+        decoder = _Decoder(view, pos, strings)
+        for _ in range(decoder.u32()):
+            address, parent, prev, type_id = struct.unpack_from('<QQQI', view, decoder.pos)
+            decoder.pos += 28
+            nodes[address] = (parent, prev, strings[type_id], decoder.value())
+            if parent == 0:
+                self._root = address
+
+
+def _signatures(tree: CompactUITree) -> Optional[Dict[int, tuple]]:
+    """
+    Сигнатуры узлов для сравнения тиков: адрес -> кортеж, равный у неизменившихся узлов.
+
+    Сигнатура - (адрес родителя, адрес предыдущего соседа, тип, имя, текст,
+    entries). Колонки собираются целиком (map/zip), по узлам в Python идёт
+    только перевод packed entries в строки.
+
+    Returns:
+        None если адреса не уникальны (дельту по адресам не построить)
+    """
+    n = len(tree)
+    addresses = tree.addresses
+    strings = tree.strings
+    string_at = strings.__getitem__
+
+    parent_addresses = [addresses[parent] if parent != NO_NODE else 0 for parent in tree.parents]
+    types = map(string_at, tree.type_ids)
+
+    if tree._source is None:
+        names = [strings[i] if i >= 0 else None for i in tree.name_ids]
+        texts = [strings[i] if i >= 0 else None for i in tree.text_ids]
+        # Ключи entries - индексы строк этого дерева; в сигнатуре - сами строки
+        entries = [None] * n
+        canon = _canonical(strings)
+        for index, packed in tree.entries.items():
+            entries[index] = canon(packed)
+        columns = zip(parent_addresses, _prev_siblings(tree), types, names, texts, entries)
+    else:
+        # Индекс поверх dict-узлов: entries - исходный dict, сравнивается как есть
+        entries = [node.get('dictEntriesOfInterest') for node in tree._source]
+        columns = zip(parent_addresses, _prev_siblings(tree), types, entries)
+
+    signatures = dict(zip(addresses, columns))
+    if len(signatures) != n or 0 in signatures:
+        return None
+    return signatures
+
+
+def _canonical(strings: List[str]):
+    """
+    Функция packed entries -> кортеж со строками вместо индексов (для сравнения между деревьями).
+
+    Замыкание, а не метод: на ~1500 узлов за тик вызов метода заметно дороже.
+    """
+    def canon(packed: tuple) -> tuple:
+        result = list(packed)
+        for i in range(0, len(result), 2):
+            result[i] = strings[result[i]]
+            value = result[i + 1]
+            if type(value) is _PackedDict:
+                result[i + 1] = canon(value)
+        return tuple(result)
+    return canon
+
+
+def _prev_siblings(tree: CompactUITree) -> array:
+    """Адрес предыдущего соседа каждого узла (0 у первого ребёнка)."""
+    addresses = tree.addresses
+    prev = array('Q', bytes(8 * len(tree)))
+    for i, sibling in enumerate(tree.next_sibling):
+        if sibling != NO_NODE:
+            prev[sibling] = addresses[i]
+    return prev
+
+
+def _build_tree(nodes: Dict[int, _NodeRecord], root: int) -> CompactUITree:
+    """CompactUITree из узлов {адрес: (родитель, сосед, тип, entries)} в pre-order."""
+    # Дети каждого родителя: сосед -> следующий узел
+    following: Dict[Tuple[int, int], int] = {}
+    for address, (parent, prev, _, _) in nodes.items():
+        following[(parent, prev)] = address
+
+    tree = CompactUITree()
+    if root not in nodes:
+        return tree
+    stack = [(root, NO_NODE)]
+    while stack:
+        address, parent_index = stack.pop()
+        _, _, type_name, entries = nodes[address]
+        index = tree.add_node(parent_index, address, type_name, entries)
+
+        children = []
+        child = following.get((address, 0))
+        while child is not None:
+            children.append(child)
+            child = following.get((address, child))
+        for child in reversed(children):
+            stack.append((child, index))
+    return tree
@@ -0,0 +1,523 @@
+"""Компактный бинарный формат снимков UI tree и фоновая запись.
+
+Снимок - это колонки CompactUITree как есть, без dict-узлов:
+
+    заголовок   magic, версия, сжатие, время, узлов, строк, длина тела
+    строки      длины (u32) + UTF-8 подряд
+    колонки     type_ids, addresses, parents, first_child, next_sibling,
+                abs_x, abs_y, widths, heights, name_ids, text_ids
+    entries     (узел, пар) + (key_id, значение с тегом типа) для остальных
+                dictEntriesOfInterest
+
+Тело сжимается zlib (или zstd, если установлен zstandard). Снимок ~1700
+узлов - порядка сотни KB против ~2 MB JSON с indent=2.
+
+SnapshotWriter пишет снимки из своего потока через ограниченную очередь:
+поток чтения только кладёт ссылку на (неизменяемое) дерево, кодирование,
+сжатие и запись идут вне тика; при переполнении очереди снимок
+пропускается, а не задерживает чтение.
+
+    writer = SnapshotWriter("output/debug")
+    writer.submit(ui_tree)                # CompactUITree или dict
+    tree = read_snapshot(writer.last_path)  # CompactUITree
+    ui_tree = load_ui_tree(path)          # dict-форма (.snap или .json)
+"""
+import json
+import logging
+import os
+import queue
+import struct
+import sys
+import threading
+import time
+import zlib
+from array import array
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from .compact_tree import CompactUITree, _BigInt, _PackedDict
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_MAGIC = b'SNDSNAP1'
+SNAPSHOT_VERSION = 1
+# magic, версия, сжатие, резерв, время (unix), узлов, строк, длина тела без сжатия
+SNAPSHOT_HEADER = struct.Struct('<8sHBBdIII')
+
+COMPRESSION_NONE = 0
+COMPRESSION_ZLIB = 1
+COMPRESSION_ZSTD = 2
+COMPRESSIONS = {'none': COMPRESSION_NONE, 'zlib': COMPRESSION_ZLIB, 'zstd': COMPRESSION_ZSTD}
+
+# Колонки CompactUITree в порядке записи
+COLUMNS = (
+    ('type_ids', 'i'), ('addresses', 'Q'), ('parents', 'i'),
+    ('first_child', 'i'), ('next_sibling', 'i'),
+    ('abs_x', 'i'), ('abs_y', 'i'), ('widths', 'i'), ('heights', 'i'),
+    ('name_ids', 'i'), ('text_ids', 'i'),
+)
+
+# Теги значений entries
+T_NONE = 0
+T_FALSE = 1
+T_TRUE = 2
+T_INT = 3       # i64
+T_FLOAT = 4     # f64
+T_STR = 5       # индекс строки
+T_BIGINT = 6    # {'int': ..., 'int_low32': ...}: два значения
+T_PACKED = 7    # вложенный dict CompactUITree: пар + (key_id, значение)
+T_LIST = 8      # элементов + значения
+T_MAP = 9       # обычный dict (внутри списков): пар + (key_id, значение)
+T_INTSTR = 10   # int вне i64 - строкой
+
+_U32 = struct.Struct('<I')
+_I64 = struct.Struct('<q')
+_F64 = struct.Struct('<d')
+_PAIR = struct.Struct('<II')
+_BIG_ENDIAN = sys.byteorder == 'big'
+
+
+def encode_snapshot(ui_tree: Union[CompactUITree, dict], compression: str = 'zlib',
+                    level: int = 3, created: Optional[float] = None) -> bytes:
+    """
+    Закодировать UI tree в бинарный снимок.
+
+    Args:
+        ui_tree: CompactUITree или dict-дерево (формат C# exe)
+        compression: 'none', 'zlib' или 'zstd'
+        level: Уровень сжатия
+        created: Время снимка (unix, по умолчанию сейчас)
+
+    Returns:
+        Содержимое файла снимка
+    """
+    tree = ui_tree
+    if not isinstance(tree, CompactUITree) or tree._source is not None:
+        # dict-дерево и индекс поверх dict упаковываем в колонки
+        source = tree.to_dict() if isinstance(tree, CompactUITree) else tree
+        tree = CompactUITree.from_dict(source, keep_source=False)
+
+    encoder = _Encoder(tree.strings, tree._string_ids)
+    entries = encoder.encode_entries(tree.entries)
+
+    body = bytearray(_encode_strings(encoder.strings))
+    for name, _ in COLUMNS:
+        body += _column_bytes(getattr(tree, name))
+    body += entries
+
+    method = COMPRESSIONS.get(compression, COMPRESSION_ZLIB)
+    if method == COMPRESSION_ZSTD and zstandard is None:
+        method = COMPRESSION_ZLIB
+    if method == COMPRESSION_ZLIB:
+        packed = zlib.compress(bytes(body), level)
+    elif method == COMPRESSION_ZSTD:
+        packed = zstandard.ZstdCompressor(level=level).compress(bytes(body))
+    else:
+        packed = bytes(body)
+
+    header = SNAPSHOT_HEADER.pack(
+        SNAPSHOT_MAGIC, SNAPSHOT_VERSION, method, 0,
+        created if created is not None else time.time(),
+        len(tree), len(encoder.strings), len(body),
+    )
+    return header + packed
+
+
+def decode_snapshot(data: bytes) -> CompactUITree:
+    """
+    Восстановить CompactUITree из бинарного снимка.
+
+    Raises:
+        ValueError: Не снимок, неизвестная версия или сжатие
+    """
+    if len(data) < SNAPSHOT_HEADER.size:
+        raise ValueError("слишком короткий снимок")
+    magic, version, method, _, created, nodes, string_count, body_len = \
+        SNAPSHOT_HEADER.unpack_from(data, 0)
+    if magic != SNAPSHOT_MAGIC:
+        raise ValueError(f"не снимок UI tree ({magic!r})")
+    if version != SNAPSHOT_VERSION:
+        raise ValueError(f"неизвестная версия снимка {version}")
+
+    packed = data[SNAPSHOT_HEADER.size:]
+    if method == COMPRESSION_ZLIB:
+        body = zlib.decompress(packed)
+    elif method == COMPRESSION_ZSTD:
+        if zstandard is None:
+            raise ValueError("снимок сжат zstd, а zstandard не установлен (pip install zstandard)")
+        body = zstandard.ZstdDecompressor().decompress(packed, max_output_size=body_len)
+    elif method == COMPRESSION_NONE:
+        body = packed
+    else:
+        raise ValueError(f"неизвестное сжатие {method}")
+    if len(body) != body_len:
+        raise ValueError(f"повреждённый снимок: {len(body)} байт тела вместо {body_len}")
+
+    view = memoryview(body)
+    tree = CompactUITree()
+    strings, pos = _decode_strings(view, 0, string_count)
+    tree.strings = strings
+    # Первое вхождение строки - её индекс (как в intern)
+    string_ids = tree._string_ids
+    for index in range(len(strings) - 1, -1, -1):
+        string_ids[strings[index]] = index
+
+    for name, typecode in COLUMNS:
+        column = _read_column(view, pos, typecode, nodes)
+        pos += column.itemsize * nodes
+        setattr(tree, name, column)
+
+    tree.entries = _Decoder(view, pos, strings).decode_entries()
+    return tree
+
+
+def write_snapshot(path: Union[str, Path], ui_tree: Union[CompactUITree, dict],
+                   compression: str = 'zlib', created: Optional[float] = None) -> int:
+    """
+    Записать снимок в файл (через временный файл - без полузаписанных снимков).
+
+    Returns:
+        Размер файла в байтах
+    """
+    data = encode_snapshot(ui_tree, compression, created=created)
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + '.tmp')
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+    return len(data)
+
+
+def read_snapshot(path: Union[str, Path]) -> CompactUITree:
+    """Прочитать файл снимка в CompactUITree."""
+    with open(path, 'rb') as f:
+        return decode_snapshot(f.read())
+
+
+def load_ui_tree(path: Union[str, Path]) -> Optional[dict]:
+    """
+    Загрузить UI tree в dict-форме для dev tools: бинарный снимок или JSON.
+
+    Args:
+        path: .snap (SnapshotWriter) или .json (C# exe, старые дампы)
+
+    Returns:
+        Корневой dict-узел
+    """
+    with open(path, 'rb') as f:
+        head = f.read(len(SNAPSHOT_MAGIC))
+    if head == SNAPSHOT_MAGIC:
+        return read_snapshot(path).to_dict()
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+class SnapshotWriter:
+    """Фоновая запись снимков UI tree через ограниченную очередь."""
+
+    def __init__(self, output_dir: str = "output/debug", compression: str = 'zlib',
+                 queue_size: int = 4, prefix: str = "ui_tree"):
+        """
+        Args:
+            output_dir: Каталог снимков
+            compression: 'none', 'zlib' или 'zstd'
+            queue_size: Снимков в очереди; сверх этого новые пропускаются
+            prefix: Префикс имён файлов
+        """
+        self.output_dir = Path(output_dir)
+        self.compression = compression
+        self.prefix = prefix
+        if compression == 'zstd' and zstandard is None:
+            logger.warning("zstandard не установлен - снимки сжимаются zlib")
+            self.compression = 'zlib'
+
+        self.written = 0
+        self.dropped = 0
+        self.bytes_written = 0
+        self.last_path: Optional[Path] = None
+
+        self._queue: queue.Queue = queue.Queue(maxsize=max(1, queue_size))
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def submit(self, ui_tree: Union[CompactUITree, dict]) -> bool:
+        """
+        Поставить снимок в очередь (не блокирует).
+
+        Дерево не копируется: после submit его нельзя менять (CompactUITree
+        не меняется после построения; dict-дерево отдаётся целиком).
+
+        Returns:
+            False если очередь полна и снимок пропущен
+        """
+        return self._put(('tree', ui_tree, time.time()))
+
+    def submit_file(self, json_path: Union[str, Path]) -> bool:
+        """
+        Поставить в очередь JSON-файл C# exe: writer сам разберёт его и удалит.
+
+        Так поток чтения не делит с writer'ом dict-дерево, которое дальше
+        дополняет парсер.
+
+        Returns:
+            False если очередь полна (файл тогда удаляется сразу)
+        """
+        if self._put(('file', Path(json_path), time.time())):
+            return True
+        _unlink(json_path)
+        return False
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Дописать очередь и остановить поток."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        self._queue.put(None)
+        thread.join(timeout=timeout)
+
+    def stats(self) -> dict:
+        """Счётчики записи."""
+        return {
+            'written': self.written,
+            'dropped': self.dropped,
+            'queued': self._queue.qsize(),
+            'bytes': self.bytes_written,
+            'last_path': str(self.last_path) if self.last_path else None,
+        }
+
+    def _put(self, item: tuple) -> bool:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="sanderling-snapshots", daemon=True)
+                self._thread.start()
+        try:
+            self._queue.put_nowait(item)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            if self.dropped == 1 or self.dropped % 100 == 0:
+                logger.warning(f"Snapshot queue full, dropped {self.dropped} snapshots")
+            return False
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            kind, payload, created = item
+            try:
+                if kind == 'file':
+                    with open(payload, 'r', encoding='utf-8') as f:
+                        ui_tree = json.load(f)
+                    _unlink(payload)
+                else:
+                    ui_tree = payload
+                self._write(ui_tree, created)
+            except Exception as e:
+                logger.error(f"Failed to save debug snapshot: {e}")
+
+    def _write(self, ui_tree: Union[CompactUITree, dict], created: float) -> None:
+        stamp = time.strftime("%Y%m%d_%H%M%S", time.localtime(created))
+        path = self.output_dir / f"{self.prefix}_{stamp}_{int(created * 1000) % 1000:03d}.snap"
+        size = write_snapshot(path, ui_tree, self.compression, created=created)
+        self.written += 1
+        self.bytes_written += size
+        self.last_path = path
+
+
+class _Encoder:
+    """Кодирование значений entries (строки вне начальной таблицы дописываются)."""
+
+    def __init__(self, strings: List[str] = (), ids: Optional[Dict[str, int]] = None):
+        """
+        Args:
+            strings: Начальная таблица строк (ключи packed entries - её индексы)
+            ids: Индекс строк таблицы (строка -> первый индекс)
+        """
+        self.strings: List[str] = list(strings)
+        self._ids: Dict[str, int] = dict(ids) if ids is not None else {}
+
+    def intern(self, value: str) -> int:
+        string_id = self._ids.get(value)
+        if string_id is None:
+            string_id = len(self.strings)
+            self.strings.append(value)
+            self._ids[value] = string_id
+        return string_id
+
+    def encode_entries(self, entries: Dict[int, tuple]) -> bytearray:
+        out = bytearray()
+        out += _U32.pack(len(entries))
+        for index in sorted(entries):
+            packed = entries[index]
+            out += _PAIR.pack(index, len(packed) // 2)
+            self._pairs(out, packed)
+        return out
+
+    def _pairs(self, out: bytearray, packed: tuple) -> None:
+        for i in range(0, len(packed), 2):
+            out += _U32.pack(packed[i])
+            self.value(out, packed[i + 1])
+
+    def value(self, out: bytearray, value: Any) -> None:
+        if value is None:
+            out.append(T_NONE)
+        elif value is True:
+            out.append(T_TRUE)
+        elif value is False:
+            out.append(T_FALSE)
+        elif isinstance(value, str):
+            out.append(T_STR)
+            out += _U32.pack(self.intern(value))
+        elif isinstance(value, int):
+            if -0x8000000000000000 <= value <= 0x7FFFFFFFFFFFFFFF:
+                out.append(T_INT)
+                out += _I64.pack(value)
+            else:
+                out.append(T_INTSTR)
+                out += _U32.pack(self.intern(str(value)))
+        elif isinstance(value, float):
+            out.append(T_FLOAT)
+            out += _F64.pack(value)
+        elif isinstance(value, _BigInt):
+            out.append(T_BIGINT)
+            self.value(out, value[0])
+            self.value(out, value[1])
+        elif isinstance(value, _PackedDict):
+            out.append(T_PACKED)
+            out += _U32.pack(len(value) // 2)
+            self._pairs(out, value)
+        elif isinstance(value, dict):
+            out.append(T_MAP)
+            out += _U32.pack(len(value))
+            for key, item in value.items():
+                out += _U32.pack(self.intern(str(key)))
+                self.value(out, item)
+        elif isinstance(value, (list, tuple)):
+            out.append(T_LIST)
+            out += _U32.pack(len(value))
+            for item in value:
+                self.value(out, item)
+        else:
+            # Неизвестный тип (не из JSON) - строкой, как json.dump(default=str)
+            out.append(T_STR)
+            out += _U32.pack(self.intern(str(value)))
+
+
+class _Decoder:
+    """Разбор entries снимка."""
+
+    def __init__(self, view: memoryview, pos: int, strings: List[str]):
+        self.view = view
+        self.pos = pos
+        self.strings = strings
+
+    def u32(self) -> int:
+        (value,) = _U32.unpack_from(self.view, self.pos)
+        self.pos += 4
+        return value
+
+    def decode_entries(self) -> Dict[int, tuple]:
+        entries = {}
+        for _ in range(self.u32()):
+            index, pairs = _PAIR.unpack_from(self.view, self.pos)
+            self.pos += _PAIR.size
+            entries[index] = self._pairs(pairs)
+        return entries
+
+    def _pairs(self, count: int) -> tuple:
+        packed = []
+        for _ in range(count):
+            packed.append(self.u32())
+            packed.append(self.value())
+        return tuple(packed)
+
+    def value(self) -> Any:
+        tag = self.view[self.pos]
+        self.pos += 1
+        if tag == T_STR:
+            return self.strings[self.u32()]
+        if tag == T_INT:
+            (value,) = _I64.unpack_from(self.view, self.pos)
+            self.pos += 8
+            return value
+        if tag == T_NONE:
+            return None
+        if tag == T_TRUE:
+            return True
+        if tag == T_FALSE:
+            return False
+        if tag == T_FLOAT:
+            (value,) = _F64.unpack_from(self.view, self.pos)
+            self.pos += 8
+            return value
+        if tag == T_BIGINT:
+            return _BigInt((self.value(), self.value()))
+        if tag == T_PACKED:
+            return _PackedDict(self._pairs(self.u32()))
+        if tag == T_MAP:
+            strings = self.strings
+            result = {}
+            for _ in range(self.u32()):
+                key = strings[self.u32()]
+                result[key] = self.value()
+            return result
+        if tag == T_LIST:
+            return [self.value() for _ in range(self.u32())]
+        if tag == T_INTSTR:
+            return int(self.strings[self.u32()])
+        raise ValueError(f"неизвестный тег значения {tag} (смещение {self.pos - 1})")
+
+
+def _encode_strings(strings: List[str]) -> bytes:
+    """Таблица строк: длины (u32) + UTF-8 подряд."""
+    raw = [s.encode('utf-8', 'surrogatepass') for s in strings]
+    return _column_bytes(array('I', [len(s) for s in raw])) + b''.join(raw)
+
+
+def _decode_strings(view: memoryview, pos: int, count: int) -> Tuple[List[str], int]:
+    """
+    Прочитать таблицу строк.
+
+    Returns:
+        (строки, позиция после таблицы)
+    """
+    lengths = _read_column(view, pos, 'I', count)
+    pos += 4 * count
+    strings = []
+    for length in lengths:
+        strings.append(str(view[pos:pos + length], 'utf-8', 'surrogatepass'))
+        pos += length
+    return strings, pos
+
+
+def _column_bytes(column: array) -> bytes:
+    """Колонка в little-endian."""
+    if _BIG_ENDIAN:
+        column = array(column.typecode, column)
+        column.byteswap()
+    return column.tobytes()
+
+
+def _read_column(view: memoryview, pos: int, typecode: str, count: int) -> array:
+    """Прочитать колонку из little-endian."""
+    column = array(typecode)
+    column.frombytes(view[pos:pos + column.itemsize * count])
+    if _BIG_ENDIAN:
+        column.byteswap()
+    return column
+
+
+def _unlink(path: Union[str, Path]) -> None:
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
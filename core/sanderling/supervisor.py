@@ -0,0 +1,342 @@
+"""Несколько клиентов EVE на одной машине.
+
+SanderlingSupervisor находит все процессы EVE и держит на каждый свой
+SanderlingService (root address, открытый reader с кэшем layout, снимки,
+история, метрики), но без собственного потока чтения. Тики выполняет общий
+пул воркеров: диспетчер отдаёт в пул клиентов, у которых наступил срок
+чтения, по возрастанию срока и не больше одного тика на клиента за раз.
+Медленный клиент не занимает пул целиком, остальные не голодают.
+
+    supervisor = SanderlingSupervisor()
+    supervisor.start()
+    for pid, client in supervisor.clients().items():
+        state = client.get_state()
+    print(supervisor.format_rates())
+
+Воркеры - потоки: чтение памяти (pread / process_vm_readv через ctypes,
+C#-ридер через subprocess на Windows) отпускает GIL, а снимки должны жить
+в этом процессе. Парсинг по-прежнему выполняется под GIL.
+"""
+import logging
+import os
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Set
+
+import psutil
+
+from .cache import RootAddressCache
+from .config import SanderlingConfig
+from .service import SanderlingService
+
+
+logger = logging.getLogger(__name__)
+
+# Окно для подсчёта частоты чтений (сек)
+RATE_WINDOW_S = 10.0
+# Повторная попытка подключиться к процессу, где не нашёлся root address (сек)
+ATTACH_RETRY_S = 60.0
+
+
+def discover_eve_processes() -> List[int]:
+    """
+    Найти все процессы EVE Online.
+
+    Returns:
+        Список PID (может быть пустым)
+    """
+    if sys.platform == 'linux':
+        from .linux_process import find_eve_processes
+        return find_eve_processes()
+
+    pids = []
+    for proc in psutil.process_iter(['pid', 'name']):
+        try:
+            if (proc.info['name'] or '').lower() == 'exefile.exe':
+                pids.append(proc.info['pid'])
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            continue
+    return pids
+
+
+class SanderlingSupervisor:
+    """Чтение нескольких клиентов EVE общим пулом воркеров."""
+
+    def __init__(self, config: Optional[SanderlingConfig] = None,
+                 workers: Optional[int] = None):
+        """
+        Args:
+            config: Конфигурация Sanderling (общая для всех клиентов)
+            workers: Размер пула (None - config.supervisor_workers, 0 там - по числу ядер)
+        """
+        self.config = config or SanderlingConfig.load()
+        self.workers = workers or self.config.supervisor_workers or os.cpu_count() or 1
+        self.is_running = False
+        # Один кэш root address на всех клиентов (иначе записи затирают друг друга)
+        self.cache = RootAddressCache() if self.config.cache_enabled else None
+
+        self._clients: Dict[int, SanderlingService] = {}
+        self._attaching: Set[int] = set()
+        self._failed: Dict[int, float] = {}  # pid -> когда не удалось подключиться
+        self._in_flight: Set[int] = set()
+        self._due_at: Dict[int, float] = {}  # pid -> срок следующего тика (monotonic)
+        self._tick_started: Dict[int, float] = {}
+        self._reads: Dict[int, deque] = {}  # pid -> время успешных тиков (для частоты)
+        self._attached_at: Dict[int, float] = {}
+
+        self._lock = threading.Lock()
+        # Общий для всех клиентов: завершение тика, появление ожидающего, stop()
+        self._wake = threading.Event()
+        self._stop_event = threading.Event()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._thread: Optional[threading.Thread] = None
+        self._discovered_at: Optional[float] = None
+
+    def start(self) -> bool:
+        """
+        Запустить диспетчер; клиенты подключаются в фоне по мере обнаружения.
+
+        Returns:
+            True если запущен
+        """
+        if not self.config.enabled:
+            logger.info("Sanderling is disabled in config")
+            return False
+
+        if self.is_running:
+            return True
+
+        logger.info(f"Starting Sanderling supervisor ({self.workers} workers)...")
+        self.is_running = True
+        self._stop_event.clear()
+        self._executor = ThreadPoolExecutor(max_workers=self.workers,
+                                            thread_name_prefix="sanderling-worker")
+        self._thread = threading.Thread(target=self._run, name="sanderling-supervisor", daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self) -> None:
+        """Остановить диспетчер, дождаться текущих тиков и остановить клиентов."""
+        if not self.is_running:
+            return
+
+        logger.info("Stopping supervisor...")
+        self.is_running = False
+        self._stop_event.set()
+        self._wake.set()
+
+        if self._thread:
+            self._thread.join(timeout=5.0)
+        if self._executor:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+        with self._lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+        for client in clients:
+            client.stop()
+
+        logger.info("Supervisor stopped")
+
+    def clients(self) -> Dict[int, SanderlingService]:
+        """Подключённые клиенты: {pid: SanderlingService}."""
+        with self._lock:
+            return dict(self._clients)
+
+    def client(self, pid: int) -> Optional[SanderlingService]:
+        """
+        Сервис конкретного клиента (get_state, wait_until, history, metrics...).
+
+        Args:
+            pid: PID процесса EVE
+
+        Returns:
+            SanderlingService или None если клиент не подключён
+        """
+        with self._lock:
+            return self._clients.get(pid)
+
+    def rates(self) -> dict:
+        """
+        Частота чтений по клиентам и суммарно.
+
+        Returns:
+            {'clients': {pid: {'reads_per_s', 'reads', 'errors', 'tick_p50', 'tick_p95'}},
+             'total': {'reads_per_s', 'reads', 'errors', 'clients', 'workers'}}
+        """
+        now = time.monotonic()
+        with self._lock:
+            clients = dict(self._clients)
+            reads = {pid: list(times) for pid, times in self._reads.items()}
+            attached_at = dict(self._attached_at)
+
+        result = {}
+        for pid, client in clients.items():
+            times = [t for t in reads.get(pid, ()) if now - t <= RATE_WINDOW_S]
+            window = min(RATE_WINDOW_S, now - attached_at.get(pid, now))
+            metrics = client.metrics()
+            tick = metrics['stages'].get('tick_ms') or {}
+            result[pid] = {
+                'reads_per_s': len(times) / window if window > 0 else 0.0,
+                'reads': client.read_count,
+                'errors': metrics['errors'],
+                'tick_p50': tick.get('p50'),
+                'tick_p95': tick.get('p95'),
+            }
+
+        return {
+            'clients': result,
+            'total': {
+                'reads_per_s': sum(r['reads_per_s'] for r in result.values()),
+                'reads': sum(r['reads'] for r in result.values()),
+                'errors': sum(r['errors'] for r in result.values()),
+                'clients': len(result),
+                'workers': self.workers,
+            },
+        }
+
+    def format_rates(self) -> str:
+        """Таблица частоты чтений по клиентам (для логов)."""
+        data = self.rates()
+        lines = [f"{'pid':<8} {'reads/s':>8} {'reads':>8} {'errors':>7} {'p50 ms':>8} {'p95 ms':>8}"]
+        for pid, r in sorted(data['clients'].items()):
+            p50 = f"{r['tick_p50']:.1f}" if r['tick_p50'] is not None else '-'
+            p95 = f"{r['tick_p95']:.1f}" if r['tick_p95'] is not None else '-'
+            lines.append(f"{pid:<8} {r['reads_per_s']:>8.2f} {r['reads']:>8} {r['errors']:>7} {p50:>8} {p95:>8}")
+        total = data['total']
+        lines.append(f"{'total':<8} {total['reads_per_s']:>8.2f} {total['reads']:>8} {total['errors']:>7} "
+                     f"({total['clients']} clients, {total['workers']} workers)")
+        return '\n'.join(lines)
+
+    def _run(self) -> None:
+        """Цикл диспетчера: поиск клиентов и раздача тиков в пул."""
+        interval = self.config.supervisor_discover_interval_s
+
+        while not self._stop_event.is_set():
+            now = time.monotonic()
+            if self._discovered_at is None or now - self._discovered_at >= interval:
+                self._discovered_at = now
+                self._discover()
+
+            self._wake.clear()
+            timeout = self._dispatch(time.monotonic())
+            next_discover = self._discovered_at + interval - time.monotonic()
+            self._wake.wait(max(0.0, min(timeout, next_discover)))
+
+    def _discover(self) -> None:
+        """Подключить новые процессы EVE (в пуле - поиск root address может быть долгим)."""
+        try:
+            pids = discover_eve_processes()
+        except Exception as e:
+            logger.error(f"EVE process discovery failed: {e}")
+            return
+
+        now = time.monotonic()
+        with self._lock:
+            new = [
+                pid for pid in pids
+                if pid not in self._clients and pid not in self._attaching
+                and now - self._failed.get(pid, -ATTACH_RETRY_S) >= ATTACH_RETRY_S
+            ]
+            self._attaching.update(new)
+
+        for pid in new:
+            logger.info(f"Found EVE client: {pid}")
+            self._executor.submit(self._attach, pid)
+
+    def _attach(self, pid: int) -> None:
+        """Выполняется в пуле: подключиться к клиенту и поставить в очередь."""
+        client = SanderlingService(self.config, pid=pid, wake_event=self._wake, cache=self.cache)
+        try:
+            attached = client.attach()
+        except Exception as e:
+            logger.error(f"Failed to attach to EVE client {pid}: {e}")
+            attached = False
+
+        with self._lock:
+            self._attaching.discard(pid)
+            if not attached:
+                self._failed[pid] = time.monotonic()
+            elif not self._stop_event.is_set():
+                self._failed.pop(pid, None)
+                self._clients[pid] = client
+                self._due_at[pid] = time.monotonic()
+                self._attached_at[pid] = time.monotonic()
+                self._reads[pid] = deque()
+                logger.info(f"EVE client {pid} attached ({len(self._clients)} total)")
+        if attached and self._stop_event.is_set():
+            client.stop()
+        self._wake.set()
+
+    def _dispatch(self, now: float) -> float:
+        """
+        Отдать в пул клиентов, у которых наступил срок.
+
+        Клиентов с ожидающими (wait_until, async) читаем не реже нижней
+        границы интервала - как пауза одиночного сервиса сокращается до floor.
+
+        Returns:
+            Сколько ждать до ближайшего срока (сек)
+        """
+        with self._lock:
+            ready = []
+            next_due = float('inf')
+            for pid, client in self._clients.items():
+                if pid in self._in_flight:
+                    continue
+                due = self._due_at[pid]
+                if client._waiters > 0:
+                    due = min(due, self._tick_started.get(pid, now) + client.scheduler.floor_ms / 1000.0)
+                if due <= now:
+                    ready.append((due, pid))
+                else:
+                    next_due = min(next_due, due)
+
+            # Раньше срок - раньше очередь; пул не переполняем, чтобы
+            # клиент с более ранним сроком не встал за уже отданными
+            ready.sort()
+            free = self.workers - len(self._in_flight) - len(self._attaching)
+            for due, pid in ready[:max(0, free)]:
+                self._in_flight.add(pid)
+                self._executor.submit(self._tick, pid, self._clients[pid])
+            if len(ready) > max(0, free):
+                # Пул занят: до освобождения воркера раздавать нечего.
+                # _tick/_attach в конце будят _wake (он сброшен до _dispatch),
+                # таймаут - только страховка
+                return RATE_WINDOW_S
+
+        return max(0.0, next_due - now) if next_due != float('inf') else RATE_WINDOW_S
+
+    def _tick(self, pid: int, client: SanderlingService) -> None:
+        """Выполняется в пуле: один тик клиента."""
+        tick_start = time.monotonic()
+        state = None
+        try:
+            state = client.tick()
+        finally:
+            with self._lock:
+                self._in_flight.discard(pid)
+                self._tick_started[pid] = tick_start
+                if not client.is_running:
+                    self._remove(pid)
+                else:
+                    self._due_at[pid] = client.next_tick_at(tick_start, state)
+                    if state is not None:
+                        reads = self._reads[pid]
+                        reads.append(time.monotonic())
+                        while reads and reads[-1] - reads[0] > RATE_WINDOW_S:
+                            reads.popleft()
+            self._wake.set()
+
+    def _remove(self, pid: int) -> None:
+        """Убрать завершившийся клиент (вызывать под self._lock)."""
+        self._clients.pop(pid, None)
+        self._due_at.pop(pid, None)
+        self._tick_started.pop(pid, None)
+        self._reads.pop(pid, None)
+        self._attached_at.pop(pid, None)
+        logger.info(f"EVE client {pid} terminated ({len(self._clients)} left)")
@@ -0,0 +1,155 @@
+"""Трассировка задержки реакции бота.
+
+Меряем время от чтения памяти, в котором бот увидел изменение, до его
+действия (клик / нажатие клавиши):
+
+1. SanderlingService.get_state() / get_snapshot() / wait_until() помечают
+   снимок как "наблюдаемый" текущим потоком (seq + время чтения).
+2. Бот-рутина помечается span'ом: `with span('kill_enemy'):` или `@traced('kill_enemy')`.
+3. Клики, drag и нажатия клавиш в eve.mouse / eve.keyboard вызывают record_action() -
+   задержка "время чтения снимка -> действие" пишется в гистограмму рутины.
+
+Считается только первое действие после нового наблюдения: серия кликов по
+одному снимку (лок + F + 1) - это одна реакция.
+"""
+import functools
+import json
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Iterator, Optional
+
+from .metrics import RollingHistogram, format_table
+from .models import StateSnapshot
+
+
+UNLABELED = 'unlabeled'
+
+_local = threading.local()
+_lock = threading.Lock()
+_histograms: Dict[str, RollingHistogram] = {}
+_enabled = True
+
+# Сколько последних реакций хранить на рутину
+HISTORY_PER_ROUTINE = 4096
+
+
+def set_enabled(enabled: bool) -> None:
+    """Включить/выключить трассировку (глобально)."""
+    global _enabled
+    _enabled = enabled
+
+
+def observe(snapshot: StateSnapshot) -> None:
+    """
+    Запомнить что текущий поток принимает решение по этому снимку.
+
+    Вызывается сервисом при выдаче состояния; повторное наблюдение того же
+    снимка не сбрасывает уже записанную реакцию.
+    """
+    if not _enabled or not snapshot.seq:
+        return
+    if getattr(_local, 'seq', 0) != snapshot.seq:
+        _local.seq = snapshot.seq
+        _local.read_at = snapshot.timestamp
+        _local.pending = True
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """
+    Пометить участок кода как бот-рутину (вложенные span'ы перекрывают внешние).
+
+        with span('process_cache'):
+            ...
+    """
+    previous = getattr(_local, 'routine', None)
+    _local.routine = name
+    try:
+        yield
+    finally:
+        _local.routine = previous
+
+
+def traced(name: str) -> Callable:
+    """Декоратор: выполнить функцию внутри span(name)."""
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def record_action(action: str) -> Optional[float]:
+    """
+    Записать действие бота (вызывается из eve.mouse / eve.keyboard).
+
+    Args:
+        action: Тип действия ('click', 'drag', 'key')
+
+    Returns:
+        Задержка реакции в мс или None (нет нового наблюдения)
+    """
+    if not _enabled or not getattr(_local, 'pending', False):
+        return None
+    _local.pending = False
+
+    latency_ms = (time.time() - _local.read_at) * 1000
+    routine = getattr(_local, 'routine', None) or UNLABELED
+
+    with _lock:
+        for key in (routine, f'{routine}:{action}'):
+            histogram = _histograms.get(key)
+            if histogram is None:
+                histogram = _histograms[key] = RollingHistogram(HISTORY_PER_ROUTINE)
+            histogram.add(latency_ms)
+    return latency_ms
+
+
+def report() -> Dict[str, dict]:
+    """
+    Распределения задержки по рутинам за сессию.
+
+    Returns:
+        {routine: {'count', 'mean', 'p50', 'p95', 'p99', 'max'}} (мс);
+        ключи 'routine:action' - разбивка по типу действия
+    """
+    with _lock:
+        return {name: histogram.summary() for name, histogram in sorted(_histograms.items())}
+
+
+def format_report() -> str:
+    """Таблица задержек по рутинам (мс) для лога."""
+    data = report()
+    return format_table(data, [name for name in data if ':' not in name], title='routine')
+
+
+def reset() -> None:
+    """Очистить накопленные задержки."""
+    with _lock:
+        _histograms.clear()
+
+
+def dump(path: Optional[str] = None) -> Optional[str]:
+    """
+    Сохранить отчёт в JSON.
+
+    Args:
+        path: Путь (по умолчанию output/logs/reaction_latency_<время>.json)
+
+    Returns:
+        Путь к файлу или None если данных нет
+    """
+    data = report()
+    if not data:
+        return None
+    if path is None:
+        path = f"output/logs/reaction_latency_{time.strftime('%Y%m%d_%H%M%S')}.json"
+
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    return path
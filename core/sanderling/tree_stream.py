@@ -0,0 +1,274 @@
+"""Потоковый приём UI tree из stdout ридера.
+
+Вместо "ридер пишет JSON-файл -> ищем имя файла в выводе -> json.load ->
+удаляем файл" JSON читается из pipe по мере вывода: без временного файла
+и без второго прохода по диску.
+
+С установленным ijson (C-бэкенд yajl2) дерево строится по событиям парсера
+прямо во время чтения: узлы сразу добавляются в CompactUITree (узел
+добавляется, как только пришли его поля до "children" - C# exe пишет
+children последним), dict-узлы в памяти не собираются. Без ijson вывод
+копится в буфере и разбирается json.loads после завершения ридера.
+
+Строки до JSON (лог ридера) сохраняются в preamble: если ридер вывел не
+дерево, а "... to file '<имя>'", сервис откатывается на чтение файла.
+
+    result = run_reader_streaming(cmd, cwd=temp_dir, timeout=5.0, compact=True)
+    if result.returncode == 0 and result.ui_tree is not None:
+        tree = result.ui_tree
+"""
+import json
+import re
+import subprocess
+import threading
+import time
+from typing import Any, List, NamedTuple, Optional, Sequence, Union
+
+from .compact_tree import CompactUITree, NO_NODE, _parse_address
+
+try:
+    import ijson
+    # Чистый Python-бэкенд ijson медленнее буфера + json.loads
+    _STREAMING = ijson.backend in ('yajl2_c', 'yajl2_cffi', 'yajl2')
+except ImportError:
+    ijson = None
+    _STREAMING = False
+
+
+# Начало JSON: строка, начинающаяся с "{" (до неё - лог ридера)
+_JSON_START = re.compile(rb'(?m)^[ \t]*\{')
+
+READ_CHUNK_SIZE = 65536
+
+# События ijson, меняющие стек разбора (остальные - скаляры)
+_STRUCTURE_EVENTS = frozenset(('start_map', 'end_map', 'start_array', 'end_array'))
+
+# Поля кадра стека разбора
+_IS_MAP, _VALUE, _KEY, _PARENT, _INDEX = range(5)
+
+
+def streaming_available() -> bool:
+    """Строится ли дерево во время чтения (ijson с C-бэкендом)."""
+    return _STREAMING
+
+
+class TreeStreamBuilder:
+    """Сборка UI tree из кусков JSON по мере их прихода."""
+
+    def __init__(self, compact: bool = True, streaming: Optional[bool] = None):
+        """
+        Args:
+            compact: Собирать CompactUITree (иначе dict-дерево)
+            streaming: Разбирать по мере прихода (по умолчанию - если есть ijson с C-бэкендом)
+        """
+        self.compact = compact
+        self.streaming = _STREAMING if streaming is None else streaming and ijson is not None
+        self.preamble = bytearray()  # Вывод до начала JSON
+        self.received = 0  # Байт JSON
+        self._started = False
+        self._chunks: List[bytes] = []
+        self._tree = CompactUITree() if compact else None
+        self._result: Any = None
+        self._stack: List[list] = []
+        self._events = None
+        self._parser = None
+        if self.streaming:
+            self._events = ijson.sendable_list()
+            self._parser = ijson.basic_parse_coro(self._events, use_float=True)
+
+    @property
+    def started(self) -> bool:
+        """Начался ли JSON в выводе."""
+        return self._started
+
+    def feed(self, data: bytes) -> None:
+        """Передать очередной кусок вывода ридера."""
+        if not self._started:
+            self.preamble += data
+            match = _JSON_START.search(self.preamble)
+            if match is None:
+                return
+            data = bytes(self.preamble[match.start():])
+            del self.preamble[match.start():]
+            self._started = True
+
+        self.received += len(data)
+        if self._parser is None:
+            self._chunks.append(data)
+            return
+        self._parser.send(data)
+        if self._events:
+            self._process(self._events)
+            del self._events[:]
+
+    def close(self) -> Union[CompactUITree, dict, None]:
+        """
+        Завершить разбор.
+
+        Returns:
+            CompactUITree (compact) или dict-дерево; None, если JSON в выводе не было
+
+        Raises:
+            ValueError: JSON оборван или некорректен
+        """
+        if not self._started:
+            return None
+
+        if self._parser is None:
+            ui_tree = json.loads(b''.join(self._chunks))
+            self._chunks = []
+            if self.compact:
+                return CompactUITree.from_dict(ui_tree, keep_source=False)
+            return ui_tree
+
+        try:
+            self._parser.close()
+        except ijson.JSONError as e:
+            raise ValueError(f"Некорректный JSON UI tree: {e}") from e
+        self._process(self._events)
+        del self._events[:]
+        if self._stack:
+            raise ValueError("JSON UI tree оборван")
+        return self._tree if self.compact else self._result
+
+    def _process(self, events: list) -> None:
+        """Применить события ijson (basic_parse) к стеку разбора."""
+        stack = self._stack
+        compact = self.compact
+
+        for event, value in events:
+            if event == 'map_key':
+                top = stack[-1]
+                top[_KEY] = value
+                # Поля узла до children уже пришли - узел можно добавлять (pre-order)
+                if value == 'children' and top[_PARENT] is not None and top[_INDEX] is None:
+                    top[_INDEX] = self._add_node(top)
+                continue
+
+            if event not in _STRUCTURE_EVENTS:
+                # Скаляр - самое частое событие
+                top = stack[-1]
+                if top[_IS_MAP]:
+                    top[_VALUE][top[_KEY]] = value
+                else:
+                    top[_VALUE].append(value)
+                continue
+
+            if event == 'start_map':
+                parent = None
+                if compact:
+                    if not stack:
+                        parent = NO_NODE
+                    elif not stack[-1][_IS_MAP]:
+                        # Элемент списка children узла - тоже узел
+                        parent = stack[-1][_PARENT]
+                stack.append([True, {}, None, parent, None])
+                continue
+
+            if event == 'start_array':
+                owner = None
+                if compact and stack:
+                    top = stack[-1]
+                    if top[_IS_MAP] and top[_KEY] == 'children' and top[_INDEX] is not None:
+                        owner = top[_INDEX]
+                stack.append([False, [], None, owner, None])
+                continue
+
+            # end_map / end_array
+            frame = stack.pop()
+            if frame[_PARENT] is not None:
+                # Узел (или его children) уже в дереве - в dict-форму не собирается
+                if frame[_IS_MAP] and frame[_INDEX] is None:
+                    self._add_node(frame)
+                continue
+            value = frame[_VALUE]
+
+            if stack:
+                top = stack[-1]
+                if top[_IS_MAP]:
+                    top[_VALUE][top[_KEY]] = value
+                else:
+                    top[_VALUE].append(value)
+            else:
+                self._result = value
+
+    def _add_node(self, frame: list) -> int:
+        node = frame[_VALUE]
+        return self._tree.add_node(
+            frame[_PARENT],
+            _parse_address(node.get('pythonObjectAddress')),
+            node.get('pythonObjectTypeName'),
+            node.get('dictEntriesOfInterest'),
+        )
+
+
+class ReaderOutput(NamedTuple):
+    """Результат запуска ридера с потоковым выводом."""
+    returncode: int
+    ui_tree: Union[CompactUITree, dict, None]  # None - ридер вывел не JSON
+    output: str  # Вывод ридера кроме JSON
+    elapsed_ms: float
+
+
+def run_reader_streaming(cmd: Sequence[str], cwd: Optional[str] = None,
+                         timeout: Optional[float] = None, compact: bool = True,
+                         chunk_size: int = READ_CHUNK_SIZE,
+                         streaming: Optional[bool] = None) -> ReaderOutput:
+    """
+    Запустить ридер и собрать UI tree из его stdout.
+
+    Args:
+        cmd: Команда ридера (с аргументами, при которых он пишет JSON в stdout)
+        cwd: Рабочий каталог (ридер без вывода в stdout пишет файл сюда)
+        timeout: Секунд на весь запуск
+        compact: Собирать CompactUITree
+        chunk_size: Размер чтения из pipe
+        streaming: Как в TreeStreamBuilder (None - по наличию ijson)
+
+    Returns:
+        ReaderOutput
+
+    Raises:
+        subprocess.TimeoutExpired: Ридер не завершился за timeout (процесс убит)
+        ValueError: Некорректный JSON в выводе
+    """
+    builder = TreeStreamBuilder(compact, streaming=streaming)
+    started = time.perf_counter()
+    process = subprocess.Popen(cmd, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+
+    expired = threading.Event()
+
+    def kill():
+        expired.set()
+        process.kill()
+
+    timer = threading.Timer(timeout, kill) if timeout else None
+    if timer is not None:
+        timer.daemon = True
+        timer.start()
+    try:
+        read = process.stdout.read1
+        while True:
+            chunk = read(chunk_size)
+            if not chunk:
+                break
+            builder.feed(chunk)
+        returncode = process.wait()
+    finally:
+        if timer is not None:
+            timer.cancel()
+        process.stdout.close()
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+
+    if expired.is_set():
+        raise subprocess.TimeoutExpired(cmd, timeout)
+
+    ui_tree = builder.close() if returncode == 0 else None
+    return ReaderOutput(
+        returncode=returncode,
+        ui_tree=ui_tree,
+        output=builder.preamble.decode('utf-8', errors='replace'),
+        elapsed_ms=(time.perf_counter() - started) * 1000,
+    )
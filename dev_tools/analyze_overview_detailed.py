@@ -2,8 +2,14 @@
 Детальный анализ OverviewScrollEntry для поиска признаков врагов.
 """
 import json
+import sys
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.sanderling.compact_tree import CompactUITree
+from core.sanderling.selector import select
+
 
 def find_node_by_path(root, path_str):
     """Находит узел по пути типа '/child[0]/child[1]'."""
@@ -24,6 +30,17 @@ def find_node_by_path(root, path_str):
     return node
 
 
+def node_path(tree, index):
+    """Путь узла вида '/child[0]/child[1]' от корня."""
+    parts = []
+    while tree.parent(index) != -1:
+        parent = tree.parent(index)
+        position = list(tree.children(parent)).index(index)
+        parts.append(f"child[{position}]")
+        index = parent
+    return ''.join(f"/{part}" for part in reversed(parts))
+
+
 def analyze_scroll_entry(entry, depth=0, max_depth=3):
     """Рекурсивно анализирует OverviewScrollEntry и его детей."""
     if depth > max_depth:
@@ -70,23 +87,9 @@ def main():
         data = json.load(f)
     
     # Ищем OverviewScrollEntry
-    def find_scroll_entries(node, path=""):
-        results = []
-        if not isinstance(node, dict):
-            return results
-        
-        obj_type = node.get("pythonObjectTypeName", "")
-        if obj_type == "OverviewScrollEntry":
-            results.append((path, node))
-        
-        children = node.get("children")
-        if isinstance(children, list):
-            for i, child in enumerate(children):
-                results.extend(find_scroll_entries(child, f"{path}/child[{i}]"))
-        
-        return results
-    
-    entries = find_scroll_entries(data)
+    tree = CompactUITree.from_dict(data)
+    entries = [(node_path(tree, index), tree.node(index))
+               for index in select(tree, 'OverviewScrollEntry')]
     print(f"Найдено OverviewScrollEntry: {len(entries)}\n")
     
     # Анализируем первые 3 записи
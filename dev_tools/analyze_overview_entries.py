@@ -5,41 +5,46 @@ import json
 import sys
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
 
-def find_overview_entries(node, path="", depth=0):
-    """Рекурсивно ищет overview entries в UI tree."""
-    results = []
-    
-    if not isinstance(node, dict):
-        return results
-    
-    # Проверяем тип объекта
-    obj_type = node.get("pythonObjectTypeName", "")
-    
-    # Ищем OverviewEntry, OverviewScrollEntry или строки в списке
-    if "entry" in obj_type.lower() and "overview" in obj_type.lower():
-        results.append({
-            "path": path,
-            "type": obj_type,
-            "data": node.get("dictEntriesOfInterest", {}),
-            "depth": depth
-        })
+from core.sanderling.compact_tree import CompactUITree
+from core.sanderling.selector import select
+
+
+def node_path(tree, index):
+    """Путь узла вида '/child[0]/child[1]' от корня."""
+    parts = []
+    while tree.parent(index) != -1:
+        parent = tree.parent(index)
+        position = list(tree.children(parent)).index(index)
+        parts.append(f"child[{position}]")
+        index = parent
+    return ''.join(f"/{part}" for part in reversed(parts))
+
+
+def is_overview_entry_type(type_name):
+    """OverviewEntry, OverviewScrollEntry или строки в списке (ScrollEntry/ListEntry)."""
+    lowered = type_name.lower()
+    return (("entry" in lowered and "overview" in lowered)
+            or "scrollentry" in lowered or "listentry" in lowered)
+
+
+def find_overview_entries(tree):
+    """Найти overview entries в UI tree (селектор по подходящим типам)."""
+    types = sorted({tree.type_name(index) for index in range(len(tree))
+                    if is_overview_entry_type(tree.type_name(index))})
+    if not types:
+        return []
     
-    # Также ищем ScrollEntry (строки в скролле)
-    if "scrollentry" in obj_type.lower() or "listentry" in obj_type.lower():
+    results = []
+    for index in select(tree, ', '.join(types)):
         results.append({
-            "path": path,
-            "type": obj_type,
-            "data": node.get("dictEntriesOfInterest", {}),
-            "depth": depth
+            "path": node_path(tree, index),
+            "type": tree.type_name(index),
+            "data": tree.dict_entries(index),
+            "depth": sum(1 for _ in tree.ancestors(index))
         })
     
-    # Рекурсивно обходим детей
-    children = node.get("children")
-    if isinstance(children, list):
-        for i, child in enumerate(children):
-            results.extend(find_overview_entries(child, f"{path}/child[{i}]", depth+1))
-    
     return results
 
 
@@ -51,7 +56,7 @@ def analyze_json_dump(filepath):
         data = json.load(f)
     
     # Ищем overview entries
-    entries = find_overview_entries(data)
+    entries = find_overview_entries(CompactUITree.from_dict(data))
     
     print(f"\nНайдено объектов: {len(entries)}")
     
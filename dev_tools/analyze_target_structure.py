@@ -4,20 +4,15 @@ import json
 import sys
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.sanderling.compact_tree import CompactUITree
+from core.sanderling.selector import compile_selector
 
-def find_nodes_by_type(node, target_type, results=None, depth=0, max_depth=100):
-    """Найти все узлы определенного типа."""
-    if results is None:
-        results = []
-    if depth > max_depth or not isinstance(node, dict):
-        return results
-    if node.get('pythonObjectTypeName') == target_type:
-        results.append(node)
-    children = node.get('children', [])
-    if isinstance(children, list):
-        for child in children:
-            find_nodes_by_type(child, target_type, results, depth + 1, max_depth)
-    return results
+
+def find_nodes_by_type(tree, target_type):
+    """Найти все узлы определенного типа (через индекс дерева)."""
+    return compile_selector(target_type).nodes(tree)
 
 
 def print_all_children(node, indent=0, max_depth=5):
@@ -62,11 +57,13 @@ def main():
     with open(json_file, 'r', encoding='utf-8') as f:
         ui_tree = json.load(f)
     
+    tree = CompactUITree.from_dict(ui_tree)
+    
     # Анализ целей
     print("=" * 80)
     print("TARGET STRUCTURE (TargetInBar)")
     print("=" * 80)
-    targets = find_nodes_by_type(ui_tree, 'TargetInBar')
+    targets = find_nodes_by_type(tree, 'TargetInBar')
     if targets:
         print(f"\nFound {len(targets)} targets. Showing first one:\n")
         print_all_children(targets[0], max_depth=4)
@@ -75,7 +72,7 @@ def main():
     print("\n" + "=" * 80)
     print("OVERVIEW STRUCTURE (OverviewScrollEntry)")
     print("=" * 80)
-    overview = find_nodes_by_type(ui_tree, 'OverviewScrollEntry')
+    overview = find_nodes_by_type(tree, 'OverviewScrollEntry')
     if overview:
         print(f"\nFound {len(overview)} entries. Showing first one:\n")
         print_all_children(overview[0], max_depth=3)
@@ -1,58 +1,24 @@
 #!/usr/bin/env python
 """Анализ UI tree из Sanderling для отладки парсера."""
-import json
 import sys
 from collections import Counter
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
 
-def find_all_types(node, types_counter=None, depth=0, max_depth=100):
-    """Рекурсивно найти все типы узлов в дереве."""
-    if types_counter is None:
-        types_counter = Counter()
-    
-    if depth > max_depth:
-        return types_counter
-    
-    if not isinstance(node, dict):
-        return types_counter
-    
-    # Подсчитать тип текущего узла
-    node_type = node.get('pythonObjectTypeName')
-    if node_type:
-        types_counter[node_type] += 1
-    
-    # Рекурсивно обработать children
-    children = node.get('children', [])
-    if isinstance(children, list):
-        for child in children:
-            find_all_types(child, types_counter, depth + 1, max_depth)
-    
-    return types_counter
+from core.sanderling.compact_tree import CompactUITree
+from core.sanderling.selector import compile_selector
+from core.sanderling.snapshot_file import load_ui_tree
 
 
-def find_nodes_by_type(node, target_type, results=None, depth=0, max_depth=100):
-    """Найти все узлы определенного типа."""
-    if results is None:
-        results = []
-    
-    if depth > max_depth:
-        return results
-    
-    if not isinstance(node, dict):
-        return results
-    
-    # Проверить текущий узел
-    if node.get('pythonObjectTypeName') == target_type:
-        results.append(node)
-    
-    # Рекурсивно обработать children
-    children = node.get('children', [])
-    if isinstance(children, list):
-        for child in children:
-            find_nodes_by_type(child, target_type, results, depth + 1, max_depth)
-    
-    return results
+def find_all_types(tree):
+    """Подсчитать все типы узлов в дереве."""
+    return Counter(tree.type_name(index) for index in range(len(tree)))
+
+
+def find_nodes_by_type(tree, target_type):
+    """Найти все узлы определенного типа (через индекс дерева)."""
+    return compile_selector(target_type).nodes(tree)
 
 
 def analyze_node(node, indent=0):
@@ -82,7 +48,7 @@ def main():
         json_files = list(Path('.').glob('eve-online-memory-reading-*.json'))
         if not json_files:
             print("ERROR: No JSON files found")
-            print("Usage: python dev_tools/analyze_ui_tree.py <json_file>")
+            print("Usage: python dev_tools/analyze_ui_tree.py <json_file | output/debug/*.snap>")
             return
         json_file = max(json_files, key=lambda p: p.stat().st_mtime)
         print(f"Using latest file: {json_file}")
@@ -92,18 +58,19 @@ def main():
     print(f"\nAnalyzing: {json_file}")
     print("=" * 80)
     
-    # Загрузить JSON
-    with open(json_file, 'r', encoding='utf-8') as f:
-        ui_tree = json.load(f)
+    # Загрузить JSON или бинарный debug-снимок
+    ui_tree = load_ui_tree(json_file)
     
     print(f"\nRoot type: {ui_tree.get('pythonObjectTypeName')}")
     print(f"Root has children: {'children' in ui_tree}")
     
+    tree = CompactUITree.from_dict(ui_tree)
+    
     # Подсчитать все типы
     print("\n" + "=" * 80)
     print("ALL NODE TYPES IN UI TREE:")
     print("=" * 80)
-    types_counter = find_all_types(ui_tree)
+    types_counter = find_all_types(tree)
     
     for node_type, count in types_counter.most_common(30):
         print(f"  {node_type:40} : {count:5} nodes")
@@ -120,7 +87,7 @@ def main():
     target_types = ['TargetInBar', 'Target', 'SelectedItemView', 'SelectedItem']
     print("\n[TARGETS]")
     for target_type in target_types:
-        nodes = find_nodes_by_type(ui_tree, target_type)
+        nodes = find_nodes_by_type(tree, target_type)
         print(f"  {target_type}: {len(nodes)} found")
         if nodes:
             print(f"    Example:")
@@ -130,7 +97,7 @@ def main():
     overview_types = ['OverviewScrollEntry', 'OverviewEntry', 'OverView', 'OverviewWindow']
     print("\n[OVERVIEW]")
     for overview_type in overview_types:
-        nodes = find_nodes_by_type(ui_tree, overview_type)
+        nodes = find_nodes_by_type(tree, overview_type)
         print(f"  {overview_type}: {len(nodes)} found")
         if nodes:
             print(f"    Example:")
@@ -140,7 +107,7 @@ def main():
     module_types = ['ShipSlot', 'ModuleButton', 'ShipModule', 'HudButton']
     print("\n[MODULES]")
     for module_type in module_types:
-        nodes = find_nodes_by_type(ui_tree, module_type)
+        nodes = find_nodes_by_type(tree, module_type)
         print(f"  {module_type}: {len(nodes)} found")
         if nodes:
             print(f"    Example:")
@@ -4,27 +4,15 @@ import json
 import sys
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.sanderling.compact_tree import CompactUITree
+from core.sanderling.selector import compile_selector
 
-def find_nodes_by_type(node, target_type, results=None, depth=0, max_depth=100):
-    """Найти все узлы определенного типа."""
-    if results is None:
-        results = []
-    
-    if depth > max_depth:
-        return results
-    
-    if not isinstance(node, dict):
-        return results
-    
-    if node.get('pythonObjectTypeName') == target_type:
-        results.append(node)
-    
-    children = node.get('children', [])
-    if isinstance(children, list):
-        for child in children:
-            find_nodes_by_type(child, target_type, results, depth + 1, max_depth)
-    
-    return results
+
+def find_nodes_by_type(tree, target_type):
+    """Найти все узлы определенного типа (через индекс дерева)."""
+    return compile_selector(target_type).nodes(tree)
 
 
 def print_node_structure(node, indent=0, max_depth=3):
@@ -78,11 +66,13 @@ def main():
     with open(json_file, 'r', encoding='utf-8') as f:
         ui_tree = json.load(f)
     
+    tree = CompactUITree.from_dict(ui_tree)
+    
     # Targets
     print("=" * 80)
     print("TARGETS (TargetInBar)")
     print("=" * 80)
-    targets = find_nodes_by_type(ui_tree, 'TargetInBar')
+    targets = find_nodes_by_type(tree, 'TargetInBar')
     print(f"Found: {len(targets)}\n")
     for i, target in enumerate(targets, 1):
         print(f"\n--- Target #{i} ---")
@@ -92,7 +82,7 @@ def main():
     print("\n" + "=" * 80)
     print("OVERVIEW (OverviewScrollEntry)")
     print("=" * 80)
-    overview = find_nodes_by_type(ui_tree, 'OverviewScrollEntry')
+    overview = find_nodes_by_type(tree, 'OverviewScrollEntry')
     print(f"Found: {len(overview)}\n")
     for i, entry in enumerate(overview[:3], 1):  # Показать первые 3
         print(f"\n--- Entry #{i} ---")
@@ -104,7 +94,7 @@ def main():
     print("\n" + "=" * 80)
     print("MODULES (ShipSlot)")
     print("=" * 80)
-    modules = find_nodes_by_type(ui_tree, 'ShipSlot')
+    modules = find_nodes_by_type(tree, 'ShipSlot')
     print(f"Found: {len(modules)}\n")
     for i, module in enumerate(modules[:3], 1):  # Показать первые 3
         print(f"\n--- Module #{i} ---")
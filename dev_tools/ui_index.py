@@ -0,0 +1,492 @@
+#!/usr/bin/env python
+"""
+Индекс UI tree дампов в SQLite: дампы разбираются один раз, дальше запросы
+по типам, тексту и селекторам идут по всему корпусу за миллисекунды.
+
+Загрузка принимает JSON-дампы (C# exe, dev tools), бинарные снимки .snap,
+записи сессий .sess (кадр раз в --session-every секунд) и каталоги с ними
+(core/sanderling/corpus.py). Файлы разбираются
+параллельно в процессах, вставка идёт в одном соединении; уже загруженные
+файлы с тем же mtime пропускаются, изменённые перезагружаются.
+
+Таблица nodes: узел в pre-order нумерации дерева (idx), его поддерево -
+[idx, end_idx), родитель, глубина, тип, адрес, _name, _setText, абсолютный
+прямоугольник и все dictEntriesOfInterest в JSON. Селектор (core/sanderling/
+selector.py) транслируется в соединения: A > B - B.parent = A.idx,
+A B - A.idx < B.idx < A.end_idx.
+
+Запуск:
+    python dev_tools/ui_index.py ingest output/ui_tree_dump_*.json output/debug/*.snap
+    python dev_tools/ui_index.py ingest output/sessions/*.sess --session-every 30
+    python dev_tools/ui_index.py info
+    python dev_tools/ui_index.py types --like overview
+    python dev_tools/ui_index.py find "OverviewScrollEntry > EveLabelMedium[_setText~=km]" --path
+    python dev_tools/ui_index.py text "Warp To" --type EveLabelMedium
+    python dev_tools/ui_index.py show 3 1542 --depth 2
+"""
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.sanderling.compact_tree import CompactUITree, MISSING, NAME_KEY, NO_NODE, TEXT_KEY
+from core.sanderling.corpus import expand_paths, load_trees
+from core.sanderling.selector import CHILD, SelectorError, _attr_matches, compile_selector
+
+DEFAULT_DB = "output/ui_index.sqlite"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS dumps (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL,
+    frame INTEGER NOT NULL,
+    timestamp REAL,
+    mtime REAL,
+    nodes INTEGER,
+    UNIQUE (path, frame)
+);
+CREATE TABLE IF NOT EXISTS types (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS nodes (
+    dump_id INTEGER NOT NULL,
+    idx INTEGER NOT NULL,
+    end_idx INTEGER NOT NULL,
+    parent INTEGER NOT NULL,
+    depth INTEGER NOT NULL,
+    type_id INTEGER NOT NULL,
+    address INTEGER,
+    name TEXT,
+    text TEXT,
+    x INTEGER,
+    y INTEGER,
+    width INTEGER,
+    height INTEGER,
+    entries TEXT,
+    PRIMARY KEY (dump_id, idx)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS nodes_type ON nodes (type_id);
+CREATE INDEX IF NOT EXISTS nodes_parent ON nodes (dump_id, parent);
+CREATE INDEX IF NOT EXISTS nodes_name ON nodes (name);
+CREATE INDEX IF NOT EXISTS nodes_text ON nodes (text);
+"""
+
+# Колонки узла, которыми заменяются одноимённые entries в условиях селектора
+ENTRY_COLUMNS = {NAME_KEY: 'name', TEXT_KEY: 'text'}
+
+
+# ------------------------------------------------------------
+# Загрузка
+# ------------------------------------------------------------
+
+def tree_rows(tree: CompactUITree) -> list:
+    """
+    Строки таблицы nodes для дерева (без dump_id, тип - именем).
+
+    Returns:
+        [(idx, end_idx, parent, depth, тип, адрес, name, text, x, y, w, h, entries)]
+    """
+    count = len(tree)
+    parents = tree.parents
+
+    # Pre-order: дети идут после родителя, размеры поддеревьев - обратным проходом
+    sizes = [1] * count
+    for index in range(count - 1, 0, -1):
+        parent = parents[index]
+        if parent != NO_NODE:
+            sizes[parent] += sizes[index]
+    depths = [0] * count
+    for index in range(1, count):
+        parent = parents[index]
+        if parent != NO_NODE:
+            depths[index] = depths[parent] + 1
+
+    rows = []
+    for index in range(count):
+        entries = tree.dict_entries(index)
+        width = tree.widths[index]
+        height = tree.heights[index]
+        rows.append((
+            index,
+            index + sizes[index],
+            parents[index],
+            depths[index],
+            tree.type_name(index),
+            tree.address(index) or None,
+            tree.name(index),
+            tree.text(index),
+            tree.abs_x[index],
+            tree.abs_y[index],
+            None if width == MISSING else width,
+            None if height == MISSING else height,
+            json.dumps(entries, ensure_ascii=False, default=str) if entries else None,
+        ))
+    return rows
+
+
+def _extract(path: str, session_every: float) -> list:
+    """Задача процесса: [(кадр, время, узлов, строки)] файла."""
+    return [(frame, timestamp, len(tree), tree_rows(tree))
+            for frame, timestamp, tree in load_trees(path, session_every)]
+
+
+def open_index(db_path: str) -> sqlite3.Connection:
+    """Открыть (создать) индекс и зарегистрировать функции для условий селектора."""
+    os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+    conn = sqlite3.connect(db_path)
+    conn.executescript(SCHEMA)
+    conn.create_function('entry_matches', 4, _entry_matches, deterministic=True)
+    conn.create_function('value_matches', 3, _attr_matches, deterministic=True)
+    conn.create_function('icontains', 2, _icontains, deterministic=True)
+    return conn
+
+
+def ingest(args) -> int:
+    paths = expand_paths(args.paths)
+    if not paths:
+        print("ERROR: Нет файлов для загрузки")
+        return 2
+
+    conn = open_index(args.db)
+    conn.execute("PRAGMA synchronous = OFF")
+    indexed = dict(conn.execute("SELECT path, max(mtime) FROM dumps GROUP BY path"))
+
+    todo = []
+    for path in paths:
+        path = os.path.abspath(path)
+        if not args.force and indexed.get(path) == os.path.getmtime(path):
+            continue
+        todo.append(path)
+    print(f"Файлов: {len(paths)}, к загрузке: {len(todo)} (остальные уже в индексе)")
+    if not todo:
+        return 0
+
+    type_ids = {name: type_id for type_id, name in conn.execute("SELECT id, name FROM types")}
+
+    def type_id(name):
+        found = type_ids.get(name)
+        if found is None:
+            found = type_ids[name] = conn.execute("INSERT INTO types (name) VALUES (?)", (name,)).lastrowid
+        return found
+
+    started = time.perf_counter()
+    total_dumps = total_nodes = errors = 0
+    workers = args.workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(_extract, path, args.session_every): path for path in todo}
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                frames = future.result()
+            except Exception as e:
+                print(f"ERROR: {path}: {e}")
+                errors += 1
+                continue
+
+            with conn:
+                conn.execute("DELETE FROM nodes WHERE dump_id IN (SELECT id FROM dumps WHERE path = ?)", (path,))
+                conn.execute("DELETE FROM dumps WHERE path = ?", (path,))
+                mtime = os.path.getmtime(path)
+                for frame, timestamp, count, rows in frames:
+                    dump_id = conn.execute(
+                        "INSERT INTO dumps (path, frame, timestamp, mtime, nodes) VALUES (?, ?, ?, ?, ?)",
+                        (path, frame, timestamp, mtime, count),
+                    ).lastrowid
+                    conn.executemany(
+                        "INSERT INTO nodes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        ((dump_id, idx, end, parent, depth, type_id(type_name), *rest)
+                         for idx, end, parent, depth, type_name, *rest in rows),
+                    )
+                    total_dumps += 1
+                    total_nodes += count
+            print(f"  {os.path.relpath(path)}: деревьев {len(frames)}, узлов {sum(f[2] for f in frames)}")
+
+    conn.execute("ANALYZE")
+    conn.close()
+    elapsed = time.perf_counter() - started
+    print(f"Загружено деревьев: {total_dumps}, узлов: {total_nodes} за {elapsed:.1f} с "
+          f"({workers} процессов) -> {args.db}")
+    return 1 if errors else 0
+
+
+# ------------------------------------------------------------
+# Запросы
+# ------------------------------------------------------------
+
+@lru_cache(maxsize=4096)
+def _parse_entries(entries: str) -> dict:
+    return json.loads(entries)
+
+
+def _entry_matches(entries, key, op, expected) -> bool:
+    """SQL-функция: условие [key op expected] селектора по entries узла."""
+    value = _parse_entries(entries).get(key) if entries else None
+    return _attr_matches(value, op, expected)
+
+
+def _icontains(text, pattern) -> bool:
+    """SQL-функция: подстрока без учёта регистра (LIKE не знает кириллицу)."""
+    return text is not None and pattern.lower() in text.lower()
+
+
+def selector_sql(query: str, type_ids: dict):
+    """
+    SQL для селектора: пары (dump_id, idx) подходящих узлов.
+
+    Args:
+        query: Селектор (core/sanderling/selector.py)
+        type_ids: {имя типа: id} из таблицы types
+
+    Returns:
+        (sql, параметры) или None, если ни одна цепочка не может совпасть
+    """
+    parts = []
+    params = []
+    for chain in compile_selector(query).parts():
+        joins = []
+        where = []
+        chain_params = []
+        possible = True
+        for i, (combinator, type_name, attrs) in enumerate(chain):
+            alias = f"n{i}"
+            if i == 0:
+                joins.append(f"nodes {alias}")
+            elif combinator == CHILD:
+                joins.append(f"JOIN nodes {alias} ON {alias}.dump_id = n{i - 1}.dump_id "
+                             f"AND {alias}.parent = n{i - 1}.idx")
+            else:
+                joins.append(f"JOIN nodes {alias} ON {alias}.dump_id = n{i - 1}.dump_id "
+                             f"AND {alias}.idx > n{i - 1}.idx AND {alias}.idx < n{i - 1}.end_idx")
+
+            if type_name is not None:
+                if type_name not in type_ids:
+                    possible = False
+                    break
+                where.append(f"{alias}.type_id = ?")
+                chain_params.append(type_ids[type_name])
+            for key, op, expected in attrs:
+                column = ENTRY_COLUMNS.get(key)
+                if column and op == '=':
+                    # Индексированная колонка вместо разбора entries
+                    where.append(f"{alias}.{column} = ?")
+                    chain_params.append(expected)
+                elif column and op is not None:
+                    # Строковое значение - из колонки, иначе (нет или не строка) - из entries
+                    condition, condition_params = _entry_condition(alias, key, op, expected)
+                    where.append(f"(CASE WHEN {alias}.{column} IS NOT NULL "
+                                 f"THEN value_matches({alias}.{column}, ?, ?) ELSE {condition} END)")
+                    chain_params.extend((op, expected, *condition_params))
+                else:
+                    condition, condition_params = _entry_condition(alias, key, op, expected)
+                    where.append(condition)
+                    chain_params.extend(condition_params)
+
+        if not possible:
+            continue
+        last = f"n{len(chain) - 1}"
+        # DISTINCT: узел под несколькими подходящими предками (A B) - одна строка
+        sql = f"SELECT DISTINCT {last}.dump_id AS dump_id, {last}.idx AS idx FROM {' '.join(joins)}"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        parts.append(sql)
+        params.extend(chain_params)
+
+    if not parts:
+        return None
+    # UNION - узел, подходящий под несколько цепочек, тоже одной строкой
+    return " UNION ".join(parts), params
+
+
+def _entry_condition(alias: str, key: str, op, expected):
+    """Условие [key op expected] по JSON entries: (sql, параметры)."""
+    if op == '!=':
+        # Отсутствующий ключ тоже подходит - нужен разбор каждого узла
+        return f"entry_matches({alias}.entries, ?, ?, ?)", [key, op, expected]
+    # Без ключа в тексте JSON узел не подходит - дешёвый фильтр до разбора
+    return (f"(CASE WHEN instr({alias}.entries, ?) > 0 THEN entry_matches({alias}.entries, ?, ?, ?) ELSE 0 END)",
+            [json.dumps(key) + ': ', key, op, expected])
+
+
+def node_path(conn: sqlite3.Connection, dump_id: int, idx: int) -> str:
+    """Цепочка типов от корня до узла."""
+    rows = conn.execute("""
+        WITH RECURSIVE up(idx, parent, type_id, level) AS (
+            SELECT idx, parent, type_id, 0 FROM nodes WHERE dump_id = ? AND idx = ?
+            UNION ALL
+            SELECT n.idx, n.parent, n.type_id, up.level + 1
+            FROM nodes n JOIN up ON n.dump_id = ? AND n.idx = up.parent
+        )
+        SELECT t.name FROM up JOIN types t ON t.id = up.type_id ORDER BY level DESC
+    """, (dump_id, idx, dump_id)).fetchall()
+    return ' > '.join(name for (name,) in rows)
+
+
+def print_matches(conn: sqlite3.Connection, sql: str, params: list, limit: int, show_path: bool) -> None:
+    started = time.perf_counter()
+    total = conn.execute(f"SELECT count(*) FROM ({sql})", params).fetchone()[0]
+    rows = conn.execute(f"""
+        SELECT m.dump_id, m.idx, d.path, d.frame, t.name, n.name, n.text, n.x, n.y, n.width, n.height
+        FROM ({sql}) m
+        JOIN nodes n ON n.dump_id = m.dump_id AND n.idx = m.idx
+        JOIN dumps d ON d.id = m.dump_id
+        JOIN types t ON t.id = n.type_id
+        ORDER BY m.dump_id, m.idx
+        LIMIT ?
+    """, (*params, limit)).fetchall()
+    elapsed = (time.perf_counter() - started) * 1000
+
+    for dump_id, idx, path, frame, type_name, name, text, x, y, width, height in rows:
+        source = os.path.basename(path) + (f"#{frame}" if frame else "")
+        label = type_name
+        if name:
+            label += f" #{name}"
+        if text:
+            label += f" {text[:60]!r}"
+        print(f"[{dump_id}:{idx}] {source}  {label}  ({x}, {y}, {width}, {height})")
+        if show_path:
+            print(f"    {node_path(conn, dump_id, idx)}")
+
+    dumps = conn.execute(f"SELECT count(DISTINCT dump_id) FROM ({sql})", params).fetchone()[0]
+    shown = f", показано {len(rows)}" if len(rows) < total else ""
+    print(f"Найдено: {total} в {dumps} деревьях{shown} ({elapsed:.1f} мс)")
+
+
+def find(args) -> int:
+    conn = open_index(args.db)
+    type_ids = {name: type_id for type_id, name in conn.execute("SELECT id, name FROM types")}
+    try:
+        query = selector_sql(args.selector, type_ids)
+    except SelectorError as e:
+        print(f"ERROR: {e}")
+        return 2
+    if query is None:
+        print("Найдено: 0 (типов из селектора нет в индексе)")
+        return 0
+    print_matches(conn, *query, limit=args.limit, show_path=args.path)
+    return 0
+
+
+def text(args) -> int:
+    conn = open_index(args.db)
+    sql = "SELECT n.dump_id AS dump_id, n.idx AS idx FROM nodes n"
+    where = ["n.text IS NOT NULL", "icontains(n.text, ?)"]
+    params = [args.pattern]
+    if args.type:
+        sql += " JOIN types t ON t.id = n.type_id"
+        where.append("t.name = ?")
+        params.append(args.type)
+    print_matches(conn, f"{sql} WHERE {' AND '.join(where)}", params, limit=args.limit, show_path=args.path)
+    return 0
+
+
+def types(args) -> int:
+    conn = open_index(args.db)
+    started = time.perf_counter()
+    rows = conn.execute("""
+        SELECT t.name, count(*), count(DISTINCT n.dump_id)
+        FROM nodes n JOIN types t ON t.id = n.type_id
+        GROUP BY n.type_id ORDER BY count(*) DESC
+    """).fetchall()
+    if args.like:
+        rows = [row for row in rows if args.like.lower() in row[0].lower()]
+    elapsed = (time.perf_counter() - started) * 1000
+
+    print(f"{'type':<48} {'узлов':>8} {'деревьев':>9}")
+    for name, count, dumps in rows[:args.limit]:
+        print(f"{name:<48} {count:>8} {dumps:>9}")
+    print(f"Типов: {len(rows)} ({elapsed:.1f} мс)")
+    return 0
+
+
+def show(args) -> int:
+    conn = open_index(args.db)
+    root = conn.execute("SELECT end_idx, depth FROM nodes WHERE dump_id = ? AND idx = ?",
+                        (args.dump_id, args.idx)).fetchone()
+    if root is None:
+        print(f"ERROR: Узла {args.dump_id}:{args.idx} нет в индексе")
+        return 1
+    end, base_depth = root
+    print(node_path(conn, args.dump_id, args.idx))
+
+    rows = conn.execute("""
+        SELECT n.idx, n.depth, t.name, n.x, n.y, n.width, n.height, n.entries
+        FROM nodes n JOIN types t ON t.id = n.type_id
+        WHERE n.dump_id = ? AND n.idx >= ? AND n.idx < ? AND n.depth <= ?
+        ORDER BY n.idx
+    """, (args.dump_id, args.idx, end, base_depth + args.depth)).fetchall()
+    for idx, depth, type_name, x, y, width, height, entries in rows:
+        prefix = "  " * (depth - base_depth)
+        print(f"{prefix}[{idx}] {type_name} ({x}, {y}, {width}, {height})")
+        for key, value in (json.loads(entries) if entries else {}).items():
+            if key == 'children':
+                continue
+            if isinstance(value, str) and len(value) > 60:
+                value = value[:60] + '...'
+            print(f"{prefix}    {key}: {value}")
+    return 0
+
+
+def info(args) -> int:
+    conn = open_index(args.db)
+    files, dumps, nodes = conn.execute(
+        "SELECT count(DISTINCT path), count(*), coalesce(sum(nodes), 0) FROM dumps").fetchone()
+    type_count = conn.execute("SELECT count(*) FROM types").fetchone()[0]
+    size = os.path.getsize(args.db)
+    print(f"{args.db}: файлов {files}, деревьев {dumps}, узлов {nodes}, типов {type_count}, "
+          f"{size / 1024 / 1024:.1f} MB")
+    for dump_id, path, frame, nodes in conn.execute(
+            "SELECT id, path, frame, nodes FROM dumps ORDER BY id LIMIT ?", (args.limit,)):
+        print(f"  [{dump_id}] {os.path.relpath(path)}{f'#{frame}' if frame else ''}: {nodes} узлов")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="SQLite-индекс UI tree дампов")
+    parser.add_argument("--db", default=DEFAULT_DB, help="Файл индекса")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    p_ingest = commands.add_parser("ingest", help="Загрузить дампы в индекс")
+    p_ingest.add_argument("paths", nargs="+", help="Файлы, glob или каталоги (.json, .snap, .sess)")
+    p_ingest.add_argument("--workers", type=int, default=0, help="Процессов разбора (по умолчанию - по числу CPU)")
+    p_ingest.add_argument("--session-every", type=float, default=60.0,
+                          help="Для .sess: кадр не чаще раза в столько секунд")
+    p_ingest.add_argument("--force", action="store_true", help="Перезагрузить уже загруженные файлы")
+
+    p_info = commands.add_parser("info", help="Содержимое индекса")
+    p_info.add_argument("--limit", type=int, default=50, help="Деревьев в списке")
+
+    p_types = commands.add_parser("types", help="Типы узлов по корпусу")
+    p_types.add_argument("--like", help="Подстрока в имени типа")
+    p_types.add_argument("--limit", type=int, default=50, help="Строк")
+
+    p_find = commands.add_parser("find", help="Узлы по селектору")
+    p_find.add_argument("selector", help='Селектор, например "OverviewScrollEntry > EveLabelMedium"')
+    p_find.add_argument("--limit", type=int, default=50, help="Строк")
+    p_find.add_argument("--path", action="store_true", help="Показать цепочку типов от корня")
+
+    p_text = commands.add_parser("text", help="Узлы по подстроке _setText")
+    p_text.add_argument("pattern", help="Подстрока (без учёта регистра)")
+    p_text.add_argument("--type", help="Только узлы этого типа")
+    p_text.add_argument("--limit", type=int, default=50, help="Строк")
+    p_text.add_argument("--path", action="store_true", help="Показать цепочку типов от корня")
+
+    p_show = commands.add_parser("show", help="Поддерево узла с entries")
+    p_show.add_argument("dump_id", type=int, help="id дерева (первое число в [id:idx])")
+    p_show.add_argument("idx", type=int, help="Индекс узла")
+    p_show.add_argument("--depth", type=int, default=1, help="Глубина")
+
+    args = parser.parse_args()
+    commands = {"ingest": ingest, "info": info, "types": types, "find": find, "text": text, "show": show}
+    return commands[args.command](args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,6 +6,8 @@ import logging
 from typing import Optional, Tuple
 from core.sanderling.service import SanderlingService
 from core.sanderling.models import InventoryFilter, InventoryItem, ContextMenuItem
+from core.sanderling.compact_tree import CompactUITree
+from core.sanderling.selector import select_first
 from config import INVENTORY_FILTERS, CONTEXT_MENU_ACTIONS, DELAY_AFTER_CLICK, DELAY_BETWEEN_ACTIONS
 from eve.mouse import click, right_click
 
@@ -367,13 +369,10 @@ class InventoryManager:
             state = self.sanderling.get_state()
             
             # Ищем кнопку ActivateButton с текстом "Активировать для флота"
-            if state and state.ui_tree:
-                button = self._find_activate_button(state.ui_tree)
+            if state and state.tree:
+                button = self._find_activate_button(state.tree)
                 if button:
-                    x = button.get('_displayX', 0)
-                    y = button.get('_displayY', 0)
-                    w = button.get('_displayWidth', 0)
-                    h = button.get('_displayHeight', 0)
+                    x, y, w, h = button
                     
                     center_x = x + w // 2
                     center_y = y + h // 2
@@ -476,13 +475,10 @@ class InventoryManager:
             state = self.sanderling.get_state()
             
             # Ищем кнопку ActivateButton с текстом "Активировать"
-            if state and state.ui_tree:
-                button = self._find_final_activate_button(state.ui_tree)
+            if state and state.tree:
+                button = self._find_final_activate_button(state.tree)
                 if button:
-                    x = button.get('_displayX', 0)
-                    y = button.get('_displayY', 0)
-                    w = button.get('_displayWidth', 0)
-                    h = button.get('_displayHeight', 0)
+                    x, y, w, h = button
                     
                     center_x = x + w // 2
                     center_y = y + h // 2
@@ -498,131 +494,35 @@ class InventoryManager:
         logger.error(f"Финальная кнопка 'Активировать' не появилась за {timeout} секунд")
         return False
     
-    def _find_final_activate_button(self, node, parent_x=0, parent_y=0) -> dict:
-        """Рекурсивно ищет финальную кнопку ActivateButton с текстом 'Активировать'."""
-        if not isinstance(node, dict):
-            return None
-        
-        # Получаем координаты текущего узла
-        dict_entries = node.get('dictEntriesOfInterest', {})
-        display_x = dict_entries.get('_displayX', 0)
-        display_y = dict_entries.get('_displayY', 0)
-        
-        # Обрабатываем случай когда координаты - словари с int_low32
-        if isinstance(display_x, dict):
-            display_x = display_x.get('int_low32', 0)
-        if isinstance(display_y, dict):
-            display_y = display_y.get('int_low32', 0)
-        
-        # Проверяем что координаты - числа
-        if not isinstance(display_x, (int, float)):
-            display_x = 0
-        if not isinstance(display_y, (int, float)):
-            display_y = 0
-            
-        current_x = parent_x + display_x
-        current_y = parent_y + display_y
-        
-        # Проверяем тип узла
-        if node.get('pythonObjectTypeName') == 'ActivateButton':
-            # Ищем дочерний EveLabelMedium с текстом "Активировать" (БЕЗ "для флота")
-            children = node.get('children', [])
-            if isinstance(children, list):
-                for child in children:
-                    if isinstance(child, dict):
-                        if child.get('pythonObjectTypeName') == 'EveLabelMedium':
-                            child_dict = child.get('dictEntriesOfInterest', {})
-                            text = child_dict.get('_setText', '')
-                            # Ищем просто "Активировать", а не "Активировать для флота"
-                            if text == 'Активировать' or text == 'Activate':
-                                # Возвращаем абсолютные координаты кнопки
-                                w = dict_entries.get('_displayWidth', 0)
-                                h = dict_entries.get('_displayHeight', 0)
-                                if isinstance(w, dict):
-                                    w = w.get('int_low32', 0)
-                                if isinstance(h, dict):
-                                    h = h.get('int_low32', 0)
-                                if not isinstance(w, (int, float)):
-                                    w = 0
-                                if not isinstance(h, (int, float)):
-                                    h = 0
-                                return {
-                                    '_displayX': current_x,
-                                    '_displayY': current_y,
-                                    '_displayWidth': w,
-                                    '_displayHeight': h
-                                }
-        
-        # Рекурсивный поиск в детях
-        children = node.get('children')
-        if isinstance(children, list):
-            for child in children:
-                result = self._find_final_activate_button(child, current_x, current_y)
-                if result:
-                    return result
-        
-        return None
+    def _find_final_activate_button(self, tree) -> Optional[Tuple[int, int, int, int]]:
+        """Ищет финальную кнопку ActivateButton с текстом 'Активировать' (БЕЗ "для флота")."""
+        return self._find_activate_button_rect(
+            tree,
+            'ActivateButton > EveLabelMedium[_setText="Активировать"], '
+            'ActivateButton > EveLabelMedium[_setText="Activate"]'
+        )
     
-    def _find_activate_button(self, node, parent_x=0, parent_y=0) -> dict:
-        """Рекурсивно ищет кнопку ActivateButton с текстом 'Активировать для флота'."""
-        if not isinstance(node, dict):
-            return None
+    def _find_activate_button(self, tree) -> Optional[Tuple[int, int, int, int]]:
+        """Ищет кнопку ActivateButton с текстом 'Активировать для флота'."""
+        return self._find_activate_button_rect(
+            tree,
+            'ActivateButton > EveLabelMedium[_setText*="Активировать для флота"], '
+            'ActivateButton > EveLabelMedium[_setText*="Activate for Fleet"]'
+        )
+    
+    def _find_activate_button_rect(self, tree: CompactUITree, label_query: str) -> Optional[Tuple[int, int, int, int]]:
+        """
+        Найти ActivateButton по селектору его дочерней метки.
         
-        # Получаем координаты текущего узла
-        dict_entries = node.get('dictEntriesOfInterest', {})
-        display_x = dict_entries.get('_displayX', 0)
-        display_y = dict_entries.get('_displayY', 0)
-        
-        # Обрабатываем случай когда координаты - словари с int_low32
-        if isinstance(display_x, dict):
-            display_x = display_x.get('int_low32', 0)
-        if isinstance(display_y, dict):
-            display_y = display_y.get('int_low32', 0)
-        
-        # Проверяем что координаты - числа
-        if not isinstance(display_x, (int, float)):
-            display_x = 0
-        if not isinstance(display_y, (int, float)):
-            display_y = 0
+        Args:
+            tree: Индексированный UI tree (GameState.tree)
+            label_query: Селектор метки EveLabelMedium внутри кнопки
             
-        current_x = parent_x + display_x
-        current_y = parent_y + display_y
-        
-        # Проверяем тип узла
-        if node.get('pythonObjectTypeName') == 'ActivateButton':
-            # Ищем дочерний EveLabelMedium с нужным текстом
-            children = node.get('children', [])
-            if isinstance(children, list):
-                for child in children:
-                    if isinstance(child, dict):
-                        if child.get('pythonObjectTypeName') == 'EveLabelMedium':
-                            child_dict = child.get('dictEntriesOfInterest', {})
-                            text = child_dict.get('_setText', '')
-                            if 'Активировать для флота' in text or 'Activate for Fleet' in text:
-                                # Возвращаем абсолютные координаты кнопки
-                                w = dict_entries.get('_displayWidth', 0)
-                                h = dict_entries.get('_displayHeight', 0)
-                                if isinstance(w, dict):
-                                    w = w.get('int_low32', 0)
-                                if isinstance(h, dict):
-                                    h = h.get('int_low32', 0)
-                                if not isinstance(w, (int, float)):
-                                    w = 0
-                                if not isinstance(h, (int, float)):
-                                    h = 0
-                                return {
-                                    '_displayX': current_x,
-                                    '_displayY': current_y,
-                                    '_displayWidth': w,
-                                    '_displayHeight': h
-                                }
-        
-        # Рекурсивный поиск в детях
-        children = node.get('children')
-        if isinstance(children, list):
-            for child in children:
-                result = self._find_activate_button(child, current_x, current_y)
-                if result:
-                    return result
+        Returns:
+            Абсолютный прямоугольник кнопки (x, y, width, height) или None
+        """
+        label = select_first(tree, label_query)
+        if label is None:
+            return None
         
-        return None
+        return tree.rect(tree.parent(label))
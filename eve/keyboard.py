@@ -8,6 +8,17 @@ import pyautogui
 pyautogui.PAUSE = 0.05
 
 
+def _record_action(action: str) -> None:
+    """
+    Отметить действие для трассировки задержки реакции.
+
+    core.sanderling.tracing импортируется при первом действии: импорт пакета
+    core.sanderling тянет сервис, парсер и супервизор, а eve используется и без них.
+    """
+    from core.sanderling import tracing
+    tracing.record_action(action)
+
+
 def type_text(text: str, interval: float = 0.05):
     """
     Ввести текст с клавиатуры.
@@ -62,6 +73,7 @@ def press_key(key: str):
         press_key('alt+c')
         press_key('ctrl+shift+s')
     """
+    _record_action('key')
     if '+' in key:
         # Комбинация клавиш
         keys = key.split('+')
@@ -84,11 +96,13 @@ def hotkey(*keys: str):
         hotkey('alt', 'tab') # Switch window
         hotkey('ctrl', 'shift', 's')  # Save As
     """
+    _record_action('key')
     pyautogui.hotkey(*keys)
 
 
 def key_down(key: str):
     """Зажать клавишу."""
+    _record_action('key')
     pyautogui.keyDown(key)
 
 
@@ -220,6 +220,17 @@ def _apply_click_offset(x: int, y: int) -> Tuple[int, int]:
     return (x + offset_x, y + offset_y)
 
 
+def _record_action(action: str) -> None:
+    """
+    Отметить действие для трассировки задержки реакции.
+
+    core.sanderling.tracing импортируется при первом действии: импорт пакета
+    core.sanderling тянет сервис, парсер и супервизор, а eve используется и без них.
+    """
+    from core.sanderling import tracing
+    tracing.record_action(action)
+
+
 def _human_click_delay() -> None:
     """Случайная задержка перед/после клика."""
     delay = random.uniform(HumanConfig.CLICK_DELAY_MIN, HumanConfig.CLICK_DELAY_MAX)
@@ -257,6 +268,7 @@ def click(
             HumanConfig.CLICK_DURATION_MIN,
             HumanConfig.CLICK_DURATION_MAX
         )
+        _record_action('click')
         pyautogui.mouseDown(button=button, _pause=False)
         time.sleep(click_duration)
         pyautogui.mouseUp(button=button, _pause=False)
@@ -264,6 +276,7 @@ def click(
         # Небольшая пауза после клика
         _human_click_delay()
     else:
+        _record_action('click')
         pyautogui.click(x, y, button=button)
 
 
@@ -286,6 +299,8 @@ def double_click(x: int, y: int, humanize: bool = True) -> None:
                 HumanConfig.CLICK_DURATION_MIN,
                 HumanConfig.CLICK_DURATION_MAX
             )
+            if i == 0:
+                _record_action('click')
             pyautogui.mouseDown(button="left", _pause=False)
             time.sleep(click_duration)
             pyautogui.mouseUp(button="left", _pause=False)
@@ -296,6 +311,7 @@ def double_click(x: int, y: int, humanize: bool = True) -> None:
 
         _human_click_delay()
     else:
+        _record_action('click')
         pyautogui.doubleClick(x, y)
 
 
@@ -351,6 +367,7 @@ def drag(
         _human_click_delay()
 
         # Зажимаем кнопку
+        _record_action('drag')
         pyautogui.mouseDown(button=button, _pause=False)
         time.sleep(random.uniform(0.05, 0.1))
 
@@ -366,6 +383,7 @@ def drag(
         _human_click_delay()
     else:
         pyautogui.moveTo(start_x, start_y)
+        _record_action('drag')
         pyautogui.drag(end_x - start_x, end_y - start_y, duration=duration or 0.5, button=button)
 
 
@@ -0,0 +1,295 @@
+#!/usr/bin/env python
+"""
+Микробенчмарк примитивов CPythonReader / LinuxProcessAccess по методам доступа.
+
+Строит синтетическую кучу CPython 2.7 (core/sanderling/linux_fixture.py) с
+известными объектами (str, unicode, list, dict, экземпляр UI-класса, tp_name)
+и UI tree из дампа, держит её в дочернем процессе (HeapProcess) и читает
+настоящими syscall'ами:
+    pread    - os.pread по /proc/pid/mem (по умолчанию)
+    vm_readv - process_vm_readv через ctypes (linux_use_process_vm_readv)
+    fixture  - FixtureProcessAccess в памяти (стоимость Python без syscall'ов)
+
+Отчёт:
+    1. примитивы: ns/op, syscall/op, байт/op; каждый результат сверяется с объектом
+    2. read_bytes по размерам чтения: ns/op и MB/s (выбор linux_scan_chunk_size)
+    3. find_root_address по linux_scan_chunk_size и чтение всего дерева
+
+Запуск:
+    python scripts/benchmark_linux_primitives.py
+    python scripts/benchmark_linux_primitives.py -n 20000 --methods pread vm_readv
+    python scripts/benchmark_linux_primitives.py --scan-chunks 65536 1048576 4194304 --output output/benchmarks/linux_primitives.json
+
+Только Linux. Код выхода 1 - примитив вернул не то, что лежит в куче.
+"""
+import argparse
+import glob
+import json
+import logging
+import os
+import sys
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+# Добавляем корень проекта в path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.sanderling.linux_cpython import CPythonReader
+from core.sanderling.linux_fixture import (
+    FixtureProcessAccess, HeapBuilder, HeapImage, HeapProcess, count_nodes, normalize_tree,
+)
+from core.sanderling.linux_process import LinuxProcessAccess
+from core.sanderling.linux_reader import LinuxMemoryReader
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+# Ридер и доступ к памяти пишут INFO на каждое открытие/чтение
+logging.getLogger('core.sanderling.linux_reader').setLevel(logging.WARNING)
+logging.getLogger('core.sanderling.linux_process').setLevel(logging.WARNING)
+
+DEFAULT_CORPUS = "output/ui_tree_dump_*.json"
+METHODS = ('pread', 'vm_readv', 'fixture')
+READ_SIZES = (8, 64, 512, 4096, 65536, 262144, 1048576, 4194304)
+SCAN_CHUNKS = (65536, 262144, 1048576, 4194304, 16777216)
+
+# Известные объекты кучи
+SHORT_STR = 'OverviewScrollEntry'
+LONG_STR = '<color=0xffb0b0b0>' + 'Veldspar Asteroid ' * 16 + '</color>'
+UNICODE_STR = 'Астероид (Вельдспар) 12 км'
+LIST_SIZE = 50
+SMALL_DICT = 5
+LARGE_DICT = 60
+
+
+def build_bench_heap(dump: Any, blob_size: int) -> Tuple[HeapImage, Dict[str, Any]]:
+    """
+    Куча с известными объектами, UI tree дампа и блоком под чтения по размерам.
+
+    Returns:
+        (образ, адреса объектов)
+    """
+    builder = HeapBuilder()
+    objects: Dict[str, Any] = {
+        'short_str': builder.new_str(SHORT_STR),
+        'long_str': builder.new_str(LONG_STR),
+        'unicode': builder.new_unicode(UNICODE_STR),
+        'int': builder.new_int(1189),
+        'list': builder.new_list([builder.new_int(1000 + i) for i in range(LIST_SIZE)]),
+        'small_dict': builder.new_dict({f'_key{i}': builder.new_int(i) for i in range(SMALL_DICT)}),
+        'large_dict': builder.new_dict({f'_key{i}': builder.new_int(i) for i in range(LARGE_DICT)}),
+    }
+    objects['instance'] = builder.new_instance(SHORT_STR, {'_name': builder.new_str('entry')})
+    objects['tp_name'] = builder._cstring(SHORT_STR)
+    objects['blob'] = builder._alloc(blob_size)
+    root = builder.node(dump) if dump is not None else 0
+    return builder.image(root, {'nodes': count_nodes(dump)}), objects
+
+
+def primitive_ops(objects: Dict[str, Any]) -> List[Tuple[str, Callable, Any]]:
+    """[(имя, op(cpython, process), ожидаемый результат)]"""
+    def cold_type_name(cpython, process):
+        cpython._type_name_cache.clear()
+        return cpython.read_type_name(objects['instance'])
+
+    return [
+        ('read_type_name', lambda c, p: c.read_type_name(objects['instance']), SHORT_STR),
+        ('read_type_name (cold)', cold_type_name, SHORT_STR),
+        ('read_cstring', lambda c, p: p.read_cstring(objects['tp_name'], 128), SHORT_STR),
+        ('read_int', lambda c, p: c.read_int(objects['int']), 1189),
+        ('read_string', lambda c, p: c.read_string(objects['short_str']), SHORT_STR),
+        ('read_string (long)', lambda c, p: c.read_string(objects['long_str']), LONG_STR),
+        ('read_unicode', lambda c, p: c.read_unicode(objects['unicode']), UNICODE_STR),
+        ('read_list', lambda c, p: len(c.read_list(objects['list']) or ()), LIST_SIZE),
+        ('read_dict', lambda c, p: sorted(c.read_dict(objects['small_dict']) or ()),
+         sorted(f'_key{i}' for i in range(SMALL_DICT))),
+        ('read_dict (large)', lambda c, p: sorted(c.read_dict(objects['large_dict']) or ()),
+         sorted(f'_key{i}' for i in range(LARGE_DICT))),
+    ]
+
+
+def open_access(method: str, pid: int, image: HeapImage) -> LinuxProcessAccess:
+    if method == 'fixture':
+        process = FixtureProcessAccess(image)
+    else:
+        process = LinuxProcessAccess(pid, use_process_vm_readv=method == 'vm_readv')
+    if not process.open():
+        raise OSError(f"{method}: нет доступа к памяти процесса {pid}")
+    return process
+
+
+def measure(op: Callable, process: LinuxProcessAccess, iterations: int, rounds: int) -> Dict[str, float]:
+    """
+    Замер op: медиана ns/op по раундам, syscall'ы и байты на операцию.
+
+    Returns:
+        {'ns': ..., 'calls': ..., 'bytes': ...}
+    """
+    for _ in range(min(iterations, 100)):
+        op()
+    timings = []
+    calls = size = 0
+    for _ in range(rounds):
+        calls_before, bytes_before = process.read_calls, process.bytes_read
+        started = time.perf_counter_ns()
+        for _ in range(iterations):
+            op()
+        timings.append((time.perf_counter_ns() - started) / iterations)
+        calls = (process.read_calls - calls_before) / iterations
+        size = (process.bytes_read - bytes_before) / iterations
+    timings.sort()
+    return {'ns': timings[len(timings) // 2], 'calls': calls, 'bytes': size}
+
+
+def log_table(header: List[str], rows: List[List[str]]) -> None:
+    widths = [max(len(str(row[i])) for row in [header] + rows) for i in range(len(header))]
+    for row in [header] + rows:
+        cells = [f"{row[0]:<{widths[0]}}"] + [f"{cell:>{width}}" for cell, width in zip(row[1:], widths[1:])]
+        logger.info("  " + "  ".join(cells))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Микробенчмарк примитивов чтения памяти CPython 2.7")
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS, help="glob дампов (UI tree - первый дамп)")
+    parser.add_argument("--iterations", "-n", type=int, default=5000, help="Операций в раунде")
+    parser.add_argument("--rounds", type=int, default=5, help="Раундов (в отчёт идёт медиана)")
+    parser.add_argument("--methods", nargs="+", choices=METHODS, default=list(METHODS), help="Методы доступа")
+    parser.add_argument("--read-sizes", type=int, nargs="+", default=list(READ_SIZES), help="Размеры read_bytes")
+    parser.add_argument("--scan-chunks", type=int, nargs="+", default=list(SCAN_CHUNKS),
+                        help="linux_scan_chunk_size для find_root_address")
+    parser.add_argument("--tree-reads", type=int, default=5, help="Чтений всего дерева на метод")
+    parser.add_argument("--output", help="Сохранить результаты в JSON")
+    args = parser.parse_args()
+
+    if sys.platform != 'linux':
+        logger.error("Нужен Linux (/proc/pid/mem, process_vm_readv)")
+        return 2
+
+    dumps = sorted(glob.glob(args.corpus))
+    dump = None
+    if dumps:
+        with open(dumps[0], 'r', encoding='utf-8') as f:
+            dump = json.load(f)
+    else:
+        logger.info(f"Нет дампов по маске {args.corpus}: без поиска корня и чтения дерева")
+
+    image, objects = build_bench_heap(dump, max(args.read_sizes))
+    ops = primitive_ops(objects)
+    results: Dict[str, Any] = {'primitives': {}, 'read_bytes': {}, 'find_root': {}, 'read_tree': {}}
+    failures = 0
+
+    with HeapProcess(image) as holder:
+        logger.info(f"Куча {image.size / 1024 / 1024:.1f} MB в процессе {holder.pid}, "
+                    f"{args.iterations} операций x {args.rounds} раундов")
+
+        for method in args.methods:
+            process = open_access(method, holder.pid, image)
+            cpython = CPythonReader(process)
+            try:
+                for name, op, expected in ops:
+                    result = op(cpython, process)
+                    if result != expected:
+                        logger.error(f"{method}: {name} вернул {result!r}, ожидалось {expected!r}")
+                        failures += 1
+                    results['primitives'].setdefault(name, {})[method] = measure(
+                        lambda: op(cpython, process), process, args.iterations, args.rounds)
+
+                for size in args.read_sizes:
+                    # Большие чтения - меньше повторов (время растёт с размером)
+                    iterations = max(10, min(args.iterations, args.iterations * 4096 // size))
+                    results['read_bytes'].setdefault(size, {})[method] = measure(
+                        lambda: process.read_bytes(objects['blob'], size), process, iterations, args.rounds)
+            finally:
+                process.close()
+
+            if dump is None:
+                continue
+            expected_tree = normalize_tree(dump)
+            for chunk in args.scan_chunks:
+                reader = LinuxMemoryReader(holder.pid, scan_chunk_size=chunk,
+                                           process=FixtureProcessAccess(image) if method == 'fixture' else None,
+                                           use_process_vm_readv=method == 'vm_readv')
+                reader.open()
+                try:
+                    started = time.perf_counter()
+                    root = reader.find_root_address()
+                    elapsed = (time.perf_counter() - started) * 1000
+                    results['find_root'].setdefault(chunk, {})[method] = {
+                        'ms': elapsed, 'calls': reader.read_calls, 'bytes': reader._process.bytes_read}
+                    if root is None or int(root, 16) != image.root:
+                        logger.error(f"{method}: find_root_address (chunk {chunk}) нашёл {root}")
+                        failures += 1
+                    if chunk != args.scan_chunks[-1]:
+                        continue
+                    timings = []
+                    for _ in range(args.tree_reads):
+                        calls_before, bytes_before = reader.read_calls, reader._process.bytes_read
+                        started = time.perf_counter()
+                        tree = reader.read_ui_tree_compact(hex(image.root))
+                        timings.append((time.perf_counter() - started) * 1000)
+                    timings.sort()
+                    results['read_tree'][method] = {
+                        'ms': timings[len(timings) // 2],
+                        'calls': reader.read_calls - calls_before,
+                        'bytes': reader._process.bytes_read - bytes_before,
+                    }
+                    if tree is None or normalize_tree(tree.to_dict()) != expected_tree:
+                        logger.error(f"{method}: прочитанное дерево не совпадает с дампом")
+                        failures += 1
+                finally:
+                    reader.close()
+
+    methods = args.methods
+    logger.info("Примитивы (ns/op, syscall/op, байт/op):")
+    log_table(['op'] + [f"{method} ns" for method in methods] + ['syscalls', 'bytes'], [
+        [name] + [f"{by_method[m]['ns']:.0f}" for m in methods]
+        + [f"{by_method[methods[0]]['calls']:.1f}", f"{by_method[methods[0]]['bytes']:.0f}"]
+        for name, by_method in results['primitives'].items()
+    ])
+
+    logger.info("read_bytes по размеру (ns/op, MB/s):")
+    log_table(['size'] + [f"{method} ns" for method in methods] + [f"{method} MB/s" for method in methods], [
+        [str(size)] + [f"{by_method[m]['ns']:.0f}" for m in methods]
+        + [f"{size / by_method[m]['ns'] * 1e9 / 1024 / 1024:.0f}" for m in methods]
+        for size, by_method in results['read_bytes'].items()
+    ])
+
+    if results['find_root']:
+        logger.info("find_root_address по linux_scan_chunk_size (мс, syscall'ов, MB прочитано):")
+        log_table(['chunk'] + [f"{method} ms" for method in methods] + ['syscalls', 'MB'], [
+            [str(chunk)] + [f"{by_method[m]['ms']:.0f}" for m in methods]
+            + [str(by_method[methods[0]]['calls']), f"{by_method[methods[0]]['bytes'] / 1024 / 1024:.1f}"]
+            for chunk, by_method in results['find_root'].items()
+        ])
+        logger.info(f"read_ui_tree_compact ({image.meta['nodes']} узлов, медиана {args.tree_reads} чтений):")
+        log_table(['method', 'ms', 'syscalls', 'bytes'], [
+            [method, f"{row['ms']:.1f}", str(row['calls']), str(row['bytes'])]
+            for method, row in results['read_tree'].items()
+        ])
+        syscall_methods = [m for m in ('pread', 'vm_readv') if m in results['read_tree']]
+        if len(syscall_methods) == 2:
+            fastest = min(syscall_methods, key=lambda m: results['read_tree'][m]['ms'])
+            logger.info(f"Быстрее на чтении дерева: {fastest} "
+                        f"(linux_use_process_vm_readv = {str(fastest == 'vm_readv').lower()})")
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({
+                'created': time.strftime('%Y-%m-%d %H:%M:%S'),
+                'iterations': args.iterations,
+                'rounds': args.rounds,
+                **results,
+            }, f, indent=2, ensure_ascii=False)
+        logger.info(f"Результаты: {args.output}")
+
+    if failures:
+        logger.error(f"Несовпадений: {failures}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,154 @@
+#!/usr/bin/env python
+"""
+Бенчмарк и регрессионная проверка LinuxMemoryReader без EVE.
+
+Для каждого дампа output/ui_tree_dump_*.json строится синтетическая куча
+CPython 2.7 (core/sanderling/linux_fixture.py), по ней запускаются поиск
+UIRoot, read_ui_tree и read_ui_tree_compact - тот же код, что на живом
+процессе. Проверяется, что найден правильный корень и прочитанное дерево
+совпадает с дампом; печатаются время (p50/p95/p99/max) и число чтений памяти.
+
+Запуск:
+    python scripts/benchmark_linux_reader.py
+    python scripts/benchmark_linux_reader.py --repeat 50
+    python scripts/benchmark_linux_reader.py --save-heaps output/heaps    # сохранить образы
+    python scripts/benchmark_linux_reader.py --heaps "output/heaps/*.heap"
+
+Код выхода 1 - корень не найден или дерево не совпало с дампом.
+"""
+import argparse
+import glob
+import json
+import logging
+import os
+import sys
+import time
+from typing import List, Optional, Tuple
+
+# Добавляем корень проекта в path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.sanderling.linux_fixture import (
+    FixtureProcessAccess, HeapImage, build_heap, normalize_tree,
+)
+from core.sanderling.linux_reader import LinuxMemoryReader
+from core.sanderling.metrics import RollingHistogram, format_table
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+# Ридер пишет INFO на каждое чтение
+logging.getLogger('core.sanderling.linux_reader').setLevel(logging.WARNING)
+
+DEFAULT_CORPUS = "output/ui_tree_dump_*.json"
+
+
+def load_images(args) -> List[Tuple[str, HeapImage, Optional[dict]]]:
+    """
+    Образы для прогона: готовые .heap или построенные из дампов.
+
+    Returns:
+        [(имя, образ, исходный дамп или None)]
+    """
+    images = []
+    if args.heaps:
+        for path in sorted(glob.glob(args.heaps)):
+            image = HeapImage.load(path)
+            dump = None
+            source = image.meta.get('source')
+            if source and os.path.exists(source):
+                with open(source, 'r', encoding='utf-8') as f:
+                    dump = json.load(f)
+            images.append((os.path.basename(path), image, dump))
+        return images
+
+    for path in sorted(glob.glob(args.corpus)):
+        with open(path, 'r', encoding='utf-8') as f:
+            dump = json.load(f)
+        started = time.perf_counter()
+        image = build_heap(dump, source=path)
+        logger.info(f"{os.path.basename(path)}: образ {image.size / 1024:.0f} KB, "
+                    f"{image.meta['nodes']} узлов, {image.meta['objects']} объектов "
+                    f"за {(time.perf_counter() - started) * 1000:.0f} мс")
+
+        if args.save_heaps:
+            os.makedirs(args.save_heaps, exist_ok=True)
+            name = os.path.splitext(os.path.basename(path))[0] + '.heap'
+            image.save(os.path.join(args.save_heaps, name))
+
+        images.append((os.path.basename(path), image, dump))
+    return images
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="LinuxMemoryReader по синтетической куче CPython 2.7")
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS, help="glob дампов UI tree")
+    parser.add_argument("--heaps", help="glob готовых образов .heap (вместо дампов)")
+    parser.add_argument("--save-heaps", help="Сохранить построенные образы в каталог")
+    parser.add_argument("--repeat", "-n", type=int, default=20, help="Повторов чтения дерева на образ")
+    args = parser.parse_args()
+
+    images = load_images(args)
+    if not images:
+        logger.error("Нет дампов/образов для прогона")
+        return 2
+
+    stages = {name: RollingHistogram(args.repeat * len(images))
+              for name in ('find_root', 'read_ui_tree', 'read_compact')}
+    calls = {name: [] for name in stages}
+    failures = 0
+
+    for name, image, dump in images:
+        reader = LinuxMemoryReader(0, process=FixtureProcessAccess(image))
+        reader.open()
+        try:
+            before = reader.read_calls
+            started = time.perf_counter()
+            root = reader.find_root_address()
+            stages['find_root'].add((time.perf_counter() - started) * 1000)
+            calls['find_root'].append(reader.read_calls - before)
+
+            if root is None or int(root, 16) != image.root:
+                logger.error(f"{name}: найден корень {root}, ожидался 0x{image.root:X}")
+                failures += 1
+                continue
+
+            expected = normalize_tree(dump) if dump is not None else None
+            for stage, read in (('read_ui_tree', reader.read_ui_tree),
+                                ('read_compact', reader.read_ui_tree_compact)):
+                result = None
+                for _ in range(args.repeat):
+                    before = reader.read_calls
+                    started = time.perf_counter()
+                    result = read(root)
+                    stages[stage].add((time.perf_counter() - started) * 1000)
+                    calls[stage].append(reader.read_calls - before)
+
+                if expected is None:
+                    continue
+                tree = result.to_dict() if stage == 'read_compact' and result is not None else result
+                if normalize_tree(tree) != expected:
+                    logger.error(f"{name}: {stage} не совпадает с дампом")
+                    failures += 1
+        finally:
+            reader.close()
+
+    summaries = {stage: histogram.summary() for stage, histogram in stages.items()}
+    logger.info(f"Образов: {len(images)}, повторов: {args.repeat} (мс)")
+    for line in format_table(summaries, title='stage').splitlines():
+        logger.info(f"  {line}")
+    for stage, values in calls.items():
+        if values:
+            logger.info(f"  {stage}: {sum(values) / len(values):.0f} чтений памяти за вызов")
+
+    if failures:
+        logger.error(f"Ошибок: {failures}")
+        return 1
+    logger.info("Корни найдены, деревья совпадают с дампами")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,269 @@
+#!/usr/bin/env python
+"""
+Офлайн-бенчмарк парсера UI tree (без запущенной игры).
+
+Гоняет UITreeParser.parse и каждую секцию _parse_* по записанным дампам
+output/ui_tree_dump_*.json: время (p50/p95/p99/max), выделения памяти
+(tracemalloc, пик на вызов) и число узлов. Результат можно сохранить как
+baseline и сравнивать с ним следующие прогоны - при регрессии сверх порога
+скрипт завершается с кодом 1.
+
+Запуск:
+    python scripts/benchmark_parser.py                    # прогон + сравнение с baseline
+    python scripts/benchmark_parser.py --save-baseline    # записать baseline
+    python scripts/benchmark_parser.py --repeat 200 --threshold 0.1
+"""
+import argparse
+import glob
+import inspect
+import json
+import logging
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Tuple
+
+# Добавляем корень проекта в path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.sanderling.compact_tree import CompactUITree
+from core.sanderling.metrics import RollingHistogram, format_table
+from core.sanderling.parser import UITreeParser
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+DEFAULT_CORPUS = "output/ui_tree_dump_*.json"
+DEFAULT_BASELINE = "output/benchmarks/parser_baseline.json"
+
+# Разница меньше этого не считается регрессией (шум таймера на мелких секциях)
+MIN_REGRESSION_MS = 0.05
+MIN_REGRESSION_KB = 4.0
+
+
+def load_corpus(pattern: str) -> List[Tuple[str, dict]]:
+    """
+    Загрузить дампы UI tree.
+
+    Args:
+        pattern: glob дампов
+
+    Returns:
+        [(имя файла, dict-дерево)]
+    """
+    corpus = []
+    for path in sorted(glob.glob(pattern)):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                corpus.append((os.path.basename(path), json.load(f)))
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Пропускаю {path}: {e}")
+    return corpus
+
+
+def section_methods(parser: UITreeParser) -> Dict[str, Callable]:
+    """Секции парсера: методы _parse_*(tree), вызываемые из parse()."""
+    sections = {}
+    for name, method in inspect.getmembers(parser, inspect.ismethod):
+        if not name.startswith('_parse_'):
+            continue
+        if list(inspect.signature(method).parameters) == ['tree']:
+            sections[name[len('_parse_'):]] = method
+    return dict(sorted(sections.items()))
+
+
+def build_cases(parser: UITreeParser) -> Dict[str, Callable[[dict, CompactUITree], object]]:
+    """
+    Замеряемые операции: fn(dict-дерево, компактное дерево).
+
+    from_dict - упаковка дерева (путь сервиса с compact_ui_tree),
+    parse - полный разбор, остальные - отдельные секции.
+    """
+    def parse(raw: dict, tree: CompactUITree):
+        # Сбросить кэш по идентичности дерева, иначе parse() вернёт прошлый результат
+        parser._cached_tree = None
+        return parser.parse(tree)
+
+    cases = {
+        'from_dict': lambda raw, tree: CompactUITree.from_dict(raw, keep_source=False),
+        'parse': parse,
+    }
+    for name, method in section_methods(parser).items():
+        cases[name] = lambda raw, tree, method=method: method(tree)
+    return cases
+
+
+def run_benchmark(corpus: List[Tuple[str, dict]], repeat: int,
+                  measure_alloc: bool = True) -> dict:
+    """
+    Прогнать все операции по корпусу.
+
+    Args:
+        corpus: Результат load_corpus
+        repeat: Повторов каждой операции на дамп
+        measure_alloc: Отдельный проход под tracemalloc
+
+    Returns:
+        {'dumps': {...}, 'sections': {name: {p50, p95, p99, max, mean, count, alloc_kb, items}}}
+    """
+    parser = UITreeParser()
+    cases = build_cases(parser)
+    trees = [(name, raw, CompactUITree.from_dict(raw, keep_source=False)) for name, raw in corpus]
+
+    histograms = {case: RollingHistogram(repeat * len(trees)) for case in cases}
+    allocations: Dict[str, List[float]] = {case: [] for case in cases}
+    items: Dict[str, List[int]] = {case: [] for case in cases}
+
+    for _, raw, tree in trees:
+        # Секции читают текущее дерево парсера (как внутри parse())
+        parser._tree = tree
+        for case, fn in cases.items():
+            result = fn(raw, tree)  # прогрев
+            # Число найденных записей (кортежи чисел вроде (shield, armor, hull) не считаем)
+            if isinstance(result, tuple) and not any(isinstance(r, (int, float)) for r in result):
+                items[case].append(len(result))
+            for _ in range(repeat):
+                started = time.perf_counter()
+                fn(raw, tree)
+                histograms[case].add((time.perf_counter() - started) * 1000)
+
+    if measure_alloc:
+        tracemalloc.start()
+        try:
+            for _, raw, tree in trees:
+                parser._tree = tree
+                for case, fn in cases.items():
+                    tracemalloc.reset_peak()
+                    before, _ = tracemalloc.get_traced_memory()
+                    result = fn(raw, tree)
+                    _, peak = tracemalloc.get_traced_memory()
+                    allocations[case].append((peak - before) / 1024)
+                    del result
+        finally:
+            tracemalloc.stop()
+    parser._tree = None
+
+    sections = {}
+    for case, histogram in histograms.items():
+        summary = histogram.summary()
+        if allocations[case]:
+            summary['alloc_kb'] = sum(allocations[case]) / len(allocations[case])
+        if items[case]:
+            summary['items'] = sum(items[case]) / len(items[case])
+        sections[case] = summary
+
+    return {
+        'created': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'python': platform.python_version(),
+        'repeat': repeat,
+        'dumps': {name: {'nodes': len(tree)} for name, _, tree in trees},
+        'sections': sections,
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> List[str]:
+    """
+    Сравнить прогон с baseline.
+
+    Регрессия - p50 или alloc_kb секции вырос больше чем в (1 + threshold) раз
+    и больше абсолютного порога (MIN_REGRESSION_MS / MIN_REGRESSION_KB).
+
+    Returns:
+        Описания регрессий (пусто - всё в порядке)
+    """
+    regressions = []
+    for case, base in baseline.get('sections', {}).items():
+        now = current['sections'].get(case)
+        if not now or not base:
+            continue
+        checks = (('p50', MIN_REGRESSION_MS, 'мс'), ('alloc_kb', MIN_REGRESSION_KB, 'KB'))
+        for key, min_delta, unit in checks:
+            if key not in now or key not in base:
+                continue
+            if now[key] > base[key] * (1 + threshold) and now[key] - base[key] > min_delta:
+                regressions.append(
+                    f"{case}.{key}: {base[key]:.2f} -> {now[key]:.2f} {unit} "
+                    f"(+{(now[key] / base[key] - 1) * 100 if base[key] else float('inf'):.0f}%)"
+                )
+    return regressions
+
+
+def log_report(result: dict, baseline: dict = None) -> None:
+    """Вывести таблицы времени и памяти."""
+    nodes = [d['nodes'] for d in result['dumps'].values()]
+    logger.info(f"Дампов: {len(nodes)}, узлов: {min(nodes)}-{max(nodes)}, повторов: {result['repeat']}")
+
+    for line in format_table(result['sections'], title='section').splitlines():
+        logger.info(f"  {line}")
+
+    logger.info("")
+    logger.info(f"  {'section':<20} {'alloc KB':>9} {'items':>7} {'vs base p50':>12}")
+    base_sections = (baseline or {}).get('sections', {})
+    for case, summary in result['sections'].items():
+        alloc = f"{summary['alloc_kb']:.1f}" if 'alloc_kb' in summary else '-'
+        count = f"{summary['items']:.0f}" if 'items' in summary else '-'
+        base = base_sections.get(case) or {}
+        delta = f"{(summary['p50'] / base['p50'] - 1) * 100:+.0f}%" if base.get('p50') else '-'
+        logger.info(f"  {case:<20} {alloc:>9} {count:>7} {delta:>12}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Офлайн-бенчмарк UITreeParser по дампам UI tree")
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS, help="glob дампов UI tree")
+    parser.add_argument("--repeat", "-n", type=int, default=50, help="Повторов на дамп")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Файл baseline")
+    parser.add_argument("--save-baseline", action="store_true", help="Записать результат как baseline")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Допустимый рост p50/alloc относительно baseline (0.2 = +20%%)")
+    parser.add_argument("--no-alloc", action="store_true", help="Без прохода tracemalloc")
+    parser.add_argument("--output", help="Сохранить результат прогона в JSON")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus)
+    if not corpus:
+        logger.error(f"Нет дампов по маске {args.corpus}")
+        return 2
+
+    result = run_benchmark(corpus, args.repeat, measure_alloc=not args.no_alloc)
+
+    baseline = None
+    if not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    log_report(result, baseline)
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2, ensure_ascii=False)
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2, ensure_ascii=False)
+        logger.info(f"Baseline записан: {args.baseline}")
+        return 0
+
+    if baseline is None:
+        logger.info(f"Baseline {args.baseline} не найден - сравнение пропущено (--save-baseline)")
+        return 0
+
+    regressions = compare(result, baseline, args.threshold)
+    if regressions:
+        logger.error(f"Регрессии относительно baseline (порог +{args.threshold * 100:.0f}%):")
+        for line in regressions:
+            logger.error(f"  {line}")
+        return 1
+
+    logger.info(f"Регрессий нет (порог +{args.threshold * 100:.0f}%)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
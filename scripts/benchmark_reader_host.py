@@ -0,0 +1,170 @@
+#!/usr/bin/env python
+"""
+Бенчмарк долгоживущего ридера (reader_host) против запуска на каждый тик.
+
+Гоняет SanderlingService._read_memory по записанным дампам в режимах:
+    spawn       - заглушка exe (scripts/fake_memory_reader.py) запускается на каждое чтение
+    host        - та же заглушка в режиме serve: запуск один раз, дальше запросы по pipe
+    linux       - LinuxMemoryReader в процессе сервиса по синтетической куче (linux_fixture)
+    linux-host  - тот же LinuxMemoryReader в дочернем процессе (core/sanderling/reader_host.py)
+и проверяет, что каждое прочитанное дерево совпадает с дампом.
+
+--startup-ms задаёт задержку запуска заглушки (старт процесса и JIT у exe):
+spawn платит её на каждом чтении, host - один раз (отдельная строка start).
+
+Запуск:
+    python scripts/benchmark_reader_host.py
+    python scripts/benchmark_reader_host.py --reads 20 --startup-ms 150 --write-mbps 40
+    python scripts/benchmark_reader_host.py --modes spawn host
+"""
+import argparse
+import glob
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+
+# Добавляем корень проекта в path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.sanderling.compact_tree import CompactUITree
+from core.sanderling.config import SanderlingConfig
+from core.sanderling.linux_fixture import FixtureProcessAccess, build_heap, normalize_tree
+from core.sanderling.linux_reader import LinuxMemoryReader
+from core.sanderling.metrics import RollingHistogram, format_table
+from core.sanderling.service import SanderlingService
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+# Ридер пишет INFO на каждое чтение
+logging.getLogger('core.sanderling.linux_reader').setLevel(logging.WARNING)
+
+DEFAULT_CORPUS = "output/ui_tree_dump_*.json"
+FAKE_READER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fake_memory_reader.py")
+MODES = ('spawn', 'host', 'linux', 'linux-host')
+
+
+def make_service(compact: bool, host_command=None) -> SanderlingService:
+    """Сервис без запуска потока чтения; host_command - режим reader_host."""
+    config = SanderlingConfig(
+        binary_path=FAKE_READER,
+        cache_enabled=False,
+        compact_ui_tree=compact,
+        reader_host=host_command is not None,
+        reader_host_command=list(host_command or []),
+        timeout_ms=30000,
+    )
+    service = SanderlingService(config)
+    service.eve_process_id = 1
+    return service
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Долгоживущий ридер против запуска на каждый тик")
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS, help="glob дампов UI tree")
+    parser.add_argument("--reads", "-n", type=int, default=10, help="Чтений на дамп в каждом режиме")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES), help="Режимы")
+    parser.add_argument("--startup-ms", type=float, default=100.0, help="Задержка запуска заглушки exe")
+    parser.add_argument("--write-mbps", type=float, default=0.0,
+                        help="Скорость вывода заглушки, MB/s (0 - без ограничения)")
+    parser.add_argument("--dict", action="store_true", help="dict-дерево вместо CompactUITree")
+    args = parser.parse_args()
+
+    dumps = sorted(glob.glob(args.corpus))
+    if not dumps:
+        logger.error(f"Нет дампов по маске {args.corpus}")
+        return 2
+
+    compact = not args.dict
+    fake_args = ["--startup-ms", str(args.startup_ms), "--write-mbps", str(args.write_mbps)]
+    histograms = {mode: RollingHistogram(args.reads * len(dumps)) for mode in args.modes}
+    starts = {mode: RollingHistogram(len(dumps)) for mode in args.modes if mode.endswith('host')}
+    failures = 0
+
+    with tempfile.TemporaryDirectory(prefix='reader_host_') as heap_dir:
+        for path in dumps:
+            with open(path, 'r', encoding='utf-8') as f:
+                raw = json.load(f)
+            root = hex(int(raw.get('pythonObjectAddress') or 0))
+            expected = CompactUITree.from_dict(raw, keep_source=False).to_dict()
+            expected_linux = normalize_tree(raw)
+            image = None
+            if any(mode.startswith('linux') for mode in args.modes):
+                image = build_heap(raw, source=path)
+                heap_path = os.path.join(heap_dir, os.path.basename(path) + '.heap')
+                image.save(heap_path)
+
+            for mode in args.modes:
+                if mode == 'spawn':
+                    service = make_service(compact)
+                    service._root_address = root
+                    os.environ["FAKE_MEMORY_READER_ARGS"] = " ".join(["--dump", os.path.abspath(path)] + fake_args)
+                elif mode == 'host':
+                    service = make_service(compact, [
+                        sys.executable, FAKE_READER, "serve", "--pid={pid}", "--dump", os.path.abspath(path),
+                    ] + fake_args)
+                    service._root_address = root
+                elif mode == 'linux':
+                    service = make_service(compact)
+                    reader = LinuxMemoryReader(0, process=FixtureProcessAccess(image))
+                    reader.open()
+                    service._linux_reader = reader
+                    service._root_address = hex(image.root)
+                else:
+                    service = make_service(compact, [
+                        sys.executable, "-m", "core.sanderling.reader_host", "--heap", heap_path,
+                    ])
+                    service._root_address = hex(image.root)
+
+                if mode in starts:
+                    # Запуск хоста - один раз, в чтения не входит
+                    started = time.perf_counter()
+                    if service._reader_host_client() is None:
+                        logger.error(f"{mode}: ридер не запустился")
+                        failures += 1
+                        continue
+                    starts[mode].add((time.perf_counter() - started) * 1000)
+
+                # spawn - путь через exe и на Linux
+                read = service._read_memory_exe if mode == 'spawn' else service._read_memory
+                try:
+                    for _ in range(args.reads):
+                        started = time.perf_counter()
+                        ui_tree = read()
+                        histograms[mode].add((time.perf_counter() - started) * 1000)
+
+                        result = ui_tree.to_dict() if compact and ui_tree is not None else ui_tree
+                        if mode.startswith('linux'):
+                            ok = result is not None and normalize_tree(result) == expected_linux
+                        else:
+                            ok = result == expected
+                        if not ok:
+                            logger.error(f"{mode}: дерево {os.path.basename(path)} отличается от дампа")
+                            failures += 1
+                finally:
+                    service._close_linux_reader()
+                    service._close_reader_host()
+
+    size = sum(os.path.getsize(path) for path in dumps) / len(dumps)
+    logger.info(f"Дампов: {len(dumps)} (~{size / 1024 / 1024:.1f} MB), чтений на режим: "
+                f"{args.reads * len(dumps)}, запуск заглушки {args.startup_ms:.0f} мс, "
+                f"вывод {args.write_mbps or 'без ограничения'} MB/s, {'CompactUITree' if compact else 'dict'}")
+    summaries = {mode: histogram.summary() for mode, histogram in histograms.items()}
+    summaries.update({f"{mode} start": histogram.summary() for mode, histogram in starts.items()})
+    for line in format_table(summaries, title='mode').splitlines():
+        logger.info(f"  {line}")
+
+    if failures:
+        logger.error(f"Деревьев с отличиями: {failures}")
+        return 1
+    logger.info("Все деревья совпадают с дампами")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+"""
+Бенчмарк приёма UI tree от ридера: JSON-файл против потока из stdout.
+
+Гоняет SanderlingService._read_memory_exe с заглушкой ридера
+(scripts/fake_memory_reader.py) по записанным дампам в режимах:
+    file            - ридер пишет файл, сервис ищет имя в выводе, json.load, удаляет
+    stream          - reader_stream_output: JSON из stdout, дерево строится по мере вывода
+    stream-buffered - поток без ijson: буфер + json.loads после завершения ридера
+и проверяет, что каждое полученное дерево совпадает с дампом.
+
+--write-mbps задаёт скорость вывода заглушки (exe сериализует дерево по мере
+обхода памяти - поток выигрывает за счёт разбора параллельно с выводом),
+--startup-ms - запуск процесса и JIT.
+
+Запуск:
+    python scripts/benchmark_reader_stream.py
+    python scripts/benchmark_reader_stream.py --reads 20 --write-mbps 40 --startup-ms 100
+"""
+import argparse
+import glob
+import json
+import logging
+import os
+import sys
+import time
+
+# Добавляем корень проекта в path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.sanderling.compact_tree import CompactUITree
+from core.sanderling.config import SanderlingConfig
+from core.sanderling.metrics import RollingHistogram, format_table
+from core.sanderling.service import SanderlingService
+from core.sanderling.tree_stream import run_reader_streaming, streaming_available
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+DEFAULT_CORPUS = "output/ui_tree_dump_*.json"
+FAKE_READER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fake_memory_reader.py")
+
+
+def make_service(stream: bool, compact: bool) -> SanderlingService:
+    """Сервис с заглушкой вместо exe (без запуска потока чтения)."""
+    config = SanderlingConfig(
+        binary_path=FAKE_READER,
+        cache_enabled=False,
+        compact_ui_tree=compact,
+        reader_stream_output=stream,
+        reader_stream_args=["--stdout"],
+        timeout_ms=30000,
+    )
+    service = SanderlingService(config)
+    service.eve_process_id = 1
+    return service
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Приём UI tree от ридера: файл против stdout")
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS, help="glob дампов UI tree")
+    parser.add_argument("--reads", "-n", type=int, default=10, help="Чтений на дамп в каждом режиме")
+    parser.add_argument("--write-mbps", type=float, default=0.0,
+                        help="Скорость вывода заглушки, MB/s (0 - без ограничения)")
+    parser.add_argument("--startup-ms", type=float, default=0.0, help="Задержка запуска заглушки")
+    parser.add_argument("--dict", action="store_true", help="dict-дерево вместо CompactUITree")
+    args = parser.parse_args()
+
+    dumps = sorted(glob.glob(args.corpus))
+    if not dumps:
+        logger.error(f"Нет дампов по маске {args.corpus}")
+        return 2
+
+    compact = not args.dict
+    modes = ['file', 'stream']
+    if streaming_available():
+        modes.append('stream-buffered')
+    else:
+        logger.info("ijson (C-бэкенд) не установлен: stream разбирает JSON после завершения ридера")
+
+    services = {'file': make_service(False, compact), 'stream': make_service(True, compact)}
+    histograms = {mode: RollingHistogram(args.reads * len(dumps)) for mode in modes}
+    failures = 0
+
+    for path in dumps:
+        with open(path, 'r', encoding='utf-8') as f:
+            raw = json.load(f)
+        expected = CompactUITree.from_dict(raw, keep_source=False).to_dict() if compact else raw
+        root = hex(int(raw.get('pythonObjectAddress') or 0))
+        os.environ["FAKE_MEMORY_READER_ARGS"] = (
+            f"--dump {os.path.abspath(path)} --write-mbps {args.write_mbps} --startup-ms {args.startup_ms}"
+        )
+
+        for mode in modes:
+            for _ in range(args.reads):
+                started = time.perf_counter()
+                if mode == 'stream-buffered':
+                    service = services['stream']
+                    cmd = service._reader_command() + [
+                        "read-memory-eve-online", "--pid=1", "--remove-other-dict-entries",
+                        "--root-address", root, "--stdout",
+                    ]
+                    ui_tree = run_reader_streaming(cmd, timeout=30.0, compact=compact, streaming=False).ui_tree
+                else:
+                    service = services[mode]
+                    service._root_address = root
+                    ui_tree = service._read_memory_exe()
+                histograms[mode].add((time.perf_counter() - started) * 1000)
+
+                result = ui_tree.to_dict() if compact and ui_tree is not None else ui_tree
+                if result != expected:
+                    logger.error(f"{mode}: дерево {os.path.basename(path)} отличается от дампа")
+                    failures += 1
+
+    size = sum(os.path.getsize(path) for path in dumps) / len(dumps)
+    logger.info(f"Дампов: {len(dumps)} (~{size / 1024 / 1024:.1f} MB), чтений на режим: "
+                f"{args.reads * len(dumps)}, вывод {args.write_mbps or 'без ограничения'} MB/s, "
+                f"запуск {args.startup_ms:.0f} мс, {'CompactUITree' if compact else 'dict'}")
+    summaries = {mode: histogram.summary() for mode, histogram in histograms.items()}
+    for line in format_table(summaries, title='mode').splitlines():
+        logger.info(f"  {line}")
+
+    if failures:
+        logger.error(f"Деревьев с отличиями: {failures}")
+        return 1
+    logger.info("Все деревья совпадают с дампами")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
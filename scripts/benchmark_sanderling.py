@@ -6,6 +6,7 @@ import logging
 import time
 import statistics
 from core.sanderling.service import SanderlingService
+from core.sanderling.metrics import format_table
 
 logging.basicConfig(
     level=logging.INFO,
@@ -44,26 +45,22 @@ def benchmark_sanderling(num_reads: int = 20):
     logger.info("(Ждем пока фоновый поток сделает чтения...)")
     
     read_times = []
-    prev_count = service._read_count
+    seq = service.state_seq
     
     start_time = time.time()
     
     while len(read_times) < num_reads:
-        time.sleep(0.05)  # Проверяем каждые 50 мс
-        
-        current_count = service._read_count
-        if current_count > prev_count:
-            # Было новое чтение
-            read_time = service._last_read_time_ms
-            read_times.append(read_time)
-            
-            logger.info(f"  [{len(read_times):2d}/{num_reads}] Read time: {read_time:6.1f} мс")
-            prev_count = current_count
-        
         # Таймаут 30 секунд
-        if time.time() - start_time > 30:
+        remaining = 30 - (time.time() - start_time)
+        snapshot = service.wait_for_new_state(seq, timeout=max(remaining, 0))
+        if snapshot is None:
             logger.warning("Таймаут ожидания чтений")
             break
+        
+        # Было новое чтение
+        seq = snapshot.seq
+        read_times.append(snapshot.read_time_ms)
+        logger.info(f"  [{len(read_times):2d}/{num_reads}] Read time: {snapshot.read_time_ms:6.1f} мс")
     
     # Статистика
     logger.info("\n" + "="*80)
@@ -82,6 +79,12 @@ def benchmark_sanderling(num_reads: int = 20):
     logger.info(f"  Максимум: {max(read_times):6.1f} мс")
     logger.info(f"  Стд.откл: {statistics.stdev(read_times):6.1f} мс")
     
+    # Разбивка тика по стадиям (p50/p95/p99/max)
+    metrics = service.metrics()
+    logger.info(f"\nСтадии тика ({metrics['ticks']} тиков, ошибок: {metrics['errors']}):")
+    for line in format_table(metrics['stages']).splitlines():
+        logger.info(f"  {line}")
+    
     avg_read = statistics.mean(read_times)
     max_fps = 1000.0 / avg_read
     
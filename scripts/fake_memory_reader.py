@@ -0,0 +1,168 @@
+#!/usr/bin/env python
+"""
+Заглушка read-memory-64-bit.exe: отдаёт записанные дампы UI tree.
+
+Повторяет командную строку и вывод C# ридера, чтобы путь сервиса через exe
+(SanderlingService._read_memory_exe, поиск корня, потоковый приём из stdout)
+проверялся и замерялся без Windows и EVE. В конфиге достаточно указать
+"binary_path": "scripts/fake_memory_reader.py" - .py запускается текущим
+интерпретатором.
+
+    python scripts/fake_memory_reader.py read-memory-eve-online --pid=1 --remove-other-dict-entries
+    python scripts/fake_memory_reader.py read-memory-eve-online --pid=1 --root-address 0x1A2B --stdout
+
+Как exe: пишет eve-online-memory-reading-<время>.json в текущий каталог и
+печатает "... to file '<имя>'"; без --root-address сначала печатает
+найденный корень ("0x...: N nodes"). С --stdout JSON идёт в stdout кусками
+по --chunk-size со скоростью --write-mbps (0 - без ограничения), имитируя
+сериализацию по мере обхода. --startup-ms - задержка перед выводом (запуск
+процесса и JIT у exe).
+
+Дамп: --dump файл или --dumps glob (по кругу, счётчик в текущем каталоге).
+Параметры заглушки можно передать и через переменную окружения
+FAKE_MEMORY_READER_ARGS (когда командную строку собирает сервис):
+
+    FAKE_MEMORY_READER_ARGS="--write-mbps 40 --startup-ms 150"
+
+Команда serve - долгоживущий ридер (режим reader_host сервиса): запросы
+и ответы кадрами протокола core/sanderling/reader_host.py через
+stdin/stdout, дерево отдаётся JSON-ом. --startup-ms платится один раз при
+запуске, --write-mbps - на каждый ответ; дампы по кругу без файла-счётчика.
+
+    python scripts/fake_memory_reader.py serve --pid=1 --dumps "output/ui_tree_dump_*.json"
+"""
+import argparse
+import glob
+import json
+import os
+import shlex
+import sys
+import time
+from datetime import datetime
+
+DEFAULT_DUMPS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                             "output", "ui_tree_dump_*.json")
+COUNTER_FILE = ".fake_memory_reader_counter"
+ENV_ARGS = "FAKE_MEMORY_READER_ARGS"
+
+
+def pick_dump(args) -> str:
+    """Дамп для этого запуска: --dump или следующий по кругу из --dumps."""
+    if args.dump:
+        return args.dump
+    dumps = sorted(glob.glob(args.dumps))
+    if not dumps:
+        raise SystemExit(f"Нет дампов по маске {args.dumps}")
+    try:
+        with open(COUNTER_FILE, 'r') as f:
+            counter = int(f.read() or 0)
+    except (OSError, ValueError):
+        counter = 0
+    with open(COUNTER_FILE, 'w') as f:
+        f.write(str(counter + 1))
+    return dumps[counter % len(dumps)]
+
+
+def serve(args) -> int:
+    """Обслуживать запросы reader_host, отдавая дампы по кругу."""
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from core.sanderling.reader_host import FORMAT_JSON, ReaderHandler, serve as serve_requests
+
+    dumps = [args.dump] if args.dump else sorted(glob.glob(args.dumps))
+    if not dumps:
+        raise SystemExit(f"Нет дампов по маске {args.dumps}")
+    loaded = {}
+
+    def load(path: str) -> bytes:
+        if path not in loaded:
+            with open(path, 'rb') as f:
+                loaded[path] = f.read()
+        return loaded[path]
+
+    class DumpReplayHandler(ReaderHandler):
+        name = 'fake'
+        formats = (FORMAT_JSON,)
+        counter = 0
+
+        def find_root(self):
+            ui_tree = json.loads(load(dumps[self.counter % len(dumps)]))
+            return f"0x{int(ui_tree.get('pythonObjectAddress') or 0):X}"
+
+        def read_tree(self, root, fmt):
+            data = load(dumps[self.counter % len(dumps)])
+            self.counter += 1
+            if args.write_mbps > 0:
+                # Сериализация дерева в ридере по мере обхода
+                time.sleep(len(data) / (args.write_mbps * 1024 * 1024))
+            return {'format': FORMAT_JSON}, data
+
+    # stdout - канал протокола
+    stdout = sys.stdout.buffer
+    sys.stdout = sys.stderr
+    return serve_requests(DumpReplayHandler(), sys.stdin.buffer, stdout)
+
+
+def write_chunks(out, data: bytes, chunk_size: int, write_mbps: float) -> None:
+    """Записать JSON кусками с заданной скоростью (как exe по мере обхода дерева)."""
+    started = time.perf_counter()
+    for pos in range(0, len(data), chunk_size):
+        out.write(data[pos:pos + chunk_size])
+        out.flush()
+        if write_mbps > 0:
+            due = started + (pos + chunk_size) / (write_mbps * 1024 * 1024)
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Заглушка read-memory-64-bit.exe по записанным дампам")
+    parser.add_argument("command", choices=["read-memory-eve-online", "serve"])
+    parser.add_argument("--pid", type=int, required=True)
+    parser.add_argument("--remove-other-dict-entries", action="store_true")
+    parser.add_argument("--root-address")
+    parser.add_argument("--dump", help="Файл дампа")
+    parser.add_argument("--dumps", default=DEFAULT_DUMPS, help="glob дампов (по кругу)")
+    parser.add_argument("--stdout", action="store_true", help="JSON в stdout вместо файла")
+    parser.add_argument("--chunk-size", type=int, default=65536, help="Размер куска вывода")
+    parser.add_argument("--write-mbps", type=float, default=0.0, help="Скорость вывода, MB/s (0 - без ограничения)")
+    parser.add_argument("--startup-ms", type=float, default=0.0, help="Задержка перед выводом")
+    parser.add_argument("--fail", action="store_true", help="Завершиться с кодом 1 (проверка ошибок)")
+    args = parser.parse_args(sys.argv[1:] + shlex.split(os.environ.get(ENV_ARGS, '')))
+
+    if args.startup_ms > 0:
+        time.sleep(args.startup_ms / 1000.0)
+    if args.fail:
+        print("Failed to open process")
+        return 1
+    if args.command == "serve":
+        return serve(args)
+
+    path = pick_dump(args)
+    with open(path, 'rb') as f:
+        data = f.read()
+
+    if not args.root_address:
+        ui_tree = json.loads(data)
+        nodes, stack = 0, [ui_tree]
+        while stack:
+            node = stack.pop()
+            nodes += 1
+            stack.extend(child for child in node.get('children') or () if isinstance(child, dict))
+        print("Found 1 candidate for UIRoot:")
+        print(f"0x{int(ui_tree.get('pythonObjectAddress') or 0):X}: {nodes} nodes")
+        sys.stdout.flush()
+
+    if args.stdout:
+        write_chunks(sys.stdout.buffer, data, args.chunk_size, args.write_mbps)
+        return 0
+
+    filename = f"eve-online-memory-reading-{datetime.now():%Y-%m-%dT%H-%M-%S-%f}.json"
+    with open(filename, 'wb') as f:
+        write_chunks(f, data, args.chunk_size, args.write_mbps)
+    print(f"Saved the memory reading to file '{os.path.abspath(filename)}'")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
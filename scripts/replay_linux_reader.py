@@ -0,0 +1,211 @@
+#!/usr/bin/env python
+"""
+Запись и офлайн-воспроизведение чтений памяти LinuxMemoryReader.
+
+record: поиск UIRoot и N чтений дерева на живом процессе EVE (или на
+синтетической куче --heap), все прочитанные байты и регионы сохраняются
+в файл .pages (core/sanderling/linux_replay.py) вместе со временем и
+числом чтений каждого этапа.
+
+replay: те же этапы по записи, без процесса. Печатается время и число
+чтений против записи; проверяется, что найден тот же корень, узлов столько
+же и последовательность чтений совпадает с записанной. После изменения
+алгоритма ридера расхождение показывает, с какого чтения он пошёл иначе,
+а чтение вне записанных байт вернёт None - как неотображённая память.
+
+Запуск:
+    python scripts/replay_linux_reader.py record --pid 12345 -o output/tick.pages -n 5
+    python scripts/replay_linux_reader.py record --heap output/heaps/ui_tree_dump_1.heap -o output/tick.pages
+    python scripts/replay_linux_reader.py replay output/tick.pages --repeat 20
+
+Код выхода replay: 1 - другой корень или число узлов.
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+
+# Добавляем корень проекта в path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.sanderling.linux_process import LinuxProcessAccess, find_eve_process
+from core.sanderling.linux_reader import LinuxMemoryReader
+from core.sanderling.linux_replay import PageRecorder, Recording, ReplayProcessAccess
+from core.sanderling.metrics import RollingHistogram, format_table
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+# Ридер пишет INFO на каждое чтение
+logging.getLogger('core.sanderling.linux_reader').setLevel(logging.WARNING)
+
+
+def run_stages(reader: LinuxMemoryReader, reads: int, mark=None, root=None) -> dict:
+    """
+    Поиск корня и reads чтений дерева (read_ui_tree_compact).
+
+    Args:
+        reader: Открытый ридер
+        reads: Чтений дерева
+        mark: Вызывается с именем этапа перед его началом (PageRecorder.mark)
+        root: Готовый корень (без поиска)
+
+    Returns:
+        {'root', 'nodes', 'stages': [(имя, мс, чтений памяти)]}
+    """
+    stages = []
+
+    def timed(name, fn):
+        if mark:
+            mark(name)
+        before = reader.read_calls
+        started = time.perf_counter()
+        result = fn()
+        stages.append((name, (time.perf_counter() - started) * 1000, reader.read_calls - before))
+        return result
+
+    if root is None:
+        root = timed('find_root', reader.find_root_address)
+
+    nodes = None
+    if root is not None:
+        for i in range(reads):
+            tree = timed(f'read_{i}', lambda: reader.read_ui_tree_compact(root))
+            nodes = len(tree) if tree is not None else None
+
+    return {'root': root, 'nodes': nodes, 'stages': stages}
+
+
+def record(args) -> int:
+    if args.heap:
+        from core.sanderling.linux_fixture import FixtureProcessAccess, HeapImage
+        process = FixtureProcessAccess(HeapImage.load(args.heap))
+        pid = 0
+    else:
+        pid = args.pid or find_eve_process()
+        if not pid:
+            logger.error("Процесс EVE не найден (--pid или --heap)")
+            return 2
+        process = LinuxProcessAccess(pid)
+
+    recorder = PageRecorder()
+    process.recorder = recorder
+    reader = LinuxMemoryReader(pid, process=process)
+    if not reader.open():
+        logger.error(f"Не удалось открыть процесс {pid}")
+        return 2
+
+    try:
+        result = run_stages(reader, args.reads, mark=recorder.mark, root=args.root)
+    finally:
+        reader.close()
+
+    if result['root'] is None:
+        logger.warning("UIRoot не найден - запись сохраняется для разбора поиска")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    recorder.save(args.output, meta={
+        'pid': pid,
+        'source': args.heap or f'pid {pid}',
+        'root': result['root'],
+        'nodes': result['nodes'],
+        'stages': result['stages'],
+    })
+
+    for name, ms, calls in result['stages']:
+        logger.info(f"  {name:<12} {ms:>9.1f} мс {calls:>8} чтений")
+    size = os.path.getsize(args.output)
+    logger.info(f"Записано {len(recorder)} чтений, {len(recorder.store)} страниц "
+                f"({recorder.store.stored_bytes() / 1024:.0f} KB данных, файл {size / 1024:.0f} KB): {args.output}")
+    return 0
+
+
+def replay(args) -> int:
+    started = time.perf_counter()
+    recording = Recording.load(args.recording)
+    meta = recording.meta
+    logger.info(f"{args.recording}: {recording.reads} чтений, {len(recording.store)} страниц, "
+                f"источник {meta.get('source')}, загрузка {(time.perf_counter() - started) * 1000:.0f} мс")
+
+    recorded = {name: (ms, calls) for name, ms, calls in meta.get('stages', [])}
+    reads = sum(1 for name in recorded if name.startswith('read_'))
+    find_root = 'find_root' in recorded
+
+    histograms = {}
+    calls = {}
+    failures = 0
+    for run in range(args.repeat):
+        process = ReplayProcessAccess(recording)
+        reader = LinuxMemoryReader(process.pid, process=process)
+        reader.open()
+        try:
+            result = run_stages(reader, reads, root=None if find_root else meta.get('root'))
+        finally:
+            reader.close()
+
+        for name, ms, count in result['stages']:
+            stage = 'read_tree' if name.startswith('read_') else name
+            histograms.setdefault(stage, RollingHistogram(args.repeat * max(reads, 1))).add(ms)
+            calls[stage] = count
+
+        if run > 0:
+            continue
+        # Проверка по первому прогону (остальные идут тем же путём)
+        if result['root'] != meta.get('root'):
+            logger.error(f"Корень {result['root']}, в записи {meta.get('root')}")
+            failures += 1
+        if result['nodes'] != meta.get('nodes'):
+            logger.error(f"Узлов {result['nodes']}, в записи {meta.get('nodes')}")
+            failures += 1
+        if not process.matches_log:
+            i = process.diverged_at
+            expected = (f"0x{recording.log_addr[i]:X}+{recording.log_size[i]}"
+                        if i < recording.reads else 'конец записи')
+            logger.warning(f"Последовательность чтений разошлась с записью на чтении #{i} "
+                           f"(в записи {expected}); чтений {process.read_calls} против {recording.reads}")
+
+    summaries = {stage: histogram.summary() for stage, histogram in histograms.items()}
+    logger.info(f"Воспроизведение, прогонов: {args.repeat} (мс)")
+    for line in format_table(summaries, title='stage').splitlines():
+        logger.info(f"  {line}")
+
+    logger.info(f"  {'stage':<12} {'чтений':>8} {'в записи':>9} {'мс в записи':>12}")
+    for stage in histograms:
+        names = [n for n in recorded if (n.startswith('read_') if stage == 'read_tree' else n == stage)]
+        rec_calls = recorded[names[-1]][1] if names else None
+        rec_ms = sum(recorded[n][0] for n in names) / len(names) if names else None
+        logger.info(f"  {stage:<12} {calls[stage]:>8} "
+                    f"{rec_calls if rec_calls is not None else '-':>9} "
+                    f"{f'{rec_ms:.1f}' if rec_ms is not None else '-':>12}")
+
+    if failures:
+        logger.error(f"Ошибок: {failures}")
+        return 1
+    logger.info("Корень и число узлов совпадают с записью")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Запись/воспроизведение чтений LinuxMemoryReader")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    rec = commands.add_parser("record", help="Записать поиск корня и чтения дерева")
+    rec.add_argument("--pid", type=int, help="PID процесса EVE (по умолчанию - найти)")
+    rec.add_argument("--heap", help="Синтетическая куча .heap вместо процесса")
+    rec.add_argument("--root", help="Известный root address (без поиска)")
+    rec.add_argument("--reads", "-n", type=int, default=3, help="Чтений дерева")
+    rec.add_argument("--output", "-o", default="output/linux_reader.pages", help="Файл записи")
+
+    rep = commands.add_parser("replay", help="Воспроизвести запись")
+    rep.add_argument("recording", help="Файл .pages")
+    rep.add_argument("--repeat", type=int, default=5, help="Прогонов")
+
+    args = parser.parse_args()
+    return record(args) if args.command == "record" else replay(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,205 @@
+#!/usr/bin/env python
+"""
+Записи сессий UI tree (core/sanderling/session_recorder.py): обзор,
+дерево на момент времени и бенчмарк записи.
+
+Запуск:
+    python scripts/session_tool.py info output/sessions/session_12345_20260205_023010.sess
+    python scripts/session_tool.py at output/sessions/<файл>.sess 02:41:15 -o tree.json
+    python scripts/session_tool.py at output/sessions/<файл>.sess +600 -o tree.snap
+    python scripts/session_tool.py bench --ticks 600 --changes 20
+
+bench прогоняет запись по дампам output/ui_tree_dump_*.json (каждый дамп -
+серия тиков с изменёнными _setText в случайных узлах), печатает время
+record() на кадр, размер кадров и объём в час при интервале чтения
+read_interval_ms, и проверяет, что читатель восстанавливает каждое дерево.
+"""
+import argparse
+import glob
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+# Добавляем корень проекта в path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.sanderling.compact_tree import CompactUITree
+from core.sanderling.metrics import RollingHistogram, format_table
+from core.sanderling.session_recorder import FRAME_KEYFRAME, SessionReader, SessionRecorder
+from core.sanderling.snapshot_file import write_snapshot
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+DEFAULT_CORPUS = "output/ui_tree_dump_*.json"
+
+
+def parse_time(value: str, reader: SessionReader) -> float:
+    """
+    Время в записи: unix-время, "+секунд" от начала или "ЧЧ:ММ:СС" в день начала записи.
+    """
+    if value.startswith('+'):
+        return reader.start + float(value[1:])
+    if ':' in value:
+        day = datetime.fromtimestamp(reader.start)
+        clock = datetime.strptime(value, "%H:%M:%S")
+        return day.replace(hour=clock.hour, minute=clock.minute, second=clock.second).timestamp()
+    return float(value)
+
+
+def info(args) -> int:
+    reader = SessionReader(args.session)
+    if not len(reader):
+        logger.error(f"{args.session}: кадров нет")
+        return 1
+
+    keyframes = [f for f in reader.frames if f[1] == FRAME_KEYFRAME]
+    deltas = [f for f in reader.frames if f[1] != FRAME_KEYFRAME]
+    duration = reader.end - reader.start
+    size = os.path.getsize(args.session)
+    logger.info(f"{args.session}")
+    logger.info(f"  {datetime.fromtimestamp(reader.start):%Y-%m-%d %H:%M:%S} - "
+                f"{datetime.fromtimestamp(reader.end):%H:%M:%S} ({duration / 60:.1f} мин)")
+    logger.info(f"  кадров: {len(reader)} (ключевых {len(keyframes)}, дельт {len(deltas)}), "
+                f"{size / 1024 / 1024:.1f} MB")
+    if keyframes:
+        logger.info(f"  ключевой кадр: {sum(f[4] for f in keyframes) / len(keyframes) / 1024:.1f} KB")
+    if deltas:
+        logger.info(f"  дельта: {sum(f[4] for f in deltas) / len(deltas) / 1024:.2f} KB")
+    if duration > 0:
+        logger.info(f"  {size / duration * 3600 / 1024 / 1024:.1f} MB/час")
+    return 0
+
+
+def tree_at(args) -> int:
+    reader = SessionReader(args.session)
+    timestamp = parse_time(args.time, reader)
+    index = reader.frame_at(timestamp)
+    if index < 0:
+        logger.error(f"Запись начинается позже ({datetime.fromtimestamp(reader.start):%H:%M:%S})")
+        return 1
+
+    started = time.perf_counter()
+    tree = reader.tree(index)
+    logger.info(f"Кадр {index} ({datetime.fromtimestamp(reader.frames[index][0]):%H:%M:%S.%f}), "
+                f"{len(tree)} узлов, восстановлен за {(time.perf_counter() - started) * 1000:.0f} мс")
+
+    if args.output:
+        if args.output.endswith('.snap'):
+            write_snapshot(args.output, tree)
+        else:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                json.dump(tree.to_dict(), f, ensure_ascii=False)
+        logger.info(f"Записано: {args.output}")
+    return 0
+
+
+def bench(args) -> int:
+    dumps = []
+    for path in sorted(glob.glob(args.corpus)):
+        with open(path, 'r', encoding='utf-8') as f:
+            dumps.append(json.load(f))
+    if not dumps:
+        logger.error(f"Нет дампов по маске {args.corpus}")
+        return 2
+
+    rng = random.Random(1)
+    trees = []
+    hold = max(1, args.ticks // len(dumps))
+    for dump in dumps:
+        nodes = _flatten(dump)
+        for _ in range(hold):
+            for node in rng.sample(nodes, min(args.changes, len(nodes))):
+                entries = node.get('dictEntriesOfInterest')
+                if not isinstance(entries, dict):
+                    entries = node['dictEntriesOfInterest'] = {}
+                entries['_setText'] = f"{rng.randint(0, 250000):,} m"
+            # Упаковка копирует entries - дамп дальше можно менять
+            trees.append(CompactUITree.from_dict(dump, keep_source=False))
+
+    path = os.path.join(tempfile.mkdtemp(prefix="session_bench_"), "bench.sess")
+    recorder = SessionRecorder(path, keyframe_interval=args.keyframe_interval)
+    started = time.time()
+    interval = args.read_interval_ms / 1000.0
+    for i, tree in enumerate(trees):
+        recorder.record(tree, timestamp=started + i * interval)
+    recorder.close()
+
+    stats = recorder.stats()
+    logger.info(f"Тиков: {len(trees)}, изменений на тик: {args.changes}, "
+                f"ключевой кадр раз в {args.keyframe_interval}")
+    for line in format_table({'record_ms': stats['record_ms']}, title='stage').splitlines():
+        logger.info(f"  {line}")
+
+    reader = SessionReader(path)
+    keyframes = [f[4] for f in reader.frames if f[1] == FRAME_KEYFRAME]
+    deltas = [f[4] for f in reader.frames if f[1] != FRAME_KEYFRAME]
+    per_hour = stats['bytes'] / (len(trees) * interval) * 3600
+    logger.info(f"  ключевой кадр {sum(keyframes) / len(keyframes) / 1024:.1f} KB, "
+                f"дельта {sum(deltas) / max(1, len(deltas)) / 1024:.2f} KB, "
+                f"{per_hour / 1024 / 1024:.1f} MB/час при {args.read_interval_ms} мс")
+
+    seek = RollingHistogram(len(trees))
+    failures = 0
+    for index, tree in enumerate(trees):
+        begin = time.perf_counter()
+        restored = reader.tree_at(started + index * interval)
+        seek.add((time.perf_counter() - begin) * 1000)
+        if restored.to_dict() != tree.to_dict():
+            logger.error(f"Кадр {index} восстановлен с отличиями")
+            failures += 1
+    for line in format_table({'sequential_ms': seek.summary()}, title='reader').splitlines():
+        logger.info(f"  {line}")
+    os.unlink(path)
+
+    if failures:
+        return 1
+    logger.info("Все кадры восстановлены без отличий")
+    return 0
+
+
+def _flatten(tree: dict) -> list:
+    """Все dict-узлы дерева."""
+    nodes, stack = [], [tree]
+    while stack:
+        node = stack.pop()
+        nodes.append(node)
+        for child in node.get('children') or ():
+            if isinstance(child, dict):
+                stack.append(child)
+    return nodes
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Записи сессий UI tree")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    p_info = commands.add_parser("info", help="Обзор записи")
+    p_info.add_argument("session", help="Файл .sess")
+
+    p_at = commands.add_parser("at", help="Дерево на момент времени")
+    p_at.add_argument("session", help="Файл .sess")
+    p_at.add_argument("time", help="unix-время, +секунд от начала или ЧЧ:ММ:СС")
+    p_at.add_argument("--output", "-o", help="Сохранить дерево (.json или .snap)")
+
+    p_bench = commands.add_parser("bench", help="Стоимость записи по дампам")
+    p_bench.add_argument("--corpus", default=DEFAULT_CORPUS, help="glob дампов UI tree")
+    p_bench.add_argument("--ticks", type=int, default=300, help="Тиков всего")
+    p_bench.add_argument("--changes", type=int, default=20, help="Изменённых узлов на тик")
+    p_bench.add_argument("--keyframe-interval", type=int, default=100, help="Ключевой кадр раз в N тиков")
+    p_bench.add_argument("--read-interval-ms", type=int, default=600, help="Интервал чтения для оценки объёма")
+
+    args = parser.parse_args()
+    return {"info": info, "at": tree_at, "bench": bench}[args.command](args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
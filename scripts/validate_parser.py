@@ -0,0 +1,321 @@
+#!/usr/bin/env python
+"""
+Проверка UITreeParser по корпусу записанных UI tree против эталона.
+
+Дампы, снимки .snap и кадры записей сессий .sess (core/sanderling/corpus.py)
+разбираются параллельно в пуле процессов (файл - задача). GameState каждого
+дерева приводится к JSON-виду и сравнивается с эталоном: отчёт перечисляет
+деревья, где разбор изменился (с путями изменённых полей), новые деревья без
+эталона и время parse() по каждому дереву.
+
+Запуск:
+    python scripts/validate_parser.py --save-golden               # записать эталон по output/
+    python scripts/validate_parser.py                             # сравнить с эталоном
+    python scripts/validate_parser.py /data/dumps "output/sessions/*.sess" --workers 8
+    python scripts/validate_parser.py /data/dumps --save-golden   # обновить эталон для этих деревьев
+
+После намеренного изменения парсера отчёт показывает, что именно поменялось;
+если изменения ожидаемые - эталон обновляется через --save-golden.
+
+Перед корпусом разбираются синтетические деревья EDGE_CASES (значения, которых
+в записанном корпусе нет): parse() на них не должен падать.
+
+Код выхода: 1 - разбор отличается от эталона, файл не разобрался или упал
+разбор синтетического дерева.
+"""
+import argparse
+import copy
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import fields, is_dataclass
+from typing import Any, Dict, List, Tuple
+
+# Добавляем корень проекта в path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.sanderling.compact_tree import CompactUITree
+from core.sanderling.corpus import corpus_files, load_trees, tree_key
+from core.sanderling.metrics import RollingHistogram, format_table
+from core.sanderling.parser import UITreeParser
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+DEFAULT_CORPUS = ["output"]
+DEFAULT_GOLDEN = "output/benchmarks/parser_golden.json"
+
+# Поля GameState, которые не сравниваются: дерево, производный индекс, время разбора
+IGNORED_FIELDS = ('ui_tree', 'tree', 'overview_index', 'timestamp')
+FLOAT_DIGITS = 6
+
+
+def _node(type_name: str, children: List[dict] = (), **entries) -> dict:
+    """Узел синтетического дерева в формате C# exe."""
+    return {'pythonObjectTypeName': type_name, 'pythonObjectAddress': '1',
+            'dictEntriesOfInterest': entries, 'children': list(children)}
+
+
+# Синтетические деревья: parse() должен вернуть GameState, а не упасть
+EDGE_CASES = {
+    # int_low32 указателя вместо координаты: сумма с ребёнком выходит за int32
+    'displayX за int32': _node('UIRoot', [
+        _node('OverviewScrollEntry', [_node('OverviewLabel', _setText='Wreck')], _displayX=1000),
+    ], _displayX={'int': '2100239008741', 'int_low32': 2147483000}),
+    'размеры за int32': _node('UIRoot', [
+        _node('ShipSlot', _displayX=-5000000000, _displayWidth=5000000000, _displayHeight=-1),
+    ]),
+}
+
+
+def state_to_dict(state) -> Dict[str, Any]:
+    """GameState в JSON-вид для эталона (кортежи - списки, записи - dict)."""
+    return {f.name: _plain(getattr(state, f.name)) for f in fields(state) if f.name not in IGNORED_FIELDS}
+
+
+def _plain(value: Any) -> Any:
+    if is_dataclass(value):
+        return {f.name: _plain(getattr(value, f.name)) for f in fields(value)}
+    if isinstance(value, (list, tuple)):
+        return [_plain(v) for v in value]
+    if isinstance(value, dict):
+        return {str(k): _plain(v) for k, v in value.items()}
+    if isinstance(value, float):
+        return round(value, FLOAT_DIGITS)
+    return value
+
+
+def diff_states(expected: Any, actual: Any, path: str = 'state') -> List[str]:
+    """
+    Отличия разбора от эталона.
+
+    Returns:
+        Строки вида "overview[3].distance: '1 189 м' -> '1 190 м'"
+    """
+    if isinstance(expected, dict) and isinstance(actual, dict):
+        differences = []
+        for key in list(expected) + [k for k in actual if k not in expected]:
+            if key not in actual:
+                differences.append(f"{path}.{key}: поле пропало")
+            elif key not in expected:
+                differences.append(f"{path}.{key}: новое поле = {_short(actual[key])}")
+            else:
+                differences.extend(diff_states(expected[key], actual[key], f"{path}.{key}"))
+        return differences
+
+    if isinstance(expected, list) and isinstance(actual, list):
+        differences = []
+        if len(expected) != len(actual):
+            differences.append(f"{path}: {len(expected)} -> {len(actual)} элементов")
+        for i, (old, new) in enumerate(zip(expected, actual)):
+            differences.extend(diff_states(old, new, f"{path}[{i}]"))
+        return differences
+
+    if expected != actual:
+        return [f"{path}: {_short(expected)} -> {_short(actual)}"]
+    return []
+
+
+def _short(value: Any, limit: int = 80) -> str:
+    text = repr(value)
+    return text if len(text) <= limit else text[:limit] + '...'
+
+
+def check_edge_cases() -> List[str]:
+    """
+    Разобрать EDGE_CASES в dict- и компактной форме.
+
+    Returns:
+        Ошибки вида "имя (форма): исключение"
+    """
+    errors = []
+    for name, ui_tree in EDGE_CASES.items():
+        for form in ('dict', 'compact'):
+            # from_dict поверх dict дописывает геометрию в узлы - каждый раз копия
+            tree = copy.deepcopy(ui_tree)
+            try:
+                if form == 'compact':
+                    tree = CompactUITree.from_dict(tree, keep_source=False)
+                UITreeParser().parse(tree)
+            except Exception as e:
+                errors.append(f"{name} ({form}): {type(e).__name__}: {e}")
+    return errors
+
+
+def parse_file(path: str, root: str, session_every: float, repeat: int) -> List[tuple]:
+    """
+    Задача процесса: разобрать все деревья файла.
+
+    Args:
+        path: Файл корпуса
+        root: Корень аргумента корпуса (ключи деревьев считаются от него)
+        session_every: Для .sess - не чаще одного кадра за столько секунд
+        repeat: Замеров parse() на дерево (в отчёт идёт медиана)
+
+    Returns:
+        [(ключ, узлов, мс, state_to_dict)]
+    """
+    results = []
+    for frame, _, tree in load_trees(path, session_every):
+        # Свой парсер на дерево: без переиспользования записей соседних деревьев
+        parser = UITreeParser()
+        state = parser.parse(tree)
+        timings = []
+        for _ in range(repeat):
+            parser._cached_tree = None
+            started = time.perf_counter()
+            parser.parse(tree)
+            timings.append((time.perf_counter() - started) * 1000)
+        timings.sort()
+        results.append((tree_key(path, frame, root), len(tree), timings[len(timings) // 2], state_to_dict(state)))
+    return results
+
+
+def run_corpus(files: List[Tuple[str, str]], workers: int, session_every: float, repeat: int) -> dict:
+    """
+    Разобрать корпус в пуле процессов.
+
+    Args:
+        files: [(путь, корень)] из corpus_files
+
+    Returns:
+        {'trees': {ключ: (узлов, мс, state)}, 'errors': {путь: ошибка}, 'wall_s': float}
+    """
+    trees: Dict[str, tuple] = {}
+    errors: Dict[str, str] = {}
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(parse_file, path, root, session_every, repeat): path for path, root in files}
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                for key, nodes, ms, state in future.result():
+                    trees[key] = (nodes, ms, state)
+            except Exception as e:
+                errors[path] = f"{type(e).__name__}: {e}"
+    return {'trees': dict(sorted(trees.items())), 'errors': errors,
+            'wall_s': time.perf_counter() - started}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Проверка UITreeParser по корпусу UI tree против эталона")
+    parser.add_argument("paths", nargs="*", default=DEFAULT_CORPUS,
+                        help="Файлы, glob или каталоги (.json, .snap, .sess); по умолчанию output/")
+    parser.add_argument("--golden", default=DEFAULT_GOLDEN, help="Файл эталона")
+    parser.add_argument("--save-golden", action="store_true",
+                        help="Записать результат в эталон (деревья не из этого прогона сохраняются)")
+    parser.add_argument("--workers", type=int, default=0, help="Процессов (по умолчанию - по числу CPU)")
+    parser.add_argument("--session-every", type=float, default=60.0,
+                        help="Для .sess: кадр не чаще раза в столько секунд")
+    parser.add_argument("--repeat", "-n", type=int, default=3, help="Замеров parse() на дерево")
+    parser.add_argument("--show", type=int, default=5, help="Отличий на дерево в отчёте")
+    parser.add_argument("--slowest", type=int, default=10, help="Самых медленных деревьев в отчёте")
+    parser.add_argument("--output", help="Сохранить отчёт в JSON")
+    args = parser.parse_args()
+
+    edge_errors = check_edge_cases()
+    for error in edge_errors:
+        logger.error(f"Синтетическое дерево: {error}")
+
+    files = corpus_files(args.paths)
+    if not files:
+        logger.error(f"Нет файлов корпуса: {' '.join(args.paths)}")
+        return 2
+
+    workers = args.workers or os.cpu_count() or 1
+    result = run_corpus(files, workers, args.session_every, max(1, args.repeat))
+    trees = result['trees']
+    for path, error in result['errors'].items():
+        logger.error(f"{path}: {error}")
+    if not trees:
+        logger.error("Ни одного UI tree в корпусе")
+        return 2
+
+    parse_ms = [ms for _, ms, _ in trees.values()]
+    logger.info(f"Деревьев: {len(trees)} из {len(files)} файлов, {workers} процессов, "
+                f"{result['wall_s']:.1f} с (parse() суммарно {sum(parse_ms) / 1000:.1f} с)")
+    histogram = RollingHistogram(len(parse_ms))
+    for ms in parse_ms:
+        histogram.add(ms)
+    for line in format_table({'parse': histogram.summary()}, title='stage').splitlines():
+        logger.info(f"  {line}")
+    if args.slowest:
+        logger.info("Самые медленные:")
+    for key, (nodes, ms, _) in sorted(trees.items(), key=lambda item: -item[1][1])[:args.slowest]:
+        logger.info(f"  {ms:>8.2f} мс {nodes:>7} узлов  {key}")
+
+    golden = {}
+    if os.path.exists(args.golden):
+        with open(args.golden, 'r', encoding='utf-8') as f:
+            golden = json.load(f).get('states', {})
+
+    if args.save_golden:
+        golden.update({key: state for key, (_, _, state) in trees.items()})
+        os.makedirs(os.path.dirname(os.path.abspath(args.golden)), exist_ok=True)
+        with open(args.golden, 'w', encoding='utf-8') as f:
+            json.dump({'created': time.strftime('%Y-%m-%d %H:%M:%S'), 'states': golden},
+                      f, ensure_ascii=False, sort_keys=True)
+        logger.info(f"Эталон записан: {args.golden} ({len(golden)} деревьев)")
+        return 1 if result['errors'] or edge_errors else 0
+
+    changed = {}
+    new = []
+    for key, (_, _, state) in trees.items():
+        if key not in golden:
+            new.append(key)
+            continue
+        differences = diff_states(golden[key], state)
+        if differences:
+            changed[key] = differences
+
+    if not golden:
+        logger.info(f"Эталон {args.golden} не найден - сравнение пропущено (--save-golden)")
+    else:
+        if new:
+            logger.info(f"Без эталона: {len(new)} деревьев (--save-golden, чтобы добавить)")
+        for key, differences in changed.items():
+            logger.error(f"{key}: {len(differences)} отличий")
+            for line in differences[:args.show]:
+                logger.error(f"    {line}")
+            if len(differences) > args.show:
+                logger.error(f"    ... ещё {len(differences) - args.show}")
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({
+                'created': time.strftime('%Y-%m-%d %H:%M:%S'),
+                'wall_s': result['wall_s'],
+                'workers': workers,
+                'trees': {key: {'nodes': nodes, 'parse_ms': ms} for key, (nodes, ms, _) in trees.items()},
+                'changed': changed,
+                'new': new,
+                'errors': result['errors'],
+            }, f, indent=2, ensure_ascii=False)
+
+    compared = len(trees) - len(new)
+    if golden and not compared:
+        # Эталон есть, но ни одно дерево с ним не сопоставилось - проверки не было
+        logger.error(f"Ни одно дерево не найдено в эталоне {args.golden} "
+                     f"(ключи - пути относительно аргументов корпуса)")
+        return 1
+    if edge_errors:
+        logger.error(f"Разбор синтетических деревьев упал: {len(edge_errors)}")
+        return 1
+    if changed or result['errors']:
+        logger.error(f"Регрессии: {len(changed)} из {compared} деревьев с эталоном, "
+                     f"ошибок чтения: {len(result['errors'])}")
+        return 1
+    if golden:
+        logger.info(f"Разбор совпадает с эталоном: {compared} деревьев")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())